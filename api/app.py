@@ -8,9 +8,13 @@ import sys
 import tempfile
 import shutil
 import json
+import time
 import logging
+import importlib
+import threading
+from contextlib import nullcontext
 from pathlib import Path
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, Response, g, has_request_context, request, jsonify, send_file, send_from_directory
 from flask_cors import CORS
 from werkzeug.utils import secure_filename
 import subprocess
@@ -19,17 +23,32 @@ import subprocess
 logging.getLogger('werkzeug').setLevel(logging.ERROR)
 logging.getLogger('werkzeug').disabled = True
 
-# Configurar o path para importar o FinaCrew
+# Configurar o path para importar o FinaCrew e as tools
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-
-# Importar nova estrutura FinaCrew com decoradores
-from finacrew import process_vr_calculation
-
-# Importar ferramenta de dados reais
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'tools'))
-from real_data_processor_tool import real_data_processor_tool
-from results_analyzer_agent_tool import results_analyzer_agent_tool
-from agent_logger_tool import agent_logger_tool
+
+# Apenas módulos leves no import: crewai, pandas e o processador (com openpyxl/xlsxwriter)
+# são importados na primeira requisição que os usa, então o worker sobe e responde
+# /api/health sem carregá-los (medido em benchmarks/bench_startup_imports.py)
+from session_context import ConfiguracaoLLM, ativar_sessao, criar_sessao, obter_sessao, remover_sessao
+from metrics import HTTP_DURACAO, HTTP_REQUISICOES, TIPO_CONTENT_PROMETHEUS, registro_metricas
+from profiling import PerfilExecucao, perfil_habilitado
+from tracing import rastrear, span, trace_atual
+
+# Jobs assíncronos de processamento
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from jobs import GerenciadorJobs
+from event_bus import EVENTO_FIM, barramento
+
+# Módulos pesados carregados sob demanda (ver precarregar_dependencias)
+MODULOS_PESADOS = (
+    'real_data_processor_tool',
+    'processing_result',
+    'llm_response_cache',
+    'llm_registry',
+    'results_analyzer_agent_tool',
+    'agent_logger_tool'
+)
 
 app = Flask(__name__, static_folder='../frontend/build', static_url_path='/')
 CORS(app)  # Permitir requisições do React
@@ -38,6 +57,7 @@ CORS(app)  # Permitir requisições do React
 UPLOAD_FOLDER = 'temp_uploads'
 ALLOWED_EXTENSIONS = {'xlsx', 'xls', 'csv'}
 MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB máximo
+SSE_HEARTBEAT_SEGUNDOS = 15
 
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = MAX_CONTENT_LENGTH
@@ -45,6 +65,41 @@ app.config['MAX_CONTENT_LENGTH'] = MAX_CONTENT_LENGTH
 # Criar diretório de upload se não existir
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
+# Executor em segundo plano e armazenamento limitado dos jobs
+gerenciador_jobs = GerenciadorJobs()
+
+
+def precarregar_dependencias():
+    """
+    Importa os módulos pesados (crewai, pandas, processador) antes da primeira requisição.
+    Útil em hooks como post_fork do gunicorn ou com FINACREW_PRECARREGAR=1
+    """
+    inicio = time.perf_counter()
+    for modulo in MODULOS_PESADOS:
+        importlib.import_module(modulo)
+    print(f"📦 Dependências pré-carregadas em {time.perf_counter() - inicio:.2f}s")
+
+
+if os.getenv('FINACREW_PRECARREGAR', '0').strip().lower() in ('1', 'true', 'sim'):
+    # Em segundo plano: o health check continua disponível enquanto os imports rodam
+    threading.Thread(target=precarregar_dependencias, name='finacrew-precarregar', daemon=True).start()
+
+
+@app.before_request
+def iniciar_medicao_requisicao():
+    g.inicio_requisicao = time.perf_counter()
+
+
+@app.after_request
+def registrar_metricas_requisicao(response):
+    """Latência e status por rota (o padrão da rota, não a URL, para não explodir os rótulos)"""
+    inicio = g.pop('inicio_requisicao', None)
+    if inicio is not None:
+        endpoint = request.url_rule.rule if request.url_rule is not None else 'sem_rota'
+        HTTP_DURACAO.observar(time.perf_counter() - inicio, endpoint=endpoint, metodo=request.method)
+        HTTP_REQUISICOES.inc(endpoint=endpoint, metodo=request.method, status=response.status_code)
+    return response
+
 
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
@@ -66,6 +121,12 @@ def health_check():
     return jsonify({"status": "healthy", "service": "FinaCrew API"})
 
 
+@app.route('/api/metrics', methods=['GET'])
+def metrics():
+    """Métricas do processo no formato texto do Prometheus"""
+    return Response(registro_metricas.exportar(), content_type=TIPO_CONTENT_PROMETHEUS)
+
+
 @app.route('/api/upload', methods=['POST'])
 def upload_files():
     """Endpoint para upload de arquivos Excel"""
@@ -77,11 +138,17 @@ def upload_files():
         if not files or all(file.filename == '' for file in files):
             return jsonify({"error": "Nenhum arquivo selecionado"}), 400
 
+        # Arquivos vão para a sessão informada (X-Session-Id) ou para uma nova sessão
+        session_id = _session_id_da_requisicao()
+        sessao = obter_sessao(session_id) if session_id else criar_sessao()
+        if sessao is None:
+            return jsonify({"error": f"Sessão não encontrada: {session_id}"}), 404
+
         uploaded_files = []
         for file in files:
             if file and file.filename and allowed_file(file.filename):
                 filename = secure_filename(file.filename)
-                filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
+                filepath = os.path.join(sessao.uploads, filename)
                 file.save(filepath)
                 uploaded_files.append({
                     "name": filename,
@@ -93,6 +160,7 @@ def upload_files():
 
         return jsonify({
             "message": f"{len(uploaded_files)} arquivo(s) carregado(s) com sucesso",
+            "session_id": sessao.id,
             "files": uploaded_files
         })
 
@@ -102,12 +170,20 @@ def upload_files():
 
 @app.route('/api/files', methods=['GET'])
 def list_files():
-    """Listar arquivos carregados"""
+    """Listar arquivos carregados (da sessão em X-Session-Id ou da pasta de upload legada)"""
     try:
+        pasta = app.config['UPLOAD_FOLDER']
+        session_id = _session_id_da_requisicao()
+        if session_id:
+            sessao = obter_sessao(session_id)
+            if sessao is None:
+                return jsonify({"error": f"Sessão não encontrada: {session_id}"}), 404
+            pasta = str(sessao.uploads)
+
         files = []
-        if os.path.exists(app.config['UPLOAD_FOLDER']):
-            for filename in os.listdir(app.config['UPLOAD_FOLDER']):
-                filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
+        if os.path.exists(pasta):
+            for filename in os.listdir(pasta):
+                filepath = os.path.join(pasta, filename)
                 if os.path.isfile(filepath):
                     files.append({
                         "name": filename,
@@ -169,106 +245,303 @@ def test_groq_config():
         return jsonify({"error": f"Erro ao testar Groq: {str(e)}"}), 500
 
 
-@app.route('/api/process', methods=['POST'])
-def process_vr():
+def _executar_processamento(groq_config=None, progresso=None, session_id=None, analise_narrativa=False,
+                            perfilar=False):
     """
-    Endpoint principal para processamento VR/VA
-    Usa exclusivamente o agente analisador para extrair dados
+    Pipeline completo usado por /api/process e pelos jobs: números, arquivos e validações vêm
+    do resultado estruturado do processador; o agente analisador só roda se pedido.
+
+    Args:
+        groq_config: Dicionário {'apiKey', 'model'} vindo do header X-Groq-Config
+        progresso: Callback opcional progresso(etapa, percentual)
+        session_id: Sessão com os uploads; sem ela, lê a pasta de upload legada
+                    e grava a saída em uma sessão nova
+        analise_narrativa: Executa também o agente analisador (LLM) sobre o relatório em texto
+        perfilar: Roda o processamento sob cProfile/tracemalloc/amostragem e lista os
+                  artefatos do perfil (gravados nos logs da sessão) nos downloads
+
+    Returns:
+        Dicionário da resposta de sucesso (exceções sobem para quem chamou)
     """
-    try:
-        print("🚀 Iniciando processamento FinaCrew com Agente Analisador...")
-
-        # Iniciar captura de logs dos agentes
-        session_id = agent_logger_tool.func("start", "", "API_PROCESS")
-
-        # Obter configuração do Groq dos headers
-        groq_config_header = request.headers.get('X-Groq-Config')
-        if groq_config_header:
-            groq_config = json.loads(groq_config_header)
-            os.environ["GROQ_API_KEY"] = groq_config.get('apiKey', os.getenv('GROQ_API_KEY'))
-            os.environ["MODEL"] = groq_config.get('model', os.getenv('MODEL', 'llama-3.3-70b-versatile'))
-            agent_logger_tool.func("log", f"Configuração Groq aplicada: {groq_config.get('model', 'default')}", "CONFIG")
-
-        # Usar dados REAIS
-        agent_logger_tool.func("log", "Iniciando processamento de dados reais", "DATA_PROCESSOR")
-        real_data_result = real_data_processor_tool.func("temp_uploads")
-        agent_logger_tool.func("log", f"Dados processados: {len(str(real_data_result))} caracteres", "DATA_PROCESSOR")
-
-        # Usar agente analisador para extrair dados com validações empresariais
-        print("🧠 Analisando resultados com agente especializado...")
-        agent_logger_tool.func("log", "Iniciando análise com agente especializado", "ANALYZER_AGENT")
-        agent_result = results_analyzer_agent_tool.func(real_data_result)
-        agent_logger_tool.func("crew_result", agent_result, "ANALYZER_AGENT")
-
-        # Parse do resultado do agente
-        agent_data = json.loads(agent_result)
-        agent_logger_tool.func("log", f"Resultado parseado: {agent_data.get('funcionarios_elegiveis', 0)} funcionários", "PARSER")
-
-        # Salvar logs e obter caminho do arquivo
-        log_file_path = agent_logger_tool.func("save", "", "API_PROCESS")
-        log_filename = os.path.basename(log_file_path) if log_file_path else "log_indisponivel.txt"
-
-        print("✅ Processamento concluído com Agente Analisador!")
-        return jsonify({
-            "status": "success",
-            "message": "Processamento VR/VA concluído com agente analisador",
-            "funcionarios_elegiveis": agent_data.get("funcionarios_elegiveis", 0),
-            "valor_total_vr": agent_data.get("valor_total_vr", 0.0),
-            "valor_empresa": agent_data.get("valor_empresa", 0.0),
-            "valor_funcionario": agent_data.get("valor_funcionario", 0.0),
-            "tempo_processamento": agent_data.get("tempo_processamento", "Unknown"),
-            "arquivos_gerados": agent_data.get("arquivos_gerados", []),
-            "validacoes": agent_data.get("validacoes", {}),
-            "metodo_extracao": agent_data.get("metodo_extracao", "agente_analisador"),
-            "log_sessao": session_id,
-            "downloads_disponiveis": [
+    from real_data_processor_tool import executar_processamento_real
+    from processing_result import METODO_ESTRUTURADO, CronometroEtapas
+    from agent_logger_tool import agent_logger_tool
+
+    # Tempos desta requisição (o processador tem os seus em tempos_etapas)
+    cronometro = CronometroEtapas()
+
+    def notificar(etapa, percentual):
+        if progresso is not None:
+            progresso(etapa, percentual)
+
+    if session_id:
+        sessao = obter_sessao(session_id)
+        if sessao is None:
+            raise ValueError(f"Sessão não encontrada: {session_id}")
+    else:
+        sessao = criar_sessao(uploads=UPLOAD_FOLDER)
+    # Configuração do Groq recebida nos headers vale só para esta sessão (sem os.environ)
+    sessao.llm = ConfiguracaoLLM.de_groq_config(groq_config)
+
+    # Rota HTTP de origem (jobs rodam fora da requisição)
+    rota = request.url_rule.rule if has_request_context() and request.url_rule is not None else 'job'
+    with ativar_sessao(sessao), rastrear('api.processamento', sessao.logs, session_id=sessao.id, rota=rota,
+                                         analise_narrativa=analise_narrativa, perfil=perfilar):
+        try:
+            print(f"🚀 Iniciando processamento FinaCrew (sessão {sessao.id})...")
+
+            # Iniciar captura de logs dos agentes (no diretório da sessão)
+            log_sessao = agent_logger_tool.func("start", "", "API_PROCESS")
+            if sessao.llm:
+                agent_logger_tool.func("log", f"Configuração Groq aplicada: {sessao.llm.modelo}", "CONFIG")
+
+            # Usar dados REAIS (0-80% do progresso total)
+            cronometro.iniciar('Processamento')
+            agent_logger_tool.func("log", "Iniciando processamento de dados reais", "DATA_PROCESSOR")
+            perfil = PerfilExecucao(sessao.logs) if perfilar else None
+            with perfil if perfil is not None else nullcontext(), \
+                    span('tool.real_data_processor_tool', diretorio=str(sessao.uploads)) as processamento:
+                resultado = executar_processamento_real(
+                    str(sessao.uploads),
+                    progresso=lambda etapa, percentual: notificar(etapa, percentual * 0.8),
+                    diretorio_saida=str(sessao.saida)
+                )
+                processamento.definir(competencia=resultado.competencia, linhas=resultado.funcionarios_elegiveis,
+                                      excluidos=resultado.funcionarios_excluidos, sucesso=resultado.sucesso)
+            if perfil is not None:
+                agent_logger_tool.func("log", f"Perfil da execução: {perfil.resumo()}", "PROFILER")
+            if not resultado.sucesso:
+                raise RuntimeError(resultado.erro)
+            cache_planilhas = resultado.cache_planilhas
+            agent_logger_tool.func("log", f"Cache de planilhas: {cache_planilhas['hits']} hit(s), {cache_planilhas['misses']} miss(es)", "DATA_PROCESSOR")
+            agent_logger_tool.func("log", f"Dados processados: {resultado.funcionarios_elegiveis} funcionários elegíveis em {resultado.tempo_total:.2f}s", "DATA_PROCESSOR")
+
+            # Agente analisador (LLM) apenas como etapa narrativa opcional
+            analise = None
+            if analise_narrativa:
+                from results_analyzer_agent_tool import results_analyzer_agent_tool
+
+                print("🧠 Analisando resultados com agente especializado...")
+                cronometro.iniciar('Análise narrativa')
+                notificar('Analisando resultados com agente especializado', 80)
+                agent_logger_tool.func("log", "Iniciando análise com agente especializado", "ANALYZER_AGENT")
+                agent_result = results_analyzer_agent_tool.func(resultado.relatorio)
+                agent_logger_tool.func("crew_result", agent_result, "ANALYZER_AGENT")
+                analise = json.loads(agent_result)
+
+            # Salvar logs e obter caminho do arquivo
+            notificar('Salvando logs', 95)
+            cronometro.iniciar('Salvando logs')
+            log_file_path = agent_logger_tool.func("save", "", "API_PROCESS")
+            log_filename = os.path.basename(log_file_path) if log_file_path else "log_indisponivel.txt"
+
+            planilha_vr = os.path.basename(resultado.arquivos['vr_mensal'])
+            downloads = [
                 {
-                    "nome": "VR MENSAL 05.2025.xlsx",
+                    "nome": planilha_vr,
                     "descricao": "Planilha principal com cálculos de VR",
-                    "url": "/api/download/VR MENSAL 05.2025.xlsx",
+                    "url": f"/api/sessions/{sessao.id}/download/{planilha_vr}",
                     "tipo": "excel"
-                },
-                {
+                }
+            ]
+            if 'exclusoes' in resultado.arquivos:
+                downloads.append({
                     "nome": "FUNCIONARIOS_EXCLUIDOS_AUDITORIA.xlsx",
                     "descricao": "Relatório de exclusões para auditoria",
-                    "url": "/api/download/FUNCIONARIOS_EXCLUIDOS_AUDITORIA.xlsx",
+                    "url": f"/api/sessions/{sessao.id}/download/FUNCIONARIOS_EXCLUIDOS_AUDITORIA.xlsx",
                     "tipo": "excel"
-                },
-                {
-                    "nome": log_filename,
-                    "descricao": "Log completo das conversas dos agentes",
-                    "url": f"/api/download/{log_filename}",
-                    "tipo": "log"
-                }
-            ]
-        })
+                })
+            descricoes_perfil = {
+                'prof': "Perfil cProfile da execução (pstats, snakeviz)",
+                'alocacoes': "Linhas que mais alocaram memória (tracemalloc)",
+                'collapsed': "Pilhas amostradas no formato collapsed (flamegraph)"
+            }
+            for tipo, caminho in (perfil.arquivos.items() if perfil is not None else ()):
+                downloads.append({
+                    "nome": caminho.name,
+                    "descricao": descricoes_perfil[tipo],
+                    "url": f"/api/sessions/{sessao.id}/download/{caminho.name}",
+                    "tipo": "perfil"
+                })
+            trace = trace_atual()
+            if trace is not None:
+                downloads.append({
+                    "nome": trace['chrome'].name,
+                    "descricao": "Trace da execução (chrome://tracing, Perfetto)",
+                    "url": f"/api/sessions/{sessao.id}/download/{trace['chrome'].name}",
+                    "tipo": "trace"
+                })
+            downloads.append({
+                "nome": log_filename,
+                "descricao": "Log completo das conversas dos agentes",
+                "url": f"/api/sessions/{sessao.id}/download/{log_filename}",
+                "tipo": "log"
+            })
 
-    except Exception as e:
-        print(f"❌ Erro crítico na API: {e}")
-        # Tentar salvar log mesmo em caso de erro
-        try:
-            agent_logger_tool.func("log", f"ERRO: {str(e)}", "ERROR")
-            agent_logger_tool.func("save", "", "ERROR_HANDLER")
-        except:
-            pass
+            tempo_requisicao = cronometro.finalizar()
+            print("✅ Processamento concluído!")
+            resposta = resultado.to_dict()
+            resposta.update({
+                "status": "success",
+                "message": "Processamento VR/VA concluído",
+                "metodo_extracao": METODO_ESTRUTURADO,
+                "log_sessao": log_sessao,
+                "session_id": sessao.id,
+                "downloads_disponiveis": downloads,
+                "tempos_requisicao": {**cronometro.tempos, 'Total': round(tempo_requisicao, 4)}
+            })
+            if perfil is not None:
+                resposta["perfil"] = perfil.resumo()
+            if analise is not None:
+                from llm_response_cache import obter_cache_llm
+                from llm_registry import registro_llm
 
+                resposta["analise_narrativa"] = analise
+                resposta["cache_llm"] = obter_cache_llm().estatisticas()
+                resposta["clientes_llm"] = registro_llm.estatisticas()
+            return resposta
+
+        except Exception as e:
+            print(f"❌ Erro crítico no processamento: {e}")
+            cronometro.finalizar(erro=e)
+            # Tentar salvar log mesmo em caso de erro
+            try:
+                agent_logger_tool.func("log", f"ERRO: {str(e)}", "ERROR")
+                agent_logger_tool.func("save", "", "ERROR_HANDLER")
+            except:
+                pass
+            raise
+
+
+def _analise_narrativa_da_requisicao():
+    """Análise pelo agente (LLM) pedida no corpo JSON (analise_narrativa) ou em ?analise=1"""
+    corpo = request.get_json(silent=True) or {}
+    if 'analise_narrativa' in corpo:
+        return bool(corpo['analise_narrativa'])
+    return request.args.get('analise', '').lower() in ('1', 'true', 'sim')
+
+
+def _session_id_da_requisicao():
+    """Sessão informada pelo frontend no header X-Session-Id (ou no parâmetro session_id)"""
+    return request.headers.get('X-Session-Id') or request.args.get('session_id')
+
+
+def _perfil_da_requisicao():
+    """Perfil da execução pedido no header X-Profile (ou ligado para todas por FINACREW_PROFILE)"""
+    return perfil_habilitado(request.headers.get('X-Profile'))
+
+
+def _groq_config_da_requisicao():
+    """Configuração do Groq enviada pelo frontend no header X-Groq-Config"""
+    groq_config_header = request.headers.get('X-Groq-Config')
+    return json.loads(groq_config_header) if groq_config_header else None
+
+
+@app.route('/api/process', methods=['POST'])
+def process_vr():
+    """
+    Endpoint principal para processamento VR/VA (síncrono)
+    Resposta montada do resultado estruturado; o agente analisador roda só com
+    analise_narrativa=true. Para meses grandes prefira POST /api/jobs
+    """
+    try:
+        session_id = _session_id_da_requisicao()
+        if session_id and obter_sessao(session_id) is None:
+            return jsonify({"status": "error", "error": f"Sessão não encontrada: {session_id}"}), 404
+        return jsonify(_executar_processamento(
+            _groq_config_da_requisicao(), session_id=session_id,
+            analise_narrativa=_analise_narrativa_da_requisicao(), perfilar=_perfil_da_requisicao()
+        ))
+
+    except Exception as e:
         return jsonify({
             "status": "error",
             "error": f"Erro crítico: {str(e)}"
         }), 500
 
 
+@app.route('/api/jobs', methods=['POST'])
+def create_job():
+    """Agenda o processamento VR/VA em segundo plano e retorna o id do job imediatamente"""
+    try:
+        session_id = _session_id_da_requisicao()
+        if session_id and obter_sessao(session_id) is None:
+            return jsonify({"error": f"Sessão não encontrada: {session_id}"}), 404
+        job_id = gerenciador_jobs.submeter(
+            _executar_processamento, _groq_config_da_requisicao(), session_id=session_id,
+            analise_narrativa=_analise_narrativa_da_requisicao(), perfilar=_perfil_da_requisicao()
+        )
+        return jsonify({
+            "job_id": job_id,
+            "estado": "pendente",
+            "status_url": f"/api/jobs/{job_id}",
+            "session_id": session_id
+        }), 202
+
+    except Exception as e:
+        return jsonify({"error": f"Erro ao agendar processamento: {str(e)}"}), 500
+
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Estado, etapa, percentual e (quando concluído) resultado do job"""
+    job = gerenciador_jobs.obter(job_id)
+    if job is None:
+        return jsonify({"error": f"Job não encontrado: {job_id}"}), 404
+    return jsonify(job)
+
+
+@app.route('/api/jobs/<job_id>/eventos', methods=['GET'])
+def stream_job_events(job_id):
+    """
+    Server-Sent Events do job: logs dos agentes ('log'), etapas ('etapa') e término ('fim')
+    Cada cliente tem sua própria fila limitada; clientes lentos perdem eventos antigos,
+    nunca atrasam o pipeline. Reconexões continuam a partir do header Last-Event-ID
+    """
+    job = gerenciador_jobs.obter(job_id)
+    if job is None:
+        return jsonify({"error": f"Job não encontrado: {job_id}"}), 404
+
+    try:
+        desde_id = int(request.headers.get('Last-Event-ID', 0))
+    except ValueError:
+        desde_id = 0
+    assinatura = barramento.inscrever(job_id, desde_id=desde_id)
+    job_finalizado = job['estado'] in ('concluido', 'erro')
+
+    def gerar():
+        try:
+            while True:
+                evento = assinatura.proximo(timeout=0.1 if job_finalizado else SSE_HEARTBEAT_SEGUNDOS)
+                if evento is None:
+                    if job_finalizado:
+                        break
+                    # Comentário SSE mantém a conexão viva entre eventos
+                    yield ": heartbeat\n\n"
+                    continue
+                dados = json.dumps(evento['dados'], ensure_ascii=False, default=str)
+                yield f"id: {evento['id']}\nevent: {evento['tipo']}\ndata: {dados}\n\n"
+                if evento['tipo'] == EVENTO_FIM:
+                    break
+        finally:
+            barramento.cancelar(assinatura)
+
+    return Response(gerar(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
 
 @app.route('/api/test-groq', methods=['GET'])
 def test_groq():
     """Testa a conectividade com a API do Groq usando a chave padrão"""
     try:
-        from tools.results_analyzer_agent_tool import get_llm
+        from results_analyzer_agent_tool import get_llm
 
         print("🧪 Testando conexão com Groq...")
 
-        # Tentar criar uma instância do LLM
-        llm = get_llm()
+        # Tentar criar uma instância do LLM (sem cache: o teste precisa chegar ao Groq)
+        llm = get_llm(usar_cache=False)
 
         # Fazer uma chamada simples para testar
         from crewai import Agent, Task, Crew
@@ -357,6 +630,30 @@ def download_file(filename):
         return jsonify({"error": f"Erro no download: {str(e)}"}), 500
 
 
+@app.route('/api/sessions/<session_id>/download/<filename>', methods=['GET'])
+def download_session_file(session_id, filename):
+    """Download de arquivo gerado na sessão (saída, logs ou uploads dela)"""
+    sessao = obter_sessao(session_id)
+    if sessao is None:
+        return jsonify({"error": f"Sessão não encontrada: {session_id}"}), 404
+
+    for pasta in (sessao.saida, sessao.logs, sessao.uploads):
+        if (pasta / filename).is_file():
+            # send_from_directory recusa caminhos fora da pasta da sessão
+            return send_from_directory(pasta.resolve(), filename, as_attachment=True, download_name=filename)
+    return jsonify({"error": f"Arquivo não encontrado na sessão {session_id}: {filename}"}), 404
+
+
+@app.route('/api/sessions/<session_id>', methods=['DELETE'])
+def delete_session(session_id):
+    """Remove uploads, saídas e logs da sessão"""
+    sessao = obter_sessao(session_id)
+    if sessao is None:
+        return jsonify({"error": f"Sessão não encontrada: {session_id}"}), 404
+    remover_sessao(sessao)
+    return jsonify({"status": "removida", "session_id": session_id})
+
+
 # Catch-all route para servir o React (deve ser a última rota)
 @app.route('/<path:path>')
 def serve_react_app(path):
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Jobs assíncronos de processamento VR/VA
+O pipeline roda em um executor em segundo plano; o cliente consulta estado,
+etapa e percentual pelo id do job. Resultados concluídos ficam em um
+armazenamento limitado, com despejo dos mais antigos
+"""
+
+import os
+import time
+import uuid
+import threading
+import contextvars
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, asdict
+from typing import Callable, Dict, Optional
+import logging
+
+from event_bus import EVENTO_ETAPA, EVENTO_FIM, definir_canal, publicar_evento, restaurar_canal
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+ESTADO_PENDENTE = 'pendente'
+ESTADO_EXECUTANDO = 'executando'
+ESTADO_CONCLUIDO = 'concluido'
+ESTADO_ERRO = 'erro'
+ESTADOS_FINAIS = (ESTADO_CONCLUIDO, ESTADO_ERRO)
+
+# Processamentos simultâneos e quantidade de jobs mantidos em memória
+MAX_WORKERS_PADRAO = int(os.getenv('FINACREW_JOBS_WORKERS', '2'))
+MAX_JOBS_PADRAO = int(os.getenv('FINACREW_JOBS_MAX_RESULTADOS', '50'))
+
+
+@dataclass
+class Job:
+    """Estado de um processamento em segundo plano"""
+    id: str
+    estado: str = ESTADO_PENDENTE
+    etapa: str = 'Na fila'
+    percentual: int = 0
+    criado_em: float = field(default_factory=time.time)
+    iniciado_em: Optional[float] = None
+    concluido_em: Optional[float] = None
+    resultado: Optional[Dict] = None
+    erro: Optional[str] = None
+
+    def to_dict(self) -> Dict:
+        dados = asdict(self)
+        fim = self.concluido_em or time.time()
+        dados['duracao_segundos'] = round(fim - self.iniciado_em, 2) if self.iniciado_em else None
+        return dados
+
+
+class GerenciadorJobs:
+    """Executor em segundo plano + armazenamento limitado de jobs (OrderedDict por ordem de criação)"""
+
+    def __init__(self, max_workers: int = MAX_WORKERS_PADRAO, max_jobs: int = MAX_JOBS_PADRAO):
+        self.max_jobs = max_jobs
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='finacrew-job')
+        self._jobs: 'OrderedDict[str, Job]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submeter(self, funcao: Callable[..., Dict], *args, **kwargs) -> str:
+        """
+        Agenda o pipeline e retorna o id do job imediatamente.
+
+        Args:
+            funcao: Chamada como funcao(*args, progresso=callback, **kwargs); callback(etapa, percentual)
+                    atualiza o job e o retorno (dicionário) vira o resultado final
+        """
+        job = Job(id=uuid.uuid4().hex)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._despejar_excedente()
+        # Cada job roda em uma cópia do contexto: sessão, canal e captura de logs definidos
+        # durante o pipeline não vazam para o próximo job da mesma thread do executor
+        self._executor.submit(contextvars.copy_context().run, self._executar, job.id, funcao, args, kwargs)
+        logger.info(f"Job {job.id} agendado")
+        return job.id
+
+    def obter(self, job_id: str) -> Optional[Dict]:
+        """Estado atual do job (None se desconhecido ou já despejado)"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return job.to_dict() if job else None
+
+    def atualizar_progresso(self, job_id: str, etapa: str, percentual: int):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.estado in ESTADOS_FINAIS:
+                return
+            job.etapa = etapa
+            job.percentual = max(job.percentual, min(int(percentual), 99))
+            dados = {'etapa': job.etapa, 'percentual': job.percentual}
+        publicar_evento(EVENTO_ETAPA, dados, canal=job_id)
+
+    def _executar(self, job_id: str, funcao: Callable[..., Dict], args, kwargs):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            job.estado = ESTADO_EXECUTANDO
+            job.etapa = 'Iniciando'
+            job.iniciado_em = time.time()
+
+        def progresso(etapa: str, percentual: int):
+            self.atualizar_progresso(job_id, etapa, percentual)
+
+        # Logs publicados durante o pipeline (agent_logger) vão para o canal do job
+        token = definir_canal(job_id)
+        publicar_evento(EVENTO_ETAPA, {'etapa': 'Iniciando', 'percentual': 0})
+        try:
+            resultado = funcao(*args, progresso=progresso, **kwargs)
+            campos = {'estado': ESTADO_CONCLUIDO, 'etapa': 'Concluído', 'percentual': 100, 'resultado': resultado}
+        except Exception as e:
+            logger.error(f"Job {job_id} falhou: {e}")
+            campos = {'estado': ESTADO_ERRO, 'erro': str(e)}
+        finally:
+            restaurar_canal(token)
+
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                for nome, valor in campos.items():
+                    setattr(job, nome, valor)
+                job.concluido_em = time.time()
+            self._despejar_excedente()
+        publicar_evento(EVENTO_FIM, {'estado': campos['estado'], 'erro': campos.get('erro')}, canal=job_id)
+
+    def _despejar_excedente(self):
+        """Remove os jobs finalizados mais antigos acima do limite (jobs ativos nunca saem)"""
+        excedente = len(self._jobs) - self.max_jobs
+        if excedente <= 0:
+            return
+        for job_id in [j.id for j in self._jobs.values() if j.estado in ESTADOS_FINAIS][:excedente]:
+            del self._jobs[job_id]
+            logger.info(f"Job {job_id} despejado do armazenamento")
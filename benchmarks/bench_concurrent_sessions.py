@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Benchmark de sessões simultâneas: N processamentos completos (sem o agente LLM) sobre
+as mesmas planilhas, cada um em uma sessão própria, com 1, 2, 4... workers
+Mede a vazão (execuções/minuto) e confere que cada sessão gravou a própria saída,
+com a mesma base consolidada das demais
+
+Uso:
+    python benchmarks/bench_concurrent_sessions.py temp_uploads                  # threads, 1/2/4 workers
+    python benchmarks/bench_concurrent_sessions.py temp_uploads --processos      # um processo por worker
+    python benchmarks/bench_concurrent_sessions.py temp_uploads --execucoes 8 --workers 1 2 4 8
+"""
+
+import sys
+import time
+import argparse
+import tempfile
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ / 'tools'))
+
+from consolidated_artifact import ARTEFATO_PADRAO, carregar_base_consolidada
+from real_data_processor_tool import processar_dados_reais
+from session_context import ativar_sessao, criar_sessao
+
+WORKERS_PADRAO = [1, 2, 4]
+EXECUCOES_PADRAO = 8
+
+
+def executar_sessao(entrada: str, raiz_sessoes: str) -> dict:
+    """Um processamento completo em uma sessão nova (roda na thread ou no processo do worker)"""
+    sessao = criar_sessao(raiz=raiz_sessoes, uploads=entrada)
+    inicio = time.perf_counter()
+    with ativar_sessao(sessao):
+        processar_dados_reais(entrada)
+    artefatos = list(sessao.saida.glob(f"{ARTEFATO_PADRAO}.*"))
+    return {
+        'sessao': sessao.id,
+        'tempo_s': time.perf_counter() - inicio,
+        'artefato': str(artefatos[0]) if artefatos else None,
+        'planilha': (sessao.saida / "VR MENSAL 05.2025.xlsx").is_file()
+    }
+
+
+def medir(entrada: str, workers: int, execucoes: int, processos: bool) -> dict:
+    with tempfile.TemporaryDirectory() as raiz_sessoes:
+        executor_cls = ProcessPoolExecutor if processos else ThreadPoolExecutor
+        inicio = time.perf_counter()
+        with executor_cls(max_workers=workers) as executor:
+            resultados = list(executor.map(executar_sessao, [entrada] * execucoes, [raiz_sessoes] * execucoes))
+        tempo_total = time.perf_counter() - inicio
+
+        # Isolamento: cada sessão tem saída própria, todas com a mesma base consolidada
+        sessoes = {r['sessao'] for r in resultados}
+        saidas_ok = all(r['planilha'] and r['artefato'] for r in resultados)
+        referencia = carregar_base_consolidada(resultados[0]['artefato']) if saidas_ok else None
+        bases_iguais = saidas_ok and all(
+            carregar_base_consolidada(r['artefato']).equals(referencia) for r in resultados[1:]
+        )
+
+    return {
+        'workers': workers,
+        'execucoes': execucoes,
+        'tempo_total_s': round(tempo_total, 2),
+        'tempo_medio_s': round(sum(r['tempo_s'] for r in resultados) / execucoes, 2),
+        'vazao_por_min': round(execucoes / tempo_total * 60, 1),
+        'isolado': len(sessoes) == execucoes and bases_iguais
+    }
+
+
+def main(entrada: str, workers_lista, execucoes: int, processos: bool):
+    if not (Path(entrada) / 'ATIVOS.xlsx').exists():
+        raise SystemExit(f"❌ ATIVOS.xlsx não encontrado em {entrada}")
+
+    modo = 'processos' if processos else 'threads'
+    print(f"📊 Benchmark de sessões simultâneas ({execucoes} execuções por rodada, {modo})")
+
+    # Aquecimento: preenche o cache de planilhas para todas as rodadas partirem do mesmo estado
+    with tempfile.TemporaryDirectory() as raiz_sessoes:
+        executar_sessao(entrada, raiz_sessoes)
+
+    print(f"{'Workers':>8} {'Total (s)':>10} {'Médio (s)':>10} {'Execuções/min':>14} {'Speedup':>8} {'Isolado':>8}")
+    resultados = []
+    for workers in workers_lista:
+        r = medir(entrada, workers, execucoes, processos)
+        resultados.append(r)
+        speedup = r['vazao_por_min'] / resultados[0]['vazao_por_min']
+        print(f"{r['workers']:>8} {r['tempo_total_s']:>10.2f} {r['tempo_medio_s']:>10.2f} "
+              f"{r['vazao_por_min']:>14.1f} {speedup:>7.2f}x {'✅' if r['isolado'] else '❌':>7}")
+    return resultados
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('entrada', help="Diretório com as planilhas de entrada")
+    parser.add_argument('--workers', type=int, nargs='+', default=WORKERS_PADRAO)
+    parser.add_argument('--execucoes', type=int, default=EXECUCOES_PADRAO)
+    parser.add_argument('--processos', action='store_true', help="Workers em processos em vez de threads")
+    args = parser.parse_args()
+    main(args.entrada, args.workers, args.execucoes, args.processos)
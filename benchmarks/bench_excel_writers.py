@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Benchmark da escrita da planilha VR MENSAL: xlsxwriter (constant_memory) x openpyxl
+Cada combinação backend/tamanho roda em um subprocesso próprio para medir o pico de RSS isolado
+
+Uso:
+    python benchmarks/bench_excel_writers.py                 # 10k, 100k e 500k linhas
+    python benchmarks/bench_excel_writers.py 10000 50000     # tamanhos personalizados
+"""
+
+import os
+import sys
+import json
+import time
+import resource
+import tempfile
+import subprocess
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ / 'tools'))
+
+from excel_output_writer import BACKEND_OPENPYXL, BACKEND_XLSXWRITER, escrever_planilha, tabela_validacoes
+from vr_calculation_engine import COLUNAS_VR_MENSAL
+
+TAMANHOS_PADRAO = [10000, 100000, 500000]
+BACKENDS = [BACKEND_XLSXWRITER, BACKEND_OPENPYXL]
+
+SINDICATOS = [
+    'SP - SINDPD SP - SIND.TRAB.EM PROC DADOS E EMPR.EMPRESAS PROC DADOS ESTADO DE SP.',
+    'RJ - SINDPD RJ - SINDICATO PROFISSIONAIS DE PROCESSAMENTO DADOS DO RIO DE JANEIRO',
+    'RS - SINDPPD RS - SINDICATO DOS TRAB. EM PROC. DE DADOS RIO GRANDE DO SUL',
+    'PR - SITEPD PR - SIND DOS TRAB EM EMPR PRIVADAS DE PROC DE DADOS DE CURITIBA E REGIAO METROPOLITANA'
+]
+
+
+def gerar_base_vr(linhas: int) -> pd.DataFrame:
+    """Base sintética com as colunas e tipos da aba VR MENSAL"""
+    rng = np.random.default_rng(42)
+    valor_diario = rng.choice([37.5, 35.0, 29.3], linhas)
+    dias = rng.integers(15, 23, linhas)
+    total = valor_diario * dias
+    obs = np.where(rng.random(linhas) < 0.05, 'Admitido em 10/04/2025', '')
+    df = pd.DataFrame({
+        'Matricula': (30000 + np.arange(linhas)).astype(str),
+        'Admissão': '2024-08-01',
+        'Sindicato do Colaborador': rng.choice(SINDICATOS, linhas),
+        'Competência': '2025-05-01',
+        'Dias': dias,
+        'VALOR DIÁRIO VR': valor_diario,
+        'TOTAL': total,
+        'Custo empresa': total * 0.80,
+        'Desconto profissional': total * 0.20,
+        'OBS GERAL': obs
+    }, columns=COLUNAS_VR_MENSAL)
+    df['OBS GERAL'] = df['OBS GERAL'].replace('', None)
+    return df
+
+
+def medir(backend: str, linhas: int) -> dict:
+    """Executado no subprocesso: gera a base, grava e reporta tempo e pico de RSS"""
+    df = gerar_base_vr(linhas)
+    rss_base_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho = os.path.join(diretorio, 'VR MENSAL.xlsx')
+        inicio = time.perf_counter()
+        escrever_planilha(caminho, {'VR MENSAL 05.2025': df, 'Validações': tabela_validacoes()}, backend=backend)
+        tempo = time.perf_counter() - inicio
+        tamanho_mb = os.path.getsize(caminho) / (1024 * 1024)
+
+    # ru_maxrss é informado em KB no Linux
+    rss_pico_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return {
+        'backend': backend,
+        'linhas': linhas,
+        'tempo_s': round(tempo, 2),
+        'rss_pico_mb': round(rss_pico_mb, 1),
+        'rss_escrita_mb': round(rss_pico_mb - rss_base_mb, 1),
+        'arquivo_mb': round(tamanho_mb, 1)
+    }
+
+
+def executar_subprocesso(backend: str, linhas: int) -> dict:
+    saida = subprocess.run(
+        [sys.executable, __file__, '--medir', backend, str(linhas)],
+        capture_output=True, text=True, check=True
+    )
+    return json.loads(saida.stdout.strip().splitlines()[-1])
+
+
+def main(tamanhos):
+    print("📊 Benchmark de escrita Excel (VR MENSAL)")
+    print(f"{'Backend':<12} {'Linhas':>8} {'Tempo (s)':>10} {'RSS pico (MB)':>14} {'RSS escrita (MB)':>17} {'Arquivo (MB)':>13}")
+    resultados = []
+    for linhas in tamanhos:
+        for backend in BACKENDS:
+            r = executar_subprocesso(backend, linhas)
+            resultados.append(r)
+            print(f"{r['backend']:<12} {r['linhas']:>8} {r['tempo_s']:>10.2f} {r['rss_pico_mb']:>14.1f} "
+                  f"{r['rss_escrita_mb']:>17.1f} {r['arquivo_mb']:>13.1f}")
+    return resultados
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 4 and sys.argv[1] == '--medir':
+        print(json.dumps(medir(sys.argv[2], int(sys.argv[3]))))
+    else:
+        main([int(a) for a in sys.argv[1:]] or TAMANHOS_PADRAO)
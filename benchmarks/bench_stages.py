@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Benchmark por etapa do processador sobre datasets sintéticos (synthetic_dataset.py)
+Mede tempo de parede e pico de memória de cada etapa da real_data_processor_tool
+(carregamento, conversão de datas, exclusões, consolidação, prorrateio, escrita Excel),
+da working_days_calculator_tool e do pipeline completo. Cada tamanho roda em processos
+novos: uma passada sem tracemalloc para os tempos (mediana de --repeticoes) e outra com
+tracemalloc para o pico de memória de cada etapa
+
+Uso:
+    python benchmarks/bench_stages.py                           # 1k e 50k funcionários
+    python benchmarks/bench_stages.py 1k 50k 500k --repeticoes 3
+    python benchmarks/bench_stages.py --entrada temp_uploads    # planilhas existentes
+    python benchmarks/bench_stages.py 1k --json etapas.json
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import resource
+import tempfile
+import subprocess
+import tracemalloc
+from contextlib import contextmanager, redirect_stdout
+from pathlib import Path
+from statistics import median
+from typing import Dict, List, Optional
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ / 'tools'))
+sys.path.insert(0, str(RAIZ / 'benchmarks'))
+
+from synthetic_dataset import TAMANHOS, gerar_dataset, resolver_tamanho
+
+TAMANHOS_PADRAO = ['1k', '50k']
+REPETICOES_PADRAO = 1
+ETAPAS = (
+    'carregamento',
+    'datas',
+    'exclusoes',
+    'consolidacao',
+    'prorrateio',
+    'escrita_excel',
+    'dias_uteis_tool',
+    'pipeline'
+)
+# Fontes de exclusão por cargo, como no processador
+FONTES_POR_CARGO = [
+    ('AFASTAMENTOS', 'AFASTAMENTOS/LICENÇAS'),
+    ('EXTERIOR', 'FUNCIONÁRIO NO EXTERIOR'),
+    ('ESTAGIO', 'ESTAGIÁRIO'),
+    ('APRENDIZ', 'APRENDIZ')
+]
+
+
+class MedidorEtapas:
+    """Tempo (e, com tracemalloc ligado, pico de alocações) de cada bloco medido"""
+
+    def __init__(self, memoria: bool):
+        self.memoria = memoria
+        self.resultados: Dict[str, Dict[str, float]] = {}
+
+    @contextmanager
+    def etapa(self, nome: str):
+        if self.memoria:
+            tracemalloc.reset_peak()
+            atual_inicio = tracemalloc.get_traced_memory()[0]
+        inicio = time.perf_counter()
+        yield
+        medida = {'tempo_s': round(time.perf_counter() - inicio, 4)}
+        if self.memoria:
+            medida['pico_mb'] = round((tracemalloc.get_traced_memory()[1] - atual_inicio) / (1024 * 1024), 1)
+        # ru_maxrss (KB no Linux) é o pico do processo até aqui, não só da etapa
+        medida['rss_pico_mb'] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+        self.resultados[nome] = medida
+
+
+def executar_etapas(entrada: str, saida: str, medidor: MedidorEtapas) -> Dict:
+    """Executado no subprocesso: cada etapa com as mesmas funções que o processador usa"""
+    from date_column_parser import converter_coluna_datas
+    from excel_output_writer import escrever_planilha, tabela_validacoes, tabelas_auditoria
+    from exclusion_builder import ConstrutorExclusoes
+    from holiday_calendar import limpar_cache
+    from proration_engine import aplicar_prorrateio_dias_uteis, separar_ferias
+    from real_data_processor_tool import DIAS_POR_SINDICATO, VALOR_POR_SINDICATO, executar_processamento_real
+    from vr_calculation_engine import COMPETENCIA_PADRAO, calcular_base_consolidada, mascara_desligados_excluidos
+    from working_days_calculator_tool import working_days_calculator_tool
+    from workbook_loader import carregar_planilhas
+
+    pasta = Path(saida)
+    valor_diario_padrao, dias_uteis_padrao = 37.50, 22
+
+    with medidor.etapa('carregamento'):
+        dataset = carregar_planilhas(entrada)
+    df_ativos = dataset.get('ATIVOS')
+
+    with medidor.etapa('datas'):
+        df_desligados = dataset.get('DESLIGADOS').copy()
+        df_desligados['DATA DEMISSÃO'], _ = converter_coluna_datas(df_desligados['DATA DEMISSÃO'])
+        df_desligados['DIA'] = df_desligados['DATA DEMISSÃO'].dt.day
+        df_admissoes = dataset.get('ADMISSAO_ABRIL').copy()
+        df_admissoes['Admissão'], _ = converter_coluna_datas(df_admissoes['Admissão'])
+
+    with medidor.etapa('exclusoes'):
+        construtor = ConstrutorExclusoes()
+        construtor.adicionar_ferias(dataset.get('FERIAS'))
+        construtor.adicionar_desligados(df_desligados[mascara_desligados_excluidos(df_desligados)])
+        construtor.adicionar_admissoes_posteriores(df_admissoes)
+        for chave, motivo in FONTES_POR_CARGO:
+            if dataset.existe(chave):
+                construtor.adicionar_por_cargo(dataset.get(chave), motivo, dataset.arquivo(chave))
+        construtor.adicionar_diretores(df_ativos)
+        df_exclusoes = construtor.construir()
+
+    with medidor.etapa('consolidacao'):
+        df_consolidado = calcular_base_consolidada(
+            df_ativos, construtor.matriculas, df_admissoes, df_desligados,
+            VALOR_POR_SINDICATO, DIAS_POR_SINDICATO, valor_diario_padrao, dias_uteis_padrao
+        )
+
+    with medidor.etapa('prorrateio'):
+        _, ferias_parciais = separar_ferias(dataset.get('FERIAS'), COMPETENCIA_PADRAO)
+        aplicar_prorrateio_dias_uteis(
+            df_consolidado, DIAS_POR_SINDICATO, dias_uteis_padrao, df_admissoes, df_desligados, ferias_parciais
+        )
+
+    with medidor.etapa('escrita_excel'):
+        escrever_planilha(str(pasta / 'VR MENSAL.xlsx'), {'VR MENSAL': df_consolidado, 'Validações': tabela_validacoes()})
+        escrever_planilha(str(pasta / 'AUDITORIA.xlsx'), tabelas_auditoria(df_exclusoes))
+
+    with medidor.etapa('dias_uteis_tool'):
+        limpar_cache()
+        working_days_calculator_tool.func('05.2025')
+
+    with medidor.etapa('pipeline'):
+        resultado = executar_processamento_real(entrada, diretorio_saida=str(pasta / 'pipeline'))
+
+    return {
+        'funcionarios': len(df_ativos),
+        'linhas_vr': len(df_consolidado),
+        'exclusoes': len(df_exclusoes),
+        'pipeline_sucesso': resultado.sucesso,
+        'pipeline_etapas': resultado.tempos_etapas
+    }
+
+
+def medir(entrada: str, memoria: bool) -> Dict:
+    """Uma passada completa no processo atual (stdout do processador descartado)"""
+    os.environ.setdefault('FINACREW_CACHE_PLANILHAS', '0')
+    os.environ['FINACREW_INCREMENTAL'] = '0'
+    if memoria:
+        tracemalloc.start()
+    medidor = MedidorEtapas(memoria)
+    with tempfile.TemporaryDirectory() as saida, redirect_stdout(io.StringIO()):
+        info = executar_etapas(entrada, saida, medidor)
+    return {'etapas': medidor.resultados, **info}
+
+
+def executar_subprocesso(entrada: str, memoria: bool, com_cache: bool) -> Dict:
+    ambiente = dict(os.environ)
+    ambiente['FINACREW_CACHE_PLANILHAS'] = '1' if com_cache else '0'
+    processo = subprocess.run(
+        [sys.executable, __file__, '--medir', entrada] + (['--memoria'] if memoria else []),
+        capture_output=True, text=True, env=ambiente
+    )
+    if processo.returncode != 0:
+        raise RuntimeError(f"Falha ao medir {entrada}:\n{processo.stderr[-2000:]}")
+    return json.loads(processo.stdout.strip().splitlines()[-1])
+
+
+def medir_entrada(entrada: str, repeticoes: int, memoria: bool, com_cache: bool) -> Dict:
+    """Mediana dos tempos em processos novos + pico de memória de uma passada com tracemalloc"""
+    passadas = [executar_subprocesso(entrada, False, com_cache) for _ in range(repeticoes)]
+    etapas = {
+        etapa: {'tempo_s': round(median(p['etapas'][etapa]['tempo_s'] for p in passadas), 4)}
+        for etapa in ETAPAS
+    }
+    for etapa in ETAPAS:
+        etapas[etapa]['rss_pico_mb'] = max(p['etapas'][etapa]['rss_pico_mb'] for p in passadas)
+    if memoria:
+        com_memoria = executar_subprocesso(entrada, True, com_cache)
+        for etapa in ETAPAS:
+            etapas[etapa]['pico_mb'] = com_memoria['etapas'][etapa]['pico_mb']
+    ultima = passadas[-1]
+    return {
+        'funcionarios': ultima['funcionarios'],
+        'linhas_vr': ultima['linhas_vr'],
+        'exclusoes': ultima['exclusoes'],
+        'pipeline_sucesso': ultima['pipeline_sucesso'],
+        'pipeline_etapas': ultima['pipeline_etapas'],
+        'etapas': etapas
+    }
+
+
+def imprimir(rotulo: str, resultado: Dict):
+    print(f"\n📦 {rotulo}: {resultado['funcionarios']} funcionário(s), {resultado['linhas_vr']} linha(s) VR, "
+          f"{resultado['exclusoes']} exclusão(ões)")
+    print(f"   {'Etapa':<18} {'Tempo (s)':>10} {'Pico etapa (MB)':>16} {'RSS processo (MB)':>18}")
+    for etapa, medida in resultado['etapas'].items():
+        pico = f"{medida['pico_mb']:.1f}" if 'pico_mb' in medida else '-'
+        print(f"   {etapa:<18} {medida['tempo_s']:>10.3f} {pico:>16} {medida['rss_pico_mb']:>18.1f}")
+    if not resultado['pipeline_sucesso']:
+        print("   ⚠️ Pipeline completo terminou com erro")
+    etapas_pipeline = ', '.join(f"{nome} {tempo:.2f}s" for nome, tempo in resultado['pipeline_etapas'].items())
+    print(f"   ⏱️ Etapas do pipeline: {etapas_pipeline}")
+
+
+def main(tamanhos: List[str], entrada: Optional[str], repeticoes: int, memoria: bool,
+         com_cache: bool, salvar: Optional[str]) -> Dict:
+    print(f"📊 Benchmark por etapa ({repeticoes} execução(ões) por tamanho, mediana; "
+          f"cache de planilhas {'ligado' if com_cache else 'desligado'})")
+    resultados = {}
+    if entrada:
+        resultados[Path(entrada).name] = medir_entrada(entrada, repeticoes, memoria, com_cache)
+        imprimir(Path(entrada).name, resultados[Path(entrada).name])
+    else:
+        for tamanho in tamanhos:
+            with tempfile.TemporaryDirectory() as diretorio:
+                inicio = time.perf_counter()
+                gerar_dataset(diretorio, resolver_tamanho(tamanho))
+                print(f"\n🧪 Dataset {tamanho} gerado em {time.perf_counter() - inicio:.1f}s")
+                resultados[tamanho] = medir_entrada(diretorio, repeticoes, memoria, com_cache)
+            imprimir(tamanho, resultados[tamanho])
+
+    if salvar:
+        Path(salvar).write_text(json.dumps(resultados, indent=2, ensure_ascii=False), encoding='utf-8')
+        print(f"\n💾 Resultados salvos em {salvar}")
+    return resultados
+
+
+if __name__ == "__main__":
+    if len(sys.argv) >= 3 and sys.argv[1] == '--medir':
+        print(json.dumps(medir(sys.argv[2], '--memoria' in sys.argv[3:]), ensure_ascii=False))
+        sys.exit(0)
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('tamanhos', nargs='*', default=TAMANHOS_PADRAO,
+                        help=f"Funcionários por dataset sintético ({', '.join(TAMANHOS)} ou número)")
+    parser.add_argument('--entrada', help="Mede um diretório de planilhas existente em vez de gerar")
+    parser.add_argument('--repeticoes', type=int, default=REPETICOES_PADRAO)
+    parser.add_argument('--sem-memoria', action='store_true', help="Pula a passada com tracemalloc")
+    parser.add_argument('--com-cache', action='store_true', help="Mantém o cache de planilhas (leitura quente)")
+    parser.add_argument('--json', dest='salvar', help="Grava os resultados em JSON")
+    args = parser.parse_args()
+    main(args.tamanhos, args.entrada, args.repeticoes, not args.sem_memoria, args.com_cache, args.salvar)
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Benchmark de inicialização: custo de import por módulo (python -X importtime) e tempo até
+o primeiro /api/health, cada medição em um interpretador novo (cold start de um worker)
+Com --salvar/--comparar o resultado vira uma referência em JSON, e módulos que ficaram
+mais lentos que a tolerância são apontados (ex.: alguém voltou a importar crewai no topo)
+
+Uso:
+    python benchmarks/bench_startup_imports.py                       # api/app.py
+    python benchmarks/bench_startup_imports.py --alvos app finacrew real_data_processor_tool
+    python benchmarks/bench_startup_imports.py --salvar startup.json
+    python benchmarks/bench_startup_imports.py --comparar startup.json --tolerancia 0.25
+"""
+
+import os
+import sys
+import json
+import argparse
+import tempfile
+import subprocess
+from pathlib import Path
+from statistics import median
+from typing import Dict, List
+
+RAIZ = Path(__file__).resolve().parent.parent
+CAMINHOS = [RAIZ / 'api', RAIZ / 'tools', RAIZ]
+
+ALVOS_PADRAO = ['app']
+REPETICOES_PADRAO = 3
+TOP_PADRAO = 15
+TOLERANCIA_PADRAO = 0.25
+# Abaixo disso (ms) variações são ruído e não contam como regressão
+PISO_REGRESSAO_MS = 20.0
+# Pacotes cuja presença no import da API indica regressão do caminho rápido
+PACOTES_PESADOS = ('crewai', 'litellm', 'pandas', 'numpy', 'holidays', 'openpyxl', 'xlsxwriter', 'pyarrow')
+
+SCRIPT_HEALTH = """
+import time
+inicio = time.perf_counter()
+import app
+cliente = app.app.test_client()
+resposta = cliente.get('/api/health')
+assert resposta.status_code == 200, resposta.status_code
+print(round((time.perf_counter() - inicio) * 1000, 1))
+"""
+
+
+def _ambiente() -> Dict[str, str]:
+    ambiente = dict(os.environ)
+    caminhos = [str(c) for c in CAMINHOS] + [p for p in ambiente.get('PYTHONPATH', '').split(os.pathsep) if p]
+    ambiente['PYTHONPATH'] = os.pathsep.join(caminhos)
+    ambiente.pop('FINACREW_PRECARREGAR', None)
+    return ambiente
+
+
+def medir_importtime(alvo: str, diretorio: str) -> Dict[str, Dict[str, float]]:
+    """
+    Importa o alvo com -X importtime em um processo novo.
+
+    Returns:
+        {módulo: {'proprio_ms', 'cumulativo_ms'}} para cada módulo carregado
+    """
+    processo = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {alvo}'],
+        cwd=diretorio, env=_ambiente(), capture_output=True, text=True
+    )
+    if processo.returncode != 0:
+        raise RuntimeError(f"Falha ao importar {alvo}:\n{processo.stderr[-2000:]}")
+
+    modulos = {}
+    for linha in processo.stderr.splitlines():
+        # Formato: "import time:   self [us] | cumulative | imported package"
+        if not linha.startswith('import time:') or 'self [us]' in linha:
+            continue
+        proprio, cumulativo, nome = linha[len('import time:'):].split('|')
+        modulos[nome.strip()] = {
+            'proprio_ms': int(proprio) / 1000,
+            'cumulativo_ms': int(cumulativo) / 1000
+        }
+    return modulos
+
+
+def medir_health(diretorio: str) -> float:
+    """Milissegundos do início do processo até a resposta do primeiro /api/health"""
+    processo = subprocess.run(
+        [sys.executable, '-c', SCRIPT_HEALTH],
+        cwd=diretorio, env=_ambiente(), capture_output=True, text=True
+    )
+    if processo.returncode != 0:
+        raise RuntimeError(f"Falha no /api/health:\n{processo.stderr[-2000:]}")
+    return float(processo.stdout.strip().splitlines()[-1])
+
+
+def medir_alvo(alvo: str, repeticoes: int) -> Dict:
+    """Mediana de várias execuções frias do import do alvo (e do health check, para a API)"""
+    with tempfile.TemporaryDirectory() as diretorio:
+        execucoes = [medir_importtime(alvo, diretorio) for _ in range(repeticoes)]
+        health = [medir_health(diretorio) for _ in range(repeticoes)] if alvo == 'app' else []
+
+    nomes = set().union(*execucoes)
+    modulos = {
+        nome: {
+            chave: round(median(e[nome][chave] for e in execucoes if nome in e), 2)
+            for chave in ('proprio_ms', 'cumulativo_ms')
+        }
+        for nome in nomes
+    }
+    return {
+        'total_ms': modulos.get(alvo, {}).get('cumulativo_ms', 0.0),
+        'health_ms': round(median(health), 1) if health else None,
+        'modulos_carregados': len(modulos),
+        'pacotes_pesados': sorted(p for p in PACOTES_PESADOS if p in modulos),
+        'modulos': modulos
+    }
+
+
+def imprimir(alvo: str, resultado: Dict, top: int):
+    print(f"\n📦 {alvo}: {resultado['total_ms']:.1f} ms de import, {resultado['modulos_carregados']} módulos")
+    if resultado['health_ms'] is not None:
+        print(f"   ⏱️  Primeiro /api/health (processo novo): {resultado['health_ms']:.1f} ms")
+    pesados = resultado['pacotes_pesados']
+    print(f"   {'⚠️  Pacotes pesados carregados: ' + ', '.join(pesados) if pesados else '✅ Nenhum pacote pesado carregado'}")
+
+    # Pacotes de topo (o cumulativo de 'pandas' já inclui 'pandas.core...')
+    topo = {nome: dados for nome, dados in resultado['modulos'].items() if '.' not in nome and nome != alvo}
+    print(f"   {'Módulo':<36} {'Cumulativo (ms)':>16} {'Próprio (ms)':>13}")
+    for nome, dados in sorted(topo.items(), key=lambda item: -item[1]['cumulativo_ms'])[:top]:
+        print(f"   {nome:<36} {dados['cumulativo_ms']:>16.1f} {dados['proprio_ms']:>13.1f}")
+
+
+def comparar(resultados: Dict, referencia: Dict, tolerancia: float) -> List[str]:
+    """Regressões: totais ou pacotes de topo acima da referência além da tolerância"""
+    regressoes = []
+    for alvo, atual in resultados.items():
+        anterior = referencia.get(alvo)
+        if anterior is None:
+            continue
+        pares = [('total', atual['total_ms'], anterior['total_ms'])]
+        if atual['health_ms'] is not None and anterior.get('health_ms') is not None:
+            pares.append(('/api/health', atual['health_ms'], anterior['health_ms']))
+        for nome, dados in atual['modulos'].items():
+            if '.' not in nome and nome in anterior['modulos']:
+                pares.append((nome, dados['cumulativo_ms'], anterior['modulos'][nome]['cumulativo_ms']))
+        for nome, agora, antes in pares:
+            if agora - antes > PISO_REGRESSAO_MS and agora > antes * (1 + tolerancia):
+                regressoes.append(f"{alvo}: {nome} {antes:.1f} ms → {agora:.1f} ms")
+        for pacote in set(atual['pacotes_pesados']) - set(anterior.get('pacotes_pesados', [])):
+            regressoes.append(f"{alvo}: passou a importar {pacote}")
+    return regressoes
+
+
+def main(alvos: List[str], repeticoes: int, top: int, salvar: str, comparar_com: str, tolerancia: float) -> int:
+    print(f"📊 Benchmark de inicialização ({repeticoes} execução(ões) fria(s) por alvo, mediana)")
+    resultados = {}
+    for alvo in alvos:
+        resultados[alvo] = medir_alvo(alvo, repeticoes)
+        imprimir(alvo, resultados[alvo], top)
+
+    if salvar:
+        Path(salvar).write_text(json.dumps(resultados, indent=2, ensure_ascii=False), encoding='utf-8')
+        print(f"\n💾 Referência salva em {salvar}")
+
+    if comparar_com:
+        regressoes = comparar(resultados, json.loads(Path(comparar_com).read_text(encoding='utf-8')), tolerancia)
+        if regressoes:
+            print(f"\n❌ {len(regressoes)} regressão(ões) de import (tolerância {tolerancia:.0%}):")
+            for regressao in regressoes:
+                print(f"   - {regressao}")
+            return 1
+        print(f"\n✅ Sem regressões em relação a {comparar_com}")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--alvos', nargs='+', default=ALVOS_PADRAO, help="Módulos a importar (api, tools ou raiz)")
+    parser.add_argument('--repeticoes', type=int, default=REPETICOES_PADRAO)
+    parser.add_argument('--top', type=int, default=TOP_PADRAO, help="Pacotes listados por alvo")
+    parser.add_argument('--salvar', help="Grava o resultado em JSON (referência)")
+    parser.add_argument('--comparar', help="JSON de referência; sai com código 1 se houver regressão")
+    parser.add_argument('--tolerancia', type=float, default=TOLERANCIA_PADRAO)
+    args = parser.parse_args()
+    sys.exit(main(args.alvos, args.repeticoes, args.top, args.salvar, args.comparar, args.tolerancia))
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Gate de regressão de desempenho ponta a ponta
+Gera o dataset dourado (synthetic_dataset.py com parâmetros fixos), executa várias vezes,
+cada uma em um processo novo, o caminho determinístico completo: real_data_processor_tool
+com as planilhas VR MENSAL e de auditoria, mais a planilha modelo do model_excel_generator_tool.
+Compara a mediana de cada etapa e o pico de RSS com a referência em JSON e confere os
+totais da VR MENSAL gerada com os da referência: ganho de desempenho não pode mudar o dinheiro
+
+Uso:
+    python benchmarks/regression_gate.py                                  # compara com a referência
+    python benchmarks/regression_gate.py --tolerancia 0.15 --repeticoes 7
+    python benchmarks/regression_gate.py --atualizar                      # grava nova referência
+
+Código de saída: 0 sem regressões; 1 com etapa mais lenta, RSS maior ou totais divergentes;
+2 sem referência ou referência de outro dataset/formato
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import platform
+import resource
+import tempfile
+import subprocess
+from contextlib import redirect_stdout
+from pathlib import Path
+from statistics import median
+from typing import Dict, List
+
+import pandas as pd
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ / 'tools'))
+sys.path.insert(0, str(RAIZ / 'benchmarks'))
+
+from synthetic_dataset import gerar_dataset
+
+# Incrementar quando o formato do JSON mudar (referências antigas deixam de ser comparadas)
+VERSAO_FORMATO = 1
+REFERENCIA_PADRAO = RAIZ / 'benchmarks' / 'baselines' / 'regression_gate.json'
+
+# Dataset dourado: mudar estes valores exige gravar uma nova referência
+DATASET_DOURADO = {
+    'funcionarios': 5000,
+    'fracao_datas_sujas': 0.02,
+    'fracao_duplicadas': 0.005,
+    'competencia': '05.2025',
+    'semente': 20250501
+}
+
+REPETICOES_PADRAO = 5
+TOLERANCIA_PADRAO = 0.20
+# Abaixo disso variações são ruído e não contam como regressão
+PISO_TEMPO_S = 0.05
+PISO_RSS_MB = 20.0
+ETAPA_MODELO = 'Planilha modelo'
+
+# Caminho padrão e determinístico: sem caches nem estado de execuções anteriores
+AMBIENTE_FIXO = {'FINACREW_CACHE_PLANILHAS': '0', 'FINACREW_INCREMENTAL': '0'}
+
+
+def impressao_dataset(diretorio: str) -> str:
+    """Hash do conteúdo das planilhas (não dos bytes do .xlsx, que trazem a data de criação)"""
+    sha = hashlib.sha256()
+    for caminho in sorted(Path(diretorio).glob('*.xlsx')):
+        df = pd.read_excel(caminho)
+        sha.update(caminho.name.encode('utf-8'))
+        sha.update(pd.util.hash_pandas_object(df.astype(str), index=False).to_numpy().tobytes())
+    return sha.hexdigest()[:16]
+
+
+def totais_vr_mensal(caminho: str) -> Dict:
+    """Totais da aba VR MENSAL gravada, em centavos arredondados, e impressão linha a linha"""
+    df = pd.read_excel(caminho, sheet_name=0, dtype={'Matricula': str})
+    linhas = df[['Matricula', 'Dias', 'TOTAL']].assign(TOTAL=df['TOTAL'].round(2)).sort_values('Matricula')
+    por_sindicato = df.groupby(df['Sindicato do Colaborador'].fillna('(sem sindicato)'))['TOTAL'].sum()
+    return {
+        'linhas': len(df),
+        'dias': int(df['Dias'].sum()),
+        'total': round(float(df['TOTAL'].sum()), 2),
+        'custo_empresa': round(float(df['Custo empresa'].sum()), 2),
+        'desconto_profissional': round(float(df['Desconto profissional'].sum()), 2),
+        'por_sindicato': {sindicato: round(float(valor), 2) for sindicato, valor in por_sindicato.items()},
+        'impressao': hashlib.sha256(linhas.to_csv(index=False).encode('utf-8')).hexdigest()[:16]
+    }
+
+
+def executar_uma_vez(entrada: str) -> Dict:
+    """Executado no subprocesso: pipeline completo + planilha modelo em um diretório temporário"""
+    from real_data_processor_tool import executar_processamento_real
+    from model_excel_generator_tool import model_excel_generator_tool
+
+    with tempfile.TemporaryDirectory() as diretorio, redirect_stdout(sys.stderr):
+        os.chdir(diretorio)
+        inicio = time.perf_counter()
+        resultado = executar_processamento_real(entrada, diretorio_saida=str(Path(diretorio) / 'saida'))
+        if not resultado.sucesso:
+            raise RuntimeError(resultado.erro)
+        inicio_modelo = time.perf_counter()
+        model_excel_generator_tool.func(
+            output_filename='VR MENSAL MODELO.xlsx', data_dict=resultado.arquivos['base_consolidada']
+        )
+        fim = time.perf_counter()
+        etapas = dict(resultado.tempos_etapas)
+        etapas[ETAPA_MODELO] = round(fim - inicio_modelo, 4)
+        totais = totais_vr_mensal(resultado.arquivos['vr_mensal'])
+        totais['exclusoes_por_motivo'] = resultado.exclusoes_por_motivo
+
+    return {
+        'tempo_total_s': round(fim - inicio, 4),
+        'etapas': etapas,
+        # ru_maxrss é informado em KB no Linux
+        'rss_pico_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        'totais': totais
+    }
+
+
+def _subprocesso(entrada: str) -> Dict:
+    ambiente = {k: v for k, v in os.environ.items() if not k.startswith('FINACREW_')}
+    ambiente.update(AMBIENTE_FIXO)
+    processo = subprocess.run(
+        [sys.executable, __file__, '--executar', entrada], capture_output=True, text=True, env=ambiente
+    )
+    if processo.returncode != 0:
+        raise RuntimeError(f"Falha na execução do pipeline:\n{processo.stderr[-2000:]}")
+    return json.loads(processo.stdout.strip().splitlines()[-1])
+
+
+def medir(repeticoes: int) -> Dict:
+    """Gera o dataset dourado e devolve medianas, pico de RSS e totais das execuções"""
+    with tempfile.TemporaryDirectory() as entrada:
+        gerar_dataset(entrada, **DATASET_DOURADO)
+        impressao = impressao_dataset(entrada)
+        execucoes = []
+        for numero in range(1, repeticoes + 1):
+            execucoes.append(_subprocesso(entrada))
+            print(f"   ▶️ Execução {numero}/{repeticoes}: {execucoes[-1]['tempo_total_s']:.2f}s")
+
+    # Totais devem ser idênticos entre execuções (caminho determinístico)
+    totais = execucoes[0]['totais']
+    divergentes = [i + 1 for i, e in enumerate(execucoes) if e['totais'] != totais]
+    etapas = sorted(set().union(*(e['etapas'] for e in execucoes)), key=list(execucoes[0]['etapas']).index)
+    return {
+        'versao_formato': VERSAO_FORMATO,
+        'gerado_em': pd.Timestamp.now().isoformat(timespec='seconds'),
+        'ambiente': {'python': platform.python_version(), 'plataforma': platform.platform(), 'cpus': os.cpu_count()},
+        'dataset': {**DATASET_DOURADO, 'impressao': impressao},
+        'repeticoes': repeticoes,
+        'tempo_total_s': round(median(e['tempo_total_s'] for e in execucoes), 4),
+        'etapas': {nome: round(median(e['etapas'].get(nome, 0.0) for e in execucoes), 4) for nome in etapas},
+        'rss_pico_mb': round(median(e['rss_pico_mb'] for e in execucoes), 1),
+        'totais': totais,
+        'execucoes_divergentes': divergentes
+    }
+
+
+def comparar(atual: Dict, referencia: Dict, tolerancia: float) -> List[str]:
+    """Falhas: totais diferentes da referência ou etapas/RSS acima da tolerância"""
+    falhas = []
+    if atual['execucoes_divergentes']:
+        falhas.append(f"totais variaram entre execuções: {atual['execucoes_divergentes']}")
+
+    for chave, valor in referencia['totais'].items():
+        if atual['totais'].get(chave) != valor:
+            falhas.append(f"totais: {chave} {valor} → {atual['totais'].get(chave)}")
+
+    pares = [('tempo total', atual['tempo_total_s'], referencia['tempo_total_s'], PISO_TEMPO_S, 's')]
+    pares += [
+        (f"etapa '{nome}'", atual['etapas'].get(nome, 0.0), anterior, PISO_TEMPO_S, 's')
+        for nome, anterior in referencia['etapas'].items()
+    ]
+    pares.append(('pico de RSS', atual['rss_pico_mb'], referencia['rss_pico_mb'], PISO_RSS_MB, ' MB'))
+    for nome, agora, antes, piso, unidade in pares:
+        if agora - antes > piso and agora > antes * (1 + tolerancia):
+            falhas.append(f"{nome}: {antes:.2f}{unidade} → {agora:.2f}{unidade} (+{(agora / antes - 1) if antes else 1:.0%})")
+    return falhas
+
+
+def imprimir(atual: Dict, referencia: Dict = None):
+    print(f"\n{'Etapa':<28} {'Mediana (s)':>12} {'Referência (s)':>15}")
+    for nome, tempo in atual['etapas'].items():
+        antes = referencia['etapas'].get(nome) if referencia else None
+        print(f"{nome:<28} {tempo:>12.3f} {(f'{antes:.3f}' if antes is not None else '-'):>15}")
+    antes_total = f"{referencia['tempo_total_s']:.3f}" if referencia else '-'
+    antes_rss = f"{referencia['rss_pico_mb']:.1f}" if referencia else '-'
+    print(f"{'Total':<28} {atual['tempo_total_s']:>12.3f} {antes_total:>15}")
+    print(f"{'Pico de RSS (MB)':<28} {atual['rss_pico_mb']:>12.1f} {antes_rss:>15}")
+    totais = atual['totais']
+    print(f"\n💰 VR MENSAL: {totais['linhas']} linha(s), {totais['dias']} dias, R$ {totais['total']:,.2f} "
+          f"(empresa R$ {totais['custo_empresa']:,.2f} | funcionário R$ {totais['desconto_profissional']:,.2f})")
+
+
+def main(caminho_referencia: Path, repeticoes: int, tolerancia: float, atualizar: bool) -> int:
+    print(f"🚦 Gate de regressão: dataset dourado de {DATASET_DOURADO['funcionarios']} funcionário(s), "
+          f"{repeticoes} execução(ões) em processos novos")
+    referencia = None
+    if not atualizar:
+        if not caminho_referencia.exists():
+            print(f"❌ Referência não encontrada: {caminho_referencia} (gere com --atualizar)")
+            return 2
+        referencia = json.loads(caminho_referencia.read_text(encoding='utf-8'))
+        if referencia.get('versao_formato') != VERSAO_FORMATO:
+            print(f"❌ Referência no formato {referencia.get('versao_formato')}, esperado {VERSAO_FORMATO} (gere com --atualizar)")
+            return 2
+
+    atual = medir(repeticoes)
+    imprimir(atual, referencia)
+
+    if atualizar:
+        if atual['execucoes_divergentes']:
+            print(f"\n❌ Totais variaram entre execuções {atual['execucoes_divergentes']}; referência não gravada")
+            return 1
+        caminho_referencia.parent.mkdir(parents=True, exist_ok=True)
+        caminho_referencia.write_text(json.dumps(atual, indent=2, ensure_ascii=False) + '\n', encoding='utf-8')
+        print(f"\n💾 Referência gravada em {caminho_referencia}")
+        return 0
+
+    if referencia['dataset'] != atual['dataset']:
+        print(f"\n❌ Dataset dourado diferente do da referência ({referencia['dataset']} x {atual['dataset']})")
+        return 2
+    if referencia['ambiente'] != atual['ambiente']:
+        print(f"\n⚠️ Referência gravada em outro ambiente ({referencia['ambiente']['plataforma']}); tempos podem não ser comparáveis")
+
+    falhas = comparar(atual, referencia, tolerancia)
+    if falhas:
+        print(f"\n❌ {len(falhas)} falha(s) (tolerância {tolerancia:.0%}):")
+        for falha in falhas:
+            print(f"   - {falha}")
+        return 1
+    print(f"\n✅ Sem regressões e totais iguais aos da referência ({caminho_referencia.name})")
+    return 0
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == '--executar':
+        print(json.dumps(executar_uma_vez(sys.argv[2]), ensure_ascii=False))
+        sys.exit(0)
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--referencia', type=Path, default=REFERENCIA_PADRAO, help="JSON de referência")
+    parser.add_argument('--repeticoes', type=int, default=REPETICOES_PADRAO)
+    parser.add_argument('--tolerancia', type=float, default=TOLERANCIA_PADRAO,
+                        help="Aumento relativo aceito por etapa e no RSS (0.20 = 20%%)")
+    parser.add_argument('--atualizar', action='store_true', help="Grava a medição atual como nova referência")
+    args = parser.parse_args()
+    sys.exit(main(args.referencia, args.repeticoes, args.tolerancia, args.atualizar))
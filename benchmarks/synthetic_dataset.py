@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Gerador de planilhas de entrada sintéticas (sem dados reais de RH)
+Grava as 10 planilhas lidas pelo processador com as colunas e formatos dos arquivos reais,
+em tamanhos configuráveis, com uma fração controlada de datas sujas (formatos mistos,
+seriais do Excel, textos inválidos e vazios) e de matrículas repetidas
+
+Uso:
+    python benchmarks/synthetic_dataset.py saida/1k --tamanho 1k
+    python benchmarks/synthetic_dataset.py saida/50k --tamanho 50k --datas-sujas 0.05 --duplicadas 0.01
+    python benchmarks/synthetic_dataset.py saida/custom --funcionarios 120000 --competencia 06.2025
+"""
+
+import sys
+import time
+import argparse
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Dict
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ / 'tools'))
+
+from competencia import Competencia
+
+TAMANHOS = {'1k': 1_000, '50k': 50_000, '500k': 500_000}
+
+FRACAO_DATAS_SUJAS_PADRAO = 0.02
+FRACAO_DUPLICADAS_PADRAO = 0.005
+SEMENTE_PADRAO = 42
+MATRICULA_INICIAL = 30_000
+
+# Sindicatos dos arquivos reais e participação no quadro (None = sem sindicato)
+SINDICATOS = {
+    'SP - SINDPD SP - SIND.TRAB.EM PROC DADOS E EMPR.EMPRESAS PROC DADOS ESTADO DE SP.': 0.45,
+    'RJ - SINDPD RJ - SINDICATO PROFISSIONAIS DE PROCESSAMENTO DADOS DO RIO DE JANEIRO': 0.20,
+    'RS - SINDPPD RS - SINDICATO DOS TRAB. EM PROC. DE DADOS RIO GRANDE DO SUL': 0.17,
+    'PR - SITEPD PR - SIND DOS TRAB EM EMPR PRIVADAS DE PROC DE DADOS DE CURITIBA E REGIAO METROPOLITANA': 0.17,
+    None: 0.01
+}
+CARGOS = {
+    'ANALISTA DE SISTEMAS': 0.40,
+    'DESENVOLVEDOR': 0.30,
+    'COORDENADOR': 0.10,
+    'ASSISTENTE ADMINISTRATIVO': 0.17,
+    'GERENTE': 0.02,
+    'DIRETOR': 0.01
+}
+SITUACOES_AFASTAMENTO = ['Auxílio Doença', 'Licença Maternidade', 'Atestado', 'Acidente de Trabalho']
+
+# Fração do quadro em cada planilha de eventos
+FRACOES_EVENTOS = {
+    'FERIAS': 0.04,
+    'DESLIGADOS': 0.02,
+    'ADMISSAO_ABRIL': 0.025,
+    'AFASTAMENTOS': 0.01,
+    'EXTERIOR': 0.0025,
+    'ESTAGIO': 0.005,
+    'APRENDIZ': 0.005
+}
+
+
+def _sujar_datas(datas: pd.Series, fracao: float, rng: np.random.Generator) -> pd.Series:
+    """
+    Texto DD/MM/AAAA com uma fração em outros formatos: ISO, DD-MM-AAAA, serial do Excel,
+    texto inválido e célula vazia (como nas planilhas preenchidas à mão)
+    """
+    texto = datas.dt.strftime('%d/%m/%Y').astype(object)
+    sujas = np.flatnonzero(rng.random(len(datas)) < fracao)
+    if len(sujas) == 0:
+        return texto
+    tipos = rng.integers(0, 5, len(sujas))
+    origem = pd.Timestamp('1899-12-30')
+    for tipo, nome_formato in enumerate(('iso', 'traco', 'serial', 'invalida', 'vazia')):
+        linhas = sujas[tipos == tipo]
+        if nome_formato == 'iso':
+            texto.iloc[linhas] = datas.iloc[linhas].dt.strftime('%Y-%m-%d')
+        elif nome_formato == 'traco':
+            texto.iloc[linhas] = datas.iloc[linhas].dt.strftime('%d-%m-%Y')
+        elif nome_formato == 'serial':
+            texto.iloc[linhas] = (datas.iloc[linhas] - origem).dt.days.astype(str)
+        elif nome_formato == 'invalida':
+            texto.iloc[linhas] = rng.choice(['31/02/2025', 'a combinar', '??/05/2025', '2025/13/40'], len(linhas))
+        else:
+            texto.iloc[linhas] = None
+    return texto
+
+
+def _datas_no_periodo(inicio: pd.Timestamp, dias: int, quantidade: int, rng: np.random.Generator) -> pd.Series:
+    return pd.Series(inicio + pd.to_timedelta(rng.integers(0, dias, quantidade), unit='D'))
+
+
+def _gravar(df: pd.DataFrame, caminho: Path):
+    # xlsxwriter grava bem mais rápido que o openpyxl (padrão do pandas) nos tamanhos grandes
+    df.to_excel(caminho, index=False, engine='xlsxwriter')
+
+
+def gerar_dataset(
+    diretorio: str,
+    funcionarios: int,
+    fracao_datas_sujas: float = FRACAO_DATAS_SUJAS_PADRAO,
+    fracao_duplicadas: float = FRACAO_DUPLICADAS_PADRAO,
+    competencia: str = '05.2025',
+    semente: int = SEMENTE_PADRAO
+) -> Dict[str, int]:
+    """
+    Grava as planilhas de entrada em diretorio.
+
+    Args:
+        diretorio: Pasta de saída (criada se não existir)
+        funcionarios: Linhas de ATIVOS (antes das duplicadas)
+        fracao_datas_sujas: Fração das datas de DESLIGADOS/ADMISSAO_ABRIL fora do DD/MM/AAAA
+        fracao_duplicadas: Fração de linhas extras em ATIVOS e FERIAS repetindo matrículas existentes
+        competencia: Mês das demissões; as admissões caem no mês anterior e no próprio mês
+        semente: Semente do gerador (mesmos parâmetros = mesmas planilhas)
+
+    Returns:
+        Linhas gravadas por arquivo
+    """
+    rng = np.random.default_rng(semente)
+    pasta = Path(diretorio)
+    pasta.mkdir(parents=True, exist_ok=True)
+    competencia = Competencia.de_texto(competencia)
+    inicio_mes = pd.Timestamp(competencia.data)
+    inicio_anterior = pd.Timestamp(competencia.anterior.data)
+
+    matriculas = MATRICULA_INICIAL + np.arange(funcionarios)
+    sindicatos = list(SINDICATOS)
+    cargos = list(CARGOS)
+    ativos = pd.DataFrame({
+        'EMPRESA': 1410,
+        'MATRICULA': matriculas,
+        'TITULO DO CARGO': rng.choice(cargos, funcionarios, p=list(CARGOS.values())),
+        'DESC. SITUACAO': 'Trabalhando',
+        'Sindicato': rng.choice(np.array(sindicatos, dtype=object), funcionarios, p=list(SINDICATOS.values()))
+    })
+
+    def amostra(chave: str) -> np.ndarray:
+        quantidade = max(1, int(round(funcionarios * FRACOES_EVENTOS[chave])))
+        return rng.choice(matriculas, min(quantidade, funcionarios), replace=False)
+
+    def duplicar(df: pd.DataFrame) -> pd.DataFrame:
+        extras = int(round(len(df) * fracao_duplicadas))
+        if extras == 0:
+            return df
+        return pd.concat([df, df.iloc[rng.integers(0, len(df), extras)]], ignore_index=True)
+
+    ferias = pd.DataFrame({'MATRICULA': amostra('FERIAS')})
+    ferias['DESC. SITUACAO'] = 'Férias'
+    ferias['DIAS DE FÉRIAS'] = rng.choice([10, 15, 20, 30], len(ferias), p=[0.2, 0.3, 0.2, 0.3])
+
+    desligados = pd.DataFrame({'MATRICULA': amostra('DESLIGADOS')})
+    demissoes = _datas_no_periodo(inicio_mes, competencia.dias_no_mes, len(desligados), rng)
+    desligados['DATA DEMISSÃO'] = _sujar_datas(demissoes, fracao_datas_sujas, rng).to_numpy()
+    desligados['COMUNICADO DE DESLIGAMENTO'] = rng.choice(['OK', 'PENDENTE'], len(desligados), p=[0.9, 0.1])
+
+    admissoes = pd.DataFrame({'MATRICULA': amostra('ADMISSAO_ABRIL')})
+    dias_periodo = competencia.anterior.dias_no_mes + competencia.dias_no_mes
+    datas_admissao = _datas_no_periodo(inicio_anterior, dias_periodo, len(admissoes), rng)
+    admissoes['Admissão'] = _sujar_datas(datas_admissao, fracao_datas_sujas, rng).to_numpy()
+    admissoes['Cargo'] = rng.choice(cargos[:4], len(admissoes))
+
+    afastamentos = pd.DataFrame({'MATRICULA': amostra('AFASTAMENTOS')})
+    afastamentos['DESC. SITUACAO'] = rng.choice(SITUACOES_AFASTAMENTO, len(afastamentos))
+
+    # EXTERIOR real identifica o funcionário pela coluna Cadastro
+    exterior = pd.DataFrame({'Cadastro': amostra('EXTERIOR')})
+    exterior['Valor'] = 0
+    exterior['OBS'] = 'Trabalhando no exterior'
+
+    estagio = pd.DataFrame({'MATRICULA': amostra('ESTAGIO'), 'TITULO DO CARGO': 'ESTAGIARIO'})
+    aprendiz = pd.DataFrame({'MATRICULA': amostra('APRENDIZ'), 'TITULO DO CARGO': 'APRENDIZ'})
+
+    valores = pd.DataFrame({
+        'ESTADO': ['Paraná', 'Rio de Janeiro', 'Rio Grande do Sul', 'São Paulo'],
+        'VALOR': [35.0, 35.0, 35.0, 37.5]
+    })
+    # Base_dias_uteis real: título na primeira célula e o cabeçalho na primeira linha de dados
+    dias_uteis = pd.DataFrame({
+        'BASE DIAS UTEIS DE 15/04 a 15/05': ['SINDICADO'] + sindicatos[:4],
+        'Unnamed: 1': ['DIAS UTEIS', 22, 21, 21, 22]
+    })
+
+    planilhas = {
+        'ATIVOS.xlsx': duplicar(ativos),
+        'FERIAS.xlsx': duplicar(ferias),
+        'DESLIGADOS.xlsx': desligados,
+        'ADMISSAO_ABRIL.xlsx': admissoes,
+        'AFASTAMENTOS.xlsx': afastamentos,
+        'EXTERIOR.xlsx': exterior,
+        'ESTAGIO.xlsx': estagio,
+        'APRENDIZ.xlsx': aprendiz,
+        'Base_sindicato_x_valor.xlsx': valores,
+        'Base_dias_uteis.xlsx': dias_uteis
+    }
+    for nome, df in planilhas.items():
+        _gravar(df, pasta / nome)
+    return {nome: len(df) for nome, df in planilhas.items()}
+
+
+def resolver_tamanho(valor: str) -> int:
+    """'1k', '50k', '500k' ou um número de funcionários"""
+    return TAMANHOS.get(valor.lower()) or int(valor)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('saida', help="Diretório onde gravar as planilhas")
+    grupo = parser.add_mutually_exclusive_group()
+    grupo.add_argument('--tamanho', default='1k', help=f"Predefinido: {', '.join(TAMANHOS)}")
+    grupo.add_argument('--funcionarios', type=int, help="Quantidade exata de funcionários em ATIVOS")
+    parser.add_argument('--datas-sujas', type=float, default=FRACAO_DATAS_SUJAS_PADRAO)
+    parser.add_argument('--duplicadas', type=float, default=FRACAO_DUPLICADAS_PADRAO)
+    parser.add_argument('--competencia', default='05.2025')
+    parser.add_argument('--semente', type=int, default=SEMENTE_PADRAO)
+    args = parser.parse_args()
+
+    total = args.funcionarios or resolver_tamanho(args.tamanho)
+    inicio = time.perf_counter()
+    linhas = gerar_dataset(args.saida, total, args.datas_sujas, args.duplicadas, args.competencia, args.semente)
+    print(f"🧪 Dataset sintético de {total} funcionário(s) em {args.saida} ({time.perf_counter() - inicio:.1f}s)")
+    for nome, quantidade in linhas.items():
+        print(f"   📁 {nome}: {quantidade} linha(s)")
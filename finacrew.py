@@ -6,7 +6,6 @@ Migração para filosofia CrewAI com decoradores e YAMLs
 
 from crewai import Agent, Task, Crew, Process
 from crewai.project import CrewBase, agent, crew, task
-from crewai.llm import LLM
 from dotenv import load_dotenv
 import sys
 import os
@@ -23,16 +22,13 @@ from tools.model_excel_generator_tool import model_excel_generator_tool
 from tools.working_days_calculator_tool import working_days_calculator_tool
 from tools.file_discovery_tool import file_discovery_tool
 from tools.real_data_processor_tool import real_data_processor_tool
+from llm_registry import obter_llm
+from tracing import rastrear
 
 # Carrega variáveis de ambiente
+# O LLM dos agentes vem do registro (llm_registry): construído uma vez por modelo/chave,
+# com respostas repetidas servidas pelo cache em disco (FINACREW_LLM_CACHE)
 load_dotenv()
-os.environ["GROQ_API_KEY"] = os.getenv("GROQ_API_KEY")
-groq_api_key = os.getenv("GROQ_API_KEY")
-modelo_llm = os.getenv("MODEL", "llama-3.3-70b-versatile")
-# Adicionar provider para CrewAI
-if not modelo_llm.startswith('groq/'):
-    modelo_llm = f"groq/{modelo_llm}"
-llm = LLM(model=modelo_llm, api_key=groq_api_key)
 
 @CrewBase
 class FinaCrew:
@@ -51,7 +47,7 @@ class FinaCrew:
         """Agente especialista em normalização e carregamento de dados"""
         return Agent(
             config=self.agents_config['file_manager_agent'],
-            llm=llm,
+            llm=obter_llm(),
             tools=[file_discovery_tool, spreadsheet_analyzer_tool],
             verbose=True
         )
@@ -61,7 +57,7 @@ class FinaCrew:
         """Agente especialista em regras de negócio e exclusões"""
         return Agent(
             config=self.agents_config['exclusions_agent'],
-            llm=llm,
+            llm=obter_llm(),
             tools=[working_days_calculator_tool],
             verbose=True
         )
@@ -71,7 +67,7 @@ class FinaCrew:
         """Agente coordenador principal do processo"""
         return Agent(
             config=self.agents_config['coordinator_agent'],
-            llm=llm,
+            llm=obter_llm(),
             tools=[
                 real_data_processor_tool,
                 spreadsheet_analyzer_tool,
@@ -142,7 +138,7 @@ class FinaCrew:
             verbose=True,
             memory=True,
             max_execution_time=1800,  # 30 minutos
-            manager_llm=llm  # Usar Groq como LLM principal
+            manager_llm=obter_llm()  # Usar Groq como LLM principal
         )
 
 # Função de conveniência para executar o processo
@@ -205,8 +201,9 @@ def process_vr_calculation(month: str = "05", year: str = "2025") -> dict:
         print(f"\n🎬 INICIANDO EXECUÇÃO SEQUENCIAL DOS AGENTES...")
         print(f"=" * 80)
 
-        # Executar processo com logs detalhados
-        result = finacrew.crew().kickoff()
+        # Executar processo com logs detalhados (spans das tools e do LLM em logs/trace_*.json)
+        with rastrear('crew.kickoff', mes=month, ano=year, agentes=3, tasks=5):
+            result = finacrew.crew().kickoff()
 
         print(f"\n" + "=" * 80)
         print(f"✅ FINACREW CREWAI: Processamento concluído com sucesso!")
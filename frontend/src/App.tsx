@@ -47,6 +47,7 @@ const steps = [
 function App() {
   const [activeStep, setActiveStep] = useState(0);
   const [files, setFiles] = useState<any[]>([]);
+  const [sessionId, setSessionId] = useState<string | null>(null);
   const [groqConfig, setGroqConfig] = useState<GroqConfig>({
     apiKey: '',
     model: 'llama-3.3-70b-versatile'
@@ -237,13 +238,15 @@ function App() {
   const handleReset = () => {
     setActiveStep(0);
     setFiles([]);
+    setSessionId(null);
     setResults(null);
     setError(null);
     setProcessing(false);
   };
 
-  const handleFilesUpload = useCallback((uploadedFiles: any[]) => {
+  const handleFilesUpload = useCallback((uploadedFiles: any[], uploadSessionId: string) => {
     setFiles(uploadedFiles);
+    setSessionId(uploadSessionId);
     if (uploadedFiles.length > 0) {
       setTimeout(() => handleNext(), 500);
     }
@@ -264,7 +267,7 @@ function App() {
   const renderStepContent = (step: number) => {
     switch (step) {
       case 0:
-        return <UploadPage onFilesUpload={handleFilesUpload} files={files} />;
+        return <UploadPage onFilesUpload={handleFilesUpload} files={files} sessionId={sessionId} />;
       case 1:
         return (
           <ConfigurationPage
@@ -277,6 +280,7 @@ function App() {
           <ProcessingPage
             files={files as File[]}
             groqConfig={groqConfig}
+            sessionId={sessionId}
             onComplete={handleProcessComplete}
             processing={processing}
             setProcessing={setProcessing}
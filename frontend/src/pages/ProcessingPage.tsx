@@ -1,4 +1,4 @@
-import React, { useState } from 'react';
+import React, { useRef, useState } from 'react';
 import {
   Box,
   Typography,
@@ -19,11 +19,15 @@ import {
   Stop as StopIcon,
   CheckCircle as SuccessIcon,
 } from '@mui/icons-material';
-import { GroqConfig, ProcessingResults } from '../types';
+import { GroqConfig, JobStatus, ProcessingResults } from '../types';
+
+const POLL_INTERVAL_MS = 2000;
+const JOB_TIMEOUT_MS = 1200000; // 20 minutos
 
 interface ProcessingPageProps {
   files: File[];
   groqConfig: GroqConfig | null;
+  sessionId: string | null;
   onComplete: (results: ProcessingResults) => void;
   processing: boolean;
   setProcessing: (processing: boolean) => void;
@@ -32,6 +36,7 @@ interface ProcessingPageProps {
 const ProcessingPage: React.FC<ProcessingPageProps> = ({
   files,
   groqConfig,
+  sessionId,
   onComplete,
   processing,
   setProcessing,
@@ -41,11 +46,79 @@ const ProcessingPage: React.FC<ProcessingPageProps> = ({
   const [error, setError] = useState<string>('');
   const [logs, setLogs] = useState<string[]>([]);
   const [results, setResults] = useState<ProcessingResults | null>(null);
+  const cancelledRef = useRef(false);
 
   const addLog = (message: string) => {
     setLogs(prev => [...prev, `${new Date().toLocaleTimeString()}: ${message}`]);
   };
 
+  const atualizarEtapa = (etapa: string, percentual: number) => {
+    setProgress(percentual);
+    setCurrentFile(etapa);
+  };
+
+  const consultarJob = async (jobId: string): Promise<JobStatus> => {
+    const statusResponse = await fetch(`/api/jobs/${jobId}`);
+    if (!statusResponse.ok) {
+      throw new Error(`Erro ao consultar o job: ${statusResponse.status}`);
+    }
+    return statusResponse.json();
+  };
+
+  const acompanharEventos = (jobId: string): Promise<JobStatus | null> =>
+    new Promise((resolve, reject) => {
+      const eventos = new EventSource(`/api/jobs/${jobId}/eventos`);
+      const verificarCancelamento = setInterval(() => {
+        if (cancelledRef.current) {
+          encerrar();
+          resolve(null);
+        }
+      }, POLL_INTERVAL_MS);
+      const encerrar = () => {
+        clearInterval(verificarCancelamento);
+        eventos.close();
+      };
+
+      eventos.addEventListener('etapa', (e) => {
+        const { etapa, percentual } = JSON.parse((e as MessageEvent).data);
+        atualizarEtapa(etapa, percentual);
+        addLog(`${etapa} (${percentual}%)`);
+      });
+      eventos.addEventListener('log', (e) => {
+        const { agent, message } = JSON.parse((e as MessageEvent).data);
+        addLog(`[${agent}] ${message}`);
+      });
+      eventos.addEventListener('fim', () => {
+        encerrar();
+        consultarJob(jobId).then(resolve, reject);
+      });
+      eventos.onerror = () => {
+        encerrar();
+        reject(new Error('Conexão de eventos interrompida'));
+      };
+    });
+
+  const acompanharPorPolling = async (jobId: string): Promise<JobStatus | null> => {
+    const inicio = Date.now();
+    let ultimaEtapa = '';
+    while (!cancelledRef.current) {
+      if (Date.now() - inicio > JOB_TIMEOUT_MS) {
+        throw new Error('Processamento excedeu o tempo limite (20 minutos). Tente novamente.');
+      }
+      const job = await consultarJob(jobId);
+      atualizarEtapa(job.etapa, job.percentual);
+      if (job.etapa !== ultimaEtapa) {
+        addLog(`${job.etapa} (${job.percentual}%)`);
+        ultimaEtapa = job.etapa;
+      }
+      if (job.estado === 'concluido' || job.estado === 'erro') {
+        return job;
+      }
+      await new Promise(resolve => setTimeout(resolve, POLL_INTERVAL_MS));
+    }
+    return null;
+  };
+
   const startProcessing = async () => {
     if (!groqConfig) {
       setError('Configuração da API não encontrada');
@@ -61,26 +134,22 @@ const ProcessingPage: React.FC<ProcessingPageProps> = ({
 
     try {
       addLog(`Processando ${files.length} arquivo(s) previamente carregados`);
+      cancelledRef.current = false;
 
-      // Criar AbortController para timeout customizado
-      const controller = new AbortController();
-      const timeoutId = setTimeout(() => controller.abort(), 1200000); // 20 minutos
-
-      const response = await fetch('/api/process', {
+      // Agendar o processamento em segundo plano
+      const response = await fetch('/api/jobs', {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
           'X-Groq-Config': JSON.stringify({
             apiKey: groqConfig.apiKey,
             model: groqConfig.model
-          })
+          }),
+          ...(sessionId ? { 'X-Session-Id': sessionId } : {})
         },
-        body: JSON.stringify({}),
-        signal: controller.signal
+        body: JSON.stringify({})
       });
 
-      clearTimeout(timeoutId);
-
       if (!response.ok) {
         let errorMessage = `Erro no servidor: ${response.status}`;
         try {
@@ -94,8 +163,19 @@ const ProcessingPage: React.FC<ProcessingPageProps> = ({
         throw new Error(errorMessage);
       }
 
-      // Backend retorna JSON simples, não streaming
-      const result = await response.json();
+      const { job_id: jobId } = await response.json();
+      addLog(`Job ${jobId.slice(0, 8)} agendado`);
+
+      // Eventos ao vivo por SSE; se a conexão cair, segue consultando o job por polling
+      const job = await acompanharEventos(jobId).catch(() => acompanharPorPolling(jobId));
+      if (cancelledRef.current) {
+        return;
+      }
+
+      if (!job || job.estado === 'erro' || !job.resultado) {
+        throw new Error(job?.erro || 'Erro no processamento');
+      }
+      const result = job.resultado;
 
       if (result.status === 'success') {
         addLog('Processamento concluído com sucesso!');
@@ -112,9 +192,7 @@ const ProcessingPage: React.FC<ProcessingPageProps> = ({
       let errorMessage = 'Erro desconhecido';
 
       if (err instanceof Error) {
-        if (err.name === 'AbortError') {
-          errorMessage = 'Processamento interrompido por timeout (20 minutos). Tente novamente.';
-        } else if (err.message.includes('Failed to fetch')) {
+        if (err.message.includes('Failed to fetch')) {
           errorMessage = 'Erro de conexão com o servidor. Verifique se o backend está funcionando.';
         } else if (err.message.includes('JSON')) {
           errorMessage = 'Erro de formato de resposta do servidor. Verifique os logs do backend.';
@@ -133,6 +211,7 @@ const ProcessingPage: React.FC<ProcessingPageProps> = ({
   };
 
   const stopProcessing = () => {
+    cancelledRef.current = true;
     setProcessing(false);
     addLog('Processamento interrompido pelo usuário');
   };
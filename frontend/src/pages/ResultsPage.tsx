@@ -38,6 +38,11 @@ const ResultsPage: React.FC<ResultsPageProps> = ({
   onReset,
 }) => {
   const [downloadingFiles, setDownloadingFiles] = useState<Set<string>>(new Set());
+
+  // Arquivos gerados ficam no diretório da sessão do processamento
+  const urlDownload = (filename: string) => results?.session_id
+    ? `/api/sessions/${results.session_id}/download/${encodeURIComponent(filename)}`
+    : `/api/download/${encodeURIComponent(filename)}`;
   const [notification, setNotification] = useState<{
     open: boolean;
     message: string;
@@ -60,7 +65,7 @@ const ResultsPage: React.FC<ResultsPageProps> = ({
       setDownloadingFiles(prev => new Set(prev).add(filename));
 
       // Fazer o download (usando URL relativa para aproveitar o proxy)
-      const downloadUrl = `/api/download/${encodeURIComponent(filename)}`;
+      const downloadUrl = urlDownload(filename);
 
       console.log(`🔄 Fazendo requisição para: ${downloadUrl}`);
       console.log(`🔗 URL completa: ${window.location.origin}${downloadUrl}`);
@@ -136,7 +141,7 @@ const ResultsPage: React.FC<ResultsPageProps> = ({
         console.warn(`⚠️ Falhou o download via blob, tentando método alternativo:`, linkError);
 
         // Fallback: usar window.location.href
-        const fallbackUrl = `${window.location.origin}/api/download/${encodeURIComponent(filename)}`;
+        const fallbackUrl = `${window.location.origin}${urlDownload(filename)}`;
         console.log(`🔄 Tentando download direto via: ${fallbackUrl}`);
         window.location.href = fallbackUrl;
 
@@ -26,8 +26,9 @@ import {
 } from '@mui/icons-material';
 
 export interface UploadPageProps {
-  onFilesUpload: (files: any[]) => void;
+  onFilesUpload: (files: any[], sessionId: string) => void;
   files: any[];
+  sessionId: string | null;
 }
 
 const REQUIRED_FILES = [
@@ -38,7 +39,7 @@ const REQUIRED_FILES = [
   'FÉRIAS.xlsx'
 ];
 
-const UploadPage: React.FC<UploadPageProps> = ({ onFilesUpload, files }) => {
+const UploadPage: React.FC<UploadPageProps> = ({ onFilesUpload, files, sessionId }) => {
   const [uploading, setUploading] = useState(false);
   const [dragOver, setDragOver] = useState(false);
   const [error, setError] = useState<string | null>(null);
@@ -76,15 +77,17 @@ const UploadPage: React.FC<UploadPageProps> = ({ onFilesUpload, files }) => {
         formData.append('files', file);
       });
 
+      // Novos envios continuam na mesma sessão (uploads isolados por processamento)
       const response = await fetch('/api/upload', {
         method: 'POST',
+        headers: sessionId ? { 'X-Session-Id': sessionId } : undefined,
         body: formData,
       });
 
       const data = await response.json();
 
       if (response.ok) {
-        onFilesUpload(data.files);
+        onFilesUpload(data.files, data.session_id);
       } else {
         setError(data.error || 'Erro no upload dos arquivos');
       }
@@ -13,4 +13,23 @@ export interface ProcessingResults {
   sistema_usado?: string;
   metodo_calculo?: string;
   fonte_dados?: string;
-}
\ No newline at end of file
+  session_id?: string;
+  validacoes?: Record<string, boolean>;
+  tempos_etapas?: Record<string, number>;
+  tempos_requisicao?: Record<string, number>;
+  perfil?: Record<string, unknown>;
+  competencia?: string;
+  prorrateio?: Record<string, unknown>;
+  incremental?: Record<string, unknown>;
+  analise_narrativa?: Record<string, unknown>;
+}
+
+export interface JobStatus {
+  id: string;
+  estado: 'pendente' | 'executando' | 'concluido' | 'erro';
+  etapa: string;
+  percentual: number;
+  duracao_segundos: number | null;
+  resultado: (ProcessingResults & { status: string; error?: string }) | null;
+  erro: string | null;
+}
@@ -0,0 +1,37 @@
+"""
+Configuração comum dos testes: os módulos de tools/, api/ e benchmarks/ são importados
+pelo nome, como fazem a API e os benchmarks
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ / 'tools'))
+sys.path.insert(0, str(RAIZ / 'api'))
+sys.path.insert(0, str(RAIZ / 'benchmarks'))
+
+# Tamanho do dataset sintético dos testes de ponta a ponta (rápido, mas com todos os eventos)
+FUNCIONARIOS_TESTE = 300
+
+
+@pytest.fixture(autouse=True)
+def ambiente_isolado(monkeypatch, tmp_path):
+    """Sem caches em disco compartilhados e sem estado incremental entre testes"""
+    monkeypatch.setenv('FINACREW_CACHE_PLANILHAS', '0')
+    monkeypatch.setenv('FINACREW_LLM_CACHE', '0')
+    monkeypatch.setenv('FINACREW_INCREMENTAL', '0')
+    monkeypatch.setenv('FINACREW_SESSOES_DIR', str(tmp_path / 'sessions'))
+    monkeypatch.chdir(tmp_path)
+
+
+@pytest.fixture(scope='session')
+def dataset_sintetico(tmp_path_factory) -> Path:
+    """Planilhas de entrada sintéticas de 05/2025 (mesma semente = mesmas planilhas)"""
+    from synthetic_dataset import gerar_dataset
+
+    pasta = tmp_path_factory.mktemp('entrada')
+    gerar_dataset(str(pasta), FUNCIONARIOS_TESTE)
+    return pasta
@@ -0,0 +1,33 @@
+"""Modo lote: regra de desligamento por competência como padrão"""
+
+import logging
+
+from batch_competencias import processar_lote_competencias
+from real_data_processor_tool import executar_processamento_real
+from vr_calculation_engine import REGRA_DIA_DO_MES, REGRA_MES_COMPETENCIA
+
+
+def test_lote_usa_regra_por_competencia(dataset_sintetico, tmp_path, monkeypatch):
+    monkeypatch.delenv('FINACREW_REGRA_DESLIGAMENTO', raising=False)
+    lote = processar_lote_competencias(str(dataset_sintetico), ['04.2025', '05.2025'],
+                                       max_workers=2, diretorio_saida=str(tmp_path / 'lote'))
+    assert lote.sucesso
+
+    # Em 04/2025 os admitidos em maio ficam de fora e os desligamentos de maio não contam
+    abril, maio = lote.resultados['04.2025'], lote.resultados['05.2025']
+    assert abril.funcionarios_elegiveis != maio.funcionarios_elegiveis
+
+    avulso = executar_processamento_real(str(dataset_sintetico), diretorio_saida=str(tmp_path / 'avulso'),
+                                         competencia='04.2025', regra_desligamento=REGRA_MES_COMPETENCIA)
+    assert abril.funcionarios_elegiveis == avulso.funcionarios_elegiveis
+    assert abril.valor_total_vr == avulso.valor_total_vr
+
+
+def test_regra_dia_em_varios_meses_avisa(dataset_sintetico, tmp_path, caplog):
+    with caplog.at_level(logging.WARNING, logger='batch_competencias'):
+        lote = processar_lote_competencias(str(dataset_sintetico), ['04.2025', '05.2025'],
+                                           diretorio_saida=str(tmp_path / 'lote'),
+                                           regra_desligamento=REGRA_DIA_DO_MES)
+    assert lote.sucesso
+    assert any('mesma elegibilidade' in registro.message for registro in caplog.records)
+    assert lote.resultados['04.2025'].funcionarios_elegiveis == lote.resultados['05.2025'].funcionarios_elegiveis
@@ -0,0 +1,67 @@
+"""Conversão de colunas de datas em lote: formatos, data padrão e relatório"""
+
+import logging
+from datetime import datetime
+
+import pandas as pd
+
+from date_column_parser import DATA_PADRAO, converter_coluna_datas
+
+
+def test_formatos_misturados_na_mesma_coluna():
+    serie = pd.Series([
+        '14/05/2025',           # DD/MM/AAAA
+        '3/5/2025',             # DD/MM/AAAA sem zeros
+        '20-05-2025',           # DD-MM-AAAA
+        '2025-05-21',           # ISO
+        '2025-05-22 00:00:00',  # ISO com hora
+        45799,                  # serial do Excel
+        datetime(2025, 5, 23),  # célula de data
+        '24.05.2025',           # fallback valor a valor
+    ], name='DATA DEMISSÃO')
+
+    datas, relatorio = converter_coluna_datas(serie)
+
+    assert datas.dt.strftime('%Y-%m-%d').tolist() == [
+        '2025-05-14', '2025-05-03', '2025-05-20', '2025-05-21',
+        '2025-05-22', '2025-05-22', '2025-05-23', '2025-05-24'
+    ]
+    assert relatorio.por_formato == {'datetime': 1, 'serial Excel': 1, 'DD/MM/AAAA': 2, 'ISO': 2, 'DD-MM-AAAA': 1}
+    assert relatorio.fallback == 1
+    assert relatorio.total_corrigidas == 0
+
+
+def test_coluna_ja_convertida():
+    serie = pd.to_datetime(pd.Series(['2025-05-01', None]))
+    datas, relatorio = converter_coluna_datas(serie, data_padrao=pd.Timestamp('2025-01-01'))
+    assert datas.tolist() == [pd.Timestamp('2025-05-01'), pd.Timestamp('2025-01-01')]
+    assert relatorio.vazias == 1
+
+
+def test_vazios_e_invalidos_recebem_a_data_padrao_com_aviso(caplog):
+    serie = pd.Series(['14/05/2025', None, '', 'lixo', '31/02/2025'], name='DATA DEMISSÃO')
+
+    with caplog.at_level(logging.WARNING, logger='date_column_parser'):
+        datas, relatorio = converter_coluna_datas(serie)
+
+    assert datas.isna().sum() == 0
+    assert (datas.iloc[1:] == DATA_PADRAO).all()
+    assert relatorio.vazias == 2
+    assert relatorio.total_corrigidas == 4
+    assert [c['linha_excel'] for c in relatorio.corrigidas] == [3, 4, 5, 6]
+    assert relatorio.corrigidas[2]['valor_original'] == 'lixo'
+    assert 'substituídas pela data padrão: 4 (linhas 3, 4, 5, 6)' in relatorio.resumo()
+    assert len(caplog.records) == 1
+
+
+def test_data_padrao_nat_mantem_vazios_sem_aviso(caplog):
+    serie = pd.Series(['05/05/2025', None, 'lixo'], name='INICIO FÉRIAS')
+
+    with caplog.at_level(logging.WARNING, logger='date_column_parser'):
+        datas, relatorio = converter_coluna_datas(serie, data_padrao=pd.NaT)
+
+    assert datas.iloc[0] == pd.Timestamp('2025-05-05')
+    assert datas.iloc[1:].isna().all()
+    assert relatorio.total_corrigidas == 0
+    assert relatorio.corrigidas == []
+    assert caplog.records == []
@@ -0,0 +1,87 @@
+"""Barramento de eventos: fan-out por canal, filas limitadas e histórico para replay"""
+
+import threading
+
+from event_bus import (
+    EVENTO_LOG,
+    BarramentoEventos,
+    barramento,
+    canal_atual,
+    definir_canal,
+    publicar_evento,
+    restaurar_canal
+)
+
+
+def test_cada_assinante_recebe_os_eventos_do_proprio_canal():
+    bus = BarramentoEventos()
+    a1, a2, outro = bus.inscrever('job-a'), bus.inscrever('job-a'), bus.inscrever('job-b')
+
+    bus.publicar('job-a', EVENTO_LOG, {'mensagem': 'olá'})
+
+    for assinatura in (a1, a2):
+        evento = assinatura.proximo(timeout=1)
+        assert evento['tipo'] == EVENTO_LOG
+        assert evento['dados'] == {'mensagem': 'olá'}
+    assert outro.proximo(timeout=0.05) is None
+
+
+def test_fila_cheia_descarta_os_mais_antigos_sem_bloquear():
+    bus = BarramentoEventos(tamanho_fila=3)
+    assinatura = bus.inscrever('job')
+
+    for i in range(10):
+        bus.publicar('job', EVENTO_LOG, {'i': i})
+
+    recebidos = [assinatura.proximo(timeout=0.1)['dados']['i'] for _ in range(3)]
+    assert recebidos == [7, 8, 9]
+    assert assinatura.descartados == 7
+
+
+def test_replay_do_historico_a_partir_do_ultimo_id():
+    bus = BarramentoEventos(historico=5)
+    eventos = [bus.publicar('job', EVENTO_LOG, {'i': i}) for i in range(8)]
+
+    assinatura = bus.inscrever('job', desde_id=eventos[5]['id'])
+    assert [assinatura.proximo(timeout=0.1)['dados']['i'] for _ in range(2)] == [6, 7]
+    assert assinatura.proximo(timeout=0.05) is None
+
+    # Histórico limitado: só os 5 últimos voltam
+    completa = bus.inscrever('job')
+    assert [completa.proximo(timeout=0.1)['dados']['i'] for _ in range(5)] == [3, 4, 5, 6, 7]
+
+
+def test_cancelar_interrompe_a_entrega():
+    bus = BarramentoEventos()
+    assinatura = bus.inscrever('job')
+    bus.cancelar(assinatura)
+    bus.publicar('job', EVENTO_LOG, {})
+    assert assinatura.proximo(timeout=0.05) is None
+
+
+def test_canal_do_contexto_nao_vaza_entre_threads():
+    assinatura = barramento.inscrever('canal-teste-contexto')
+    vistos = {}
+
+    def trabalhar(nome, canal):
+        token = definir_canal(canal)
+        try:
+            vistos[nome] = canal_atual()
+            publicar_evento(EVENTO_LOG, {'de': nome})
+        finally:
+            restaurar_canal(token)
+
+    threads = [
+        threading.Thread(target=trabalhar, args=('com_canal', 'canal-teste-contexto')),
+        threading.Thread(target=trabalhar, args=('sem_canal', None))
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert vistos == {'com_canal': 'canal-teste-contexto', 'sem_canal': None}
+    assert canal_atual() is None
+    assert assinatura.proximo(timeout=1)['dados'] == {'de': 'com_canal'}
+    assert assinatura.proximo(timeout=0.05) is None
+    barramento.cancelar(assinatura)
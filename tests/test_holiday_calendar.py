@@ -0,0 +1,50 @@
+"""Identificação da UF pelo nome do sindicato e contagem de dias úteis por região"""
+
+from datetime import date
+
+import pytest
+
+from holiday_calendar import dias_uteis_mes, dias_uteis_por_regiao, uf_da_regiao
+
+# Nomes reais da coluna Sindicato de ATIVOS.xlsx
+SINDICATOS_REAIS = {
+    'SP - SINDPD SP - SIND.TRAB.EM PROC DADOS E EMPR.EMPRESAS PROC DADOS ESTADO DE SP.': 'SP',
+    'RJ - SINDPD RJ - SINDICATO PROFISSIONAIS DE PROCESSAMENTO DADOS DO RIO DE JANEIRO': 'RJ',
+    'RS - SINDPPD RS - SINDICATO DOS TRAB. EM PROC. DE DADOS RIO GRANDE DO SUL': 'RS',
+    'PR - SITEPD PR - SIND DOS TRAB EM EMPR PRIVADAS DE PROC DE DADOS DE CURITIBA E REGIAO METROPOLITANA': 'PR',
+}
+
+
+@pytest.mark.parametrize('sindicato, uf', SINDICATOS_REAIS.items())
+def test_uf_dos_sindicatos_reais(sindicato, uf):
+    assert uf_da_regiao(sindicato) == uf
+
+
+@pytest.mark.parametrize('texto, uf', [
+    ('SINDPD SP - São Paulo', 'SP'),
+    ('SINDPD RS - Rio Grande do Sul', 'RS'),
+    ('Paraná', 'PR'),
+    ('Minas Gerais', 'MG'),
+    ('SINDICATO DE PROC. DE DADOS', 'BR'),
+    ('', 'BR'),
+    (None, 'BR'),
+])
+def test_uf_por_sigla_inteira_ou_nome_do_estado(texto, uf):
+    assert uf_da_regiao(texto) == uf
+
+
+def test_dias_uteis_usam_o_calendario_do_sindicato():
+    rs = next(s for s, uf in SINDICATOS_REAIS.items() if uf == 'RS')
+    pr = next(s for s, uf in SINDICATOS_REAIS.items() if uf == 'PR')
+
+    # 20/09 (Revolução Farroupilha) só é feriado no RS; 19/12 (Emancipação) só no PR
+    assert dias_uteis_mes(2024, 9, uf_da_regiao(rs)) == 20
+    assert dias_uteis_mes(2024, 9, uf_da_regiao(pr)) == 21
+    assert dias_uteis_mes(2025, 12, uf_da_regiao(rs)) == 22
+    assert dias_uteis_mes(2025, 12, uf_da_regiao(pr)) == 21
+
+
+def test_dias_uteis_por_regiao_vetorizado():
+    ufs = [uf_da_regiao(s) for s in SINDICATOS_REAIS]
+    dias = dias_uteis_por_regiao(ufs, date(2024, 9, 1), date(2024, 9, 30))
+    assert list(dias) == [21, 21, 20, 21]
@@ -0,0 +1,77 @@
+"""Recálculo incremental: a base remendada é igual à de um recálculo completo"""
+
+import pandas as pd
+import pytest
+
+from conftest import FUNCIONARIOS_TESTE
+from incremental_state import DIRETORIO_ESTADO, incremental_habilitado
+from real_data_processor_tool import executar_processamento_real
+
+PLANILHAS_SAIDA = ['VR MENSAL 05.2025.xlsx', 'FUNCIONARIOS_EXCLUIDOS_AUDITORIA.xlsx']
+
+
+def _alterar_entradas(pasta):
+    """Remove férias e ativos, muda datas de desligamento e uma admissão"""
+    ferias = pd.read_excel(pasta / 'FERIAS.xlsx')
+    ferias.iloc[5:].to_excel(pasta / 'FERIAS.xlsx', index=False)
+    desligados = pd.read_excel(pasta / 'DESLIGADOS.xlsx')
+    desligados.loc[:2, 'DATA DEMISSÃO'] = '28/05/2025'
+    desligados.to_excel(pasta / 'DESLIGADOS.xlsx', index=False)
+    ativos = pd.read_excel(pasta / 'ATIVOS.xlsx')
+    ativos.drop(index=[10, 20]).to_excel(pasta / 'ATIVOS.xlsx', index=False)
+    admissoes = pd.read_excel(pasta / 'ADMISSAO_ABRIL.xlsx')
+    admissoes.loc[0, 'Admissão'] = '2025-05-20'
+    admissoes.to_excel(pasta / 'ADMISSAO_ABRIL.xlsx', index=False)
+
+
+def test_desligado_por_padrao(monkeypatch):
+    monkeypatch.delenv('FINACREW_INCREMENTAL', raising=False)
+    assert not incremental_habilitado()
+    monkeypatch.setenv('FINACREW_INCREMENTAL', '1')
+    assert incremental_habilitado()
+
+
+def test_sem_estado_gravado_por_padrao(dataset_sintetico, tmp_path, monkeypatch):
+    monkeypatch.delenv('FINACREW_INCREMENTAL', raising=False)
+    executar_processamento_real(str(dataset_sintetico), diretorio_saida=str(tmp_path / 'saida'))
+    assert not (tmp_path / 'saida' / DIRETORIO_ESTADO).exists()
+    assert not (tmp_path / DIRETORIO_ESTADO).exists()
+
+
+@pytest.mark.parametrize('modo_prorrateio', ['calendario', 'dias_uteis'])
+def test_incremental_igual_ao_recalculo_completo(tmp_path, monkeypatch, modo_prorrateio):
+    from synthetic_dataset import gerar_dataset
+
+    # Sem matrículas repetidas em ATIVOS (com elas o recálculo é sempre completo)
+    entrada = tmp_path / 'entrada'
+    gerar_dataset(str(entrada), FUNCIONARIOS_TESTE, fracao_duplicadas=0)
+
+    def processar(saida):
+        resultado = executar_processamento_real(str(entrada), diretorio_saida=str(tmp_path / saida),
+                                                modo_prorrateio=modo_prorrateio)
+        assert resultado.sucesso, resultado.erro
+        return resultado
+
+    monkeypatch.setenv('FINACREW_INCREMENTAL', '1')
+    primeira = processar('incremental')
+    assert primeira.incremental['completo']
+    repetida = processar('incremental')
+    assert not repetida.incremental['completo'], repetida.incremental
+    assert repetida.incremental['recalculadas'] == 0
+
+    _alterar_entradas(entrada)
+    incremental = processar('incremental')
+    assert not incremental.incremental['completo']
+    assert 0 < incremental.incremental['recalculadas'] < incremental.funcionarios_elegiveis
+
+    monkeypatch.setenv('FINACREW_INCREMENTAL', '0')
+    completo = processar('completo')
+    assert completo.incremental is None or not completo.incremental
+
+    for nome in PLANILHAS_SAIDA:
+        parcial = pd.read_excel(tmp_path / 'incremental' / nome, sheet_name=None)
+        referencia = pd.read_excel(tmp_path / 'completo' / nome, sheet_name=None)
+        assert parcial.keys() == referencia.keys()
+        for aba in referencia:
+            pd.testing.assert_frame_equal(parcial[aba], referencia[aba], obj=f"{nome} / {aba}")
+    assert incremental.valor_total_vr == completo.valor_total_vr
@@ -0,0 +1,104 @@
+"""Jobs em segundo plano: estados, progresso publicado no canal do job e despejo"""
+
+import threading
+import time
+
+import pytest
+
+from event_bus import EVENTO_ETAPA, EVENTO_FIM, EVENTO_LOG, barramento, canal_atual, publicar_evento
+from jobs import ESTADO_CONCLUIDO, ESTADO_ERRO, ESTADOS_FINAIS, GerenciadorJobs
+
+
+def _aguardar(gerenciador, job_id, limite=10):
+    fim = time.time() + limite
+    while time.time() < fim:
+        job = gerenciador.obter(job_id)
+        if job['estado'] in ESTADOS_FINAIS:
+            return job
+        time.sleep(0.01)
+    pytest.fail(f"Job {job_id} não terminou em {limite}s")
+
+
+def _eventos(assinatura):
+    eventos = []
+    while True:
+        evento = assinatura.proximo(timeout=1)
+        eventos.append(evento)
+        if evento is None or evento['tipo'] == EVENTO_FIM:
+            return eventos
+
+
+def test_job_concluido_com_progresso_e_eventos():
+    gerenciador = GerenciadorJobs(max_workers=1)
+    liberar = threading.Event()
+
+    def pipeline(valor, progresso):
+        liberar.wait(5)
+        progresso('Calculando VR', 60)
+        publicar_evento(EVENTO_LOG, {'canal': canal_atual()})
+        return {'valor': valor}
+
+    job_id = gerenciador.submeter(pipeline, 42)
+    assinatura = barramento.inscrever(job_id)
+    liberar.set()
+
+    job = _aguardar(gerenciador, job_id)
+    assert job['estado'] == ESTADO_CONCLUIDO
+    assert job['percentual'] == 100
+    assert job['resultado'] == {'valor': 42}
+
+    eventos = _eventos(assinatura)
+    tipos = [e['tipo'] for e in eventos]
+    assert tipos == [EVENTO_ETAPA, EVENTO_ETAPA, EVENTO_LOG, EVENTO_FIM]
+    assert eventos[1]['dados'] == {'etapa': 'Calculando VR', 'percentual': 60}
+    # Logs publicados dentro do pipeline vão para o canal do job
+    assert eventos[2]['dados'] == {'canal': job_id}
+    assert eventos[3]['dados'] == {'estado': ESTADO_CONCLUIDO, 'erro': None}
+    barramento.cancelar(assinatura)
+
+
+def test_job_com_erro():
+    gerenciador = GerenciadorJobs(max_workers=1)
+
+    def pipeline(progresso):
+        raise ValueError('planilha inválida')
+
+    job = _aguardar(gerenciador, gerenciador.submeter(pipeline))
+    assert job['estado'] == ESTADO_ERRO
+    assert job['erro'] == 'planilha inválida'
+
+
+def test_progresso_nunca_regride_nem_chega_a_100_antes_do_fim():
+    gerenciador = GerenciadorJobs(max_workers=1)
+    agendado = threading.Event()
+    percentuais = []
+
+    def pipeline(progresso):
+        agendado.wait(5)
+        for percentual in (40, 20, 150):
+            progresso('Etapa', percentual)
+            percentuais.append(gerenciador.obter(job_id)['percentual'])
+        return {}
+
+    job_id = gerenciador.submeter(pipeline)
+    agendado.set()
+    _aguardar(gerenciador, job_id)
+    assert percentuais == [40, 40, 99]
+
+
+def test_despejo_mantem_jobs_ativos():
+    gerenciador = GerenciadorJobs(max_workers=2, max_jobs=2)
+    liberar = threading.Event()
+
+    ativo = gerenciador.submeter(lambda progresso: liberar.wait(5) and {})
+    finalizados = [gerenciador.submeter(lambda progresso: {}) for _ in range(3)]
+    for job_id in finalizados:
+        fim = time.time() + 5
+        while gerenciador.obter(job_id) is not None and gerenciador.obter(job_id)['estado'] not in ESTADOS_FINAIS:
+            assert time.time() < fim
+            time.sleep(0.01)
+
+    assert gerenciador.obter(ativo) is not None
+    assert gerenciador.obter(finalizados[0]) is None
+    liberar.set()
+    assert _aguardar(gerenciador, ativo)['estado'] == ESTADO_CONCLUIDO
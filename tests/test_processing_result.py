@@ -0,0 +1,22 @@
+"""Cronômetro de etapas: tempos e spans do trace ativo"""
+
+import json
+
+from processing_result import CronometroEtapas
+from tracing import rastrear, trace_atual
+
+
+def test_finalizar_com_erro_marca_a_etapa_corrente(tmp_path):
+    with rastrear('teste', str(tmp_path)):
+        cronometro = CronometroEtapas()
+        cronometro.iniciar('Leitura')
+        cronometro.iniciar('Cálculo')
+        cronometro.finalizar(erro=ValueError('coluna ausente'))
+        caminho = trace_atual()['jsonl']
+
+    spans = {s['nome']: s for s in map(json.loads, caminho.read_text(encoding='utf-8').splitlines())}
+    assert spans['etapa.Leitura']['status'] == 'ok'
+    assert spans['etapa.Cálculo']['status'] == 'erro'
+    assert spans['etapa.Cálculo']['erro'] == 'ValueError: coluna ausente'
+    assert spans['teste']['status'] == 'ok'
+    assert set(cronometro.tempos) == {'Leitura', 'Cálculo'}
@@ -0,0 +1,82 @@
+"""Prorrateio por dias úteis no calendário de feriados do sindicato"""
+
+import pandas as pd
+import pytest
+
+from proration_engine import aplicar_prorrateio_dias_uteis, periodo_competencia, separar_ferias
+
+SINDICATO_RS = 'RS - SINDPPD RS - SINDICATO DOS TRAB. EM PROC. DE DADOS RIO GRANDE DO SUL'
+SINDICATO_PR = 'PR - SITEPD PR - SIND DOS TRAB EM EMPR PRIVADAS DE PROC DE DADOS DE CURITIBA E REGIAO METROPOLITANA'
+DIAS_POR_SINDICATO = {'SINDPPD RS': 21, 'SITEPD PR': 22}
+
+
+def _base(matriculas, sindicatos, competencia='2025-05-01'):
+    """Base consolidada mínima com mês cheio (como sai do motor)"""
+    return pd.DataFrame({
+        'Matricula': [str(m) for m in matriculas],
+        'Sindicato do Colaborador': sindicatos,
+        'Competência': competencia,
+        'Dias': [DIAS_POR_SINDICATO['SINDPPD RS' if 'RS' in s[:2] else 'SITEPD PR'] for s in sindicatos],
+        'VALOR DIÁRIO VR': 35.0,
+        'OBS GERAL': ''
+    })
+
+
+def test_periodo_competencia_aceita_os_dois_formatos():
+    esperado = (pd.Timestamp('2025-05-01'), pd.Timestamp('2025-05-31'))
+    assert periodo_competencia('05.2025') == esperado
+    assert periodo_competencia('2025-05-01') == esperado
+
+
+def test_mes_completo_mantem_os_dias_da_tabela():
+    base = _base([1, 2], [SINDICATO_RS, SINDICATO_PR])
+    resultado, estatisticas = aplicar_prorrateio_dias_uteis(base, DIAS_POR_SINDICATO, 21.5)
+
+    assert resultado['Dias'].tolist() == [21, 22]
+    assert estatisticas.prorrateados == 0
+    assert estatisticas.dias_descontados == 0
+
+
+def test_admissao_desligamento_e_ferias_parciais_descontam_dias_uteis():
+    base = _base([1, 2, 3, 4], [SINDICATO_RS] * 4)
+    admissoes = pd.DataFrame({'MATRICULA': [1, 4], 'Admissão': pd.to_datetime(['2025-05-19', '2025-04-10'])})
+    desligados = pd.DataFrame({'MATRICULA': [2], 'DATA DEMISSÃO': pd.to_datetime(['2025-05-20'])})
+    ferias = pd.DataFrame({'MATRICULA': [3], 'INICIO FÉRIAS': ['05/05/2025'], 'FIM FÉRIAS': ['09/05/2025']})
+
+    resultado, estatisticas = aplicar_prorrateio_dias_uteis(
+        base, DIAS_POR_SINDICATO, 21.5, admissoes, desligados, ferias, '05.2025'
+    )
+    dias = dict(zip(resultado['Matricula'], resultado['Dias']))
+
+    # 05/2025 no RS: 21 dias úteis (01/05 é feriado)
+    assert dias['1'] == 10        # 19/05 a 30/05
+    assert dias['2'] == 13        # 02/05 a 20/05
+    assert dias['3'] == 21 - 5    # uma semana de férias
+    assert dias['4'] == 21        # admitido no mês anterior
+    assert resultado.loc[resultado['Matricula'] == '1', 'TOTAL'].item() == pytest.approx(35.0 * 10)
+    assert resultado['Custo empresa'].sum() == pytest.approx(resultado['TOTAL'].sum() * 0.8)
+    assert (estatisticas.admissoes, estatisticas.desligamentos, estatisticas.ferias_parciais) == (1, 1, 1)
+    assert estatisticas.dias_descontados == (21 - 10) + (21 - 13) + 5
+
+
+def test_feriado_regional_entra_no_prorrateio():
+    # 20/09 (Revolução Farroupilha) é feriado só no RS: admitidos em 16/09/2024 perdem dias diferentes
+    base = _base([1, 2], [SINDICATO_RS, SINDICATO_PR], competencia='2024-09-01')
+    admissoes = pd.DataFrame({'MATRICULA': [1, 2], 'Admissão': pd.to_datetime(['2024-09-16', '2024-09-16'])})
+    resultado, _ = aplicar_prorrateio_dias_uteis(
+        base, {'SINDPPD RS': 20, 'SITEPD PR': 21}, 21, admissoes, competencia='09.2024'
+    )
+    assert resultado['Dias'].tolist() == [10, 11]
+
+
+def test_separar_ferias_integrais_e_parciais():
+    ferias = pd.DataFrame({
+        'MATRICULA': [1, 2, 3, 4],
+        'INICIO FÉRIAS': ['01/05/2025', '05/05/2025', '01/03/2025', None],
+        'FIM FÉRIAS': ['31/05/2025', '09/05/2025', '15/03/2025', None]
+    })
+    integrais, parciais = separar_ferias(ferias, '05.2025')
+
+    # Sem datas nem dias: férias integrais (regra original)
+    assert integrais['MATRICULA'].tolist() == [1, 4]
+    assert parciais['MATRICULA'].tolist() == [2]
@@ -0,0 +1,69 @@
+"""Processamento de ponta a ponta sobre o dataset sintético"""
+
+import pandas as pd
+import pytest
+
+import real_data_processor_tool
+from metrics import PROCESSAMENTOS
+from real_data_processor_tool import executar_processamento_real
+
+
+def test_processamento_completo(dataset_sintetico, tmp_path):
+    antes = PROCESSAMENTOS.valor(status='sucesso')
+    resultado = executar_processamento_real(str(dataset_sintetico), diretorio_saida=str(tmp_path / 'saida'))
+
+    assert resultado.sucesso, resultado.erro
+    assert resultado.funcionarios_elegiveis > 0
+    assert resultado.valor_total_vr > 0
+    assert 'PROCESSAMENTO CONCLUÍDO COM SUCESSO' in resultado.relatorio
+    assert PROCESSAMENTOS.valor(status='sucesso') == antes + 1
+
+
+def test_falha_na_consolidacao_conta_erro_e_omite_sucesso(dataset_sintetico, tmp_path, monkeypatch):
+    def falhar(*args, **kwargs):
+        raise OSError('disco cheio')
+
+    monkeypatch.setattr(real_data_processor_tool, 'escrever_planilha', falhar)
+    sucesso_antes = PROCESSAMENTOS.valor(status='sucesso')
+    erro_antes = PROCESSAMENTOS.valor(status='erro')
+
+    resultado = executar_processamento_real(str(dataset_sintetico), diretorio_saida=str(tmp_path / 'saida'))
+
+    assert not resultado.sucesso
+    assert 'disco cheio' in resultado.erro
+    assert 'CONCLUÍDO COM SUCESSO' not in resultado.relatorio
+    assert PROCESSAMENTOS.valor(status='erro') == erro_antes + 1
+    assert PROCESSAMENTOS.valor(status='sucesso') == sucesso_antes
+
+
+@pytest.mark.parametrize('modo_prorrateio', ['calendario', 'dias_uteis'])
+def test_totais_do_relatorio_vem_da_planilha_gerada(dataset_sintetico, tmp_path, modo_prorrateio):
+    resultado = executar_processamento_real(
+        str(dataset_sintetico), diretorio_saida=str(tmp_path / 'saida'), modo_prorrateio=modo_prorrateio
+    )
+    vr_mensal = pd.read_excel(resultado.arquivos['vr_mensal'], sheet_name=0)
+
+    assert resultado.valor_total_vr == pytest.approx(vr_mensal['TOTAL'].sum())
+    assert resultado.valor_empresa == pytest.approx(vr_mensal['Custo empresa'].sum())
+    assert resultado.valor_funcionario == pytest.approx(vr_mensal['Desconto profissional'].sum())
+    assert f"Valor total VR: R$ {resultado.valor_total_vr:,.2f}" in resultado.relatorio
+    assert f"Valor empresa (80%): R$ {resultado.valor_empresa:,.2f}" in resultado.relatorio
+    assert f"Valor funcionário (20%): R$ {resultado.valor_funcionario:,.2f}" in resultado.relatorio
+
+
+def test_etapa_com_falha_fica_com_status_erro_no_trace(dataset_sintetico, tmp_path, monkeypatch):
+    import json
+    from tracing import rastrear, trace_atual
+
+    def falhar(*args, **kwargs):
+        raise OSError('disco cheio')
+
+    monkeypatch.setattr(real_data_processor_tool, 'escrever_planilha', falhar)
+    with rastrear('teste', str(tmp_path / 'logs')):
+        executar_processamento_real(str(dataset_sintetico), diretorio_saida=str(tmp_path / 'saida'))
+        caminho = trace_atual()['jsonl']
+
+    spans = {s['nome']: s for s in map(json.loads, caminho.read_text(encoding='utf-8').splitlines())}
+    assert spans['etapa.Gravando planilhas']['status'] == 'erro'
+    assert 'disco cheio' in spans['etapa.Gravando planilhas']['erro']
+    assert spans['etapa.Calculando VR']['status'] == 'ok'
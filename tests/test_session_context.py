@@ -0,0 +1,75 @@
+"""Sessões simultâneas: cada processamento grava só na própria sessão, com o próprio resultado"""
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from consolidated_artifact import ARTEFATO_PADRAO, carregar_base_consolidada
+from real_data_processor_tool import executar_processamento_real
+from session_context import ativar_sessao, criar_sessao, diretorio_saida, sessao_atual
+from tracing import rastrear
+
+SESSOES_SIMULTANEAS = 6
+
+
+@pytest.fixture(scope='module')
+def entradas(dataset_sintetico, tmp_path_factory):
+    """Dois conjuntos de planilhas diferentes: uma troca de saída entre sessões aparece nos totais"""
+    from synthetic_dataset import gerar_dataset
+
+    outro = tmp_path_factory.mktemp('entrada_menor')
+    gerar_dataset(str(outro), 120, semente=7)
+    return [dataset_sintetico, outro]
+
+
+@pytest.fixture(scope='module')
+def referencias(entradas, tmp_path_factory):
+    """Base consolidada de cada entrada processada sozinha, sem sessão"""
+    bases = []
+    for entrada in entradas:
+        saida = tmp_path_factory.mktemp('referencia')
+        executar_processamento_real(str(entrada), diretorio_saida=str(saida))
+        bases.append(carregar_base_consolidada(str(next(saida.glob(f"{ARTEFATO_PADRAO}.*")))))
+    return bases
+
+
+def _processar_em_sessao(raiz, entrada):
+    sessao = criar_sessao(raiz=str(raiz), uploads=str(entrada))
+    with ativar_sessao(sessao), rastrear('teste.sessao', sessao=sessao.id):
+        assert diretorio_saida() == sessao.saida
+        resultado = executar_processamento_real(str(sessao.uploads))
+        assert sessao_atual() is sessao
+    return sessao, resultado
+
+
+def test_sessoes_simultaneas_ficam_isoladas(entradas, referencias, tmp_path):
+    raiz = tmp_path / 'sessions'
+    indices = [i % len(entradas) for i in range(SESSOES_SIMULTANEAS)]
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        execucoes = list(executor.map(lambda i: _processar_em_sessao(raiz, entradas[i]), indices))
+
+    assert len({sessao.id for sessao, _ in execucoes}) == SESSOES_SIMULTANEAS
+    for indice, (sessao, resultado) in zip(indices, execucoes):
+        assert resultado.sucesso, resultado.erro
+
+        # Arquivos só na saída da própria sessão, com a base da própria entrada
+        for caminho in resultado.arquivos.values():
+            assert sessao.saida in Path(caminho).parents
+        base = carregar_base_consolidada(resultado.arquivos['base_consolidada'])
+        assert base.equals(referencias[indice])
+        assert resultado.valor_total_vr == pytest.approx(float(referencias[indice]['TOTAL'].sum()))
+
+        # Trace próprio: todos os spans da sessão em um único trace, com a raiz desta sessão
+        traces = list(sessao.logs.glob('trace_*.jsonl'))
+        assert len(traces) == 1
+        spans = [json.loads(linha) for linha in traces[0].read_text(encoding='utf-8').splitlines()]
+        assert len({span['trace_id'] for span in spans}) == 1
+        raizes = [span for span in spans if span['parent_id'] is None]
+        assert [span['atributos']['sessao'] for span in raizes] == [sessao.id]
+
+    # Nada gravado fora das sessões (diretório atual do teste)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['sessions']
+    assert sessao_atual() is None
@@ -0,0 +1,50 @@
+"""Modo streaming de ATIVOS: lotes com índice contínuo e o mesmo resultado da leitura completa"""
+
+import pandas as pd
+
+from real_data_processor_tool import executar_processamento_real
+from streaming_ativos_reader import LINHAS_CALIBRACAO, iterar_lotes_planilha
+
+# Acima de LINHAS_CALIBRACAO linhas o streaming entrega mais de um lote
+FUNCIONARIOS_STREAMING = LINHAS_CALIBRACAO + 200
+
+
+def _entrada_com_diretor_no_ultimo_lote(pasta):
+    """ATIVOS em que a matrícula de uma linha comum do 1º lote reaparece como diretor no último"""
+    from synthetic_dataset import gerar_dataset
+
+    gerar_dataset(str(pasta), FUNCIONARIOS_STREAMING, fracao_duplicadas=0)
+    ativos = pd.read_excel(pasta / 'ATIVOS.xlsx')
+    diretor = ativos.iloc[[5]].assign(**{'TITULO DO CARGO': 'DIRETOR'})
+    pd.concat([ativos, diretor], ignore_index=True).to_excel(pasta / 'ATIVOS.xlsx', index=False)
+    return str(ativos.loc[5, 'MATRICULA'])
+
+
+def test_lotes_cobrem_a_planilha_com_indice_continuo(tmp_path):
+    matricula = _entrada_com_diretor_no_ultimo_lote(tmp_path)
+    lotes = list(iterar_lotes_planilha(tmp_path / 'ATIVOS.xlsx'))
+
+    assert len(lotes) == 2
+    completa = pd.concat(lotes)
+    assert completa.index.tolist() == list(range(FUNCIONARIOS_STREAMING + 1))
+    pd.testing.assert_frame_equal(completa, pd.read_excel(tmp_path / 'ATIVOS.xlsx'), check_dtype=False)
+    assert str(lotes[0].loc[5, 'MATRICULA']) == matricula
+
+
+def test_diretor_em_lote_posterior_exclui_a_matricula_como_na_leitura_completa(tmp_path, monkeypatch):
+    entrada = tmp_path / 'entrada'
+    matricula = _entrada_com_diretor_no_ultimo_lote(entrada)
+
+    resultados = {}
+    for modo in ('nunca', 'sempre'):
+        monkeypatch.setenv('FINACREW_STREAMING', modo)
+        resultado = executar_processamento_real(str(entrada), diretorio_saida=str(tmp_path / modo))
+        assert resultado.sucesso, resultado.erro
+        assert resultado.modo_streaming == (modo == 'sempre')
+        resultados[modo] = resultado
+
+    completa = pd.read_excel(resultados['nunca'].arquivos['vr_mensal'], sheet_name=0)
+    streaming = pd.read_excel(resultados['sempre'].arquivos['vr_mensal'], sheet_name=0)
+    assert matricula not in completa['Matricula'].astype(str).tolist()
+    pd.testing.assert_frame_equal(streaming, completa)
+    assert resultados['sempre'].valor_total_vr == resultados['nunca'].valor_total_vr
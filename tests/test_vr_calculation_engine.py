@@ -0,0 +1,126 @@
+"""Motor vetorizado da base consolidada: regras de desligamento e equivalência com o laço legado"""
+
+import pandas as pd
+import pytest
+
+from vr_calculation_engine import (
+    COLUNAS_VR_MENSAL,
+    REGRA_DIA_DO_MES,
+    REGRA_MES_COMPETENCIA,
+    calcular_base_consolidada,
+    comparar_bases_consolidadas,
+    mascara_desligados_anteriores,
+    mascara_desligados_excluidos,
+    mascara_desligados_vr_integral,
+    resolver_regra_desligamento
+)
+
+
+@pytest.fixture
+def desligados():
+    # Abril dia 20, abril dia 5, maio dia 10, maio dia 20, junho dia 10, junho dia 25
+    datas = pd.to_datetime(['2025-04-20', '2025-04-05', '2025-05-10', '2025-05-20', '2025-06-10', '2025-06-25'])
+    return pd.DataFrame({'MATRICULA': range(6), 'DATA DEMISSÃO': datas, 'DIA': datas.day})
+
+
+def test_regra_dia_considera_so_o_dia_da_demissao(desligados):
+    # Regra do modelo 05/2025: o mês da data não importa
+    assert mascara_desligados_excluidos(desligados, '05.2025').tolist() == [False, True, True, False, True, False]
+    assert mascara_desligados_vr_integral(desligados, '05.2025').tolist() == [True, False, False, True, False, True]
+    assert not mascara_desligados_anteriores(desligados, '05.2025').any()
+
+
+def test_regra_competencia_compara_o_mes(desligados):
+    regra = REGRA_MES_COMPETENCIA
+    assert mascara_desligados_anteriores(desligados, '05.2025', regra).tolist() == [True, True, False, False, False, False]
+    assert mascara_desligados_excluidos(desligados, '05.2025', regra).tolist() == [True, True, True, False, False, False]
+    assert mascara_desligados_vr_integral(desligados, '05.2025', regra).tolist() == [False, False, False, True, False, False]
+
+
+def test_regra_padrao_e_variavel_de_ambiente(monkeypatch):
+    monkeypatch.delenv('FINACREW_REGRA_DESLIGAMENTO', raising=False)
+    assert resolver_regra_desligamento() == REGRA_DIA_DO_MES
+    monkeypatch.setenv('FINACREW_REGRA_DESLIGAMENTO', 'competencia')
+    assert resolver_regra_desligamento() == REGRA_MES_COMPETENCIA
+    assert resolver_regra_desligamento('invalida') == REGRA_DIA_DO_MES
+
+
+SINDICATO_SP = 'SP - SINDPD SP - SIND.TRAB.EM PROC DADOS E EMPR.EMPRESAS PROC DADOS ESTADO DE SP.'
+SINDICATO_RS = 'RS - SINDPPD RS - SINDICATO DOS TRAB. EM PROC. DE DADOS RIO GRANDE DO SUL'
+VALOR_POR_SINDICATO = {'SINDPD SP': 37.5, 'SINDPPD RS': 35.0}
+DIAS_POR_SINDICATO = {'SINDPD SP': 22, 'SINDPPD RS': 21}
+
+
+@pytest.fixture
+def entradas_motor():
+    """Ativos com admissões, desligamentos, diretores, excluídos e sindicato vazio ou desconhecido"""
+    df_ativos = pd.DataFrame({
+        'MATRICULA': pd.Series([101, 102, 103, 104, 105, 106, 107, 108, 109, None], dtype=object),
+        'TITULO DO CARGO': ['ANALISTA', 'DIRETOR COMERCIAL', 'ANALISTA', None, 'analista', 'COORDENADOR',
+                            'ANALISTA', 'ANALISTA', 'ANALISTA', 'ANALISTA'],
+        'Sindicato': [SINDICATO_SP, SINDICATO_SP, SINDICATO_RS, SINDICATO_RS, None, 'OUTRO SINDICATO',
+                      SINDICATO_SP, SINDICATO_RS, SINDICATO_SP, SINDICATO_SP]
+    })
+    df_admissoes = pd.DataFrame({
+        'MATRICULA': [103, 104, 108, 103],
+        'Admissão': pd.to_datetime(['2025-04-10', '2025-05-12', '2025-06-02', '2025-05-01'])
+    })
+    datas = pd.to_datetime(['2025-05-20', '2025-05-08', '2025-04-25', '2025-06-18'])
+    df_desligados = pd.DataFrame({'MATRICULA': [106, 107, 108, 109], 'DATA DEMISSÃO': datas, 'DIA': datas.day})
+    return df_ativos, {'105'}, df_admissoes, df_desligados
+
+
+@pytest.mark.parametrize('regra', [REGRA_DIA_DO_MES, REGRA_MES_COMPETENCIA])
+def test_motor_vetorizado_igual_ao_laco_legado(entradas_motor, regra):
+    from real_data_processor_tool import _montar_base_consolidada_legado
+
+    df_ativos, excluidos, df_admissoes, df_desligados = entradas_motor
+    argumentos = (df_ativos, excluidos, df_admissoes, df_desligados,
+                  VALOR_POR_SINDICATO, DIAS_POR_SINDICATO, 37.5, 21.5, '05.2025', regra)
+
+    legado = _montar_base_consolidada_legado(*argumentos)
+    vetorizado = calcular_base_consolidada(*argumentos)
+
+    comparacao = comparar_bases_consolidadas(legado, vetorizado)
+    assert comparacao['identicas'], comparacao['exemplos']
+    assert list(vetorizado.columns) == COLUNAS_VR_MENSAL
+    # Diretor (102) e excluído (105) fora; a matrícula vazia entra como ''
+    assert vetorizado['Matricula'].tolist() == ['101', '103', '104', '106', '107', '108', '109', '']
+
+
+def test_admissao_no_mes_e_proporcional_aos_dias_corridos(entradas_motor):
+    df_ativos, excluidos, df_admissoes, df_desligados = entradas_motor
+    base = calcular_base_consolidada(df_ativos, excluidos, df_admissoes, df_desligados,
+                                     VALOR_POR_SINDICATO, DIAS_POR_SINDICATO, 37.5, 21.5).set_index('Matricula')
+
+    # Admitido no mês anterior: mês cheio; em 12/05: 20 de 31 dias corridos
+    assert base.loc['103', 'Dias'] == 21
+    assert base.loc['104', 'Dias'] == int(21 * 20 / 31)
+    assert base.loc['104', 'OBS GERAL'] == 'Admitido em 12/05/2025 - Proporcional'
+    assert base.loc['106', 'OBS GERAL'].startswith('Desligado em 20/05/2025 - VR Integral')
+    assert base.loc['101', 'TOTAL'] == pytest.approx(37.5 * 22)
+    assert base.loc['101', 'Custo empresa'] == pytest.approx(37.5 * 22 * 0.8)
+
+
+@pytest.mark.parametrize('regra', [REGRA_DIA_DO_MES, REGRA_MES_COMPETENCIA])
+def test_admissao_de_outro_ano_segue_a_regra(regra):
+    from real_data_processor_tool import _montar_base_consolidada_legado
+
+    df_ativos = pd.DataFrame({'MATRICULA': [201, 202], 'TITULO DO CARGO': 'ANALISTA', 'Sindicato': SINDICATO_SP})
+    df_admissoes = pd.DataFrame({'MATRICULA': [201, 202], 'Admissão': pd.to_datetime(['2024-05-10', '2024-04-10'])})
+    argumentos = (df_ativos, set(), df_admissoes, None,
+                  VALOR_POR_SINDICATO, DIAS_POR_SINDICATO, 37.5, 21.5, '05.2025', regra)
+
+    legado = _montar_base_consolidada_legado(*argumentos)
+    vetorizado = calcular_base_consolidada(*argumentos)
+    assert comparar_bases_consolidadas(legado, vetorizado)['identicas']
+
+    base = vetorizado.set_index('Matricula')
+    if regra == REGRA_DIA_DO_MES:
+        # Modelo 05/2025: só o mês da admissão conta (maio proporcional, abril mês cheio)
+        assert base.loc['201', 'Dias'] == int(22 * 22 / 31)
+        assert base.loc['201', 'OBS GERAL'] == 'Admitido em 10/05/2024 - Proporcional'
+        assert base.loc['202', 'OBS GERAL'] == 'Admitido em 10/04/2024'
+    else:
+        assert base.loc['201', 'Dias'] == 22
+        assert base['OBS GERAL'].tolist() == ['', '']
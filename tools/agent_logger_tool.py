@@ -8,19 +8,25 @@ import os
 import json
 import logging
 import sys
+import contextvars
 from datetime import datetime
 from pathlib import Path
 from crewai_tools import tool
 from io import StringIO
 
+from event_bus import EVENTO_LOG, publicar_evento
+from session_context import sessao_atual
+from metrics import medir_tool
+
 
 class AgentLogCapture:
     """Captura logs dos agentes CrewAI"""
 
-    def __init__(self):
+    def __init__(self, logs_dir="logs"):
         self.logs = []
         self.start_time = datetime.now()
         self.log_file = None
+        self.logs_dir = Path(logs_dir)
 
     def start_capture(self, session_id=None):
         """Inicia a captura de logs"""
@@ -28,10 +34,9 @@ class AgentLogCapture:
             session_id = datetime.now().strftime("%Y%m%d_%H%M%S")
 
         # Criar diretório de logs se não existir
-        logs_dir = Path("logs")
-        logs_dir.mkdir(exist_ok=True)
+        self.logs_dir.mkdir(parents=True, exist_ok=True)
 
-        self.log_file = logs_dir / f"agentes_log_{session_id}.txt"
+        self.log_file = self.logs_dir / f"agentes_log_{session_id}.txt"
 
         # Configurar logging para capturar saídas dos agentes
         self.setup_logging()
@@ -61,6 +66,9 @@ class AgentLogCapture:
             with open(self.log_file, 'a', encoding='utf-8') as f:
                 f.write(f"[{timestamp}] {level} - {agent_role}: {message}\n")
 
+        # Transmitir aos assinantes da sessão em andamento (SSE), sem bloquear
+        publicar_evento(EVENTO_LOG, log_entry)
+
     def capture_crew_execution(self, crew_result, crew_info="FinaCrew"):
         """Captura resultado da execução do crew"""
         self.add_log("CREW_RESULT", f"Resultado do {crew_info}: {str(crew_result)}", "RESULT")
@@ -102,11 +110,20 @@ class AgentLogCapture:
         return str(self.log_file)
 
 
-# Instância global para captura
+# Instância global para captura (uso fora de sessão, ex.: CLI)
 agent_logger = AgentLogCapture()
 
+# Captura da sessão em andamento no contexto atual (uma por execução simultânea)
+_captura_atual: contextvars.ContextVar = contextvars.ContextVar('finacrew_captura_logs', default=None)
+
+
+def captura_atual() -> AgentLogCapture:
+    """Captura do contexto atual ou, sem sessão, a instância global"""
+    return _captura_atual.get() or agent_logger
+
 
 @tool
+@medir_tool
 def agent_logger_tool(action: str, data: str = "", agent_role: str = "UNKNOWN") -> str:
     """
     Ferramenta para capturar logs das conversas dos agentes.
@@ -122,20 +139,28 @@ def agent_logger_tool(action: str, data: str = "", agent_role: str = "UNKNOWN")
 
     try:
         if action == "start":
-            session_id = datetime.now().strftime("%Y%m%d_%H%M%S")
-            agent_logger.start_capture(session_id)
+            sessao = sessao_atual()
+            if sessao is not None:
+                # Logs da sessão ficam no diretório dela, sem misturar com execuções paralelas
+                session_id = sessao.id
+                captura = AgentLogCapture(sessao.logs)
+                _captura_atual.set(captura)
+            else:
+                session_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+                captura = agent_logger
+            captura.start_capture(session_id)
             return f"Captura iniciada - Sessão: {session_id}"
 
         elif action == "log":
-            agent_logger.add_log(agent_role, data, "LOG")
+            captura_atual().add_log(agent_role, data, "LOG")
             return "Log adicionado com sucesso"
 
         elif action == "crew_result":
-            agent_logger.capture_crew_execution(data, agent_role)
+            captura_atual().capture_crew_execution(data, agent_role)
             return "Resultado do crew capturado"
 
         elif action == "save":
-            log_file = agent_logger.save_final_log()
+            log_file = captura_atual().save_final_log()
             if log_file:
                 return log_file
             else:
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Processamento em lote de várias competências
+As planilhas de entrada são lidas uma única vez e compartilhadas (somente leitura)
+entre os meses; cada competência roda em sua própria thread com calendário, regras de
+elegibilidade e arquivos de saída próprios, gravados em <saida>/<MM.AAAA>/
+
+Uso:
+    python tools/batch_competencias.py temp_uploads 03.2025 04.2025 05.2025
+    python tools/batch_competencias.py temp_uploads 01.2025:06.2025 --workers 3 --saida lote
+"""
+
+import os
+import sys
+import time
+import argparse
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Union
+import logging
+
+from competencia import Competencia, resolver_competencias
+from processing_result import ResultadoProcessamento
+from real_data_processor_tool import executar_processamento_real
+from session_context import diretorio_saida as diretorio_saida_sessao
+from streaming_ativos_reader import resolver_modo_streaming
+from tracing import span
+from vr_calculation_engine import REGRA_DIA_DO_MES, REGRA_MES_COMPETENCIA, resolver_regra_desligamento
+from workbook_loader import ARQUIVOS_ENTRADA, carregar_planilhas
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Competências processadas ao mesmo tempo (cada uma mantém sua base consolidada em memória)
+MAX_WORKERS_PADRAO = int(os.getenv('FINACREW_LOTE_WORKERS', '4'))
+
+
+@dataclass
+class ResultadoLote:
+    """Resultados por competência, na ordem cronológica, e os tempos do lote"""
+    diretorio_entrada: str
+    resultados: Dict[str, ResultadoProcessamento] = field(default_factory=dict)
+    tempo_carregamento: float = 0.0
+    tempo_total: float = 0.0
+    workers: int = 1
+
+    @property
+    def sucesso(self) -> bool:
+        return all(r.sucesso for r in self.resultados.values())
+
+    @property
+    def tempos_por_competencia(self) -> Dict[str, float]:
+        return {rotulo: r.tempo_total for rotulo, r in self.resultados.items()}
+
+    def resumo(self) -> str:
+        linhas = [
+            f"📆 PROCESSAMENTO EM LOTE - {len(self.resultados)} competência(s), {self.workers} em paralelo",
+            f"   📥 Planilhas lidas uma vez em {self.tempo_carregamento:.2f}s",
+        ]
+        for rotulo, resultado in self.resultados.items():
+            if resultado.sucesso:
+                linhas.append(
+                    f"   ✅ {rotulo}: {resultado.funcionarios_elegiveis} elegíveis, "
+                    f"R$ {resultado.valor_total_vr:,.2f} em {resultado.tempo_total:.2f}s"
+                )
+            else:
+                linhas.append(f"   ❌ {rotulo}: {resultado.erro}")
+        linhas.append(f"   ⏱️ Tempo total do lote: {self.tempo_total:.2f}s")
+        return "\n".join(linhas) + "\n"
+
+    def to_dict(self) -> Dict:
+        return {
+            'diretorio_entrada': self.diretorio_entrada,
+            'sucesso': self.sucesso,
+            'workers': self.workers,
+            'tempo_carregamento': round(self.tempo_carregamento, 4),
+            'tempo_total': round(self.tempo_total, 4),
+            'tempos_por_competencia': self.tempos_por_competencia,
+            'competencias': {rotulo: r.to_dict() for rotulo, r in self.resultados.items()}
+        }
+
+
+def processar_lote_competencias(
+    base_directory: str,
+    competencias: Iterable[Union[str, Competencia]],
+    max_workers: Optional[int] = None,
+    motor_calculo: Optional[str] = None,
+    modo_prorrateio: Optional[str] = None,
+    diretorio_saida: Optional[str] = None,
+    progresso: Optional[Callable[[str, int], None]] = None,
+    regra_desligamento: Optional[str] = None
+) -> ResultadoLote:
+    """
+    Processa várias competências sobre as mesmas planilhas de entrada.
+
+    Args:
+        base_directory: Diretório onde estão os arquivos Excel
+        competencias: 'MM.AAAA' avulsas ou intervalos 'MM.AAAA:MM.AAAA'
+        max_workers: Competências em paralelo (padrão: FINACREW_LOTE_WORKERS ou 4)
+        motor_calculo: Repassado a executar_processamento_real
+        modo_prorrateio: Repassado a executar_processamento_real
+        diretorio_saida: Pasta base; cada competência grava em uma subpasta MM.AAAA
+                         (padrão: saída da sessão ativa ou o diretório atual)
+        progresso: Callback opcional progresso(etapa, percentual) a cada competência concluída
+        regra_desligamento: Repassado a executar_processamento_real (padrão: FINACREW_REGRA_DESLIGAMENTO
+                            ou 'competencia', que compara o mês da demissão e da admissão com cada
+                            competência do lote; 'dia' aplica a mesma elegibilidade a todos os meses)
+
+    Returns:
+        ResultadoLote com um ResultadoProcessamento por competência
+    """
+    inicio = time.perf_counter()
+    lista = resolver_competencias(competencias)
+    if not lista:
+        raise ValueError("Nenhuma competência informada para o lote")
+
+    # No lote o padrão é a regra por competência: com 'dia' o mês da demissão é ignorado
+    regra_desligamento = resolver_regra_desligamento(
+        regra_desligamento or os.getenv('FINACREW_REGRA_DESLIGAMENTO') or REGRA_MES_COMPETENCIA
+    )
+    if regra_desligamento == REGRA_DIA_DO_MES and len(lista) > 1:
+        logger.warning(
+            f"Regra de desligamento '{REGRA_DIA_DO_MES}' em {len(lista)} competências: só o dia da demissão conta, "
+            f"então todos os meses terão a mesma elegibilidade (use '{REGRA_MES_COMPETENCIA}')"
+        )
+
+    workers = max(1, min(max_workers or MAX_WORKERS_PADRAO, len(lista)))
+    lote = ResultadoLote(diretorio_entrada=str(base_directory), workers=workers)
+    pasta_saida = Path(diretorio_saida) if diretorio_saida else diretorio_saida_sessao()
+
+    # Uma leitura para todas as competências; ATIVOS grandes continuam em streaming por mês
+    ativos_file = Path(base_directory) / ARQUIVOS_ENTRADA['ATIVOS']
+    modo_streaming = ativos_file.exists() and resolver_modo_streaming(ativos_file)
+    dataset = carregar_planilhas(
+        base_directory,
+        nomes=[nome for nome in ARQUIVOS_ENTRADA if not (modo_streaming and nome == 'ATIVOS')]
+    )
+    lote.tempo_carregamento = dataset.tempo_total
+    print(f"📥 {len(dataset.planilhas)} planilha(s) carregada(s) para {len(lista)} competência(s)")
+
+    def processar(competencia: Competencia) -> ResultadoProcessamento:
+        with span('lote.competencia', competencia=competencia.rotulo):
+            return executar_processamento_real(
+                base_directory, motor_calculo,
+                diretorio_saida=str(pasta_saida / competencia.rotulo),
+                modo_prorrateio=modo_prorrateio,
+                competencia=competencia,
+                dataset=dataset,
+                regra_desligamento=regra_desligamento
+            )
+
+    # Cada thread roda em uma cópia do contexto (sessão, configuração LLM, trace) de quem chamou
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='finacrew-competencia') as pool:
+        futuros = {c: pool.submit(contextvars.copy_context().run, processar, c) for c in lista}
+        for concluidas, (competencia, futuro) in enumerate(futuros.items(), start=1):
+            try:
+                resultado = futuro.result()
+            except Exception as e:
+                logger.error(f"Falha na competência {competencia}: {e}")
+                resultado = ResultadoProcessamento(diretorio_entrada=str(base_directory), competencia=competencia.rotulo)
+                resultado.falha(f"❌ Erro na competência {competencia}: {str(e)}")
+            lote.resultados[competencia.rotulo] = resultado
+            logger.info(f"Competência {competencia} processada em {resultado.tempo_total:.2f}s")
+            if progresso is not None:
+                progresso(f"Competência {competencia} concluída", int(concluidas / len(lista) * 100))
+
+    lote.tempo_total = time.perf_counter() - inicio
+    return lote
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('entrada', help="Diretório com as planilhas de entrada")
+    parser.add_argument('competencias', nargs='+', help="MM.AAAA ou intervalo MM.AAAA:MM.AAAA")
+    parser.add_argument('--workers', type=int, default=None, help="Competências em paralelo")
+    parser.add_argument('--saida', default='.', help="Pasta base das saídas (uma subpasta por competência)")
+    parser.add_argument('--motor', default=None, help="vetorizado, legado ou comparar")
+    parser.add_argument('--prorrateio', default=None, help="calendario ou dias_uteis")
+    parser.add_argument('--regra-desligamento', default=None, help="competencia (padrão no lote) ou dia")
+    args = parser.parse_args()
+
+    resultado_lote = processar_lote_competencias(
+        args.entrada, args.competencias, args.workers, args.motor, args.prorrateio, args.saida,
+        regra_desligamento=args.regra_desligamento
+    )
+    print(resultado_lote.resumo())
+    sys.exit(0 if resultado_lote.sucesso else 1)
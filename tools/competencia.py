@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Competência (mês de referência) do processamento VR/VA
+Concentra o que antes era fixo em 05/2025: data gravada na planilha, nomes dos arquivos
+de saída, mês anterior (admissões sem proporcional) e quantidade de dias do mês
+"""
+
+import calendar
+import re
+from dataclasses import dataclass
+from typing import Iterable, List, Union
+
+# Formatos aceitos: '05.2025', '05/2025', '5-2025', '2025-05' e '2025-05-01'
+_PADRAO_MES_ANO = re.compile(r'^(\d{1,2})[./-](\d{4})$')
+_PADRAO_ANO_MES = re.compile(r'^(\d{4})-(\d{1,2})(?:-\d{1,2})?$')
+
+
+@dataclass(frozen=True, order=True)
+class Competencia:
+    """Mês de referência (ordenável; 'MM.AAAA' em rotulo)"""
+    ano: int
+    mes: int
+
+    def __post_init__(self):
+        if not 1 <= self.mes <= 12:
+            raise ValueError(f"Mês inválido na competência: {self.mes}")
+
+    @classmethod
+    def de_texto(cls, texto: Union[str, 'Competencia']) -> 'Competencia':
+        """Converte '05.2025', '05/2025', '2025-05' ou '2025-05-01'"""
+        if isinstance(texto, Competencia):
+            return texto
+        valor = str(texto).strip()
+        encontrado = _PADRAO_MES_ANO.match(valor)
+        if encontrado:
+            return cls(ano=int(encontrado.group(2)), mes=int(encontrado.group(1)))
+        encontrado = _PADRAO_ANO_MES.match(valor)
+        if encontrado:
+            return cls(ano=int(encontrado.group(1)), mes=int(encontrado.group(2)))
+        raise ValueError(f"Competência inválida: '{texto}' (use MM.AAAA)")
+
+    @property
+    def rotulo(self) -> str:
+        return f"{self.mes:02d}.{self.ano}"
+
+    @property
+    def data(self) -> str:
+        """Valor da coluna Competência ('AAAA-MM-01')"""
+        return f"{self.ano}-{self.mes:02d}-01"
+
+    @property
+    def dias_no_mes(self) -> int:
+        return calendar.monthrange(self.ano, self.mes)[1]
+
+    @property
+    def anterior(self) -> 'Competencia':
+        return Competencia(self.ano - 1, 12) if self.mes == 1 else Competencia(self.ano, self.mes - 1)
+
+    @property
+    def proxima(self) -> 'Competencia':
+        return Competencia(self.ano + 1, 1) if self.mes == 12 else Competencia(self.ano, self.mes + 1)
+
+    @property
+    def aba_vr(self) -> str:
+        return f"VR MENSAL {self.rotulo}"
+
+    @property
+    def arquivo_vr(self) -> str:
+        return f"{self.aba_vr}.xlsx"
+
+    @property
+    def artefato(self) -> str:
+        """Nome (sem extensão) do artefato da base consolidada"""
+        return f"BASE_CONSOLIDADA_{self.rotulo}"
+
+    def __str__(self) -> str:
+        return self.rotulo
+
+
+# Competência do projeto (padrão de todos os pontos de entrada)
+COMPETENCIA_REFERENCIA = Competencia(2025, 5)
+
+
+def intervalo_competencias(inicio: Union[str, Competencia], fim: Union[str, Competencia]) -> List[Competencia]:
+    """Todas as competências de inicio a fim, inclusive"""
+    atual, fim = Competencia.de_texto(inicio), Competencia.de_texto(fim)
+    if atual > fim:
+        raise ValueError(f"Intervalo de competências invertido: {atual} a {fim}")
+    competencias = []
+    while atual <= fim:
+        competencias.append(atual)
+        atual = atual.proxima
+    return competencias
+
+
+def resolver_competencias(valores: Iterable[Union[str, Competencia]]) -> List[Competencia]:
+    """
+    Lista ordenada e sem repetições a partir de competências avulsas e intervalos
+    ('01.2025:03.2025' = janeiro a março de 2025).
+    """
+    competencias = set()
+    for valor in valores:
+        if isinstance(valor, str) and ':' in valor:
+            inicio, fim = valor.split(':', 1)
+            competencias.update(intervalo_competencias(inicio, fim))
+        else:
+            competencias.add(Competencia.de_texto(valor))
+    return sorted(competencias)
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Artefato colunar da base consolidada de VR
+O processador grava a base em Parquet (ou pickle, sem pyarrow) e o gerador de planilha
+modelo lê direto do arquivo, sem que as linhas passem pelo contexto do LLM
+"""
+
+import json
+import pandas as pd
+from pathlib import Path
+from typing import Dict
+import logging
+
+from competencia import COMPETENCIA_REFERENCIA
+from parsed_upload_cache import PARQUET_DISPONIVEL
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+ARTEFATO_PADRAO = COMPETENCIA_REFERENCIA.artefato
+
+# Colunas da aba VR MENSAL → colunas da planilha modelo
+MAPA_COLUNAS_MODELO = {
+    'Matricula': 'MATRICULA',
+    'Sindicato do Colaborador': 'SINDICATO',
+    'VALOR DIÁRIO VR': 'VALOR_DIARIO_VR',
+    'Dias': 'DIAS_UTEIS',
+    'TOTAL': 'VALOR_TOTAL_VR',
+    'Custo empresa': 'VALOR_EMPRESA',
+    'Desconto profissional': 'VALOR_FUNCIONARIO',
+    'OBS GERAL': 'OBSERVACOES'
+}
+
+COLUNAS_MODELO = [
+    'MATRICULA',
+    'NOME',
+    'SINDICATO',
+    'VALOR_DIARIO_VR',
+    'DIAS_UTEIS',
+    'VALOR_TOTAL_VR',
+    'PERCENTUAL_EMPRESA',
+    'VALOR_EMPRESA',
+    'PERCENTUAL_FUNCIONARIO',
+    'VALOR_FUNCIONARIO',
+    'OBSERVACOES'
+]
+
+LEITORES = {
+    '.parquet': pd.read_parquet,
+    '.feather': pd.read_feather,
+    '.pkl': pd.read_pickle,
+    '.pickle': pd.read_pickle,
+    '.json': pd.read_json
+}
+
+
+def salvar_base_consolidada(df: pd.DataFrame, nome: str = ARTEFATO_PADRAO, diretorio: str = ".") -> str:
+    """
+    Grava a base consolidada como artefato colunar.
+
+    Returns:
+        Caminho do arquivo gravado (.parquet, ou .pkl sem pyarrow)
+    """
+    base = Path(diretorio)
+    if PARQUET_DISPONIVEL:
+        try:
+            caminho = base / f"{nome}.parquet"
+            df.to_parquet(caminho, index=False)
+            return str(caminho)
+        except Exception as e:
+            logger.warning(f"Base consolidada não pôde ser gravada em Parquet ({e}); usando pickle")
+    caminho = base / f"{nome}.pkl"
+    df.to_pickle(caminho)
+    return str(caminho)
+
+
+def carregar_base_consolidada(origem: str) -> pd.DataFrame:
+    """
+    Carrega a base a partir de um caminho de artefato ou de um JSON orientado a colunas.
+
+    Args:
+        origem: Caminho .parquet/.feather/.pkl/.json ou texto JSON no formato
+                {"coluna": [valores...]} (ou {"coluna": {"índice": valor}})
+    """
+    texto = origem.strip()
+    if texto.startswith('{'):
+        colunas = json.loads(texto)
+        if not isinstance(colunas, dict):
+            raise ValueError("JSON da base deve ser um objeto coluna → valores")
+        return pd.DataFrame(colunas)
+
+    caminho = Path(texto)
+    if not caminho.exists():
+        raise FileNotFoundError(f"Artefato da base consolidada não encontrado: {caminho}")
+    leitor = LEITORES.get(caminho.suffix.lower())
+    if leitor is None:
+        raise ValueError(f"Formato de artefato não suportado: {caminho.suffix} (use {', '.join(LEITORES)})")
+    return leitor(caminho)
+
+
+def para_colunas_modelo(df: pd.DataFrame, percentual_empresa: int = 80) -> pd.DataFrame:
+    """
+    Converte a base (colunas da aba VR MENSAL ou já no modelo) para as colunas da planilha modelo.
+    """
+    modelo = df.rename(columns=MAPA_COLUNAS_MODELO)
+    colunas_padrao: Dict[str, object] = {
+        'NOME': '',
+        'PERCENTUAL_EMPRESA': percentual_empresa,
+        'PERCENTUAL_FUNCIONARIO': 100 - percentual_empresa,
+        'OBSERVACOES': ''
+    }
+    for coluna, valor in colunas_padrao.items():
+        if coluna not in modelo.columns:
+            modelo[coluna] = valor
+    modelo['OBSERVACOES'] = modelo['OBSERVACOES'].fillna('')
+
+    faltantes = [c for c in COLUNAS_MODELO if c not in modelo.columns]
+    if faltantes:
+        raise ValueError(f"Base consolidada sem as colunas obrigatórias: {faltantes}")
+    return modelo[COLUNAS_MODELO]
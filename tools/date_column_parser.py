@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Conversão de colunas de datas em lote
+Detecta os formatos dominantes da coluna (DD/MM/AAAA, DD-MM-AAAA, ISO, serial do Excel),
+converte cada grupo em uma única passada vetorizada e envia ao caminho lento apenas o que sobrar
+"""
+
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+import logging
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Data usada quando o valor está vazio ou não pode ser interpretado
+DATA_PADRAO = pd.Timestamp('2024-05-01')
+
+# Formatos textuais reconhecidos: nome → (expressão regular, formato do pandas)
+FORMATOS_TEXTO = {
+    'DD/MM/AAAA': (r'\d{1,2}/\d{1,2}/\d{4}', '%d/%m/%Y'),
+    'DD-MM-AAAA': (r'\d{1,2}-\d{1,2}-\d{4}', '%d-%m-%Y'),
+    'ISO': (r'\d{4}-\d{2}-\d{2}(?:[ T]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?)?', 'ISO8601'),
+}
+
+# Intervalo plausível de números seriais do Excel (01/01/1900 a 31/12/9999)
+SERIAL_EXCEL_MIN = 1
+SERIAL_EXCEL_MAX = 2958465
+ORIGEM_EXCEL = '1899-12-30'
+
+
+@dataclass
+class RelatorioDatas:
+    """Resumo compacto da conversão de uma coluna de datas"""
+    coluna: str
+    total: int = 0
+    por_formato: Dict[str, int] = field(default_factory=dict)
+    vazias: int = 0
+    fallback: int = 0
+    corrigidas: List[Dict] = field(default_factory=list)
+    total_corrigidas: int = 0
+
+    def resumo(self) -> str:
+        formatos = ', '.join(f"{nome}: {qtd}" for nome, qtd in self.por_formato.items()) or 'nenhum'
+        texto = (
+            f"{self.coluna}: {self.total} valor(es) | formatos: {formatos} | "
+            f"vazias: {self.vazias} | fallback: {self.fallback} | substituídas pela data padrão: {self.total_corrigidas}"
+        )
+        if self.corrigidas:
+            linhas = ', '.join(str(c['linha_excel']) for c in self.corrigidas)
+            texto += f" (linhas {linhas}{'...' if self.total_corrigidas > len(self.corrigidas) else ''})"
+        return texto
+
+    def to_dict(self) -> Dict:
+        return {
+            'coluna': self.coluna,
+            'total': self.total,
+            'por_formato': dict(self.por_formato),
+            'vazias': self.vazias,
+            'fallback': self.fallback,
+            'total_corrigidas': self.total_corrigidas,
+            'corrigidas': list(self.corrigidas)
+        }
+
+
+def _converter_valor_isolado(valor) -> Optional[pd.Timestamp]:
+    """Caminho lento para valores fora dos formatos detectados (sem log por célula)"""
+    texto = str(valor).strip()
+    for formato in ('%d/%m/%Y', '%d-%m-%Y', '%Y-%m-%d', '%d/%m/%y', '%d.%m.%Y'):
+        try:
+            return pd.to_datetime(texto, format=formato)
+        except (ValueError, TypeError):
+            continue
+    try:
+        return pd.to_datetime(texto, dayfirst=True)
+    except (ValueError, TypeError, OverflowError):
+        return None
+
+
+def converter_coluna_datas(
+    serie: pd.Series,
+    coluna: Optional[str] = None,
+    data_padrao: pd.Timestamp = DATA_PADRAO,
+    max_exemplos: int = 20
+) -> Tuple[pd.Series, RelatorioDatas]:
+    """
+    Converte uma coluna inteira de datas em lote.
+
+    Args:
+        serie: Coluna original (datas, textos, números seriais do Excel ou vazios)
+        coluna: Nome usado no relatório (padrão: nome da série)
+        data_padrao: Data aplicada a valores vazios ou inválidos; com pd.NaT eles ficam vazios
+                     (datas opcionais), sem substituição nem aviso
+        max_exemplos: Quantidade máxima de linhas corrigidas detalhadas no relatório
+
+    Returns:
+        Tupla (série datetime64, sem valores nulos salvo com data_padrao=NaT, RelatorioDatas)
+    """
+    relatorio = RelatorioDatas(coluna=coluna or str(serie.name), total=len(serie))
+    resultado = pd.Series(pd.NaT, index=serie.index, dtype='datetime64[ns]')
+
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        resultado = serie.astype('datetime64[ns]')
+        relatorio.por_formato['datetime'] = int(serie.notna().sum())
+        relatorio.vazias = int(serie.isna().sum())
+    else:
+        valores = serie.astype(object)
+        vazios = valores.isna().to_numpy() | (valores.astype(str).str.strip() == '').to_numpy()
+        pendentes = ~vazios
+
+        # 1. Valores que já são datas (células de data do Excel)
+        eh_data = pendentes & valores.map(lambda v: isinstance(v, (pd.Timestamp, np.datetime64)) or hasattr(v, 'year')).to_numpy()
+        if eh_data.any():
+            resultado.iloc[np.flatnonzero(eh_data)] = pd.to_datetime(valores[eh_data], errors='coerce').to_numpy()
+            relatorio.por_formato['datetime'] = int(eh_data.sum())
+            pendentes &= ~eh_data
+
+        # 2. Números seriais do Excel
+        numeros = pd.to_numeric(valores.where(pendentes), errors='coerce')
+        eh_serial = pendentes & numeros.between(SERIAL_EXCEL_MIN, SERIAL_EXCEL_MAX).to_numpy()
+        if eh_serial.any():
+            resultado.iloc[np.flatnonzero(eh_serial)] = pd.to_datetime(
+                numeros[eh_serial], unit='D', origin=ORIGEM_EXCEL
+            ).to_numpy()
+            relatorio.por_formato['serial Excel'] = int(eh_serial.sum())
+            pendentes &= ~eh_serial
+
+        # 3. Textos: detectar os formatos dominantes e converter cada grupo de uma vez
+        if pendentes.any():
+            textos = valores.astype(str).str.strip()
+            grupos = {}
+            for nome, (padrao, _) in FORMATOS_TEXTO.items():
+                grupos[nome] = pendentes & textos.str.fullmatch(padrao).fillna(False).to_numpy()
+            for nome in sorted(grupos, key=lambda n: grupos[n].sum(), reverse=True):
+                mascara = grupos[nome] & pendentes
+                if not mascara.any():
+                    continue
+                convertidas = pd.to_datetime(textos[mascara], format=FORMATOS_TEXTO[nome][1], errors='coerce')
+                validas = convertidas.notna().to_numpy()
+                posicoes = np.flatnonzero(mascara)[validas]
+                resultado.iloc[posicoes] = convertidas[validas].to_numpy()
+                relatorio.por_formato[nome] = int(validas.sum())
+                pendentes[posicoes] = False
+
+        # 4. Sobras: caminho valor a valor, apenas para o que os formatos não cobriram
+        sobras = np.flatnonzero(pendentes)
+        relatorio.fallback = len(sobras)
+        for posicao in sobras:
+            convertida = _converter_valor_isolado(valores.iloc[posicao])
+            if convertida is not None:
+                resultado.iloc[posicao] = convertida
+                pendentes[posicao] = False
+
+        relatorio.vazias = int(vazios.sum())
+
+    # Valores vazios ou inválidos recebem a data padrão e entram no relatório
+    faltantes = np.flatnonzero(resultado.isna().to_numpy())
+    if pd.isna(data_padrao):
+        # Datas opcionais (ex.: início/fim de férias no prorrateio): vazio é esperado
+        if len(faltantes):
+            logger.debug(f"{relatorio.coluna}: {len(faltantes)} data(s) vazia(s) ou inválida(s) mantida(s) como NaT")
+        return resultado, relatorio
+    relatorio.total_corrigidas = len(faltantes)
+    for posicao in faltantes[:max_exemplos]:
+        original = serie.iloc[posicao]
+        relatorio.corrigidas.append({
+            'posicao': int(posicao),
+            'linha_excel': int(posicao) + 2,
+            'valor_original': '' if pd.isna(original) else str(original)
+        })
+    if len(faltantes):
+        resultado.iloc[faltantes] = data_padrao
+        logger.warning(f"Datas corrigidas para {data_padrao.date()}: {relatorio.resumo()}")
+
+    return resultado, relatorio
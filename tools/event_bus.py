@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Barramento de eventos de progresso por sessão
+Logs dos agentes e transições de etapa são publicados em um canal (id do job) e
+distribuídos para cada assinante por uma fila limitada: quando o cliente é lento,
+os eventos mais antigos são descartados e o pipeline nunca espera
+"""
+
+import os
+import time
+import queue
+import threading
+import contextvars
+from collections import OrderedDict, deque
+from typing import Dict, List, Optional
+import logging
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Eventos pendentes por assinante e eventos recentes guardados por canal (replay)
+TAMANHO_FILA_PADRAO = int(os.getenv('FINACREW_EVENTOS_FILA', '256'))
+HISTORICO_PADRAO = 200
+MAX_CANAIS = 100
+
+EVENTO_LOG = 'log'
+EVENTO_ETAPA = 'etapa'
+EVENTO_FIM = 'fim'
+
+# Canal da execução corrente (definido pelo job na thread em que o pipeline roda)
+_canal_atual: contextvars.ContextVar = contextvars.ContextVar('finacrew_canal_eventos', default=None)
+
+
+def definir_canal(canal: Optional[str]) -> contextvars.Token:
+    """Associa o contexto atual a um canal; devolve o token para restaurar depois"""
+    return _canal_atual.set(canal)
+
+
+def restaurar_canal(token: contextvars.Token):
+    _canal_atual.reset(token)
+
+
+def canal_atual() -> Optional[str]:
+    return _canal_atual.get()
+
+
+class Assinatura:
+    """Fila limitada de um assinante; cheia, descarta o evento mais antigo"""
+
+    def __init__(self, canal: str, tamanho: int):
+        self.canal = canal
+        self.fila: queue.Queue = queue.Queue(maxsize=tamanho)
+        self.descartados = 0
+        self._lock = threading.Lock()
+
+    def entregar(self, evento: Dict):
+        with self._lock:
+            while True:
+                try:
+                    self.fila.put_nowait(evento)
+                    return
+                except queue.Full:
+                    try:
+                        self.fila.get_nowait()
+                        self.descartados += 1
+                    except queue.Empty:
+                        pass
+
+    def proximo(self, timeout: Optional[float] = None) -> Optional[Dict]:
+        """Próximo evento, ou None se nada chegar dentro do timeout"""
+        try:
+            return self.fila.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class BarramentoEventos:
+    """Canais com histórico recente e fan-out para assinantes com filas limitadas"""
+
+    def __init__(self, tamanho_fila: int = TAMANHO_FILA_PADRAO, historico: int = HISTORICO_PADRAO,
+                 max_canais: int = MAX_CANAIS):
+        self.tamanho_fila = tamanho_fila
+        self.historico = historico
+        self.max_canais = max_canais
+        self._assinaturas: Dict[str, List[Assinatura]] = {}
+        self._historicos: 'OrderedDict[str, deque]' = OrderedDict()
+        self._sequencia = 0
+        self._lock = threading.Lock()
+
+    def publicar(self, canal: str, tipo: str, dados: Dict) -> Dict:
+        """Publica um evento sem bloquear (O(assinantes) com filas que nunca enchem)"""
+        with self._lock:
+            self._sequencia += 1
+            evento = {'id': self._sequencia, 'tipo': tipo, 'canal': canal, 'timestamp': time.time(), 'dados': dados}
+
+            historico = self._historicos.get(canal)
+            if historico is None:
+                historico = self._historicos[canal] = deque(maxlen=self.historico)
+                while len(self._historicos) > self.max_canais:
+                    self._historicos.popitem(last=False)
+            historico.append(evento)
+            assinantes = list(self._assinaturas.get(canal, ()))
+
+        for assinatura in assinantes:
+            assinatura.entregar(evento)
+        return evento
+
+    def inscrever(self, canal: str, desde_id: int = 0) -> Assinatura:
+        """Assina o canal; eventos recentes com id > desde_id são reenviados primeiro"""
+        assinatura = Assinatura(canal, self.tamanho_fila)
+        with self._lock:
+            for evento in self._historicos.get(canal, ()):
+                if evento['id'] > desde_id:
+                    assinatura.entregar(evento)
+            self._assinaturas.setdefault(canal, []).append(assinatura)
+        return assinatura
+
+    def cancelar(self, assinatura: Assinatura):
+        with self._lock:
+            assinantes = self._assinaturas.get(assinatura.canal, [])
+            if assinatura in assinantes:
+                assinantes.remove(assinatura)
+            if not assinantes:
+                self._assinaturas.pop(assinatura.canal, None)
+        if assinatura.descartados:
+            logger.info(f"Assinante do canal {assinatura.canal} descartou {assinatura.descartados} evento(s)")
+
+
+# Instância do processo
+barramento = BarramentoEventos()
+
+
+def publicar_evento(tipo: str, dados: Dict, canal: Optional[str] = None) -> Optional[Dict]:
+    """Publica no canal informado ou no canal do contexto atual (nada acontece sem canal)"""
+    canal = canal or canal_atual()
+    if canal is None:
+        return None
+    return barramento.publicar(canal, tipo, dados)
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Escrita das planilhas de saída (VR MENSAL e auditoria de exclusões)
+Com xlsxwriter em modo constant_memory as linhas são gravadas em blocos direto no
+arquivo, sem montar o modelo do workbook em memória; openpyxl continua disponível
+"""
+
+import os
+import pandas as pd
+from typing import Dict, Iterable, List, Optional, Union
+import logging
+
+from metrics import registrar_escrita
+from tracing import span
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+try:
+    import xlsxwriter
+    XLSXWRITER_DISPONIVEL = True
+except ImportError:
+    XLSXWRITER_DISPONIVEL = False
+
+BACKEND_XLSXWRITER = 'xlsxwriter'
+BACKEND_OPENPYXL = 'openpyxl'
+
+# Linhas convertidas por vez antes de irem para o arquivo
+TAMANHO_BLOCO = 10000
+
+# Mesmo estilo de cabeçalho que o pandas aplica em DataFrame.to_excel
+FORMATO_CABECALHO = {'bold': True, 'border': 1, 'align': 'center', 'valign': 'top'}
+FORMATO_DATA_HORA = 'yyyy-mm-dd hh:mm:ss'
+
+# Checklist da aba Validações conforme o modelo
+VALIDACOES_VR_MENSAL = [
+    'Afastados / Licenças',
+    'DESLIGADOS GERAL',
+    'Admitidos mês',
+    'Férias',
+    'ESTAGIARIO',
+    'APRENDIZ',
+    'SINDICATOS x VALOR',
+    'DESLIGADOS ATÉ O DIA 15 DO MÊS - EXCLUIR DA COMPRA',
+    'DESLIGADOS DO DIA 16 EM DIANTE - VR INTEGRAL (desconto na rescisão)',
+    'ATENDIMENTOS/OBS',
+    'Admitidos mês anterior (abril)',
+    'EXTERIOR',
+    'ATIVOS',
+    'REVISAR O CALCULO DE PGTO ANTES DE GERAR OS VALES'
+]
+
+# Uma aba recebe um DataFrame inteiro ou uma sequência de lotes com as mesmas colunas
+ConteudoAba = Union[pd.DataFrame, Iterable[pd.DataFrame]]
+
+
+def resolver_backend_excel(backend: Optional[str] = None) -> str:
+    """Backend de escrita (FINACREW_EXCEL_BACKEND: xlsxwriter ou openpyxl)"""
+    escolha = (backend or os.getenv('FINACREW_EXCEL_BACKEND', BACKEND_XLSXWRITER)).strip().lower()
+    if escolha == BACKEND_OPENPYXL:
+        return BACKEND_OPENPYXL
+    if escolha != BACKEND_XLSXWRITER:
+        logger.warning(f"Backend Excel desconhecido '{escolha}', usando '{BACKEND_XLSXWRITER}'")
+    if not XLSXWRITER_DISPONIVEL:
+        logger.warning("xlsxwriter não instalado, usando openpyxl")
+        return BACKEND_OPENPYXL
+    return BACKEND_XLSXWRITER
+
+
+def tabela_validacoes() -> pd.DataFrame:
+    """Aba Validações da planilha VR MENSAL"""
+    return pd.DataFrame({'Validações': VALIDACOES_VR_MENSAL, 'Check': '✓'})
+
+
+def tabelas_auditoria(df_exclusoes: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    """Abas da planilha de auditoria: lista completa, estatísticas por motivo e resumo por arquivo"""
+    if 'Motivos_Secundarios' in df_exclusoes.columns:
+        df_exclusoes = df_exclusoes.assign(Motivos_Secundarios=df_exclusoes['Motivos_Secundarios'].str.join('; '))
+
+    exclusoes_stats = df_exclusoes['Motivo_Exclusao'].value_counts().reset_index()
+    exclusoes_stats.columns = ['Motivo de Exclusão', 'Quantidade']
+    exclusoes_stats_total = pd.DataFrame([['TOTAL EXCLUÍDOS', len(df_exclusoes)]],
+                                         columns=['Motivo de Exclusão', 'Quantidade'])
+    exclusoes_stats = pd.concat([exclusoes_stats, exclusoes_stats_total], ignore_index=True)
+
+    resumo_origem = df_exclusoes.groupby(['Arquivo_Origem', 'Motivo_Exclusao']).size().reset_index(name='Quantidade')
+
+    return {
+        'Lista Completa de Exclusões': df_exclusoes,
+        'Estatísticas de Exclusões': exclusoes_stats,
+        'Resumo por Arquivo': resumo_origem
+    }
+
+
+def larguras_colunas(df: pd.DataFrame, largura_maxima: int = 50, folga: int = 2) -> List[int]:
+    """Largura de cada coluna pelo maior texto (cabeçalho ou valor), com str.len vetorizado"""
+    larguras = []
+    for coluna in df.columns:
+        maior = len(str(coluna))
+        if len(df):
+            maior = max(maior, int(df[coluna].astype(str).str.len().max()))
+        larguras.append(min(maior + folga, largura_maxima))
+    return larguras
+
+
+def formatar_aba_xlsxwriter(
+    writer: pd.ExcelWriter,
+    nome_aba: str,
+    df: pd.DataFrame,
+    formatos_numericos: Optional[Dict[str, str]] = None,
+    estilo_cabecalho: Optional[Dict] = None,
+    bordas: bool = True,
+    largura_maxima: int = 50
+):
+    """
+    Formata uma aba gravada por DataFrame.to_excel (engine xlsxwriter) coluna a coluna.
+
+    Formatos numéricos e larguras vão em set_column e as bordas em um único formato
+    condicional sobre o intervalo de dados, então o custo não cresce com o número de linhas.
+
+    Args:
+        writer: ExcelWriter com engine 'xlsxwriter' onde a aba já foi gravada
+        nome_aba: Aba a formatar
+        df: DataFrame gravado na aba (index=False, cabeçalho na linha 1)
+        formatos_numericos: Coluna → num_format do Excel (ex.: 'R$ #,##0.00')
+        estilo_cabecalho: Propriedades xlsxwriter do cabeçalho (padrão: FORMATO_CABECALHO)
+        bordas: Aplica borda fina em todo o intervalo cabeçalho + dados
+        largura_maxima: Limite de largura das colunas
+    """
+    workbook = writer.book
+    worksheet = writer.sheets[nome_aba]
+    formatos_numericos = formatos_numericos or {}
+
+    for indice, (coluna, largura) in enumerate(zip(df.columns, larguras_colunas(df, largura_maxima))):
+        num_format = formatos_numericos.get(coluna)
+        formato = workbook.add_format({'num_format': num_format}) if num_format else None
+        worksheet.set_column(indice, indice, largura, formato)
+
+    # Cabeçalho regravado com o estilo pedido (sobrepõe o estilo padrão do pandas)
+    formato_cabecalho = workbook.add_format({**(estilo_cabecalho or FORMATO_CABECALHO), 'border': 1 if bordas else 0})
+    worksheet.write_row(0, 0, [str(c) for c in df.columns], formato_cabecalho)
+
+    if bordas and len(df.columns) and len(df):
+        worksheet.conditional_format(1, 0, len(df), len(df.columns) - 1, {
+            'type': 'formula',
+            'criteria': 'TRUE',
+            'format': workbook.add_format({'border': 1})
+        })
+
+
+def _lotes(conteudo: ConteudoAba, tamanho_bloco: int) -> Iterable[pd.DataFrame]:
+    """Divide um DataFrame em blocos; sequências de lotes passam direto"""
+    if isinstance(conteudo, pd.DataFrame):
+        if conteudo.empty:
+            yield conteudo
+        for inicio in range(0, len(conteudo), tamanho_bloco):
+            yield conteudo.iloc[inicio:inicio + tamanho_bloco]
+    else:
+        yield from conteudo
+
+
+def _linhas_python(lote: pd.DataFrame) -> List[list]:
+    """Valores nativos do Python por linha; vazios (NaN/NaT/None) viram None"""
+    valores = lote.astype(object).to_numpy()
+    vazios = pd.isna(lote).to_numpy()
+    if vazios.any():
+        valores[vazios] = None
+    return valores.tolist()
+
+
+def _escrever_xlsxwriter(caminho: str, abas: Dict[str, ConteudoAba], tamanho_bloco: int) -> Dict[str, int]:
+    linhas_por_aba = {}
+    workbook = xlsxwriter.Workbook(caminho, {
+        'constant_memory': True,
+        'strings_to_urls': False,
+        'strings_to_formulas': False,
+        'nan_inf_to_errors': True,
+        'default_date_format': FORMATO_DATA_HORA
+    })
+    try:
+        formato_cabecalho = workbook.add_format(FORMATO_CABECALHO)
+
+        # constant_memory exige gravar aba por aba, linha por linha, em ordem
+        for nome_aba, conteudo in abas.items():
+            worksheet = workbook.add_worksheet(nome_aba)
+            linha_atual = 0
+            for lote in _lotes(conteudo, tamanho_bloco):
+                if linha_atual == 0:
+                    worksheet.write_row(0, 0, [str(c) for c in lote.columns], formato_cabecalho)
+                    linha_atual = 1
+                for valores in _linhas_python(lote):
+                    worksheet.write_row(linha_atual, 0, valores)
+                    linha_atual += 1
+            linhas_por_aba[nome_aba] = max(linha_atual - 1, 0)
+    finally:
+        workbook.close()
+    return linhas_por_aba
+
+
+def _escrever_openpyxl(caminho: str, abas: Dict[str, ConteudoAba]) -> Dict[str, int]:
+    linhas_por_aba = {}
+    with pd.ExcelWriter(caminho, engine='openpyxl') as writer:
+        for nome_aba, conteudo in abas.items():
+            df = conteudo if isinstance(conteudo, pd.DataFrame) else pd.concat(list(conteudo), ignore_index=True)
+            df.to_excel(writer, sheet_name=nome_aba, index=False)
+            linhas_por_aba[nome_aba] = len(df)
+    return linhas_por_aba
+
+
+def escrever_planilha(
+    caminho: str,
+    abas: Dict[str, ConteudoAba],
+    backend: Optional[str] = None,
+    tamanho_bloco: int = TAMANHO_BLOCO
+) -> str:
+    """
+    Grava um workbook com as abas na ordem do dicionário, no layout de DataFrame.to_excel(index=False).
+
+    Args:
+        caminho: Arquivo .xlsx de saída
+        abas: Nome da aba → DataFrame ou sequência de lotes (DataFrames com as mesmas colunas)
+        backend: 'xlsxwriter' ou 'openpyxl' (padrão: FINACREW_EXCEL_BACKEND ou 'xlsxwriter')
+        tamanho_bloco: Linhas convertidas por vez no backend xlsxwriter
+
+    Returns:
+        Backend efetivamente usado
+    """
+    backend = resolver_backend_excel(backend)
+    with span('planilha.gravar', arquivo=os.path.basename(caminho), backend=backend) as gravacao:
+        if backend == BACKEND_XLSXWRITER:
+            linhas_por_aba = _escrever_xlsxwriter(caminho, abas, tamanho_bloco)
+        else:
+            linhas_por_aba = _escrever_openpyxl(caminho, abas)
+        gravacao.definir(linhas=sum(linhas_por_aba.values()), abas=len(linhas_por_aba))
+
+    registrar_escrita(caminho, backend, linhas_por_aba)
+    logger.info(f"{caminho} gravado via {backend}: {linhas_por_aba}")
+    return backend
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Montagem vetorizada da lista de exclusões para auditoria
+Cada fonte (férias, desligados, afastamentos, exterior, estágio, aprendiz, diretores)
+entra como um bloco colunar; cada matrícula recebe um único motivo principal pela
+precedência configurada e os demais motivos ficam como secundários
+"""
+
+import os
+import pandas as pd
+from typing import List, Optional, Set
+import logging
+
+from competencia import COMPETENCIA_REFERENCIA, Competencia
+from vr_calculation_engine import matriculas_como_texto
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Justificativa de cada motivo (tabela de consulta; a coluna do relatório é categórica)
+# {competencia} é preenchido com o mês do processamento ('05/2025')
+JUSTIFICATIVAS = {
+    'DESLIGADO ATÉ DIA 15': 'Funcionário desligado (data em Detalhes). Conforme política da empresa, funcionários com comunicação de desligamento até o dia 15 não recebem VR na competência.',
+    'DESLIGADO ANTES DA COMPETÊNCIA': 'Funcionário desligado antes da competência {competencia} (data em Detalhes). Sem vínculo no mês, não há VR a pagar.',
+    'ESTAGIÁRIO': 'Estagiário não tem direito ao benefício VR conforme política da empresa e CLT. Modalidade de contrato não prevê este benefício.',
+    'APRENDIZ': 'Aprendiz não tem direito ao benefício VR conforme Lei do Aprendiz (Lei 10.097/2000) e política interna da empresa.',
+    'DIRETOR': 'Cargos de diretoria não participam do benefício VR conforme política de remuneração executiva da empresa. Diretores possuem pacote de benefícios diferenciado.',
+    'FUNCIONÁRIO NO EXTERIOR': 'Funcionário trabalhando no exterior durante a competência {competencia}. Benefício VR não aplicável para funcionários em atividade internacional.',
+    'AFASTAMENTOS/LICENÇAS': 'Funcionário afastado por licença médica/INSS durante a competência {competencia}. Conforme legislação trabalhista, funcionários afastados não recebem benefícios da empresa.',
+    'FÉRIAS': 'Funcionário em período de férias durante a competência {competencia}. Conforme política da empresa, funcionários em férias não recebem VR no período.',
+    'ADMITIDO APÓS A COMPETÊNCIA': 'Funcionário admitido depois da competência {competencia} (data em Detalhes). Sem vínculo no mês, não há VR a pagar.'
+}
+JUSTIFICATIVA_PADRAO = 'Exclusão conforme política da empresa.'
+
+# Ordem de precedência do motivo principal (primeiro = mais forte)
+PRECEDENCIA_PADRAO = list(JUSTIFICATIVAS)
+
+COLUNAS_EXCLUSOES = [
+    'Matricula',
+    'Nome',
+    'Motivo_Exclusao',
+    'Motivos_Secundarios',
+    'Detalhes',
+    'Justificativa',
+    'Arquivo_Origem'
+]
+
+
+def resolver_precedencia(precedencia: Optional[List[str]] = None) -> List[str]:
+    """Precedência do argumento, de FINACREW_PRECEDENCIA_EXCLUSAO (motivos separados por vírgula) ou a padrão"""
+    if precedencia is None:
+        texto = os.getenv('FINACREW_PRECEDENCIA_EXCLUSAO', '').strip()
+        precedencia = [m.strip() for m in texto.split(',') if m.strip()] if texto else PRECEDENCIA_PADRAO
+    # Motivos não listados ficam depois, na ordem padrão
+    return list(precedencia) + [m for m in PRECEDENCIA_PADRAO if m not in precedencia]
+
+
+def _coluna_ou(df: pd.DataFrame, colunas: List[str], padrao) -> pd.Series:
+    """Primeira coluna existente entre as opções (como row.get encadeado) ou um valor constante"""
+    for coluna in colunas:
+        if coluna in df.columns:
+            return df[coluna]
+    return pd.Series(padrao, index=df.index, dtype=object)
+
+
+def mascara_diretores(df: pd.DataFrame) -> pd.Series:
+    """Linhas cujo TITULO DO CARGO contém DIRETOR"""
+    if 'TITULO DO CARGO' not in df.columns:
+        return pd.Series(False, index=df.index)
+    cargos = df['TITULO DO CARGO']
+    return cargos.notna() & cargos.astype(str).str.upper().str.contains('DIRETOR', regex=False)
+
+
+class ConstrutorExclusoes:
+    """Acumula as fontes de exclusão em blocos colunares e resolve um motivo por matrícula"""
+
+    def __init__(self, competencia=COMPETENCIA_REFERENCIA):
+        self.competencia = Competencia.de_texto(competencia)
+        self._blocos: List[pd.DataFrame] = []
+        self.matriculas: Set[str] = set()
+
+    def adicionar(self, df: pd.DataFrame, motivo: str, arquivo_origem: str, detalhes) -> int:
+        """
+        Adiciona uma fonte de exclusão.
+
+        Args:
+            df: Linhas excluídas (com coluna MATRICULA)
+            motivo: Motivo de exclusão (chave de JUSTIFICATIVAS)
+            arquivo_origem: Planilha de origem
+            detalhes: Série alinhada a df ou texto único
+
+        Returns:
+            Quantidade de linhas com matrícula preenchida
+        """
+        if 'MATRICULA' not in df.columns or df.empty:
+            return 0
+
+        matriculas = matriculas_como_texto(df['MATRICULA'])
+        validas = (matriculas != '').to_numpy()
+        if not validas.any():
+            return 0
+
+        if not isinstance(detalhes, pd.Series):
+            detalhes = pd.Series(detalhes, index=df.index, dtype=object)
+
+        bloco = pd.DataFrame({
+            'Matricula': matriculas[validas].to_numpy(dtype=object),
+            'Nome': _coluna_ou(df, ['Nome', 'NOME'], 'N/A')[validas].to_numpy(dtype=object),
+            'Motivo_Exclusao': motivo,
+            'Detalhes': detalhes[validas].to_numpy(dtype=object),
+            'Arquivo_Origem': arquivo_origem
+        })
+        self._blocos.append(bloco)
+        self.matriculas.update(bloco['Matricula'])
+        return len(bloco)
+
+    def adicionar_ferias(self, df_ferias: pd.DataFrame, arquivo_origem: str = 'FERIAS.xlsx') -> int:
+        detalhes = 'Período: ' + _coluna_ou(df_ferias, ['Período'], 'N/A').astype(str)
+        return self.adicionar(df_ferias, 'FÉRIAS', arquivo_origem, detalhes)
+
+    def adicionar_desligados(self, df_desligados: pd.DataFrame, arquivo_origem: str = 'DESLIGADOS.xlsx',
+                             motivo: str = 'DESLIGADO ATÉ DIA 15') -> int:
+        """
+        Desligados já filtrados (até o dia 15, ou antes da competência com o motivo
+        'DESLIGADO ANTES DA COMPETÊNCIA'), com DATA DEMISSÃO convertida e coluna DIA
+        """
+        datas = df_desligados['DATA DEMISSÃO'].dt.strftime('%d/%m/%Y').fillna('N/A')
+        detalhes = 'Data demissão: ' + datas + ' (dia ' + df_desligados['DIA'].astype(str) + ')'
+        return self.adicionar(df_desligados, motivo, arquivo_origem, detalhes)
+
+    def adicionar_admissoes_posteriores(self, df_admissoes: pd.DataFrame,
+                                        arquivo_origem: str = 'ADMISSAO_ABRIL.xlsx') -> int:
+        """Admissões (com 'Admissão' convertida) posteriores ao último dia da competência"""
+        admissao = df_admissoes['Admissão']
+        posteriores = df_admissoes[admissao >= pd.Timestamp(self.competencia.proxima.data)]
+        detalhes = 'Admissão: ' + posteriores['Admissão'].dt.strftime('%d/%m/%Y')
+        return self.adicionar(posteriores, 'ADMITIDO APÓS A COMPETÊNCIA', arquivo_origem, detalhes)
+
+    def adicionar_por_cargo(self, df: pd.DataFrame, motivo: str, arquivo_origem: str) -> int:
+        """Fontes simples (afastamentos, exterior, estágio, aprendiz): detalhe pelo Cargo, se houver"""
+        cargo = _coluna_ou(df, ['Cargo', 'CARGO'], '')
+        preenchido = cargo.notna() & (cargo.astype(str) != '')
+        detalhes = ('Cargo: ' + cargo.astype(str)).where(preenchido, 'N/A')
+        return self.adicionar(df, motivo, arquivo_origem, detalhes)
+
+    def adicionar_diretores(self, df_ativos: pd.DataFrame, arquivo_origem: str = 'ATIVOS.xlsx') -> int:
+        diretores = df_ativos[mascara_diretores(df_ativos)]
+        if diretores.empty:
+            return 0
+        return self.adicionar(diretores, 'DIRETOR', arquivo_origem, 'Cargo: ' + diretores['TITULO DO CARGO'].astype(str))
+
+    def construir(self, precedencia: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Uma linha por matrícula com o motivo principal pela precedência.
+
+        Returns:
+            DataFrame com COLUNAS_EXCLUSOES; Motivos_Secundarios é uma lista por linha e
+            Justificativa é categórica (um texto por motivo)
+        """
+        if not self._blocos:
+            return pd.DataFrame(columns=COLUNAS_EXCLUSOES)
+
+        ordem = resolver_precedencia(precedencia)
+        todas = pd.concat(self._blocos, ignore_index=True)
+        todas['_posicao'] = range(len(todas))
+        todas['_rank'] = todas['Motivo_Exclusao'].map({m: i for i, m in enumerate(ordem)}).fillna(len(ordem))
+
+        # Motivo principal: menor rank; empate fica com a primeira fonte adicionada
+        ordenadas = todas.sort_values(['_rank', '_posicao'], kind='stable')
+        principais = ordenadas.drop_duplicates('Matricula', keep='first')
+
+        # Secundários: demais motivos distintos da matrícula, em ordem de precedência
+        secundarias = ordenadas[~ordenadas.index.isin(principais.index)]
+        secundarias = secundarias.drop_duplicates(['Matricula', 'Motivo_Exclusao'])
+        secundarias = secundarias[
+            secundarias['Motivo_Exclusao'].to_numpy()
+            != principais.set_index('Matricula')['Motivo_Exclusao'].reindex(secundarias['Matricula']).to_numpy()
+        ]
+        listas = secundarias.groupby('Matricula', sort=False)['Motivo_Exclusao'].agg(list)
+
+        # Ordem do relatório: posição em que o motivo principal foi adicionado
+        resultado = principais.sort_values('_posicao').reset_index(drop=True)
+        resultado['Motivos_Secundarios'] = [
+            lista if isinstance(lista, list) else [] for lista in resultado['Matricula'].map(listas)
+        ]
+        competencia = f"{self.competencia.mes:02d}/{self.competencia.ano}"
+        justificativas = {motivo: texto.format(competencia=competencia) for motivo, texto in JUSTIFICATIVAS.items()}
+        categorias = list(dict.fromkeys(list(justificativas.values()) + [JUSTIFICATIVA_PADRAO]))
+        resultado['Justificativa'] = pd.Categorical(
+            resultado['Motivo_Exclusao'].map(justificativas).fillna(JUSTIFICATIVA_PADRAO),
+            categories=categorias
+        )
+        return resultado[COLUNAS_EXCLUSOES]
+
+
+def contar_multiplos_motivos(df_exclusoes: pd.DataFrame) -> int:
+    """Matrículas presentes em mais de uma fonte de exclusão"""
+    if df_exclusoes.empty:
+        return 0
+    return int(df_exclusoes['Motivos_Secundarios'].str.len().gt(0).sum())
+
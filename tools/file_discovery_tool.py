@@ -10,11 +10,15 @@ from pathlib import Path
 from typing import Dict, List
 import logging
 
+from parsed_upload_cache import cache_habilitado, obter_cache
+from metrics import medir_tool
+
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 @tool("file_discovery_tool")
+@medir_tool
 def file_discovery_tool(base_directory: str = "temp_uploads") -> str:
     """
     Descobre automaticamente todos os arquivos Excel disponíveis no diretório especificado
@@ -65,6 +69,15 @@ def file_discovery_tool(base_directory: str = "temp_uploads") -> str:
         file_mapping = {}
         unclassified_files = []
 
+        # Situação no cache de planilhas (apenas hash do conteúdo, sem interpretar o Excel)
+        def em_cache(file_path):
+            if not cache_habilitado():
+                return False
+            try:
+                return obter_cache().contem(file_path)
+            except OSError:
+                return False
+
         for file_path in excel_files:
             file_name_lower = file_path.name.lower()
             classified = False
@@ -76,7 +89,8 @@ def file_discovery_tool(base_directory: str = "temp_uploads") -> str:
                     file_mapping[file_type].append({
                         'path': str(file_path),
                         'name': file_path.name,
-                        'size_mb': round(file_path.stat().st_size / (1024 * 1024), 2)
+                        'size_mb': round(file_path.stat().st_size / (1024 * 1024), 2),
+                        'cached': em_cache(file_path)
                     })
                     classified = True
                     break
@@ -85,7 +99,8 @@ def file_discovery_tool(base_directory: str = "temp_uploads") -> str:
                 unclassified_files.append({
                     'path': str(file_path),
                     'name': file_path.name,
-                    'size_mb': round(file_path.stat().st_size / (1024 * 1024), 2)
+                    'size_mb': round(file_path.stat().st_size / (1024 * 1024), 2),
+                    'cached': em_cache(file_path)
                 })
 
         # Gerar relatório de descoberta
@@ -110,7 +125,8 @@ def file_discovery_tool(base_directory: str = "temp_uploads") -> str:
         for file_type, files in file_mapping.items():
             discovery_report += f"\n🏷️ {file_type}:\n"
             for file_info in files:
-                discovery_report += f"   ✅ {file_info['name']} ({file_info['size_mb']} MB)\n"
+                cache_info = " [em cache]" if file_info['cached'] else ""
+                discovery_report += f"   ✅ {file_info['name']} ({file_info['size_mb']} MB){cache_info}\n"
                 discovery_report += f"      Caminho: {file_info['path']}\n"
 
         if unclassified_files:
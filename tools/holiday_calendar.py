@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Calendário de feriados por ano e região
+Os conjuntos de feriados (nacionais da lib holidays + estaduais/municipais da tabela
+abaixo) são montados uma vez por (ano, UF) e memoizados; a contagem de dias úteis usa
+np.busday_count com um busdaycalendar por região, vetorizada sobre qualquer intervalo
+"""
+
+import re
+import numpy as np
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+import logging
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+UF_NACIONAL = 'BR'
+
+# Nome do estado por UF (a ordem define a precedência na identificação pelo texto)
+ESTADOS = {
+    'SP': 'São Paulo',
+    'RJ': 'Rio de Janeiro',
+    'PR': 'Paraná',
+    'RS': 'Rio Grande do Sul',
+    'MG': 'Minas Gerais'
+}
+
+# Feriados estaduais e municipais (capitais) considerados pelo projeto: (mês, dia, nome)
+FERIADOS_REGIONAIS = {
+    'SP': [(1, 25, 'Aniversário de São Paulo'), (4, 23, 'São Jorge'), (7, 9, 'Revolução Constitucionalista')],
+    'RJ': [(4, 23, 'São Jorge'), (11, 20, 'Zumbi dos Palmares'), (12, 13, 'Santa Luzia')],
+    'PR': [(12, 19, 'Emancipação do Paraná')],
+    'RS': [(9, 20, 'Revolução Farroupilha')],
+    'MG': [(4, 21, 'Tiradentes')]
+}
+
+Datas = Union[date, str, np.datetime64, Sequence, np.ndarray]
+
+# 'RS - SINDPPD RS - ...': sigla no início seguida de hífen
+_PADRAO_PREFIXO_UF = re.compile(r'^\s*([A-Z]{2})\s*-')
+_PADRAO_SIGLA_UF = re.compile(r'\b(' + '|'.join(ESTADOS) + r')\b')
+
+
+def uf_da_regiao(texto: Optional[str]) -> str:
+    """
+    UF a partir do nome do estado ou do sindicato; BR se nenhuma.
+    Ordem: prefixo 'XX - ' dos nomes de sindicato ('RS - SINDPPD RS - ...'), nome do estado
+    ('SINDPD SP - São Paulo') e a sigla como palavra inteira. Sigla dentro de palavra não conta
+    ('PR' em 'PROC. DE DADOS' não é o Paraná)
+    """
+    if not texto:
+        return UF_NACIONAL
+    prefixo = _PADRAO_PREFIXO_UF.match(texto)
+    if prefixo and prefixo.group(1) in ESTADOS:
+        return prefixo.group(1)
+    for uf, estado in ESTADOS.items():
+        if estado in texto:
+            return uf
+    sigla = _PADRAO_SIGLA_UF.search(texto)
+    return sigla.group(1) if sigla else UF_NACIONAL
+
+
+def nome_regiao(uf: str) -> str:
+    return ESTADOS.get(uf, 'Brasil')
+
+
+@lru_cache(maxsize=None)
+def _feriados_nacionais(ano: int) -> Tuple[Tuple[date, str], ...]:
+    # holidays carrega calendários de todos os países: importado só no primeiro ano montado
+    import holidays
+
+    return tuple(sorted(holidays.Brazil(years=ano).items()))
+
+
+@lru_cache(maxsize=None)
+def feriados_regionais(ano: int, uf: str) -> Tuple[Tuple[date, str], ...]:
+    """Feriados estaduais/municipais da UF no ano (vazio para BR)"""
+    return tuple((date(ano, mes, dia), nome) for mes, dia, nome in FERIADOS_REGIONAIS.get(uf, ()))
+
+
+@lru_cache(maxsize=None)
+def feriados(ano: int, uf: str = UF_NACIONAL) -> Dict[date, str]:
+    """Todos os feriados (nacionais + regionais) da UF no ano; não altere o dicionário devolvido"""
+    conjunto = dict(_feriados_nacionais(ano))
+    for data, nome in feriados_regionais(ano, uf):
+        conjunto.setdefault(data, nome)
+    return conjunto
+
+
+@lru_cache(maxsize=None)
+def _feriados_array(ano: int, uf: str) -> np.ndarray:
+    return np.array(sorted(feriados(ano, uf)), dtype='datetime64[D]')
+
+
+@lru_cache(maxsize=256)
+def calendario_util(uf: str, ano_inicio: int, ano_fim: Optional[int] = None) -> np.busdaycalendar:
+    """busdaycalendar (segunda a sexta, sem os feriados da UF) cobrindo os anos informados"""
+    ano_fim = ano_fim or ano_inicio
+    dias = [_feriados_array(ano, uf) for ano in range(ano_inicio, ano_fim + 1)]
+    return np.busdaycalendar(weekmask='1111100', holidays=np.concatenate(dias))
+
+
+def _como_datas(valor: Datas) -> np.ndarray:
+    return np.asarray(valor, dtype='datetime64[D]')
+
+
+def _anos(*datas: np.ndarray) -> Tuple[int, int]:
+    anos = np.concatenate([d.ravel() for d in datas]).astype('datetime64[Y]').astype(int) + 1970
+    return int(anos.min()), int(anos.max())
+
+
+def contar_dias_uteis(inicio: Datas, fim: Datas, uf: str = UF_NACIONAL) -> Union[int, np.ndarray]:
+    """
+    Dias úteis entre inicio e fim, ambos inclusivos, na UF.
+
+    Args:
+        inicio: Data ou array de datas iniciais
+        fim: Data ou array de datas finais (mesmo formato de inicio ou escalar)
+        uf: UF da região (BR = apenas feriados nacionais)
+
+    Returns:
+        int para datas escalares; array de int alinhado às entradas caso contrário
+    """
+    inicio_d, fim_d = _como_datas(inicio), _como_datas(fim)
+    if inicio_d.size == 0:
+        return np.zeros(inicio_d.shape, dtype=int)
+    calendario = calendario_util(uf, *_anos(inicio_d, fim_d))
+    # busday_count exclui a data final; intervalos invertidos contam zero
+    contagem = np.maximum(np.busday_count(inicio_d, fim_d + np.timedelta64(1, 'D'), busdaycal=calendario), 0)
+    return int(contagem) if contagem.ndim == 0 else contagem
+
+
+def dias_uteis_por_regiao(ufs: Iterable[str], inicio: Datas, fim: Datas) -> np.ndarray:
+    """
+    Contagem vetorizada para várias regiões de uma vez: uma chamada de busday_count por UF
+    distinta, com as linhas da UF (inicio/fim podem ser escalares ou arrays alinhados a ufs)
+    """
+    ufs = np.asarray(list(ufs), dtype=object)
+    inicio_d = np.broadcast_to(_como_datas(inicio), ufs.shape)
+    fim_d = np.broadcast_to(_como_datas(fim), ufs.shape)
+    resultado = np.zeros(ufs.shape, dtype=int)
+    for uf in set(ufs.tolist()):
+        linhas = ufs == uf
+        resultado[linhas] = contar_dias_uteis(inicio_d[linhas], fim_d[linhas], uf)
+    return resultado
+
+
+def limites_mes(ano: int, mes: int) -> Tuple[date, date]:
+    """Primeiro e último dia do mês"""
+    proximo = date(ano + 1, 1, 1) if mes == 12 else date(ano, mes + 1, 1)
+    return date(ano, mes, 1), proximo - timedelta(days=1)
+
+
+def dias_uteis_mes(ano: int, mes: int, uf: str = UF_NACIONAL) -> int:
+    return contar_dias_uteis(*limites_mes(ano, mes), uf)
+
+
+def feriados_regionais_do_mes(ano: int, mes: int, uf: str) -> List[Dict]:
+    """Feriados estaduais/municipais da UF no mês, no formato [{'data', 'nome'}]"""
+    return [{'data': data, 'nome': nome} for data, nome in feriados_regionais(ano, uf) if data.month == mes]
+
+
+def estatisticas_cache() -> Dict[str, Dict[str, int]]:
+    """Hits/misses dos conjuntos memoizados"""
+    return {
+        nome: funcao.cache_info()._asdict()
+        for nome, funcao in (('feriados', feriados), ('calendario_util', calendario_util))
+    }
+
+
+def limpar_cache():
+    for funcao in (_feriados_nacionais, feriados_regionais, feriados, _feriados_array, calendario_util):
+        funcao.cache_clear()
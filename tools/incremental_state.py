@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Estado para recálculo incremental da base consolidada
+Cada execução guarda, ao lado das saídas, a impressão digital de cada linha das planilhas
+de entrada (por matrícula), o conjunto de excluídos e a base final. Na execução seguinte
+só as matrículas cujas linhas mudaram em alguma entrada (ou cuja exclusão mudou) são
+recalculadas; as demais linhas da base anterior são reaproveitadas na ordem de ATIVOS
+"""
+
+import os
+import json
+import hashlib
+import time
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass, field, asdict
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Set
+import logging
+
+from consolidated_artifact import carregar_base_consolidada, salvar_base_consolidada
+from vr_calculation_engine import matriculas_como_texto
+from workbook_loader import DatasetEntrada
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Muda quando o formato do estado muda (estados antigos passam a exigir recálculo completo)
+VERSAO_ESTADO = 1
+DIRETORIO_ESTADO = '.finacrew_estado'
+
+# Grafo de dependências: o que cada planilha alimenta. Entradas com MATRICULA afetam só as
+# próprias matrículas; as tabelas de sindicato afetam todas as linhas (recálculo completo)
+DEPENDENCIAS = {
+    'ATIVOS': ('elegibilidade', 'exclusões: diretor', 'sindicato, valor e dias'),
+    'FERIAS': ('exclusões: férias', 'prorrateio de férias parciais'),
+    'DESLIGADOS': ('exclusões: desligado até dia 15', 'OBS de desligamento', 'prorrateio de desligamento'),
+    'AFASTAMENTOS': ('exclusões: afastamentos',),
+    'EXTERIOR': ('exclusões: exterior',),
+    'ESTAGIO': ('exclusões: estágio',),
+    'APRENDIZ': ('exclusões: aprendiz',),
+    'ADMISSAO_ABRIL': ('data de admissão', 'proporcional de admissão', 'exclusões: admitido após a competência'),
+    'SINDICATO_VALOR': ('todas as linhas',),
+    'DIAS_UTEIS': ('todas as linhas',)
+}
+
+# Código cujas regras definem a base: alterá-lo invalida o estado
+MODULOS_REGRAS = (
+    'vr_calculation_engine.py',
+    'proration_engine.py',
+    'exclusion_builder.py',
+    'competencia.py',
+    'holiday_calendar.py',
+    'real_data_processor_tool.py'
+)
+
+
+def incremental_habilitado() -> bool:
+    """
+    Desligado por padrão (sempre recalcula tudo); FINACREW_INCREMENTAL=1 liga.
+    Ligado, o estado é gravado em .finacrew_estado/ dentro da pasta de saída
+    """
+    return os.getenv('FINACREW_INCREMENTAL', '0').strip().lower() in ('1', 'true', 'sim')
+
+
+@lru_cache(maxsize=1)
+def impressao_codigo() -> str:
+    """SHA-256 dos módulos de regras (lido uma vez por processo)"""
+    sha = hashlib.sha256()
+    pasta = Path(__file__).resolve().parent
+    for nome in MODULOS_REGRAS:
+        caminho = pasta / nome
+        if caminho.exists():
+            sha.update(caminho.read_bytes())
+    return sha.hexdigest()[:16]
+
+
+def impressao_parametros(parametros: Dict) -> str:
+    """Impressão dos parâmetros globais (competência, motor, tabelas...) mais a do código"""
+    texto = json.dumps(parametros, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(f"{texto}|{impressao_codigo()}".encode('utf-8')).hexdigest()[:16]
+
+
+def impressoes_linhas(df: pd.DataFrame) -> pd.Series:
+    """
+    Impressão digital por matrícula: hash de cada linha (todas as colunas) somado por matrícula,
+    de modo que qualquer linha alterada, incluída ou removida muda o valor da matrícula
+    """
+    hashes = pd.util.hash_pandas_object(df, index=False).to_numpy(dtype=np.uint64)
+    colunas = pd.util.hash_pandas_object(pd.Index([str(c) for c in df.columns]), index=False).to_numpy(dtype=np.uint64)
+    matriculas = matriculas_como_texto(df['MATRICULA']).to_numpy(dtype=object)
+    # As colunas entram no hash de cada linha: renomear ou incluir coluna altera todas as matrículas
+    semente = np.bitwise_xor.reduce(colunas) if len(colunas) else np.uint64(0)
+    return pd.Series(hashes ^ semente, index=matriculas).groupby(level=0, sort=False).sum()
+
+
+def impressao_tabela(df: pd.DataFrame) -> str:
+    """Impressão de uma planilha inteira (entradas sem MATRICULA)"""
+    hashes = pd.util.hash_pandas_object(df, index=False).to_numpy(dtype=np.uint64)
+    sha = hashlib.sha256(hashes.tobytes())
+    sha.update('|'.join(str(c) for c in df.columns).encode('utf-8'))
+    return sha.hexdigest()[:16]
+
+
+def matriculas_alteradas(anterior: pd.Series, atual: pd.Series) -> Set[str]:
+    """Matrículas com impressão diferente, incluídas ou removidas entre as execuções"""
+    uniao = anterior.index.union(atual.index)
+    antes = anterior.reindex(uniao, fill_value=np.uint64(0)).to_numpy(dtype=np.uint64)
+    agora = atual.reindex(uniao, fill_value=np.uint64(0)).to_numpy(dtype=np.uint64)
+    presente_antes = uniao.isin(anterior.index)
+    presente_agora = uniao.isin(atual.index)
+    mudou = (antes != agora) | (presente_antes != presente_agora)
+    return set(uniao[mudou])
+
+
+@dataclass
+class PlanoIncremental:
+    """O que recalcular: tudo (completo, com o motivo) ou só as matrículas afetadas"""
+    completo: bool
+    motivo: str = ''
+    afetadas: Set[str] = field(default_factory=set)
+    alteracoes: Dict[str, int] = field(default_factory=dict)
+
+    def mascara(self, df_ativos: pd.DataFrame) -> pd.Series:
+        """Linhas de ATIVOS a recalcular"""
+        return matriculas_como_texto(df_ativos['MATRICULA']).isin(self.afetadas)
+
+
+@dataclass
+class EstatisticasIncremental:
+    completo: bool = True
+    motivo: str = ''
+    recalculadas: int = 0
+    reaproveitadas: int = 0
+    alteracoes: Dict[str, int] = field(default_factory=dict)
+    etapas_afetadas: Dict[str, tuple] = field(default_factory=dict)
+    tempo_planejamento: float = 0.0
+    tempo_gravacao: float = 0.0
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+class EstadoIncremental:
+    """Estado de uma competência em <saida>/.finacrew_estado/<MM.AAAA>/"""
+
+    def __init__(self, diretorio_saida, competencia: str):
+        self.diretorio = Path(diretorio_saida) / DIRETORIO_ESTADO / str(competencia)
+        self.estatisticas = EstatisticasIncremental()
+        self._impressoes: Dict[str, pd.Series] = {}
+        self._tabelas: Dict[str, str] = {}
+        self._parametros = ''
+        self._excluidos: Set[str] = set()
+        self._base_anterior: Optional[pd.DataFrame] = None
+
+    def _caminho(self, nome: str) -> Optional[Path]:
+        for extensao in ('.parquet', '.pkl'):
+            caminho = self.diretorio / f"{nome}{extensao}"
+            if caminho.exists():
+                return caminho
+        return None
+
+    def _carregar_anterior(self) -> Optional[Dict]:
+        manifesto = self.diretorio / 'manifesto.json'
+        if not manifesto.exists():
+            return None
+        try:
+            dados = json.loads(manifesto.read_text(encoding='utf-8'))
+            if dados.get('versao') != VERSAO_ESTADO:
+                return None
+            impressoes = carregar_base_consolidada(str(self._caminho('impressoes')))
+            excluidos = carregar_base_consolidada(str(self._caminho('excluidos')))
+            base = carregar_base_consolidada(str(self._caminho('base')))
+        except Exception as e:
+            logger.warning(f"Estado incremental ilegível em {self.diretorio} ({e}); recálculo completo")
+            return None
+        dados['impressoes'] = {
+            entrada: pd.Series(grupo['hash'].to_numpy(dtype=np.uint64), index=grupo['matricula'].to_numpy(dtype=object))
+            for entrada, grupo in impressoes.groupby('entrada', sort=False)
+        }
+        dados['excluidos'] = set(excluidos['matricula'])
+        dados['base'] = base
+        return dados
+
+    def planejar(self, dataset: DatasetEntrada, excluidos: Iterable[str], parametros: Dict) -> PlanoIncremental:
+        """
+        Compara as entradas atuais com as da execução anterior.
+
+        Args:
+            dataset: Planilhas carregadas (ATIVOS incluída)
+            excluidos: Matrículas excluídas nesta execução (todas as fontes)
+            parametros: Valores globais que afetam todas as linhas (competência, motor, tabelas)
+        """
+        inicio = time.perf_counter()
+        self._parametros = impressao_parametros(parametros)
+        self._excluidos = set(excluidos)
+        for nome, df in dataset.planilhas.items():
+            if 'MATRICULA' in df.columns:
+                self._impressoes[nome] = impressoes_linhas(df)
+            else:
+                self._tabelas[nome] = impressao_tabela(df)
+
+        plano = self._comparar(dataset)
+        self.estatisticas.completo = plano.completo
+        self.estatisticas.motivo = plano.motivo
+        self.estatisticas.alteracoes = plano.alteracoes
+        self.estatisticas.etapas_afetadas = {
+            entrada: DEPENDENCIAS.get(entrada, ('todas as linhas',)) for entrada, total in plano.alteracoes.items() if total
+        }
+        self.estatisticas.tempo_planejamento = round(time.perf_counter() - inicio, 4)
+        return plano
+
+    def _comparar(self, dataset: DatasetEntrada) -> PlanoIncremental:
+        ativos = dataset.get('ATIVOS')
+        if ativos is None or 'MATRICULA' not in ativos.columns:
+            return PlanoIncremental(completo=True, motivo='ATIVOS indisponível')
+        if matriculas_como_texto(ativos['MATRICULA']).duplicated().any():
+            return PlanoIncremental(completo=True, motivo='ATIVOS com matrículas repetidas')
+
+        anterior = self._carregar_anterior()
+        if anterior is None:
+            return PlanoIncremental(completo=True, motivo='sem estado anterior')
+        if anterior.get('parametros') != self._parametros:
+            return PlanoIncremental(completo=True, motivo='parâmetros, tabelas ou regras alterados')
+        if anterior.get('tabelas', {}) != self._tabelas:
+            alteradas = sorted(
+                nome for nome in set(anterior.get('tabelas', {})) | set(self._tabelas)
+                if anterior.get('tabelas', {}).get(nome) != self._tabelas.get(nome)
+            )
+            return PlanoIncremental(
+                completo=True, motivo=f"entrada global alterada: {', '.join(alteradas)}",
+                alteracoes={nome: 1 for nome in alteradas}
+            )
+
+        afetadas: Set[str] = set()
+        alteracoes = {}
+        vazia = pd.Series([], dtype=np.uint64)
+        for nome in sorted(set(anterior['impressoes']) | set(self._impressoes)):
+            alteradas = matriculas_alteradas(anterior['impressoes'].get(nome, vazia), self._impressoes.get(nome, vazia))
+            alteracoes[nome] = len(alteradas)
+            afetadas |= alteradas
+
+        # Exclusões que mudaram sem linha alterada (ex.: regra derivada de outra planilha)
+        afetadas |= anterior['excluidos'] ^ self._excluidos
+        self._base_anterior = anterior['base']
+        return PlanoIncremental(completo=False, afetadas=afetadas, alteracoes=alteracoes)
+
+    def aplicar(self, plano: PlanoIncremental, df_recalculado: pd.DataFrame, df_ativos: pd.DataFrame) -> pd.DataFrame:
+        """
+        Junta as linhas recalculadas com as reaproveitadas (na ordem de ATIVOS) e grava o novo estado.
+
+        Args:
+            plano: Resultado de planejar
+            df_recalculado: Base calculada só para as linhas de plano.mascara (ou completa)
+            df_ativos: ATIVOS completo, para a ordem das linhas
+        """
+        if plano.completo or self._base_anterior is None:
+            base = df_recalculado.reset_index(drop=True)
+            self.estatisticas.recalculadas = len(base)
+            self.estatisticas.reaproveitadas = 0
+        else:
+            anterior = self._base_anterior
+            reaproveitadas = anterior[~anterior['Matricula'].astype(str).isin(plano.afetadas)]
+            partes = [reaproveitadas] + ([df_recalculado] if len(df_recalculado) else [])
+            base = pd.concat(partes, ignore_index=True)
+            ordem = matriculas_como_texto(df_ativos['MATRICULA'])
+            posicao = pd.Series(np.arange(len(ordem)), index=ordem.to_numpy(dtype=object))
+            chave = base['Matricula'].astype(str).map(posicao).to_numpy(dtype=float, na_value=np.inf)
+            base = base.iloc[np.argsort(chave, kind='stable')].reset_index(drop=True)
+            self.estatisticas.recalculadas = len(df_recalculado)
+            self.estatisticas.reaproveitadas = len(reaproveitadas)
+
+        self.salvar(base)
+        return base
+
+    def salvar(self, base: pd.DataFrame):
+        inicio = time.perf_counter()
+        try:
+            self.diretorio.mkdir(parents=True, exist_ok=True)
+            (self.diretorio / 'manifesto.json').unlink(missing_ok=True)
+            impressoes = pd.concat([
+                pd.DataFrame({'entrada': nome, 'matricula': s.index.to_numpy(dtype=object), 'hash': s.to_numpy(dtype=np.uint64)})
+                for nome, s in self._impressoes.items()
+            ] or [pd.DataFrame(columns=['entrada', 'matricula', 'hash'])], ignore_index=True)
+            salvar_base_consolidada(impressoes, nome='impressoes', diretorio=self.diretorio)
+            salvar_base_consolidada(
+                pd.DataFrame({'matricula': sorted(self._excluidos)}, dtype=object), nome='excluidos', diretorio=self.diretorio
+            )
+            salvar_base_consolidada(base, nome='base', diretorio=self.diretorio)
+            manifesto = {
+                'versao': VERSAO_ESTADO,
+                'parametros': self._parametros,
+                'tabelas': self._tabelas,
+                'linhas_base': len(base),
+                'gerado_em': pd.Timestamp.now().isoformat(timespec='seconds')
+            }
+            # Manifesto por último: um estado incompleto não é reaproveitado
+            (self.diretorio / 'manifesto.json').write_text(json.dumps(manifesto, indent=2, ensure_ascii=False), encoding='utf-8')
+        except Exception as e:
+            logger.warning(f"Estado incremental não pôde ser gravado em {self.diretorio}: {e}")
+        self.estatisticas.tempo_gravacao = round(time.perf_counter() - inicio, 4)
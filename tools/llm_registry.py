@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Registro de clientes LLM reutilizáveis
+Cada cliente é construído uma vez por (provedor, modelo, impressão digital da chave)
+e reaproveitado entre requisições, com as conexões HTTP já abertas; o .env só é
+relido quando o arquivo muda. O tempo de cada construção fica registrado
+"""
+
+import os
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+import logging
+
+from dotenv import load_dotenv
+from crewai.llm import LLM
+
+from llm_response_cache import LLMComCache
+from session_context import MODELO_PADRAO, ConfiguracaoLLM, configuracao_llm_atual
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+PROVEDOR_PADRAO = 'groq'
+# Clientes mantidos (chaves diferentes por requisição); acima disso sai o menos usado
+MAX_CLIENTES = 16
+DOTENV_PADRAO = Path(__file__).resolve().parent.parent / '.env'
+
+
+def impressao_digital(api_key: Optional[str]) -> str:
+    """Identifica a chave sem guardá-la (prefixo do SHA-256)"""
+    if not api_key:
+        return 'sem-chave'
+    return hashlib.sha256(api_key.encode('utf-8')).hexdigest()[:12]
+
+
+def nome_modelo(modelo: str, provedor: str = PROVEDOR_PADRAO) -> str:
+    """Modelo no formato do CrewAI ('groq/<modelo>')"""
+    return modelo if modelo.startswith(f"{provedor}/") else f"{provedor}/{modelo}"
+
+
+_dotenv_lock = threading.Lock()
+_dotenv_assinatura = {}
+
+
+def configuracao_ambiente(dotenv_path: Path = DOTENV_PADRAO) -> ConfiguracaoLLM:
+    """Configuração do .env/ambiente; o .env é relido apenas quando seu mtime muda"""
+    try:
+        assinatura = dotenv_path.stat().st_mtime_ns
+    except FileNotFoundError:
+        assinatura = None
+    with _dotenv_lock:
+        if assinatura is not None and _dotenv_assinatura.get(dotenv_path) != assinatura:
+            load_dotenv(dotenv_path, override=True)
+            _dotenv_assinatura[dotenv_path] = assinatura
+    return ConfiguracaoLLM(api_key=os.getenv('GROQ_API_KEY'), modelo=os.getenv('MODEL', MODELO_PADRAO))
+
+
+class RegistroLLM:
+    """Clientes LLM por configuração; reconstrói só quando provedor, modelo ou chave mudam"""
+
+    def __init__(self, max_clientes: int = MAX_CLIENTES):
+        self.max_clientes = max_clientes
+        self._clientes: 'OrderedDict[Tuple, LLM]' = OrderedDict()
+        self._tempos_construcao: Dict[Tuple, float] = {}
+        self.construcoes = 0
+        self.reutilizacoes = 0
+        self._lock = threading.Lock()
+
+    def obter(self, modelo: str, api_key: Optional[str], provedor: str = PROVEDOR_PADRAO,
+              usar_cache: bool = True) -> LLM:
+        modelo = nome_modelo(modelo, provedor)
+        chave = (provedor, modelo, impressao_digital(api_key), usar_cache)
+        with self._lock:
+            cliente = self._clientes.get(chave)
+            if cliente is not None:
+                self._clientes.move_to_end(chave)
+                self.reutilizacoes += 1
+                return cliente
+
+        # Construção fora do lock: outras configurações não esperam por esta
+        inicio = time.perf_counter()
+        classe_llm = LLMComCache if usar_cache else LLM
+        novo = classe_llm(model=modelo, api_key=api_key)
+        duracao = time.perf_counter() - inicio
+
+        with self._lock:
+            cliente = self._clientes.setdefault(chave, novo)
+            if cliente is novo:
+                self.construcoes += 1
+                self._tempos_construcao[chave] = duracao
+                logger.info(f"Cliente LLM {modelo} (chave {chave[2]}) construído em {duracao * 1000:.1f} ms")
+                while len(self._clientes) > self.max_clientes:
+                    antiga, _ = self._clientes.popitem(last=False)
+                    self._tempos_construcao.pop(antiga, None)
+            else:
+                self.reutilizacoes += 1
+        return cliente
+
+    def limpar(self):
+        with self._lock:
+            self._clientes.clear()
+            self._tempos_construcao.clear()
+
+    def estatisticas(self) -> Dict:
+        with self._lock:
+            return {
+                'clientes': len(self._clientes),
+                'construcoes': self.construcoes,
+                'reutilizacoes': self.reutilizacoes,
+                'tempo_construcao_ms': {
+                    f"{modelo} ({digital}{'' if cache else ', sem cache'})": round(duracao * 1000, 1)
+                    for (_, modelo, digital, cache), duracao in self._tempos_construcao.items()
+                }
+            }
+
+
+# Instância do processo
+registro_llm = RegistroLLM()
+
+
+def obter_llm(config: Optional[ConfiguracaoLLM] = None, usar_cache: bool = True) -> LLM:
+    """
+    Cliente para a configuração informada, a da sessão ativa ou a do .env/ambiente.
+
+    Raises:
+        ValueError: Nenhuma GROQ_API_KEY disponível
+    """
+    config = config or configuracao_llm_atual() or configuracao_ambiente()
+    api_key = config.api_key or configuracao_ambiente().api_key
+    if not api_key:
+        raise ValueError("GROQ_API_KEY não encontrada nas variáveis de ambiente")
+    return registro_llm.obter(config.modelo, api_key, usar_cache=usar_cache)
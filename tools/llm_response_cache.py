@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Cache em disco das respostas do LLM
+Prompts repetidos (reexecuções sobre as mesmas planilhas, testes) são respondidos
+do SQLite local, sem ida à rede. A chave é o SHA-256 de modelo + mensagens (que já
+trazem as saídas das tools) + tools + parâmetros de amostragem; entradas expiram
+pelo TTL e o arquivo respeita um limite de tamanho com despejo LRU
+"""
+
+import os
+import json
+import time
+import pickle
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+import logging
+
+from crewai.llm import LLM
+
+from metrics import LLM_CHAMADAS, LLM_DURACAO, registrar_cache
+from tracing import span
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DIRETORIO_PADRAO = os.getenv('FINACREW_LLM_CACHE_DIR', '.cache/llm')
+LIMITE_PADRAO_MB = float(os.getenv('FINACREW_LLM_CACHE_LIMITE_MB', '64'))
+TTL_PADRAO_HORAS = float(os.getenv('FINACREW_LLM_CACHE_TTL_HORAS', '24'))
+ARQUIVO_BANCO = 'respostas.sqlite3'
+
+# Parâmetros do LLM que mudam a resposta e, portanto, entram na chave
+PARAMETROS_CHAVE = ('temperature', 'top_p', 'max_tokens', 'stop', 'seed', 'response_format')
+
+
+def cache_llm_habilitado() -> bool:
+    """Cache ligado por padrão; FINACREW_LLM_CACHE=0 desliga"""
+    return os.getenv('FINACREW_LLM_CACHE', '1').strip().lower() not in ('0', 'false', 'nao', 'não')
+
+
+def _serializavel(valor: Any) -> Any:
+    """Forma estável para a chave: modelos pydantic por conteúdo, tools por nome/descrição"""
+    if hasattr(valor, 'model_dump'):
+        return valor.model_dump(mode='json')
+    if hasattr(valor, 'name') and hasattr(valor, 'description'):
+        return {'name': valor.name, 'description': valor.description}
+    if isinstance(valor, type):
+        return f"{valor.__module__}.{valor.__qualname__}"
+    return str(valor)
+
+
+class CacheRespostasLLM:
+    """Respostas do LLM em SQLite (seguro entre threads e processos)"""
+
+    def __init__(self, diretorio: str = DIRETORIO_PADRAO, limite_mb: float = LIMITE_PADRAO_MB,
+                 ttl_horas: float = TTL_PADRAO_HORAS):
+        self.diretorio = Path(diretorio)
+        self.caminho = self.diretorio / ARQUIVO_BANCO
+        self.limite_bytes = int(limite_mb * 1024 * 1024)
+        self.ttl_segundos = ttl_horas * 3600
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._inicializado = False
+
+    def _conectar(self) -> sqlite3.Connection:
+        if not self._inicializado:
+            self.diretorio.mkdir(parents=True, exist_ok=True)
+        conexao = sqlite3.connect(self.caminho, timeout=30)
+        if not self._inicializado:
+            with conexao:
+                conexao.execute('PRAGMA journal_mode=WAL')
+                conexao.execute(
+                    'CREATE TABLE IF NOT EXISTS respostas ('
+                    ' chave TEXT PRIMARY KEY, modelo TEXT, resposta BLOB, tamanho INTEGER,'
+                    ' criado_em REAL, usado_em REAL)'
+                )
+                conexao.execute('CREATE INDEX IF NOT EXISTS idx_respostas_usado_em ON respostas (usado_em)')
+            self._inicializado = True
+        return conexao
+
+    @staticmethod
+    def chave(modelo: str, mensagens, tools=None, parametros: Optional[Dict] = None) -> str:
+        """Chave do cache: modelo + mensagens + tools + parâmetros de amostragem"""
+        conteudo = json.dumps(
+            {'modelo': modelo, 'mensagens': mensagens, 'tools': tools, 'parametros': parametros or {}},
+            sort_keys=True, ensure_ascii=False, default=_serializavel
+        )
+        return hashlib.sha256(conteudo.encode('utf-8')).hexdigest()
+
+    def obter(self, chave: str) -> Optional[Any]:
+        """Resposta guardada (None em miss ou entrada expirada)"""
+        agora = time.time()
+        with self._conectar() as conexao:
+            linha = conexao.execute('SELECT resposta, criado_em FROM respostas WHERE chave = ?', (chave,)).fetchone()
+            if linha is not None and agora - linha[1] > self.ttl_segundos:
+                conexao.execute('DELETE FROM respostas WHERE chave = ?', (chave,))
+                linha = None
+            if linha is not None:
+                conexao.execute('UPDATE respostas SET usado_em = ? WHERE chave = ?', (agora, chave))
+        conexao.close()
+
+        if linha is not None:
+            try:
+                resposta = pickle.loads(linha[0])
+                with self._lock:
+                    self.hits += 1
+                return resposta
+            except Exception as e:
+                logger.warning(f"Entrada do cache LLM ilegível ({e}); consultando o modelo")
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def gravar(self, chave: str, modelo: str, resposta: Any) -> bool:
+        """Guarda a resposta; respostas que não podem ser serializadas são ignoradas"""
+        try:
+            dados = pickle.dumps(resposta)
+        except Exception as e:
+            logger.info(f"Resposta do LLM não armazenável no cache: {e}")
+            return False
+
+        agora = time.time()
+        with self._conectar() as conexao:
+            conexao.execute(
+                'INSERT OR REPLACE INTO respostas (chave, modelo, resposta, tamanho, criado_em, usado_em)'
+                ' VALUES (?, ?, ?, ?, ?, ?)',
+                (chave, modelo, dados, len(dados), agora, agora)
+            )
+            self._despejar_excedente(conexao, agora)
+        conexao.close()
+        return True
+
+    def _despejar_excedente(self, conexao: sqlite3.Connection, agora: float):
+        """Remove as expiradas e, acima do limite, as menos usadas recentemente"""
+        conexao.execute('DELETE FROM respostas WHERE criado_em < ?', (agora - self.ttl_segundos,))
+        total = conexao.execute('SELECT COALESCE(SUM(tamanho), 0) FROM respostas').fetchone()[0]
+        if total <= self.limite_bytes:
+            return
+        removidas = 0
+        for chave, tamanho in conexao.execute('SELECT chave, tamanho FROM respostas ORDER BY usado_em').fetchall():
+            if total <= self.limite_bytes:
+                break
+            conexao.execute('DELETE FROM respostas WHERE chave = ?', (chave,))
+            total -= tamanho
+            removidas += 1
+        logger.info(f"Cache LLM: {removidas} resposta(s) despejada(s) (LRU)")
+
+    def limpar(self):
+        with self._conectar() as conexao:
+            conexao.execute('DELETE FROM respostas')
+        conexao.close()
+
+    def estatisticas(self) -> Dict:
+        """Contadores deste processo e ocupação atual do banco"""
+        quantidade, tamanho = 0, 0
+        if self.caminho.exists():
+            with self._conectar() as conexao:
+                quantidade, tamanho = conexao.execute(
+                    'SELECT COUNT(*), COALESCE(SUM(tamanho), 0) FROM respostas'
+                ).fetchone()
+            conexao.close()
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'entradas': quantidade,
+            'tamanho_mb': round(tamanho / (1024 * 1024), 2),
+            'limite_mb': round(self.limite_bytes / (1024 * 1024), 2),
+            'ttl_horas': round(self.ttl_segundos / 3600, 2)
+        }
+
+
+_cache_global = None
+_cache_lock = threading.Lock()
+
+
+def obter_cache_llm() -> CacheRespostasLLM:
+    """Instância do cache deste processo"""
+    global _cache_global
+    with _cache_lock:
+        if _cache_global is None:
+            _cache_global = CacheRespostasLLM()
+        return _cache_global
+
+
+class LLMComCache(LLM):
+    """
+    LLM do CrewAI que consulta o cache antes de chamar o provedor.
+    Chamadas com available_functions (o próprio LLM executaria tools) não usam o cache
+    """
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None,
+             from_task=None, from_agent=None, response_model=None):
+        argumentos = dict(tools=tools, callbacks=callbacks, available_functions=available_functions,
+                          from_task=from_task, from_agent=from_agent, response_model=response_model)
+        mensagens = len(messages) if isinstance(messages, list) else 1
+        with span('llm.chamada', modelo=self.model, mensagens=mensagens) as chamada:
+            if available_functions or not cache_llm_habilitado():
+                chamada.definir(origem='provedor')
+                return self._chamar_provedor(messages, argumentos, chamada)
+
+            cache = obter_cache_llm()
+            parametros = {nome: getattr(self, nome, None) for nome in PARAMETROS_CHAVE}
+            parametros['response_model'] = response_model
+            chave = cache.chave(self.model, messages, tools, parametros)
+
+            inicio = time.perf_counter()
+            resposta = cache.obter(chave)
+            registrar_cache('llm', resposta is not None)
+            if resposta is not None:
+                LLM_DURACAO.observar(time.perf_counter() - inicio, modelo=self.model, origem='cache')
+                LLM_CHAMADAS.inc(modelo=self.model, origem='cache', status='ok')
+                chamada.definir(origem='cache')
+                return resposta
+
+            chamada.definir(origem='provedor')
+            resposta = self._chamar_provedor(messages, argumentos, chamada)
+            if resposta is not None and resposta != '':
+                cache.gravar(chave, self.model, resposta)
+            return resposta
+
+    def _chamar_provedor(self, messages, argumentos: Dict, chamada):
+        """Chamada real ao provedor, com latência e resultado nas métricas e tokens no span"""
+        uso_antes = dict(getattr(self, '_token_usage', None) or {})
+        inicio = time.perf_counter()
+        status = 'erro'
+        try:
+            resposta = super().call(messages, **argumentos)
+            status = 'ok'
+            uso_depois = getattr(self, '_token_usage', None) or {}
+            chamada.definir(**{
+                nome: uso_depois[nome] - uso_antes.get(nome, 0)
+                for nome in ('prompt_tokens', 'completion_tokens', 'total_tokens') if nome in uso_depois
+            })
+            return resposta
+        finally:
+            LLM_DURACAO.observar(time.perf_counter() - inicio, modelo=self.model, origem='provedor')
+            LLM_CHAMADAS.inc(modelo=self.model, origem='provedor', status=status)
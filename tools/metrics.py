@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+Métricas do FinaCrew em memória, exportadas no formato texto do Prometheus
+Contadores, medidores e histogramas com rótulos, seguros entre threads, alimentados
+pelas etapas do processador, tools, chamadas ao LLM, endpoints HTTP, leituras e escritas
+de planilhas e caches; a API expõe o registro em GET /api/metrics.
+Só usa a biblioteca padrão: a API importa este módulo na subida sem pandas/crewai
+"""
+
+import time
+import resource
+import functools
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import logging
+
+from tracing import span
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Limites (segundos) dos histogramas de latência: de chamadas de tool rápidas a meses grandes
+BALDES_PADRAO = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+TIPO_CONTENT_PROMETHEUS = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _escapar(valor) -> str:
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _formatar_numero(valor: float) -> str:
+    valor = float(valor)
+    if valor == float('inf'):
+        return '+Inf'
+    return str(int(valor)) if valor.is_integer() and abs(valor) < 1e15 else repr(valor)
+
+
+def _formatar_rotulos(nomes: Iterable[str], valores: Iterable, extra: Optional[Tuple[str, str]] = None) -> str:
+    pares = [f'{nome}="{_escapar(valor)}"' for nome, valor in zip(nomes, valores)]
+    if extra is not None:
+        pares.append(f'{extra[0]}="{extra[1]}"')
+    return '{' + ','.join(pares) + '}' if pares else ''
+
+
+class _Metrica:
+    """Base: nome, ajuda, rótulos e uma série por combinação de valores dos rótulos"""
+    tipo = ''
+
+    def __init__(self, nome: str, ajuda: str, rotulos: Iterable[str] = ()):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulos = tuple(rotulos)
+        self._series: Dict[Tuple, object] = {}
+        self._lock = threading.Lock()
+
+    def _chave(self, rotulos: Dict) -> Tuple:
+        if set(rotulos) != set(self.rotulos):
+            raise ValueError(f"{self.nome}: rótulos esperados {self.rotulos}, recebidos {tuple(rotulos)}")
+        return tuple(str(rotulos[nome]) for nome in self.rotulos)
+
+    def limpar(self):
+        with self._lock:
+            self._series.clear()
+
+    def _linhas(self) -> List[str]:
+        raise NotImplementedError
+
+    def exportar(self) -> List[str]:
+        return [f"# HELP {self.nome} {_escapar(self.ajuda)}", f"# TYPE {self.nome} {self.tipo}"] + self._linhas()
+
+
+class Contador(_Metrica):
+    """Valor que só cresce (chamadas, bytes, linhas, acertos de cache)"""
+    tipo = 'counter'
+
+    def inc(self, valor: float = 1, **rotulos):
+        if valor < 0:
+            raise ValueError(f"{self.nome}: contador não pode diminuir ({valor})")
+        chave = self._chave(rotulos)
+        with self._lock:
+            self._series[chave] = self._series.get(chave, 0) + valor
+
+    def valor(self, **rotulos) -> float:
+        with self._lock:
+            return self._series.get(self._chave(rotulos), 0)
+
+    def _linhas(self) -> List[str]:
+        with self._lock:
+            series = sorted(self._series.items())
+        return [f"{self.nome}{_formatar_rotulos(self.rotulos, chave)} {_formatar_numero(v)}" for chave, v in series]
+
+
+class Medidor(_Metrica):
+    """Valor instantâneo; com coleta, é lido no momento da exportação"""
+    tipo = 'gauge'
+
+    def __init__(self, nome: str, ajuda: str, rotulos: Iterable[str] = (), coleta: Optional[Callable[[], float]] = None):
+        super().__init__(nome, ajuda, rotulos)
+        self.coleta = coleta
+
+    def definir(self, valor: float, **rotulos):
+        chave = self._chave(rotulos)
+        with self._lock:
+            self._series[chave] = valor
+
+    def _linhas(self) -> List[str]:
+        if self.coleta is not None:
+            self.definir(self.coleta())
+        with self._lock:
+            series = sorted(self._series.items())
+        return [f"{self.nome}{_formatar_rotulos(self.rotulos, chave)} {_formatar_numero(v)}" for chave, v in series]
+
+
+class Histograma(_Metrica):
+    """Distribuição de latências em baldes cumulativos, com soma e contagem"""
+    tipo = 'histogram'
+
+    def __init__(self, nome: str, ajuda: str, rotulos: Iterable[str] = (), baldes: Iterable[float] = BALDES_PADRAO):
+        super().__init__(nome, ajuda, rotulos)
+        self.baldes = tuple(sorted(baldes))
+
+    def observar(self, valor: float, **rotulos):
+        chave = self._chave(rotulos)
+        with self._lock:
+            serie = self._series.get(chave)
+            if serie is None:
+                # [contagem por balde..., +Inf], soma
+                serie = self._series[chave] = [[0] * (len(self.baldes) + 1), 0.0]
+            indice = next((i for i, limite in enumerate(self.baldes) if valor <= limite), len(self.baldes))
+            serie[0][indice] += 1
+            serie[1] += valor
+
+    def contagem(self, **rotulos) -> int:
+        with self._lock:
+            serie = self._series.get(self._chave(rotulos))
+            return sum(serie[0]) if serie else 0
+
+    def _linhas(self) -> List[str]:
+        with self._lock:
+            series = sorted((chave, (list(contagens), soma)) for chave, (contagens, soma) in self._series.items())
+        linhas = []
+        for chave, (contagens, soma) in series:
+            acumulado = 0
+            for limite, quantidade in zip(self.baldes + (float('inf'),), contagens):
+                acumulado += quantidade
+                rotulos = _formatar_rotulos(self.rotulos, chave, ('le', _formatar_numero(limite)))
+                linhas.append(f"{self.nome}_bucket{rotulos} {acumulado}")
+            rotulos = _formatar_rotulos(self.rotulos, chave)
+            linhas.append(f"{self.nome}_sum{rotulos} {_formatar_numero(round(soma, 6))}")
+            linhas.append(f"{self.nome}_count{rotulos} {acumulado}")
+        return linhas
+
+
+class RegistroMetricas:
+    """Métricas do processo por nome; registrar de novo o mesmo nome devolve a existente"""
+
+    def __init__(self):
+        self._metricas: Dict[str, _Metrica] = {}
+        self._lock = threading.Lock()
+
+    def _registrar(self, classe, nome: str, *args, **kwargs):
+        with self._lock:
+            metrica = self._metricas.get(nome)
+            if metrica is None:
+                metrica = self._metricas[nome] = classe(nome, *args, **kwargs)
+            elif not isinstance(metrica, classe):
+                raise ValueError(f"Métrica {nome} já registrada como {metrica.tipo}")
+            return metrica
+
+    def contador(self, nome: str, ajuda: str, rotulos: Iterable[str] = ()) -> Contador:
+        return self._registrar(Contador, nome, ajuda, rotulos)
+
+    def medidor(self, nome: str, ajuda: str, rotulos: Iterable[str] = (),
+                coleta: Optional[Callable[[], float]] = None) -> Medidor:
+        return self._registrar(Medidor, nome, ajuda, rotulos, coleta=coleta)
+
+    def histograma(self, nome: str, ajuda: str, rotulos: Iterable[str] = (),
+                   baldes: Iterable[float] = BALDES_PADRAO) -> Histograma:
+        return self._registrar(Histograma, nome, ajuda, rotulos, baldes=baldes)
+
+    def limpar(self):
+        """Zera as séries (as métricas continuam registradas)"""
+        with self._lock:
+            metricas = list(self._metricas.values())
+        for metrica in metricas:
+            metrica.limpar()
+
+    def exportar(self) -> str:
+        """Todas as métricas no formato texto do Prometheus (0.0.4)"""
+        with self._lock:
+            metricas = sorted(self._metricas.values(), key=lambda m: m.nome)
+        linhas = []
+        for metrica in metricas:
+            linhas.extend(metrica.exportar())
+        return '\n'.join(linhas) + '\n'
+
+
+def rss_pico_bytes() -> int:
+    """Pico de memória residente do processo (ru_maxrss vem em KB no Linux)"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def rss_atual_bytes() -> int:
+    """Memória residente atual (Linux, /proc); fora dele, o pico"""
+    try:
+        paginas = int(Path('/proc/self/statm').read_text().split()[1])
+        return paginas * resource.getpagesize()
+    except (OSError, ValueError, IndexError):
+        return rss_pico_bytes()
+
+
+# Registro global do processo (compartilhado pela API, processador e tools)
+registro_metricas = RegistroMetricas()
+
+ETAPA_DURACAO = registro_metricas.histograma(
+    'finacrew_etapa_duracao_segundos', 'Duração das etapas do processamento', ('etapa',))
+ETAPA_RSS_PICO = registro_metricas.medidor(
+    'finacrew_etapa_rss_pico_bytes', 'Pico de RSS do processo ao fim da última execução de cada etapa', ('etapa',))
+PROCESSAMENTOS = registro_metricas.contador(
+    'finacrew_processamentos_total', 'Execuções do processador por resultado', ('status',))
+TOOL_CHAMADAS = registro_metricas.contador(
+    'finacrew_tool_chamadas_total', 'Chamadas das tools por resultado', ('tool', 'status'))
+TOOL_DURACAO = registro_metricas.histograma(
+    'finacrew_tool_duracao_segundos', 'Latência das chamadas das tools', ('tool',))
+LLM_CHAMADAS = registro_metricas.contador(
+    'finacrew_llm_chamadas_total', 'Chamadas ao LLM por origem da resposta (cache ou provedor)',
+    ('modelo', 'origem', 'status'))
+LLM_DURACAO = registro_metricas.histograma(
+    'finacrew_llm_duracao_segundos', 'Latência das chamadas ao LLM', ('modelo', 'origem'))
+HTTP_REQUISICOES = registro_metricas.contador(
+    'finacrew_http_requisicoes_total', 'Requisições HTTP por rota, método e status', ('endpoint', 'metodo', 'status'))
+HTTP_DURACAO = registro_metricas.histograma(
+    'finacrew_http_duracao_segundos', 'Latência das requisições HTTP', ('endpoint', 'metodo'))
+BYTES_LIDOS = registro_metricas.contador(
+    'finacrew_bytes_lidos_total', 'Bytes das planilhas de entrada lidas', ('planilha',))
+BYTES_GRAVADOS = registro_metricas.contador(
+    'finacrew_bytes_gravados_total', 'Bytes das planilhas de saída gravadas', ('backend',))
+LINHAS_PROCESSADAS = registro_metricas.contador(
+    'finacrew_linhas_processadas_total', 'Linhas lidas das planilhas de entrada e gravadas nas de saída',
+    ('planilha', 'operacao'))
+CACHE_CONSULTAS = registro_metricas.contador(
+    'finacrew_cache_consultas_total', 'Consultas aos caches (taxa de acerto = hit / total)', ('cache', 'resultado'))
+registro_metricas.medidor('finacrew_processo_rss_bytes', 'Memória residente atual do processo', coleta=rss_atual_bytes)
+registro_metricas.medidor('finacrew_processo_rss_pico_bytes', 'Pico de memória residente do processo', coleta=rss_pico_bytes)
+
+
+def registrar_etapa(etapa: str, duracao: float):
+    """Duração de uma etapa e o pico de RSS ao fim dela"""
+    ETAPA_DURACAO.observar(duracao, etapa=etapa)
+    ETAPA_RSS_PICO.definir(rss_pico_bytes(), etapa=etapa)
+
+
+def registrar_leitura(planilha: str, caminho, linhas: int):
+    """Bytes e linhas de uma planilha de entrada"""
+    try:
+        BYTES_LIDOS.inc(Path(caminho).stat().st_size, planilha=planilha)
+    except OSError:
+        pass
+    LINHAS_PROCESSADAS.inc(linhas, planilha=planilha, operacao='lida')
+
+
+def registrar_escrita(caminho, backend: str, linhas_por_aba: Dict[str, int]):
+    """Bytes do arquivo gravado e linhas de cada aba"""
+    try:
+        BYTES_GRAVADOS.inc(Path(caminho).stat().st_size, backend=backend)
+    except OSError:
+        pass
+    for aba, linhas in linhas_por_aba.items():
+        LINHAS_PROCESSADAS.inc(linhas, planilha=aba, operacao='gravada')
+
+
+def registrar_cache(cache: str, acerto: bool):
+    CACHE_CONSULTAS.inc(cache=cache, resultado='hit' if acerto else 'miss')
+
+
+@contextmanager
+def cronometrar(histograma: Histograma, **rotulos):
+    """Observa no histograma a duração do bloco (também quando ele falha)"""
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        histograma.observar(time.perf_counter() - inicio, **rotulos)
+
+
+def medir_tool(func: Callable) -> Callable:
+    """
+    Decorador aplicado sob o @tool do CrewAI: conta chamadas, mede a latência e abre um span.
+    functools.wraps preserva nome, docstring e assinatura usados para montar o schema da tool
+    """
+    nome = func.__name__
+
+    @functools.wraps(func)
+    def envolvida(*args, **kwargs):
+        status = 'erro'
+        try:
+            with cronometrar(TOOL_DURACAO, tool=nome), span(f"tool.{nome}"):
+                resposta = func(*args, **kwargs)
+            status = 'ok'
+            return resposta
+        finally:
+            TOOL_CHAMADAS.inc(tool=nome, status=status)
+
+    return envolvida
@@ -11,11 +11,24 @@ from pathlib import Path
 from datetime import datetime
 import logging
 
+from excel_output_writer import formatar_aba_xlsxwriter
+from consolidated_artifact import COLUNAS_MODELO, carregar_base_consolidada, para_colunas_modelo
+from session_context import diretorio_saida
+from metrics import medir_tool
+
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Formatação do modelo, aplicada por coluna
+ESTILO_CABECALHO = {'bold': True, 'font_color': '#FFFFFF', 'bg_color': '#366092', 'align': 'center', 'valign': 'vcenter'}
+COLUNAS_MOEDA = ['VALOR_DIARIO_VR', 'VALOR_TOTAL_VR', 'VALOR_EMPRESA', 'VALOR_FUNCIONARIO']
+COLUNAS_PERCENTUAL = ['PERCENTUAL_EMPRESA', 'PERCENTUAL_FUNCIONARIO']
+FORMATO_MOEDA = 'R$ #,##0.00'
+FORMATO_PERCENTUAL = '0"%"'
+
 @tool("model_excel_generator_tool")
+@medir_tool
 def model_excel_generator_tool(
     output_filename: str = "VR MENSAL 05.2025.xlsx",
     data_dict: str = None
@@ -28,7 +41,9 @@ def model_excel_generator_tool(
 
     Args:
         output_filename: Nome do arquivo de saída (padrão: "VR MENSAL 05.2025.xlsx")
-        data_dict: String JSON com dados dos funcionários (opcional para testes)
+        data_dict: Caminho do artefato da base consolidada (.parquet/.feather/.pkl/.json)
+            gerado pelo real_data_processor_tool, ou JSON orientado a colunas
+            {"MATRICULA": [...], ...}; sem ele é gerada uma planilha de exemplo
 
     Returns:
         String com status da geração e localização do arquivo criado
@@ -36,28 +51,12 @@ def model_excel_generator_tool(
     try:
         print(f"📝 Gerando planilha modelo: {output_filename}")
 
-        # Definir estrutura da planilha conforme especificações
-        columns_structure = [
-            'MATRICULA',
-            'NOME',
-            'SINDICATO',
-            'VALOR_DIARIO_VR',
-            'DIAS_UTEIS',
-            'VALOR_TOTAL_VR',
-            'PERCENTUAL_EMPRESA',
-            'VALOR_EMPRESA',
-            'PERCENTUAL_FUNCIONARIO',
-            'VALOR_FUNCIONARIO',
-            'OBSERVACOES'
-        ]
-
         # Criar DataFrame base
         if data_dict:
-            # Se dados foram fornecidos, processar
-            # (Implementação simplificada para exemplo)
-            print("📊 Processando dados fornecidos...")
-            # TODO: Implementar parsing do data_dict
-            df = pd.DataFrame(columns=columns_structure)
+            # Base consolidada por artefato colunar (caminho) ou JSON orientado a colunas
+            print("📊 Carregando base consolidada...")
+            df = para_colunas_modelo(carregar_base_consolidada(data_dict))
+            print(f"   ✅ {len(df)} funcionários carregados")
         else:
             # Criar planilha de exemplo para testes
             print("📋 Criando planilha de exemplo...")
@@ -76,80 +75,24 @@ def model_excel_generator_tool(
             }
             df = pd.DataFrame(sample_data)
 
-        # Definir diretório de saída
-        output_dir = Path("output")
-        output_dir.mkdir(exist_ok=True)
+        # Definir diretório de saída (da sessão ativa, se houver)
+        output_dir = diretorio_saida("output")
+        output_dir.mkdir(parents=True, exist_ok=True)
         output_path = output_dir / output_filename
 
-        # Criar planilha com formatação
-        with pd.ExcelWriter(output_path, engine='openpyxl') as writer:
+        # Criar planilha com formatação por coluna (sem laços por célula)
+        with pd.ExcelWriter(output_path, engine='xlsxwriter') as writer:
             # Aba principal
             df.to_excel(writer, sheet_name='VR_MENSAL', index=False)
 
-            # Obter workbook e worksheet para formatação
-            workbook = writer.book
-            worksheet = writer.sheets['VR_MENSAL']
-
-            # Formatação de cabeçalhos
-            from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-
-            # Estilo do cabeçalho
-            header_font = Font(bold=True, color="FFFFFF")
-            header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-            header_alignment = Alignment(horizontal="center", vertical="center")
-
-            # Aplicar formatação ao cabeçalho
-            for col_num, column_title in enumerate(columns_structure, 1):
-                cell = worksheet.cell(row=1, column=col_num)
-                cell.font = header_font
-                cell.fill = header_fill
-                cell.alignment = header_alignment
-
-            # Formatação de valores monetários
-            currency_columns = ['VALOR_DIARIO_VR', 'VALOR_TOTAL_VR', 'VALOR_EMPRESA', 'VALOR_FUNCIONARIO']
-            for col_name in currency_columns:
-                if col_name in df.columns:
-                    col_letter = chr(65 + list(df.columns).index(col_name))
-                    for row in range(2, len(df) + 2):
-                        cell = worksheet[f"{col_letter}{row}"]
-                        cell.number_format = 'R$ #,##0.00'
-
-            # Formatação de percentuais
-            percentage_columns = ['PERCENTUAL_EMPRESA', 'PERCENTUAL_FUNCIONARIO']
-            for col_name in percentage_columns:
-                if col_name in df.columns:
-                    col_letter = chr(65 + list(df.columns).index(col_name))
-                    for row in range(2, len(df) + 2):
-                        cell = worksheet[f"{col_letter}{row}"]
-                        cell.number_format = '0"%"'
-
-            # Ajustar largura das colunas
-            for column in worksheet.columns:
-                max_length = 0
-                column_letter = column[0].column_letter
-
-                for cell in column:
-                    try:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(str(cell.value))
-                    except:
-                        pass
-
-                adjusted_width = min(max_length + 2, 50)
-                worksheet.column_dimensions[column_letter].width = adjusted_width
-
-            # Adicionar bordas
-            thin_border = Border(
-                left=Side(style='thin'),
-                right=Side(style='thin'),
-                top=Side(style='thin'),
-                bottom=Side(style='thin')
+            formatos_numericos = {coluna: FORMATO_MOEDA for coluna in COLUNAS_MOEDA}
+            formatos_numericos.update({coluna: FORMATO_PERCENTUAL for coluna in COLUNAS_PERCENTUAL})
+            formatar_aba_xlsxwriter(
+                writer, 'VR_MENSAL', df,
+                formatos_numericos=formatos_numericos,
+                estilo_cabecalho=ESTILO_CABECALHO
             )
 
-            for row in worksheet.iter_rows(min_row=1, max_row=len(df)+1, min_col=1, max_col=len(columns_structure)):
-                for cell in row:
-                    cell.border = thin_border
-
         # Calcular estatísticas
         total_funcionarios = len(df)
         total_vr = df['VALOR_TOTAL_VR'].sum() if 'VALOR_TOTAL_VR' in df.columns else 0
@@ -174,7 +117,7 @@ def model_excel_generator_tool(
    - Largura de colunas otimizada
 
 📋 ESTRUTURA CONFORME ESPECIFICAÇÕES:
-   - 11 colunas obrigatórias implementadas
+   - {len(COLUNAS_MODELO)} colunas obrigatórias implementadas
    - Rateio 80% empresa / 20% funcionário
    - Campo observações para anotações
    - Formato compatível com sistemas corporativos
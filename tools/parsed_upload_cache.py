@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Cache colunar das planilhas já interpretadas
+Armazena cada planilha lida em Parquet (ou pickle, sem pyarrow) com chave pelo
+SHA-256 do arquivo mais as opções de leitura, com limite de tamanho e despejo LRU
+"""
+
+import os
+import json
+import hashlib
+import threading
+import pandas as pd
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+import logging
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+try:
+    import pyarrow  # noqa: F401
+    PARQUET_DISPONIVEL = True
+except ImportError:
+    PARQUET_DISPONIVEL = False
+
+DIRETORIO_PADRAO = os.getenv('FINACREW_CACHE_DIR', '.cache/planilhas')
+LIMITE_PADRAO_MB = float(os.getenv('FINACREW_CACHE_LIMITE_MB', '512'))
+EXTENSOES_CACHE = ('.parquet', '.pkl')
+
+
+def cache_habilitado() -> bool:
+    """Cache ligado por padrão; FINACREW_CACHE_PLANILHAS=0 desliga"""
+    return os.getenv('FINACREW_CACHE_PLANILHAS', '1').strip().lower() not in ('0', 'false', 'nao', 'não')
+
+
+class CachePlanilhas:
+    """Cache em disco de DataFrames lidos de planilhas, compartilhado entre processos"""
+
+    def __init__(self, diretorio: str = DIRETORIO_PADRAO, limite_mb: float = LIMITE_PADRAO_MB):
+        self.diretorio = Path(diretorio)
+        self.limite_bytes = int(limite_mb * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._hashes = {}
+
+    def hash_arquivo(self, caminho) -> str:
+        """SHA-256 do conteúdo, memorizado por (caminho, tamanho, mtime) dentro do processo"""
+        caminho = Path(caminho)
+        stat = caminho.stat()
+        assinatura = (str(caminho.resolve()), stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            if assinatura in self._hashes:
+                return self._hashes[assinatura]
+
+        sha = hashlib.sha256()
+        with open(caminho, 'rb') as f:
+            for bloco in iter(lambda: f.read(1024 * 1024), b''):
+                sha.update(bloco)
+        digest = sha.hexdigest()
+
+        with self._lock:
+            self._hashes[assinatura] = digest
+        return digest
+
+    def chave(self, caminho, leitor: str = 'excel', **opcoes) -> str:
+        """Chave do cache: hash do arquivo + leitor + opções de leitura"""
+        opcoes_json = json.dumps({'leitor': leitor, **opcoes}, sort_keys=True, default=str)
+        return hashlib.sha256(f"{self.hash_arquivo(caminho)}|{opcoes_json}".encode('utf-8')).hexdigest()
+
+    def _entrada_existente(self, chave: str) -> Optional[Path]:
+        for extensao in EXTENSOES_CACHE:
+            entrada = self.diretorio / f"{chave}{extensao}"
+            if entrada.exists():
+                return entrada
+        return None
+
+    def contem(self, caminho, leitor: str = 'excel', **opcoes) -> bool:
+        """Indica se a planilha já está no cache, sem lê-la"""
+        return self._entrada_existente(self.chave(caminho, leitor, **opcoes)) is not None
+
+    def ler_planilha(self, caminho, leitor: str = 'excel', **opcoes) -> Tuple[pd.DataFrame, bool]:
+        """
+        Lê a planilha pelo cache.
+
+        Args:
+            caminho: Arquivo Excel ou CSV
+            leitor: 'excel' (pd.read_excel) ou 'csv' (pd.read_csv)
+            **opcoes: Opções repassadas ao leitor do pandas (fazem parte da chave)
+
+        Returns:
+            Tupla (DataFrame, acerto_no_cache)
+        """
+        chave = self.chave(caminho, leitor, **opcoes)
+        entrada = self._entrada_existente(chave)
+
+        if entrada is not None:
+            try:
+                df = pd.read_parquet(entrada) if entrada.suffix == '.parquet' else pd.read_pickle(entrada)
+                os.utime(entrada)  # mtime marca o último uso para o despejo LRU
+                with self._lock:
+                    self.hits += 1
+                return df, True
+            except Exception as e:
+                logger.warning(f"Entrada de cache ilegível {entrada.name}: {e}. Relendo o arquivo original.")
+
+        df = pd.read_csv(caminho, **opcoes) if leitor == 'csv' else pd.read_excel(caminho, **opcoes)
+        with self._lock:
+            self.misses += 1
+
+        try:
+            self._gravar(chave, df)
+            self._despejar_excedente()
+        except Exception as e:
+            logger.warning(f"Não foi possível gravar {Path(caminho).name} no cache: {e}")
+
+        return df, False
+
+    def _gravar(self, chave: str, df: pd.DataFrame):
+        """Grava em Parquet quando possível; colunas de tipos mistos caem para pickle"""
+        self.diretorio.mkdir(parents=True, exist_ok=True)
+        temporario = self.diretorio / f".{chave}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+        destino = None
+        if PARQUET_DISPONIVEL:
+            try:
+                df.to_parquet(temporario, index=False)
+                destino = self.diretorio / f"{chave}.parquet"
+            except Exception:
+                destino = None
+        if destino is None:
+            df.to_pickle(temporario)
+            destino = self.diretorio / f"{chave}.pkl"
+
+        # os.replace é atômico: leitores concorrentes nunca veem arquivo parcial
+        os.replace(temporario, destino)
+
+    def _despejar_excedente(self):
+        """Remove as entradas menos usadas recentemente até respeitar o limite de tamanho"""
+        entradas = []
+        for entrada in self.diretorio.iterdir():
+            if entrada.suffix in EXTENSOES_CACHE:
+                try:
+                    stat = entrada.stat()
+                    entradas.append((stat.st_mtime, stat.st_size, entrada))
+                except FileNotFoundError:
+                    continue
+
+        total = sum(tamanho for _, tamanho, _ in entradas)
+        for _, tamanho, entrada in sorted(entradas, key=lambda e: e[0]):
+            if total <= self.limite_bytes:
+                break
+            try:
+                entrada.unlink()
+                total -= tamanho
+                logger.info(f"Cache: entrada {entrada.name} despejada (LRU)")
+            except FileNotFoundError:
+                continue
+
+    def estatisticas(self) -> Dict:
+        """Contadores deste processo e ocupação atual do diretório de cache"""
+        tamanho = 0
+        quantidade = 0
+        if self.diretorio.exists():
+            for entrada in self.diretorio.iterdir():
+                if entrada.suffix in EXTENSOES_CACHE:
+                    tamanho += entrada.stat().st_size
+                    quantidade += 1
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'entradas': quantidade,
+            'tamanho_mb': round(tamanho / (1024 * 1024), 2),
+            'limite_mb': round(self.limite_bytes / (1024 * 1024), 2),
+            'formato': 'parquet' if PARQUET_DISPONIVEL else 'pickle'
+        }
+
+
+_cache_global = None
+_cache_lock = threading.Lock()
+
+
+def obter_cache() -> CachePlanilhas:
+    """Instância do cache deste processo"""
+    global _cache_global
+    with _cache_lock:
+        if _cache_global is None:
+            _cache_global = CachePlanilhas()
+        return _cache_global
+
+
+def ler_planilha_com_cache(caminho, leitor: str = 'excel', **opcoes) -> Tuple[pd.DataFrame, bool]:
+    """Lê via cache quando habilitado; caso contrário, direto do arquivo (sempre um miss)"""
+    if cache_habilitado():
+        return obter_cache().ler_planilha(caminho, leitor, **opcoes)
+    df = pd.read_csv(caminho, **opcoes) if leitor == 'csv' else pd.read_excel(caminho, **opcoes)
+    return df, False
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Resultado estruturado do processamento VR/VA
+O processador devolve contagens, totais, arquivos, validações e tempos por etapa
+em um objeto tipado; a API monta a resposta direto dele, sem extrair números do
+relatório em texto (o agente analisador fica como etapa narrativa opcional)
+"""
+
+import time
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+import logging
+
+from metrics import registrar_etapa
+from tracing import SpanAberto
+from vr_calculation_engine import matriculas_como_texto
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+PERCENTUAL_EMPRESA = 0.80
+PERCENTUAL_FUNCIONARIO = 0.20
+METODO_ESTRUTURADO = 'resultado_estruturado'
+
+
+class CronometroEtapas:
+    """
+    Duração de cada etapa: uma etapa termina quando a próxima começa.
+    Cada etapa também vai para as métricas e vira um span do trace ativo
+    """
+
+    def __init__(self):
+        self.tempos: Dict[str, float] = {}
+        self._inicio_total = time.perf_counter()
+        self._etapa: Optional[str] = None
+        self._inicio_etapa = self._inicio_total
+        self._span: Optional[SpanAberto] = None
+
+    def iniciar(self, etapa: str):
+        self._fechar_etapa()
+        self._etapa = etapa
+        self._span = SpanAberto(f"etapa.{etapa}")
+        self._inicio_etapa = time.perf_counter()
+
+    def finalizar(self, erro: Optional[BaseException] = None) -> float:
+        """
+        Fecha a etapa corrente e devolve o tempo total desde a criação.
+        Com erro, o span da etapa corrente é gravado com status 'erro'
+        """
+        self._fechar_etapa(erro)
+        return time.perf_counter() - self._inicio_total
+
+    def _fechar_etapa(self, erro: Optional[BaseException] = None):
+        if self._etapa is not None:
+            decorrido = time.perf_counter() - self._inicio_etapa
+            self.tempos[self._etapa] = round(self.tempos.get(self._etapa, 0.0) + decorrido, 4)
+            registrar_etapa(self._etapa, decorrido)
+            self._span.fechar(erro)
+            self._etapa = None
+
+
+def validar_base_consolidada(df_consolidado: pd.DataFrame, excluidos: Iterable[str],
+                             desligados_ate_15: Iterable[str] = ()) -> Dict[str, bool]:
+    """
+    Verificações determinísticas da base gerada (as mesmas cobradas do agente analisador).
+
+    Args:
+        df_consolidado: Aba VR MENSAL
+        excluidos: Matrículas que não podem aparecer na base
+        desligados_ate_15: Matrículas desligadas até o dia 15
+    """
+    if df_consolidado.empty:
+        return {
+            'regras_sindicato_aplicadas': False,
+            'exclusoes_aplicadas': False,
+            'regra_desligamento_aplicada': False,
+            'divisao_custo_correta': False
+        }
+
+    matriculas = matriculas_como_texto(df_consolidado['Matricula'])
+    total = df_consolidado['TOTAL'].astype(float).to_numpy()
+    return {
+        'regras_sindicato_aplicadas': bool(
+            df_consolidado['Sindicato do Colaborador'].notna().all()
+            and (df_consolidado['VALOR DIÁRIO VR'].astype(float) > 0).all()
+        ),
+        'exclusoes_aplicadas': not bool(matriculas.isin(set(excluidos)).any()),
+        'regra_desligamento_aplicada': not bool(matriculas.isin(set(desligados_ate_15)).any()),
+        'divisao_custo_correta': bool(
+            np.allclose(df_consolidado['Custo empresa'].astype(float).to_numpy(), total * PERCENTUAL_EMPRESA)
+            and np.allclose(df_consolidado['Desconto profissional'].astype(float).to_numpy(), total * PERCENTUAL_FUNCIONARIO)
+        )
+    }
+
+
+@dataclass
+class ResultadoProcessamento:
+    """Saída tipada de executar_processamento_real (relatorio é o texto da real_data_processor_tool)"""
+    diretorio_entrada: str
+    competencia: Optional[str] = None
+    funcionarios_ativos: int = 0
+    funcionarios_elegiveis: int = 0
+    funcionarios_excluidos: int = 0
+    contagens: Dict[str, int] = field(default_factory=dict)
+    exclusoes_por_motivo: Dict[str, int] = field(default_factory=dict)
+    valor_total_vr: float = 0.0
+    valor_empresa: float = 0.0
+    valor_funcionario: float = 0.0
+    arquivos: Dict[str, str] = field(default_factory=dict)
+    validacoes: Dict[str, bool] = field(default_factory=dict)
+    motor_calculo: Optional[str] = None
+    backend_excel: Optional[str] = None
+    modo_streaming: bool = False
+    cache_planilhas: Dict = field(default_factory=dict)
+    validacao_datas: List[Dict] = field(default_factory=list)
+    prorrateio: Dict = field(default_factory=dict)
+    incremental: Dict = field(default_factory=dict)
+    tempos_etapas: Dict[str, float] = field(default_factory=dict)
+    tempo_total: float = 0.0
+    erro: Optional[str] = None
+    relatorio: str = ''
+
+    @property
+    def sucesso(self) -> bool:
+        return self.erro is None
+
+    @property
+    def arquivos_gerados(self) -> List[str]:
+        """Nomes das planilhas geradas (sem o artefato interno da base consolidada)"""
+        return [Path(caminho).name for chave, caminho in self.arquivos.items() if chave != 'base_consolidada']
+
+    def falha(self, mensagem: str) -> 'ResultadoProcessamento':
+        """Marca o resultado como falho; o relatório passa a ser a mensagem de erro"""
+        self.erro = mensagem
+        self.relatorio = mensagem
+        return self
+
+    def to_dict(self, incluir_relatorio: bool = False) -> Dict:
+        dados = asdict(self)
+        if not incluir_relatorio:
+            dados.pop('relatorio')
+        dados['sucesso'] = self.sucesso
+        dados['arquivos_gerados'] = self.arquivos_gerados
+        dados['tempo_processamento'] = f"{self.tempo_total:.2f}s"
+        return dados
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Perfil sob demanda de uma execução do processamento
+Com o header X-Profile (ou FINACREW_PROFILE=1) a execução roda sob cProfile, tracemalloc
+e um amostrador de pilhas em thread própria. Ao final são gravados, na pasta de logs da
+sessão: o .prof (pstats/snakeviz), o relatório das N linhas que mais alocaram memória e as
+pilhas amostradas no formato collapsed (flamegraph.pl, speedscope, inferno)
+"""
+
+import os
+import sys
+import time
+import cProfile
+import threading
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+import logging
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+TOP_ALOCACOES_PADRAO = int(os.getenv('FINACREW_PROFILE_TOP', '25'))
+INTERVALO_AMOSTRAGEM_MS = float(os.getenv('FINACREW_PROFILE_INTERVALO_MS', '5'))
+# Quadros guardados por alocação: o relatório agrupa pela linha que alocou, e cada
+# quadro a mais deixa a execução perfilada mais lenta
+QUADROS_TRACEMALLOC = 1
+
+SUFIXO_PROF = '.prof'
+SUFIXO_ALOCACOES = '_alocacoes.txt'
+SUFIXO_COLLAPSED = '.collapsed'
+
+# tracemalloc é global: fica ligado enquanto houver algum perfil ativo
+_tracemalloc_lock = threading.Lock()
+_tracemalloc_usuarios = 0
+_tracemalloc_externo = False
+
+
+def perfil_habilitado(valor_header: Optional[str] = None) -> bool:
+    """Header X-Profile quando enviado; senão FINACREW_PROFILE (desligado por padrão)"""
+    valor = valor_header if valor_header is not None else os.getenv('FINACREW_PROFILE', '0')
+    return str(valor).strip().lower() in ('1', 'true', 'sim')
+
+
+def _ligar_tracemalloc():
+    global _tracemalloc_usuarios, _tracemalloc_externo
+    with _tracemalloc_lock:
+        if _tracemalloc_usuarios == 0:
+            # Já ligado por quem chamou (benchmarks): não desligar ao final
+            _tracemalloc_externo = tracemalloc.is_tracing()
+            if not _tracemalloc_externo:
+                tracemalloc.start(QUADROS_TRACEMALLOC)
+        _tracemalloc_usuarios += 1
+
+
+def _desligar_tracemalloc():
+    global _tracemalloc_usuarios
+    with _tracemalloc_lock:
+        _tracemalloc_usuarios -= 1
+        if _tracemalloc_usuarios == 0 and not _tracemalloc_externo:
+            tracemalloc.stop()
+
+
+def _nome_quadro(frame) -> str:
+    codigo = frame.f_code
+    return f"{codigo.co_name} ({Path(codigo.co_filename).name}:{codigo.co_firstlineno})"
+
+
+class AmostradorPilhas:
+    """Profiler por amostragem: lê a pilha de uma thread a cada intervalo (sys._current_frames)"""
+
+    def __init__(self, thread_id: int, intervalo_ms: float = INTERVALO_AMOSTRAGEM_MS):
+        self.thread_id = thread_id
+        self.intervalo = intervalo_ms / 1000
+        self.contagens: Counter = Counter()
+        self._parar = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def iniciar(self):
+        self._thread = threading.Thread(target=self._executar, name='finacrew-amostrador', daemon=True)
+        self._thread.start()
+
+    def parar(self):
+        self._parar.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _executar(self):
+        while not self._parar.wait(self.intervalo):
+            frame = sys._current_frames().get(self.thread_id)
+            pilha = []
+            while frame is not None:
+                pilha.append(_nome_quadro(frame))
+                frame = frame.f_back
+            if pilha:
+                self.contagens[';'.join(reversed(pilha))] += 1
+
+    def gravar_collapsed(self, caminho: Path):
+        """Uma linha por pilha: 'raiz;...;folha contagem'"""
+        with open(caminho, 'w', encoding='utf-8') as f:
+            for pilha, quantidade in sorted(self.contagens.items()):
+                f.write(f"{pilha} {quantidade}\n")
+
+
+class PerfilExecucao:
+    """
+    Context manager que perfila o bloco na thread atual e grava os artefatos em diretorio.
+    Depois do bloco, arquivos traz os caminhos gravados e resumo() os números principais
+    """
+
+    def __init__(self, diretorio, prefixo: str = 'perfil', top: int = TOP_ALOCACOES_PADRAO,
+                 intervalo_ms: float = INTERVALO_AMOSTRAGEM_MS):
+        self.diretorio = Path(diretorio)
+        self.prefixo = f"{prefixo}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}"
+        self.top = top
+        self.intervalo_ms = intervalo_ms
+        self.arquivos: Dict[str, Path] = {}
+        self.duracao = 0.0
+        self.pico_memoria_bytes = 0
+        self._profiler = cProfile.Profile()
+        self._amostrador: Optional[AmostradorPilhas] = None
+        self._snapshot_inicial = None
+
+    def __enter__(self) -> 'PerfilExecucao':
+        _ligar_tracemalloc()
+        tracemalloc.reset_peak()
+        self._snapshot_inicial = tracemalloc.take_snapshot()
+        self._amostrador = AmostradorPilhas(threading.get_ident(), self.intervalo_ms)
+        self._amostrador.iniciar()
+        self._inicio = time.perf_counter()
+        self._profiler.enable()
+        return self
+
+    def __exit__(self, tipo_excecao, excecao, traceback):
+        self._profiler.disable()
+        self.duracao = time.perf_counter() - self._inicio
+        self._amostrador.parar()
+        try:
+            snapshot_final = tracemalloc.take_snapshot()
+            self.pico_memoria_bytes = tracemalloc.get_traced_memory()[1]
+        finally:
+            _desligar_tracemalloc()
+
+        try:
+            self._gravar(snapshot_final)
+        except Exception as e:
+            # Falha ao gravar o perfil não derruba a execução perfilada
+            logger.warning(f"Não foi possível gravar o perfil em {self.diretorio}: {e}")
+        return False
+
+    def _gravar(self, snapshot_final):
+        self.diretorio.mkdir(parents=True, exist_ok=True)
+        base = self.diretorio / self.prefixo
+
+        caminho_prof = base.with_name(base.name + SUFIXO_PROF)
+        self._profiler.dump_stats(str(caminho_prof))
+        self.arquivos['prof'] = caminho_prof
+
+        caminho_alocacoes = base.with_name(base.name + SUFIXO_ALOCACOES)
+        caminho_alocacoes.write_text('\n'.join(self._relatorio_alocacoes(snapshot_final)) + '\n', encoding='utf-8')
+        self.arquivos['alocacoes'] = caminho_alocacoes
+
+        caminho_collapsed = base.with_name(base.name + SUFIXO_COLLAPSED)
+        self._amostrador.gravar_collapsed(caminho_collapsed)
+        self.arquivos['collapsed'] = caminho_collapsed
+        logger.info(f"Perfil gravado em {self.diretorio}: {', '.join(c.name for c in self.arquivos.values())}")
+
+    def _relatorio_alocacoes(self, snapshot_final) -> List[str]:
+        """Top N linhas por memória alocada durante o bloco e ainda viva ao fim, com o pico"""
+        filtros = [
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap*>')
+        ]
+        diferencas = snapshot_final.filter_traces(filtros).compare_to(
+            self._snapshot_inicial.filter_traces(filtros), 'lineno'
+        )
+        diferencas = sorted((d for d in diferencas if d.size_diff > 0), key=lambda d: d.size_diff, reverse=True)
+
+        linhas = [
+            f"Perfil {self.prefixo}",
+            f"Duração: {self.duracao:.2f}s | pico de memória rastreada: {self.pico_memoria_bytes / 1024 / 1024:.1f} MB",
+            f"Top {self.top} linhas por memória alocada no bloco e ainda em uso ao fim:",
+            ''
+        ]
+        for posicao, diferenca in enumerate(diferencas[:self.top], start=1):
+            quadro = diferenca.traceback[0]
+            linhas.append(
+                f"{posicao:>3}. {diferenca.size_diff / 1024:>10.1f} KB em {diferenca.count_diff:>7} bloco(s)"
+                f"  {quadro.filename}:{quadro.lineno}"
+            )
+        if not diferencas:
+            linhas.append('(nenhuma alocação restante)')
+        return linhas
+
+    def resumo(self) -> Dict:
+        return {
+            'duracao_s': round(self.duracao, 4),
+            'pico_memoria_mb': round(self.pico_memoria_bytes / 1024 / 1024, 1),
+            'amostras': sum(self._amostrador.contagens.values()) if self._amostrador else 0,
+            'arquivos': {tipo: caminho.name for tipo, caminho in self.arquivos.items()}
+        }
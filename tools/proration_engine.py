@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Prorrateio por dias úteis (FINACREW_PRORRATEIO=dias_uteis)
+Cada funcionário da base consolidada recebe um período elegível na competência
+(admissão, desligamento e férias parciais) e os dias úteis desse período são contados
+de uma vez para toda a população, com o calendário de feriados do sindicato
+(holiday_calendar). Funcionários com o mês completo mantêm os dias da Base_dias_uteis
+"""
+
+import os
+import time
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass, asdict
+from typing import Dict, Optional, Sequence, Tuple
+import logging
+
+from competencia import Competencia
+from date_column_parser import converter_coluna_datas
+from holiday_calendar import dias_uteis_por_regiao, limites_mes, uf_da_regiao
+from processing_result import PERCENTUAL_EMPRESA, PERCENTUAL_FUNCIONARIO
+from vr_calculation_engine import COMPETENCIA_PADRAO, matriculas_como_texto, valor_por_substring
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Modos de prorrateio
+MODO_CALENDARIO = 'calendario'  # Original: admitidos no mês por dias corridos, férias excluem o mês
+MODO_DIAS_UTEIS = 'dias_uteis'
+MODOS_VALIDOS = (MODO_CALENDARIO, MODO_DIAS_UTEIS)
+
+# Colunas aceitas na planilha FERIAS (a primeira existente é usada)
+COLUNAS_INICIO_FERIAS = ('INICIO FÉRIAS', 'INÍCIO FÉRIAS', 'INICIO FERIAS', 'DATA INICIO FÉRIAS', 'DATA INÍCIO FÉRIAS')
+COLUNAS_FIM_FERIAS = ('FIM FÉRIAS', 'FIM FERIAS', 'DATA FIM FÉRIAS', 'TÉRMINO FÉRIAS')
+COLUNAS_DIAS_FERIAS = ('DIAS DE FÉRIAS', 'DIAS DE FERIAS', 'DIAS FÉRIAS')
+
+
+def resolver_modo_prorrateio(modo: Optional[str] = None) -> str:
+    """Modo do argumento ou de FINACREW_PRORRATEIO (padrão: calendario)"""
+    modo = (modo or os.getenv('FINACREW_PRORRATEIO', MODO_CALENDARIO)).strip().lower()
+    if modo not in MODOS_VALIDOS:
+        logger.warning(f"Modo de prorrateio desconhecido '{modo}', usando '{MODO_CALENDARIO}'")
+        return MODO_CALENDARIO
+    return modo
+
+
+def periodo_competencia(competencia: str) -> Tuple[pd.Timestamp, pd.Timestamp]:
+    """Primeiro e último dia do mês da competência ('2025-05-01' ou '05.2025' -> 01/05 a 31/05)"""
+    competencia = Competencia.de_texto(competencia)
+    inicio, fim = limites_mes(competencia.ano, competencia.mes)
+    return pd.Timestamp(inicio), pd.Timestamp(fim)
+
+
+def _coluna(df: pd.DataFrame, opcoes: Sequence[str]) -> Optional[str]:
+    return next((coluna for coluna in opcoes if coluna in df.columns), None)
+
+
+def _por_matricula(df: pd.DataFrame, valores: pd.Series) -> pd.Series:
+    """Valores indexados pela matrícula em texto (primeira ocorrência)"""
+    serie = pd.Series(valores.to_numpy(), index=matriculas_como_texto(df['MATRICULA']).to_numpy())
+    return serie[~serie.index.duplicated(keep='first')]
+
+
+def _periodos_ferias(df_ferias: pd.DataFrame) -> pd.DataFrame:
+    """Início, fim (datas) e dias corridos de férias por linha, conforme as colunas disponíveis"""
+    periodos = pd.DataFrame(index=df_ferias.index)
+    coluna_inicio, coluna_fim = _coluna(df_ferias, COLUNAS_INICIO_FERIAS), _coluna(df_ferias, COLUNAS_FIM_FERIAS)
+    coluna_dias = _coluna(df_ferias, COLUNAS_DIAS_FERIAS)
+
+    periodos['inicio'] = pd.NaT
+    periodos['fim'] = pd.NaT
+    if coluna_inicio:
+        periodos['inicio'] = converter_coluna_datas(df_ferias[coluna_inicio], data_padrao=pd.NaT)[0]
+    if coluna_fim:
+        periodos['fim'] = converter_coluna_datas(df_ferias[coluna_fim], data_padrao=pd.NaT)[0]
+    if coluna_dias:
+        periodos['dias'] = pd.to_numeric(df_ferias[coluna_dias], errors='coerce')
+    else:
+        periodos['dias'] = np.nan
+
+    # Início + dias sem data final: o fim é derivado (dias corridos, inclusivo)
+    sem_fim = periodos['fim'].isna() & periodos['inicio'].notna() & periodos['dias'].notna()
+    periodos.loc[sem_fim, 'fim'] = periodos.loc[sem_fim, 'inicio'] + pd.to_timedelta(periodos.loc[sem_fim, 'dias'] - 1, unit='D')
+    return periodos
+
+
+def separar_ferias(df_ferias: pd.DataFrame, competencia: str) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Separa as férias que cobrem toda a competência (continuam excluídas) das parciais.
+
+    Sem datas nem quantidade de dias a linha é tratada como férias integrais (regra original).
+
+    Returns:
+        Tupla (férias integrais, férias parciais), subconjuntos das linhas de df_ferias
+    """
+    inicio, fim = periodo_competencia(competencia)
+    periodos = _periodos_ferias(df_ferias)
+    dias_competencia = (fim - inicio).days + 1
+
+    com_datas = periodos['inicio'].notna() & periodos['fim'].notna()
+    cobre_por_datas = com_datas & (periodos['inicio'] <= inicio) & (periodos['fim'] >= fim)
+    fora_da_competencia = com_datas & ((periodos['fim'] < inicio) | (periodos['inicio'] > fim))
+    cobre_por_dias = ~com_datas & (periodos['dias'].isna() | (periodos['dias'] >= dias_competencia))
+
+    integrais = cobre_por_datas | cobre_por_dias
+    parciais = ~integrais & ~fora_da_competencia
+    return df_ferias[integrais.to_numpy()], df_ferias[parciais.to_numpy()]
+
+
+def _dias_uteis_ferias(df_ferias: pd.DataFrame, matriculas: pd.Series, ufs: np.ndarray,
+                       inicio: pd.Timestamp, fim: pd.Timestamp) -> np.ndarray:
+    """
+    Dias úteis de férias parciais dentro da competência, por linha da base.
+    Com datas, conta a interseção no calendário da UF; só com a quantidade de dias
+    corridos, converte pela proporção de dias úteis da competência na UF
+    """
+    resultado = np.zeros(len(matriculas), dtype=int)
+    if df_ferias is None or df_ferias.empty or 'MATRICULA' not in df_ferias.columns:
+        return resultado
+
+    periodos = _periodos_ferias(df_ferias)
+    inicio_ferias = matriculas.map(_por_matricula(df_ferias, periodos['inicio'])).to_numpy(dtype='datetime64[D]')
+    fim_ferias = matriculas.map(_por_matricula(df_ferias, periodos['fim'])).to_numpy(dtype='datetime64[D]')
+    dias_ferias = matriculas.map(_por_matricula(df_ferias, periodos['dias'])).to_numpy(dtype=float, na_value=np.nan)
+
+    inicio_d, fim_d = np.datetime64(inicio.date(), 'D'), np.datetime64(fim.date(), 'D')
+    com_datas = ~np.isnat(inicio_ferias) & ~np.isnat(fim_ferias)
+    if com_datas.any():
+        resultado[com_datas] = dias_uteis_por_regiao(
+            ufs[com_datas],
+            np.maximum(inicio_ferias[com_datas], inicio_d),
+            np.minimum(fim_ferias[com_datas], fim_d)
+        )
+
+    so_dias = ~com_datas & ~np.isnan(dias_ferias)
+    if so_dias.any():
+        dias_corridos = (fim - inicio).days + 1
+        uteis_competencia = dias_uteis_por_regiao(ufs[so_dias], inicio_d, fim_d)
+        resultado[so_dias] = np.rint(dias_ferias[so_dias] * uteis_competencia / dias_corridos).astype(int)
+    return resultado
+
+
+@dataclass
+class EstatisticasProrrateio:
+    """Resumo do prorrateio aplicado (vai para ResultadoProcessamento.prorrateio)"""
+    modo: str = MODO_DIAS_UTEIS
+    competencia: str = ''
+    prorrateados: int = 0
+    admissoes: int = 0
+    desligamentos: int = 0
+    ferias_parciais: int = 0
+    dias_descontados: int = 0
+    tempo: float = 0.0
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+def aplicar_prorrateio_dias_uteis(
+    df_consolidado: pd.DataFrame,
+    dias_por_sindicato: Dict[str, int],
+    dias_uteis_padrao: float,
+    df_admissoes: Optional[pd.DataFrame] = None,
+    df_desligados: Optional[pd.DataFrame] = None,
+    df_ferias_parciais: Optional[pd.DataFrame] = None,
+    competencia: str = COMPETENCIA_PADRAO
+) -> Tuple[pd.DataFrame, EstatisticasProrrateio]:
+    """
+    Recalcula Dias, valores e OBS da base consolidada pelos dias úteis elegíveis.
+
+    O período elegível de cada funcionário vai da admissão (se no mês) ao desligamento
+    (se no mês). Os dias úteis fora dele e os de férias parciais, contados no calendário
+    da UF do sindicato, são descontados dos dias da Base_dias_uteis do sindicato: quem
+    tem o mês completo continua com exatamente os dias da tabela.
+
+    Args:
+        df_consolidado: Base de calcular_base_consolidada (ou do motor legado)
+        dias_por_sindicato: Dias úteis do mês completo por trecho do nome do sindicato
+        dias_uteis_padrao: Dias do mês completo quando nenhum sindicato corresponde
+        df_admissoes: Admissões com 'Admissão' já convertida para data
+        df_desligados: Desligados com 'DATA DEMISSÃO' já convertida (os até o dia 15 já estão excluídos)
+        df_ferias_parciais: Linhas de FERIAS que não cobrem a competência (separar_ferias)
+        competencia: Data da competência
+
+    Returns:
+        Tupla (nova base consolidada, EstatisticasProrrateio)
+    """
+    inicio_execucao = time.perf_counter()
+    estatisticas = EstatisticasProrrateio(competencia=competencia)
+    if df_consolidado.empty:
+        return df_consolidado, estatisticas
+
+    df = df_consolidado.reset_index(drop=True).copy()
+    inicio, fim = periodo_competencia(competencia)
+    inicio_d, fim_d = np.datetime64(inicio.date(), 'D'), np.datetime64(fim.date(), 'D')
+    matriculas = df['Matricula'].astype(str)
+    sindicatos = df['Sindicato do Colaborador'].astype(str)
+
+    # UF por sindicato distinto (poucos valores) e dias do mês completo por linha
+    ufs = sindicatos.map({s: uf_da_regiao(s) for s in sindicatos.unique()}).to_numpy(dtype=object)
+    dias_base = valor_por_substring(sindicatos, dias_por_sindicato, dias_uteis_padrao)
+
+    inicio_elegivel = np.full(len(df), inicio_d)
+    fim_elegivel = np.full(len(df), fim_d)
+
+    admitidos = np.zeros(len(df), dtype=bool)
+    if df_admissoes is not None and 'MATRICULA' in df_admissoes.columns:
+        admissao = matriculas.map(_por_matricula(df_admissoes, df_admissoes['Admissão'])).to_numpy(dtype='datetime64[D]')
+        admitidos = ~np.isnat(admissao) & (admissao >= inicio_d) & (admissao <= fim_d)
+        inicio_elegivel[admitidos] = admissao[admitidos]
+
+    desligados = np.zeros(len(df), dtype=bool)
+    if df_desligados is not None and 'MATRICULA' in df_desligados.columns:
+        demissao = matriculas.map(_por_matricula(df_desligados, df_desligados['DATA DEMISSÃO'])).to_numpy(dtype='datetime64[D]')
+        desligados = ~np.isnat(demissao) & (demissao >= inicio_d) & (demissao < fim_d)
+        fim_elegivel[desligados] = demissao[desligados]
+
+    ferias_uteis = _dias_uteis_ferias(df_ferias_parciais, matriculas, ufs, inicio, fim)
+    com_ferias = ferias_uteis > 0
+
+    # Uma contagem vetorizada (por UF) só para quem não tem o mês completo
+    parcial = admitidos | desligados | com_ferias
+    dias = dias_base.copy()
+    if parcial.any():
+        uteis_mes = dias_uteis_por_regiao(ufs[parcial], inicio_d, fim_d)
+        uteis_elegiveis = dias_uteis_por_regiao(ufs[parcial], inicio_elegivel[parcial], fim_elegivel[parcial])
+        perdidos = (uteis_mes - uteis_elegiveis) + ferias_uteis[parcial]
+        dias[parcial] = np.clip(dias_base[parcial] - perdidos, 0, None)
+
+    df['Dias'] = dias.astype(np.int64)
+    df['TOTAL'] = df['VALOR DIÁRIO VR'].astype(float) * df['Dias']
+    df['Custo empresa'] = df['TOTAL'] * PERCENTUAL_EMPRESA
+    df['Desconto profissional'] = df['TOTAL'] * PERCENTUAL_FUNCIONARIO
+
+    # Observações: período efetivo e férias descontadas
+    obs = df['OBS GERAL'].fillna('').astype(str).to_numpy(dtype=object)
+    dias_texto = df['Dias'].astype(str).to_numpy(dtype=object)
+    if admitidos.any():
+        datas = pd.to_datetime(inicio_elegivel[admitidos]).strftime('%d/%m/%Y').to_numpy(dtype=object)
+        obs[admitidos] = 'Admitido em ' + datas + ' - Proporcional (' + dias_texto[admitidos] + ' dias úteis)'
+    if desligados.any():
+        datas = pd.to_datetime(fim_elegivel[desligados]).strftime('%d/%m/%Y').to_numpy(dtype=object)
+        texto = 'Desligado em ' + datas + ' - Proporcional (' + dias_texto[desligados] + ' dias úteis)'
+        obs[desligados] = np.where(admitidos[desligados], obs[desligados] + '; ' + texto, texto)
+    if com_ferias.any():
+        texto = 'Férias: ' + ferias_uteis[com_ferias].astype(str).astype(object) + ' dia(s) útil(eis) descontado(s)'
+        obs[com_ferias] = np.where(obs[com_ferias] != '', obs[com_ferias] + '; ' + texto, texto)
+    df['OBS GERAL'] = obs
+
+    estatisticas.prorrateados = int(parcial.sum())
+    estatisticas.admissoes = int(admitidos.sum())
+    estatisticas.desligamentos = int(desligados.sum())
+    estatisticas.ferias_parciais = int(com_ferias.sum())
+    estatisticas.dias_descontados = int((dias_base - dias).sum())
+    estatisticas.tempo = round(time.perf_counter() - inicio_execucao, 4)
+    return df, estatisticas
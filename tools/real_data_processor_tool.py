@@ -8,15 +8,78 @@ from crewai.tools import tool
 import pandas as pd
 import numpy as np
 from pathlib import Path
-from typing import Dict, List, Tuple, Optional
+from typing import Callable, Dict, List, Tuple, Optional
 import logging
 
+from competencia import COMPETENCIA_REFERENCIA, Competencia
+from workbook_loader import ARQUIVOS_ENTRADA, DatasetEntrada, carregar_planilhas
+from streaming_ativos_reader import (
+    MEMORIA_LOTE_MB,
+    ResumoAtivos,
+    iterar_lotes_planilha,
+    resolver_modo_streaming
+)
+from holiday_calendar import dias_uteis_mes, uf_da_regiao
+from incremental_state import EstadoIncremental, incremental_habilitado
+from metrics import PROCESSAMENTOS, medir_tool
+from date_column_parser import converter_coluna_datas
+from consolidated_artifact import salvar_base_consolidada
+from exclusion_builder import ConstrutorExclusoes, contar_multiplos_motivos
+from excel_output_writer import escrever_planilha, tabela_validacoes, tabelas_auditoria
+from proration_engine import (
+    MODO_DIAS_UTEIS,
+    aplicar_prorrateio_dias_uteis,
+    resolver_modo_prorrateio,
+    separar_ferias
+)
+from processing_result import CronometroEtapas, ResultadoProcessamento, validar_base_consolidada
+from session_context import diretorio_saida as diretorio_saida_sessao
+from vr_calculation_engine import (
+    MOTOR_COMPARAR,
+    MOTOR_LEGADO,
+    MOTOR_VETORIZADO,
+    COLUNAS_VR_MENSAL,
+    COMPETENCIA_PADRAO,
+    DIA_LIMITE_DESLIGAMENTO,
+    REGRA_DIA_DO_MES,
+    REGRA_MES_COMPETENCIA,
+    calcular_base_consolidada,
+    comparar_bases_consolidadas,
+    mascara_desligados_anteriores,
+    mascara_desligados_excluidos,
+    mascara_desligados_vr_integral,
+    matriculas_como_texto,
+    resolver_motor_calculo,
+    resolver_regra_desligamento
+)
+
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Valor diário por trecho do nome do sindicato
+VALOR_POR_SINDICATO = {
+    'SINDPD SP': 37.50,
+    'SINDPPD RS': 35.00,
+    'SITEPD PR': 35.00,
+    'SINDPD RJ': 35.00
+}
+
+# Dias úteis por sindicato no modelo de 05/2025 (demais competências: calendário da UF)
+DIAS_POR_SINDICATO = {
+    'SINDPD SP': 22,
+    'SINDPPD RS': 21,
+    'SITEPD PR': 22,
+    'SINDPD RJ': 21
+}
+
 def validar_e_corrigir_data(data_str):
-    """Valida e corrige datas inconsistentes ou quebradas"""
+    """
+    Valida e corrige uma data isolada (caminho valor a valor).
+
+    As colunas inteiras são convertidas por converter_coluna_datas; esta função
+    permanece para o motor legado e para valores avulsos.
+    """
     if pd.isna(data_str) or data_str == '' or str(data_str).strip() == '':
         logger.warning(f"Data vazia encontrada, usando data padrão")
         return pd.Timestamp('2024-05-01')  # Data padrão
@@ -49,7 +112,143 @@ def validar_e_corrigir_data(data_str):
             logger.warning(f"Data inválida encontrada: '{data_str}', erro: {e}. Usando data padrão.")
             return pd.Timestamp('2024-05-01')  # Data padrão em caso de erro
 
+def _notificar_progresso(progresso: Optional[Callable[[str, int], None]], etapa: str, percentual: int):
+    """Repassa a etapa ao callback de progresso; falhas no callback não interrompem o processamento"""
+    if progresso is None:
+        return
+    try:
+        progresso(etapa, percentual)
+    except Exception as e:
+        logger.warning(f"Falha ao notificar progresso ({etapa}): {e}")
+
+
+def _secao_ativos(nome_arquivo: str, resumo: ResumoAtivos) -> str:
+    """Seção do relatório com o resumo da planilha ATIVOS"""
+    secao = f"👥 FUNCIONÁRIOS ATIVOS:\n"
+    secao += f"   📁 Arquivo: {nome_arquivo}\n"
+    secao += f"   👤 Total de funcionários: {resumo.total}\n"
+    secao += f"   📋 Colunas: {resumo.colunas}\n"
+
+    # Verificar sindicatos
+    if 'Sindicato' in resumo.colunas:
+        sindicatos_count = resumo.sindicatos_ordenados()
+        secao += f"   🏢 Sindicatos encontrados: {len(sindicatos_count)}\n"
+        for sind, count in sindicatos_count.head(5).items():
+            secao += f"      - {sind[:60]}... ({count} funcionários)\n"
+
+    secao += f"\n"
+    return secao
+
+
+def _secao_diretores(resumo: ResumoAtivos) -> str:
+    """Seção do relatório com os cargos de diretoria (coluna Cargo/CARGO)"""
+    if not resumo.possui_coluna_cargo:
+        return ""
+    secao = f"👔 CARGOS DE DIRETORES:\n"
+    secao += f"   👤 Diretores encontrados: {resumo.diretores_cargo}\n"
+    secao += f"\n"
+    return secao
+
+
+def _montar_base_consolidada_legado(df_ativos, excluidos, df_admissoes, df_desligados,
+                                    valor_por_sindicato, dias_por_sindicato,
+                                    valor_diario_medio, dias_uteis_medio,
+                                    competencia=COMPETENCIA_PADRAO, regra_desligamento=REGRA_DIA_DO_MES):
+    """Monta a base consolidada funcionário a funcionário (caminho original, usado para comparação)"""
+    competencia = Competencia.de_texto(competencia)
+    mes_anterior = competencia.anterior
+    base_consolidada = []
+
+    # Processar funcionários ativos elegíveis
+    for _, funcionario in df_ativos.iterrows():
+        matricula = str(funcionario['MATRICULA']) if pd.notna(funcionario['MATRICULA']) else ''
+
+        # Pular se está na lista de excluídos
+        if matricula in excluidos:
+            continue
+
+        # Verificar se é diretor
+        if 'TITULO DO CARGO' in funcionario and pd.notna(funcionario['TITULO DO CARGO']):
+            if 'DIRETOR' in str(funcionario['TITULO DO CARGO']).upper():
+                continue
+
+        sindicato = funcionario['Sindicato'] if pd.notna(funcionario['Sindicato']) else ''
+
+        # Determinar valor diário e dias úteis
+        valor_diario = valor_diario_medio  # Padrão
+        dias_uteis_func = dias_uteis_medio  # Padrão
+        data_admissao = '2024-08-01'  # Padrão
+        obs_geral = ''
+
+        # Buscar valor específico do sindicato
+        for sind_key, valor in valor_por_sindicato.items():
+            if sind_key in sindicato:
+                valor_diario = valor
+                break
+
+        # Buscar dias úteis específicos do sindicato
+        for sind_key, dias in dias_por_sindicato.items():
+            if sind_key in sindicato:
+                dias_uteis_func = dias
+                break
+
+        # Verificar se é admitido no mês anterior ou no mês da competência (cálculo proporcional)
+        if df_admissoes is not None and 'MATRICULA' in df_admissoes.columns and matricula in df_admissoes['MATRICULA'].astype(str).values:
+            adm_info = df_admissoes[df_admissoes['MATRICULA'].astype(str) == matricula].iloc[0]
+            data_admissao_dt = validar_e_corrigir_data(adm_info['Admissão'])
+            data_admissao = data_admissao_dt.strftime('%Y-%m-%d')
+
+            # Calcular dias proporcionais (dias corridos do mês da competência)
+            dia_admissao = data_admissao_dt.day
+            # Regra 'dia' (modelo 05/2025): só o mês da admissão; regra 'competencia': mês e ano
+            if regra_desligamento == REGRA_MES_COMPETENCIA:
+                mes_admissao = (data_admissao_dt.year, data_admissao_dt.month)
+                mes_anterior_alvo = (mes_anterior.ano, mes_anterior.mes)
+                mes_competencia_alvo = (competencia.ano, competencia.mes)
+            else:
+                mes_admissao = data_admissao_dt.month
+                mes_anterior_alvo = mes_anterior.mes
+                mes_competencia_alvo = competencia.mes
+            if mes_admissao == mes_anterior_alvo:  # Admitido no mês anterior
+                dias_uteis_func = dias_uteis_func  # Mês completo
+                obs_geral = f'Admitido em {data_admissao_dt.strftime("%d/%m/%Y")}'
+            elif mes_admissao == mes_competencia_alvo:  # Admitido no mês
+                dias_restantes_mes = competencia.dias_no_mes - dia_admissao + 1
+                proporcao = dias_restantes_mes / competencia.dias_no_mes
+                dias_uteis_func = int(dias_uteis_func * proporcao)
+                obs_geral = f'Admitido em {data_admissao_dt.strftime("%d/%m/%Y")} - Proporcional'
+
+        # Verificar se é desligado após dia 15 (recebe VR integral)
+        if df_desligados is not None and 'MATRICULA' in df_desligados.columns and matricula in df_desligados['MATRICULA'].astype(str).values:
+            desl_info = df_desligados[df_desligados['MATRICULA'].astype(str) == matricula].iloc[0]
+            data_demissao = desl_info['DATA DEMISSÃO']
+            no_mes_competencia = (data_demissao.year, data_demissao.month) == (competencia.ano, competencia.mes)
+            if (no_mes_competencia or regra_desligamento != REGRA_MES_COMPETENCIA) and desl_info['DIA'] > DIA_LIMITE_DESLIGAMENTO:
+                obs_geral = f'Desligado em {desl_info["DATA DEMISSÃO"].strftime("%d/%m/%Y")} - VR Integral (desconto na rescisão)'
+
+        # Calcular valores
+        total_vr = valor_diario * dias_uteis_func
+        custo_empresa = total_vr * 0.80
+        desconto_funcionario = total_vr * 0.20
+
+        base_consolidada.append({
+            'Matricula': matricula,
+            'Admissão': data_admissao,
+            'Sindicato do Colaborador': sindicato,
+            'Competência': competencia.data,
+            'Dias': int(dias_uteis_func),
+            'VALOR DIÁRIO VR': valor_diario,
+            'TOTAL': total_vr,
+            'Custo empresa': custo_empresa,
+            'Desconto profissional': desconto_funcionario,
+            'OBS GERAL': obs_geral
+        })
+
+    return pd.DataFrame(base_consolidada)
+
+
 @tool("real_data_processor_tool")
+@medir_tool
 def real_data_processor_tool(base_directory: str = "temp_uploads") -> str:
     """
     Processa os dados REAIS das planilhas de funcionários e calcula valores corretos de VR.
@@ -64,17 +263,68 @@ def real_data_processor_tool(base_directory: str = "temp_uploads") -> str:
         String com o resultado completo do processamento de dados reais,
         incluindo contagem de funcionários e valores calculados.
     """
+    return processar_dados_reais(base_directory)
+
+
+def processar_dados_reais(base_directory: str = "temp_uploads", motor_calculo: Optional[str] = None,
+                          progresso: Optional[Callable[[str, int], None]] = None,
+                          diretorio_saida: Optional[str] = None) -> str:
+    """
+    Executa o processamento de dados reais e devolve o relatório em texto (real_data_processor_tool).
+    Para contagens, totais e arquivos use executar_processamento_real.
+    """
+    return executar_processamento_real(base_directory, motor_calculo, progresso, diretorio_saida).relatorio
+
+
+def executar_processamento_real(base_directory: str = "temp_uploads", motor_calculo: Optional[str] = None,
+                                progresso: Optional[Callable[[str, int], None]] = None,
+                                diretorio_saida: Optional[str] = None,
+                                modo_prorrateio: Optional[str] = None,
+                                competencia: Optional[str] = None,
+                                dataset: Optional[DatasetEntrada] = None,
+                                regra_desligamento: Optional[str] = None) -> ResultadoProcessamento:
+    """
+    Executa o processamento de dados reais (núcleo da real_data_processor_tool).
+
+    Args:
+        base_directory: Diretório onde estão os arquivos Excel
+        motor_calculo: 'vetorizado', 'legado' ou 'comparar' (padrão: FINACREW_MOTOR_VR ou 'vetorizado')
+        progresso: Callback opcional progresso(etapa, percentual) chamado a cada etapa
+        diretorio_saida: Onde gravar planilhas e artefato (padrão: saída da sessão ativa ou o diretório atual)
+        modo_prorrateio: 'calendario' ou 'dias_uteis' (padrão: FINACREW_PRORRATEIO ou 'calendario')
+        competencia: Mês de referência 'MM.AAAA' (padrão: 05.2025); define nomes de saída, mês anterior
+                     das admissões, regra do dia 15 e calendário do prorrateio
+        dataset: Planilhas já carregadas (modo lote: uma leitura para várias competências)
+        regra_desligamento: 'dia' (regra do modelo 05/2025: só o dia da demissão) ou 'competencia'
+                            (mês da demissão comparado à competência e admitidos depois dela excluídos);
+                            padrão: FINACREW_REGRA_DESLIGAMENTO ou 'dia'
+
+    Returns:
+        ResultadoProcessamento com contagens, totais da planilha gerada, caminhos, validações,
+        tempos por etapa e o relatório em texto (relatorio)
+    """
+    competencia = Competencia.de_texto(competencia or COMPETENCIA_REFERENCIA)
+    regra_desligamento = resolver_regra_desligamento(regra_desligamento)
+    resultado = ResultadoProcessamento(diretorio_entrada=str(base_directory), competencia=competencia.rotulo)
+    cronometro = CronometroEtapas()
+    erro_etapa = None
+
+    def etapa(nome: str, percentual: int):
+        cronometro.iniciar(nome)
+        _notificar_progresso(progresso, nome, percentual)
+
     try:
         print(f"🔄 Processando dados REAIS das planilhas em: {base_directory}")
 
         base_path = Path(base_directory)
         if not base_path.exists():
-            return f"❌ Diretório não encontrado: {base_directory}"
+            return resultado.falha(f"❌ Diretório não encontrado: {base_directory}")
 
         result_summary = f"""
 📊 PROCESSAMENTO DE DADOS REAIS - FINACREW
 
 📂 Diretório processado: {base_directory}
+📆 Competência: {competencia.rotulo}
 🕐 Data/Hora: {pd.Timestamp.now().strftime('%d/%m/%Y %H:%M:%S')}
 
 """
@@ -82,61 +332,91 @@ def real_data_processor_tool(base_directory: str = "temp_uploads") -> str:
         # 1. Carregar funcionários ativos
         ativos_file = base_path / "ATIVOS.xlsx"
         if not ativos_file.exists():
-            return f"❌ Arquivo ATIVOS.xlsx não encontrado em {base_directory}"
-
-        df_ativos = pd.read_excel(ativos_file)
-        total_ativos = len(df_ativos)
-
-        result_summary += f"👥 FUNCIONÁRIOS ATIVOS:\n"
-        result_summary += f"   📁 Arquivo: {ativos_file.name}\n"
-        result_summary += f"   👤 Total de funcionários: {total_ativos}\n"
-        result_summary += f"   📋 Colunas: {list(df_ativos.columns)}\n"
-
-        # Verificar sindicatos
-        if 'Sindicato' in df_ativos.columns:
-            sindicatos_count = df_ativos['Sindicato'].value_counts()
-            result_summary += f"   🏢 Sindicatos encontrados: {len(sindicatos_count)}\n"
-            for sind, count in sindicatos_count.head(5).items():
-                result_summary += f"      - {sind[:60]}... ({count} funcionários)\n"
-
+            return resultado.falha(f"❌ Arquivo ATIVOS.xlsx não encontrado em {base_directory}")
+
+        etapa('Carregando planilhas', 5)
+
+        # ATIVOS muito grandes são lidos em lotes na consolidação (memória limitada)
+        modo_streaming = resolver_modo_streaming(ativos_file)
+        resumo_ativos = ResumoAtivos()
+
+        # Ler cada planilha de entrada uma única vez, em paralelo (no lote, já vem carregado)
+        if dataset is None:
+            dataset = carregar_planilhas(
+                base_directory,
+                nomes=[nome for nome in ARQUIVOS_ENTRADA if not (modo_streaming and nome == 'ATIVOS')]
+            )
+        df_ativos = None if modo_streaming else dataset.get('ATIVOS')
+        resultado.modo_streaming = modo_streaming
+        resultado.cache_planilhas = {
+            'hits': dataset.cache_hits,
+            'misses': dataset.cache_misses,
+            'arquivos': dataset.acertos_cache
+        }
+        etapa('Analisando planilhas', 25)
+        result_summary += f"📥 CARREGAMENTO DAS PLANILHAS:\n"
+        result_summary += f"   📚 Arquivos lidos: {len(dataset.planilhas)} (uma leitura por arquivo, via {dataset.executor})\n"
+        result_summary += f"   ⏱️ Tempo total de leitura: {dataset.tempo_total:.2f}s\n"
+        result_summary += f"   🗃️ Cache de planilhas: {dataset.cache_hits} hit(s), {dataset.cache_misses} miss(es)\n"
         result_summary += f"\n"
 
+        if modo_streaming:
+            tamanho_mb = ativos_file.stat().st_size / (1024 * 1024)
+            result_summary += f"👥 FUNCIONÁRIOS ATIVOS:\n"
+            result_summary += f"   📁 Arquivo: {ativos_file.name} ({tamanho_mb:.1f} MB)\n"
+            result_summary += f"   🌊 Modo streaming: leitura em lotes durante a consolidação (~{MEMORIA_LOTE_MB:.0f} MB por lote)\n"
+            result_summary += f"\n"
+        else:
+            resumo_ativos.acumular(df_ativos)
+            result_summary += _secao_ativos(ativos_file.name, resumo_ativos)
+
         # 2. Carregar funcionários em férias
         ferias_file = base_path / "FERIAS.xlsx"
         funcionarios_ferias = 0
-        if ferias_file.exists():
-            df_ferias = pd.read_excel(ferias_file)
+        if dataset.existe('FERIAS'):
+            df_ferias = dataset.get('FERIAS')
             funcionarios_ferias = len(df_ferias)
             result_summary += f"🏖️ FUNCIONÁRIOS EM FÉRIAS:\n"
             result_summary += f"   📁 Arquivo: {ferias_file.name}\n"
             result_summary += f"   👤 Funcionários em férias: {funcionarios_ferias}\n"
             result_summary += f"\n"
 
+        # Relatórios compactos das colunas de datas convertidas
+        relatorios_datas = []
+
         # 3. Carregar funcionários desligados e aplicar regra do dia 15
         desligados_file = base_path / "DESLIGADOS.xlsx"
         funcionarios_desligados_total = 0
         funcionarios_desligados_ate_15 = 0
         funcionarios_desligados_apos_15 = 0
+        funcionarios_desligados_anteriores = 0
         df_desligados = None
-        if desligados_file.exists():
-            df_desligados = pd.read_excel(desligados_file)
+        if dataset.existe('DESLIGADOS'):
+            df_desligados = dataset.get('DESLIGADOS').copy()
             funcionarios_desligados_total = len(df_desligados)
 
-            # Aplicar regra do dia 15 com validação robusta de datas
-            df_desligados['DATA DEMISSÃO'] = df_desligados['DATA DEMISSÃO'].apply(validar_e_corrigir_data)
+            # Aplicar regra do dia 15 com validação robusta de datas (conversão da coluna em lote)
+            df_desligados['DATA DEMISSÃO'], relatorio_datas = converter_coluna_datas(df_desligados['DATA DEMISSÃO'])
+            relatorios_datas.append(relatorio_datas)
             df_desligados['DIA'] = df_desligados['DATA DEMISSÃO'].dt.day
 
-            # Separar por regra do dia 15
-            ate_dia_15 = df_desligados[df_desligados['DIA'] <= 15]
-            apos_dia_15 = df_desligados[df_desligados['DIA'] > 15]
+            # Separar por regra do dia 15 (na regra 'competencia', desligados em mês anterior também não recebem)
+            excluidos_desligamento = mascara_desligados_excluidos(df_desligados, competencia.data, regra_desligamento)
+            desligados_anteriores = mascara_desligados_anteriores(df_desligados, competencia.data, regra_desligamento)
+            ate_dia_15 = df_desligados[excluidos_desligamento & ~desligados_anteriores]
+            antes_da_competencia = df_desligados[desligados_anteriores]
+            apos_dia_15 = df_desligados[mascara_desligados_vr_integral(df_desligados, competencia.data, regra_desligamento)]
 
             funcionarios_desligados_ate_15 = len(ate_dia_15)
             funcionarios_desligados_apos_15 = len(apos_dia_15)
+            funcionarios_desligados_anteriores = len(antes_da_competencia)
 
             result_summary += f"🚪 FUNCIONÁRIOS DESLIGADOS (REGRA DIA 15 - CONFORME VALIDAÇÕES):\n"
             result_summary += f"   📁 Arquivo: {desligados_file.name}\n"
             result_summary += f"   👤 Total desligados: {funcionarios_desligados_total}\n"
             result_summary += f"   ➖ Desligados até dia 15: {funcionarios_desligados_ate_15} (NÃO recebem VR)\n"
+            if regra_desligamento == REGRA_MES_COMPETENCIA:
+                result_summary += f"   ➖ Desligados antes de {competencia.rotulo}: {funcionarios_desligados_anteriores} (NÃO recebem VR)\n"
             result_summary += f"   ✅ Desligados após dia 15: {funcionarios_desligados_apos_15} (recebem VR INTEGRAL - desconto na rescisão)\n"
             result_summary += f"\n"
 
@@ -146,8 +426,8 @@ def real_data_processor_tool(base_directory: str = "temp_uploads") -> str:
         valores_vr = {}
         dias_uteis_por_sindicato = {}
 
-        if valores_file.exists():
-            df_valores = pd.read_excel(valores_file)
+        if dataset.existe('SINDICATO_VALOR'):
+            df_valores = dataset.get('SINDICATO_VALOR')
             result_summary += f"💰 VALORES POR SINDICATO:\n"
             result_summary += f"   📁 Arquivo: {valores_file.name}\n"
             result_summary += f"   📊 Registros de valores: {len(df_valores)}\n"
@@ -158,8 +438,8 @@ def real_data_processor_tool(base_directory: str = "temp_uploads") -> str:
                 valor_medio = df_valores[valor_col].mean()
                 result_summary += f"   💵 Valor médio VR: R$ {valor_medio:.2f}\n"
 
-        if dias_uteis_file.exists():
-            df_dias_uteis = pd.read_excel(dias_uteis_file)
+        if dataset.existe('DIAS_UTEIS'):
+            df_dias_uteis = dataset.get('DIAS_UTEIS')
             result_summary += f"📅 DIAS ÚTEIS POR SINDICATO:\n"
             result_summary += f"   📁 Arquivo: {dias_uteis_file.name}\n"
             result_summary += f"   📊 Registros: {len(df_dias_uteis)}\n"
@@ -187,8 +467,8 @@ def real_data_processor_tool(base_directory: str = "temp_uploads") -> str:
         # 4. Carregar afastamentos e outras exclusões
         afastamentos_file = base_path / "AFASTAMENTOS.xlsx"
         funcionarios_afastados = 0
-        if afastamentos_file.exists():
-            df_afastamentos = pd.read_excel(afastamentos_file)
+        if dataset.existe('AFASTAMENTOS'):
+            df_afastamentos = dataset.get('AFASTAMENTOS')
             funcionarios_afastados = len(df_afastamentos)
             result_summary += f"🚫 FUNCIONÁRIOS AFASTADOS:\n"
             result_summary += f"   📁 Arquivo: {afastamentos_file.name}\n"
@@ -197,8 +477,8 @@ def real_data_processor_tool(base_directory: str = "temp_uploads") -> str:
 
         exterior_file = base_path / "EXTERIOR.xlsx"
         funcionarios_exterior = 0
-        if exterior_file.exists():
-            df_exterior = pd.read_excel(exterior_file)
+        if dataset.existe('EXTERIOR'):
+            df_exterior = dataset.get('EXTERIOR')
             funcionarios_exterior = len(df_exterior)
             result_summary += f"🌍 FUNCIONÁRIOS NO EXTERIOR:\n"
             result_summary += f"   📁 Arquivo: {exterior_file.name}\n"
@@ -211,16 +491,16 @@ def real_data_processor_tool(base_directory: str = "temp_uploads") -> str:
         funcionarios_estagiarios = 0
         funcionarios_aprendizes = 0
 
-        if estagiarios_file.exists():
-            df_estagiarios = pd.read_excel(estagiarios_file)
+        if dataset.existe('ESTAGIO'):
+            df_estagiarios = dataset.get('ESTAGIO')
             funcionarios_estagiarios = len(df_estagiarios)
             result_summary += f"🎓 ESTAGIÁRIOS:\n"
             result_summary += f"   📁 Arquivo: {estagiarios_file.name}\n"
             result_summary += f"   👤 Estagiários: {funcionarios_estagiarios}\n"
             result_summary += f"\n"
 
-        if aprendizes_file.exists():
-            df_aprendizes = pd.read_excel(aprendizes_file)
+        if dataset.existe('APRENDIZ'):
+            df_aprendizes = dataset.get('APRENDIZ')
             funcionarios_aprendizes = len(df_aprendizes)
             result_summary += f"📚 APRENDIZES:\n"
             result_summary += f"   📁 Arquivo: {aprendizes_file.name}\n"
@@ -228,29 +508,31 @@ def real_data_processor_tool(base_directory: str = "temp_uploads") -> str:
             result_summary += f"\n"
 
         # 6. Verificar cargos de diretores em ATIVOS.xlsx
-        funcionarios_diretores = 0
-        if 'Cargo' in df_ativos.columns or 'CARGO' in df_ativos.columns:
-            cargo_col = 'Cargo' if 'Cargo' in df_ativos.columns else 'CARGO'
-            diretores_mask = df_ativos[cargo_col].str.contains('DIRETOR|DIRETORA', case=False, na=False)
-            funcionarios_diretores = diretores_mask.sum()
-            result_summary += f"👔 CARGOS DE DIRETORES:\n"
-            result_summary += f"   👤 Diretores encontrados: {funcionarios_diretores}\n"
-            result_summary += f"\n"
+        if not modo_streaming:
+            result_summary += _secao_diretores(resumo_ativos)
 
         # 4. Carregar admissões de abril para cálculo proporcional
         admissoes_file = base_path / "ADMISSAO_ABRIL.xlsx"
         df_admissoes = None
         funcionarios_admitidos_abril = 0
-        if admissoes_file.exists():
-            df_admissoes = pd.read_excel(admissoes_file)
+        if dataset.existe('ADMISSAO_ABRIL'):
+            df_admissoes = dataset.get('ADMISSAO_ABRIL').copy()
             funcionarios_admitidos_abril = len(df_admissoes)
             # Aplicar validação robusta de datas também nas admissões
-            df_admissoes['Admissão'] = df_admissoes['Admissão'].apply(validar_e_corrigir_data)
+            df_admissoes['Admissão'], relatorio_datas = converter_coluna_datas(df_admissoes['Admissão'])
+            relatorios_datas.append(relatorio_datas)
             result_summary += f"📅 ADMISSÕES ABRIL (CÁLCULO PROPORCIONAL):\n"
             result_summary += f"   📁 Arquivo: {admissoes_file.name}\n"
             result_summary += f"   👤 Funcionários admitidos em abril: {funcionarios_admitidos_abril}\n"
             result_summary += f"\n"
 
+        if relatorios_datas:
+            result_summary += f"🗓️ VALIDAÇÃO DE DATAS:\n"
+            for relatorio_datas in relatorios_datas:
+                result_summary += f"   - {relatorio_datas.resumo()}\n"
+            result_summary += f"\n"
+        resultado.validacao_datas = [r.to_dict() for r in relatorios_datas]
+
         # 7. Funcionários elegíveis será calculado após processamento da planilha principal
         # para garantir consistência entre o número reportado e o real na planilha
 
@@ -268,293 +550,283 @@ def real_data_processor_tool(base_directory: str = "temp_uploads") -> str:
 
         # 9. GERAR PLANILHA CONSOLIDADA FINAL conforme modelo PDF
         try:
+            etapa('Aplicando exclusões', 45)
             print("📊 Gerando planilha consolidada final...")
 
-            # Criar base consolidada com funcionários elegíveis
-            base_consolidada = []
-
-            # Mapear valores por sindicato
-            valor_por_sindicato = {
-                'SINDPD SP': 37.50,
-                'SINDPPD RS': 35.00,
-                'SITEPD PR': 35.00,
-                'SINDPD RJ': 35.00
-            }
-
-            # Mapear dias úteis por sindicato
-            dias_por_sindicato = {
-                'SINDPD SP': 22,
-                'SINDPPD RS': 21,
-                'SITEPD PR': 22,
-                'SINDPD RJ': 21
-            }
-
-            # Criar lista detalhada de funcionários excluídos para auditoria
-            lista_exclusoes = []
-            excluidos = set()
-
-            # Adicionar funcionários em férias
-            if ferias_file.exists():
-                df_ferias_temp = pd.read_excel(ferias_file)
-                if 'MATRICULA' in df_ferias_temp.columns:
-                    for _, row in df_ferias_temp.iterrows():
-                        matricula = str(row['MATRICULA']) if pd.notna(row['MATRICULA']) else ''
-                        if matricula:
-                            nome = row.get('Nome', row.get('NOME', 'N/A'))
-                            lista_exclusoes.append({
-                                'Matricula': matricula,
-                                'Nome': nome,
-                                'Motivo_Exclusao': 'FÉRIAS',
-                                'Detalhes': f"Período: {row.get('Período', 'N/A')}",
-                                'Justificativa': 'Funcionário em período de férias durante a competência 05/2025. Conforme política da empresa, funcionários em férias não recebem VR no período.',
-                                'Arquivo_Origem': 'FERIAS.xlsx'
-                            })
-                            excluidos.add(matricula)
+            # Mapear valores e dias úteis por sindicato
+            valor_por_sindicato = dict(VALOR_POR_SINDICATO)
+            dias_por_sindicato = dict(DIAS_POR_SINDICATO)
+            if competencia != COMPETENCIA_REFERENCIA:
+                dias_por_sindicato = {
+                    sindicato: dias_uteis_mes(competencia.ano, competencia.mes, uf_da_regiao(sindicato))
+                    for sindicato in dias_por_sindicato
+                }
+                result_summary += f"📆 Dias úteis {competencia.rotulo} (calendário por UF): " + ", ".join(
+                    f"{sindicato} {dias}" for sindicato, dias in dias_por_sindicato.items()
+                ) + "\n\n"
+
+            # Montar exclusões para auditoria em blocos colunares (um motivo principal por matrícula)
+            construtor_exclusoes = ConstrutorExclusoes(competencia)
+            excluidos = construtor_exclusoes.matriculas
+
+            # Adicionar funcionários em férias (no prorrateio por dias úteis, só as que cobrem o mês inteiro)
+            modo_prorrateio = resolver_modo_prorrateio(modo_prorrateio)
+            resultado.prorrateio = {'modo': modo_prorrateio}
+            df_ferias_parciais = None
+            if dataset.existe('FERIAS'):
+                df_ferias_excluidas = dataset.get('FERIAS')
+                if modo_prorrateio == MODO_DIAS_UTEIS:
+                    df_ferias_excluidas, df_ferias_parciais = separar_ferias(df_ferias_excluidas, competencia.data)
+                construtor_exclusoes.adicionar_ferias(df_ferias_excluidas)
 
             # Adicionar APENAS desligados até dia 15 (desligados após dia 15 recebem VR integral)
             if df_desligados is not None and 'MATRICULA' in df_desligados.columns:
-                desligados_ate_15 = df_desligados[df_desligados['DIA'] <= 15]
-                for _, row in desligados_ate_15.iterrows():
-                    matricula = str(row['MATRICULA']) if pd.notna(row['MATRICULA']) else ''
-                    if matricula:
-                        nome = row.get('Nome', row.get('NOME', 'N/A'))
-                        data_demissao = row['DATA DEMISSÃO'].strftime('%d/%m/%Y') if pd.notna(row['DATA DEMISSÃO']) else 'N/A'
-                        lista_exclusoes.append({
-                            'Matricula': matricula,
-                            'Nome': nome,
-                            'Motivo_Exclusao': 'DESLIGADO ATÉ DIA 15',
-                            'Detalhes': f"Data demissão: {data_demissao} (dia {row['DIA']})",
-                            'Justificativa': f'Funcionário desligado em {data_demissao}. Conforme política da empresa, funcionários com comunicação de desligamento até o dia 15 não recebem VR na competência.',
-                            'Arquivo_Origem': 'DESLIGADOS.xlsx'
-                        })
-                        excluidos.add(matricula)
+                construtor_exclusoes.adicionar_desligados(ate_dia_15)
+                construtor_exclusoes.adicionar_desligados(antes_da_competencia, motivo='DESLIGADO ANTES DA COMPETÊNCIA')
+
+            # Regra 'competencia': admitidos depois da competência (lote com meses anteriores à planilha de admissões)
+            if regra_desligamento == REGRA_MES_COMPETENCIA and df_admissoes is not None and 'MATRICULA' in df_admissoes.columns:
+                construtor_exclusoes.adicionar_admissoes_posteriores(df_admissoes)
 
             # Adicionar outras exclusões com detalhes
             exclusoes_info = [
-                (afastamentos_file, 'AFASTAMENTOS/LICENÇAS', 'AFASTAMENTOS.xlsx'),
-                (exterior_file, 'FUNCIONÁRIO NO EXTERIOR', 'EXTERIOR.xlsx'),
-                (estagiarios_file, 'ESTAGIÁRIO', 'ESTAGIO.xlsx'),
-                (aprendizes_file, 'APRENDIZ', 'APRENDIZ.xlsx')
+                ('AFASTAMENTOS', 'AFASTAMENTOS/LICENÇAS', 'AFASTAMENTOS.xlsx'),
+                ('EXTERIOR', 'FUNCIONÁRIO NO EXTERIOR', 'EXTERIOR.xlsx'),
+                ('ESTAGIO', 'ESTAGIÁRIO', 'ESTAGIO.xlsx'),
+                ('APRENDIZ', 'APRENDIZ', 'APRENDIZ.xlsx')
             ]
-
-            # Justificativas específicas por tipo de exclusão
-            justificativas = {
-                'AFASTAMENTOS/LICENÇAS': 'Funcionário afastado por licença médica/INSS durante a competência 05/2025. Conforme legislação trabalhista, funcionários afastados não recebem benefícios da empresa.',
-                'FUNCIONÁRIO NO EXTERIOR': 'Funcionário trabalhando no exterior durante a competência 05/2025. Benefício VR não aplicável para funcionários em atividade internacional.',
-                'ESTAGIÁRIO': 'Estagiário não tem direito ao benefício VR conforme política da empresa e CLT. Modalidade de contrato não prevê este benefício.',
-                'APRENDIZ': 'Aprendiz não tem direito ao benefício VR conforme Lei do Aprendiz (Lei 10.097/2000) e política interna da empresa.'
-            }
-
-            for arquivo, motivo, nome_arquivo in exclusoes_info:
-                if arquivo.exists():
-                    df_temp = pd.read_excel(arquivo)
-                    if 'MATRICULA' in df_temp.columns:
-                        for _, row in df_temp.iterrows():
-                            matricula = str(row['MATRICULA']) if pd.notna(row['MATRICULA']) else ''
-                            if matricula:
-                                nome = row.get('Nome', row.get('NOME', 'N/A'))
-                                cargo = row.get('Cargo', row.get('CARGO', ''))
-                                detalhes = f"Cargo: {cargo}" if cargo else 'N/A'
-                                lista_exclusoes.append({
-                                    'Matricula': matricula,
-                                    'Nome': nome,
-                                    'Motivo_Exclusao': motivo,
-                                    'Detalhes': detalhes,
-                                    'Justificativa': justificativas.get(motivo, 'Exclusão conforme política da empresa.'),
-                                    'Arquivo_Origem': nome_arquivo
-                                })
-                                excluidos.add(matricula)
-
-            # Verificar e adicionar diretores das planilhas ATIVAS
-            for _, funcionario in df_ativos.iterrows():
-                matricula = str(funcionario['MATRICULA']) if pd.notna(funcionario['MATRICULA']) else ''
-                if matricula and 'TITULO DO CARGO' in funcionario and pd.notna(funcionario['TITULO DO CARGO']):
-                    if 'DIRETOR' in str(funcionario['TITULO DO CARGO']).upper():
-                        nome = funcionario.get('Nome', funcionario.get('NOME', 'N/A'))
-                        lista_exclusoes.append({
-                            'Matricula': matricula,
-                            'Nome': nome,
-                            'Motivo_Exclusao': 'DIRETOR',
-                            'Detalhes': f"Cargo: {funcionario['TITULO DO CARGO']}",
-                            'Justificativa': 'Cargos de diretoria não participam do benefício VR conforme política de remuneração executiva da empresa. Diretores possuem pacote de benefícios diferenciado.',
-                            'Arquivo_Origem': 'ATIVOS.xlsx'
-                        })
-                        excluidos.add(matricula)
-
-            # Processar funcionários ativos elegíveis
-            for _, funcionario in df_ativos.iterrows():
-                matricula = str(funcionario['MATRICULA']) if pd.notna(funcionario['MATRICULA']) else ''
-
-                # Pular se está na lista de excluídos
-                if matricula in excluidos:
-                    continue
-
-                # Verificar se é diretor
-                if 'TITULO DO CARGO' in funcionario and pd.notna(funcionario['TITULO DO CARGO']):
-                    if 'DIRETOR' in str(funcionario['TITULO DO CARGO']).upper():
-                        continue
-
-                sindicato = funcionario['Sindicato'] if pd.notna(funcionario['Sindicato']) else ''
-
-                # Determinar valor diário e dias úteis
-                valor_diario = valor_diario_medio  # Padrão
-                dias_uteis_func = dias_uteis_medio  # Padrão
-                data_admissao = '2024-08-01'  # Padrão
-                obs_geral = ''
-
-                # Buscar valor específico do sindicato
-                for sind_key, valor in valor_por_sindicato.items():
-                    if sind_key in sindicato:
-                        valor_diario = valor
-                        break
-
-                # Buscar dias úteis específicos do sindicato
-                for sind_key, dias in dias_por_sindicato.items():
-                    if sind_key in sindicato:
-                        dias_uteis_func = dias
-                        break
-
-                # Verificar se é admitido em abril (cálculo proporcional)
-                if df_admissoes is not None and 'MATRICULA' in df_admissoes.columns and matricula in df_admissoes['MATRICULA'].astype(str).values:
-                    adm_info = df_admissoes[df_admissoes['MATRICULA'].astype(str) == matricula].iloc[0]
-                    data_admissao_dt = validar_e_corrigir_data(adm_info['Admissão'])
-                    data_admissao = data_admissao_dt.strftime('%Y-%m-%d')
-
-                    # Calcular dias proporcionais (maio tem 31 dias)
-                    dia_admissao = data_admissao_dt.day
-                    if data_admissao_dt.month == 4:  # Admitido em abril
-                        dias_uteis_func = dias_uteis_func  # Maio completo
-                        obs_geral = f'Admitido em {data_admissao_dt.strftime("%d/%m/%Y")}'
-                    elif data_admissao_dt.month == 5:  # Admitido em maio
-                        dias_restantes_maio = 31 - dia_admissao + 1
-                        proporcao = dias_restantes_maio / 31
-                        dias_uteis_func = int(dias_uteis_func * proporcao)
-                        obs_geral = f'Admitido em {data_admissao_dt.strftime("%d/%m/%Y")} - Proporcional'
-
-                # Verificar se é desligado após dia 15 (recebe VR integral)
-                if df_desligados is not None and 'MATRICULA' in df_desligados.columns and matricula in df_desligados['MATRICULA'].astype(str).values:
-                    desl_info = df_desligados[df_desligados['MATRICULA'].astype(str) == matricula].iloc[0]
-                    if desl_info['DIA'] > 15:
-                        obs_geral = f'Desligado em {desl_info["DATA DEMISSÃO"].strftime("%d/%m/%Y")} - VR Integral (desconto na rescisão)'
-
-                # Calcular valores
-                total_vr = valor_diario * dias_uteis_func
-                custo_empresa = total_vr * 0.80
-                desconto_funcionario = total_vr * 0.20
-
-                base_consolidada.append({
-                    'Matricula': matricula,
-                    'Admissão': data_admissao,
-                    'Sindicato do Colaborador': sindicato,
-                    'Competência': '2025-05-01',
-                    'Dias': int(dias_uteis_func),
-                    'VALOR DIÁRIO VR': valor_diario,
-                    'TOTAL': total_vr,
-                    'Custo empresa': custo_empresa,
-                    'Desconto profissional': desconto_funcionario,
-                    'OBS GERAL': obs_geral
-                })
-
-            # Criar DataFrame consolidado
-            df_consolidado = pd.DataFrame(base_consolidada)
+            for chave, motivo, nome_arquivo in exclusoes_info:
+                if dataset.existe(chave):
+                    construtor_exclusoes.adicionar_por_cargo(dataset.get(chave), motivo, nome_arquivo)
+
+            etapa('Calculando VR', 60)
+            motor = resolver_motor_calculo(motor_calculo)
+            pasta_saida = Path(diretorio_saida) if diretorio_saida else diretorio_saida_sessao()
+            estado_incremental = None
+            if modo_streaming:
+                # Um lote por vez: diretores, exclusões e cálculo; só ficam agregados e linhas de saída
+                partes_consolidadas = []
+                for df_lote in iterar_lotes_planilha(ativos_file, resumo=resumo_ativos):
+                    resumo_ativos.acumular(df_lote)
+                    construtor_exclusoes.adicionar_diretores(df_lote)
+                    partes_consolidadas.append(calcular_base_consolidada(
+                        df_lote, excluidos, df_admissoes, df_desligados,
+                        valor_por_sindicato, dias_por_sindicato,
+                        valor_diario_medio, dias_uteis_medio, competencia.data, regra_desligamento
+                    ))
+                    del df_lote
+                if partes_consolidadas:
+                    df_consolidado = pd.concat(partes_consolidadas, ignore_index=True)
+                    # Diretores só aparecem no lote em que estão: linhas da mesma matrícula aceitas em
+                    # lotes anteriores saem aqui, com as exclusões de todos os lotes (como fora do streaming)
+                    excluidas_depois = df_consolidado['Matricula'].isin(excluidos)
+                    if excluidas_depois.any():
+                        df_consolidado = df_consolidado[~excluidas_depois].reset_index(drop=True)
+                else:
+                    df_consolidado = pd.DataFrame(columns=COLUNAS_VR_MENSAL)
+
+                result_summary += _secao_ativos(ativos_file.name, resumo_ativos)
+                result_summary += f"   🌊 Streaming: {resumo_ativos.lotes} lote(s) de até {resumo_ativos.tamanho_lote} linhas\n\n"
+                result_summary += _secao_diretores(resumo_ativos)
+                if motor != MOTOR_VETORIZADO:
+                    result_summary += f"   ⚠️ Motor '{motor}' indisponível no modo streaming; usado o vetorizado\n\n"
+                motor = MOTOR_VETORIZADO
+            else:
+                # Verificar e adicionar diretores das planilhas ATIVAS
+                construtor_exclusoes.adicionar_diretores(df_ativos)
+
+                # Recálculo incremental (FINACREW_INCREMENTAL): só as matrículas com entradas alteradas
+                df_calculo = df_ativos
+                if incremental_habilitado() and motor != MOTOR_COMPARAR:
+                    estado_incremental = EstadoIncremental(pasta_saida, competencia.rotulo)
+                    plano_incremental = estado_incremental.planejar(dataset, excluidos, {
+                        'competencia': competencia.rotulo,
+                        'motor': motor,
+                        'prorrateio': modo_prorrateio,
+                        'regra_desligamento': regra_desligamento,
+                        'valor_por_sindicato': valor_por_sindicato,
+                        'dias_por_sindicato': dias_por_sindicato,
+                        'valor_diario_medio': valor_diario_medio,
+                        'dias_uteis_medio': dias_uteis_medio
+                    })
+                    if not plano_incremental.completo:
+                        df_calculo = df_ativos[plano_incremental.mascara(df_ativos)]
+
+                # Montar base consolidada com o motor selecionado (FINACREW_MOTOR_VR)
+                argumentos_motor = (
+                    df_calculo, excluidos, df_admissoes, df_desligados,
+                    valor_por_sindicato, dias_por_sindicato,
+                    valor_diario_medio, dias_uteis_medio, competencia.data, regra_desligamento
+                )
+                if motor == MOTOR_LEGADO:
+                    df_consolidado = _montar_base_consolidada_legado(*argumentos_motor)
+                else:
+                    df_consolidado = calcular_base_consolidada(*argumentos_motor)
+
+            if motor == MOTOR_COMPARAR:
+                comparacao = comparar_bases_consolidadas(
+                    _montar_base_consolidada_legado(*argumentos_motor), df_consolidado
+                )
+                result_summary += f"🔬 COMPARAÇÃO DE MOTORES (legado x vetorizado):\n"
+                result_summary += f"   📊 Linhas: {comparacao['linhas_legado']} x {comparacao['linhas_vetorizado']}\n"
+                if comparacao['identicas']:
+                    result_summary += f"   ✅ Bases idênticas linha a linha\n\n"
+                else:
+                    result_summary += f"   ❌ Linhas divergentes: {comparacao['linhas_divergentes']}\n"
+                    for exemplo in comparacao['exemplos']:
+                        result_summary += f"      - Linha {exemplo['linha']}: {exemplo['legado']} x {exemplo['vetorizado']}\n"
+                    result_summary += f"\n"
+                    logger.warning(f"Motores divergentes: {comparacao['linhas_divergentes']} linha(s)")
+
+            # Prorrateio por dias úteis: admissões, desligamentos e férias parciais no calendário do sindicato
+            if modo_prorrateio == MODO_DIAS_UTEIS:
+                etapa('Prorrateando dias úteis', 70)
+                df_consolidado, estatisticas_prorrateio = aplicar_prorrateio_dias_uteis(
+                    df_consolidado, dias_por_sindicato, dias_uteis_medio,
+                    df_admissoes, df_desligados, df_ferias_parciais, competencia.data
+                )
+                resultado.prorrateio = estatisticas_prorrateio.to_dict()
+                escopo = ' - linhas recalculadas' if estado_incremental is not None and not plano_incremental.completo else ''
+                result_summary += f"⚖️ PRORRATEIO POR DIAS ÚTEIS (feriados do sindicato{escopo}):\n"
+                result_summary += f"   📊 Funcionários com período parcial: {estatisticas_prorrateio.prorrateados}\n"
+                result_summary += f"   📅 Admissões no mês: {estatisticas_prorrateio.admissoes} | Desligamentos no mês: {estatisticas_prorrateio.desligamentos} | Férias parciais: {estatisticas_prorrateio.ferias_parciais}\n"
+                result_summary += f"   ➖ Dias úteis descontados: {estatisticas_prorrateio.dias_descontados}\n\n"
+
+            # Linhas recalculadas + reaproveitadas da execução anterior; grava o novo estado
+            if estado_incremental is not None:
+                df_consolidado = estado_incremental.aplicar(plano_incremental, df_consolidado, df_ativos)
+                estatisticas_incremental = estado_incremental.estatisticas
+                resultado.incremental = estatisticas_incremental.to_dict()
+                result_summary += f"♻️ RECÁLCULO INCREMENTAL:\n"
+                if estatisticas_incremental.completo:
+                    result_summary += f"   🔁 Recálculo completo ({estatisticas_incremental.motivo}): {estatisticas_incremental.recalculadas} linha(s)\n"
+                else:
+                    result_summary += f"   🔁 Linhas recalculadas: {estatisticas_incremental.recalculadas} | reaproveitadas: {estatisticas_incremental.reaproveitadas}\n"
+                    for entrada, etapas_afetadas in estatisticas_incremental.etapas_afetadas.items():
+                        result_summary += f"   📝 {entrada}: {estatisticas_incremental.alteracoes[entrada]} matrícula(s) alterada(s) → {', '.join(etapas_afetadas)}\n"
+                    if not estatisticas_incremental.etapas_afetadas:
+                        result_summary += f"   ✅ Nenhuma entrada alterada desde a última execução\n"
+                result_summary += f"\n"
 
             # Calcular funcionários elegíveis baseado na planilha REAL gerada
             # (garantindo consistência entre estatística e planilha)
             funcionarios_elegiveis = len(df_consolidado)
 
-            # Salvar planilha final com aba Validações
-            output_file = "VR MENSAL 05.2025.xlsx"
-            with pd.ExcelWriter(output_file, engine='openpyxl') as writer:
-                df_consolidado.to_excel(writer, sheet_name='VR MENSAL 05.2025', index=False)
-
-                # Criar aba Validações conforme modelo
-                validacoes_data = [
-                    ['Validações', 'Check'],
-                    ['Afastados / Licenças', '✓'],
-                    ['DESLIGADOS GERAL', '✓'],
-                    ['Admitidos mês', '✓'],
-                    ['Férias', '✓'],
-                    ['ESTAGIARIO', '✓'],
-                    ['APRENDIZ', '✓'],
-                    ['SINDICATOS x VALOR', '✓'],
-                    ['DESLIGADOS ATÉ O DIA 15 DO MÊS - EXCLUIR DA COMPRA', '✓'],
-                    ['DESLIGADOS DO DIA 16 EM DIANTE - VR INTEGRAL (desconto na rescisão)', '✓'],
-                    ['ATENDIMENTOS/OBS', '✓'],
-                    ['Admitidos mês anterior (abril)', '✓'],
-                    ['EXTERIOR', '✓'],
-                    ['ATIVOS', '✓'],
-                    ['REVISAR O CALCULO DE PGTO ANTES DE GERAR OS VALES', '✓']
-                ]
-                df_validacoes = pd.DataFrame(validacoes_data[1:], columns=validacoes_data[0])
-                df_validacoes.to_excel(writer, sheet_name='Validações', index=False)
+            etapa('Gravando planilhas', 80)
+
+            # Salvar planilha final com aba Validações (FINACREW_EXCEL_BACKEND)
+            pasta_saida.mkdir(parents=True, exist_ok=True)
+            output_file = competencia.arquivo_vr
+            backend_excel = escrever_planilha(str(pasta_saida / output_file), {
+                competencia.aba_vr: df_consolidado,
+                'Validações': tabela_validacoes()
+            })
 
             # Gerar planilha separada de exclusões para auditoria
             exclusoes_file = "FUNCIONARIOS_EXCLUIDOS_AUDITORIA.xlsx"
-            if lista_exclusoes:
-                df_exclusoes = pd.DataFrame(lista_exclusoes)
-
-                # Criar estatísticas de exclusões
-                exclusoes_stats = df_exclusoes['Motivo_Exclusao'].value_counts().reset_index()
-                exclusoes_stats.columns = ['Motivo de Exclusão', 'Quantidade']
-                exclusoes_stats_total = pd.DataFrame([['TOTAL EXCLUÍDOS', len(df_exclusoes)]],
-                                                   columns=['Motivo de Exclusão', 'Quantidade'])
-                exclusoes_stats = pd.concat([exclusoes_stats, exclusoes_stats_total], ignore_index=True)
-
-                with pd.ExcelWriter(exclusoes_file, engine='openpyxl') as writer:
-                    # Aba com lista detalhada de exclusões
-                    df_exclusoes.to_excel(writer, sheet_name='Lista Completa de Exclusões', index=False)
+            df_exclusoes = construtor_exclusoes.construir()
+            if not df_exclusoes.empty:
+                escrever_planilha(str(pasta_saida / exclusoes_file), tabelas_auditoria(df_exclusoes), backend=backend_excel)
 
-                    # Aba com estatísticas
-                    exclusoes_stats.to_excel(writer, sheet_name='Estatísticas de Exclusões', index=False)
-
-                    # Aba resumo por arquivo origem
-                    resumo_origem = df_exclusoes.groupby(['Arquivo_Origem', 'Motivo_Exclusao']).size().reset_index(name='Quantidade')
-                    resumo_origem.to_excel(writer, sheet_name='Resumo por Arquivo', index=False)
+            # Artefato colunar para o model_excel_generator_tool (data_dict), sem linhas no contexto do LLM
+            artefato_base = salvar_base_consolidada(df_consolidado, nome=competencia.artefato, diretorio=pasta_saida)
 
             result_summary += f"📄 PLANILHAS GERADAS:\\n"
             result_summary += f"   📁 Planilha Principal: {output_file}\\n"
             result_summary += f"      📊 Funcionários incluídos: {len(df_consolidado)}\\n"
             result_summary += f"      💰 Valor total: R$ {df_consolidado['TOTAL'].sum():,.2f}\\n"
-            if lista_exclusoes:
+            result_summary += f"      ✍️ Gravação: {backend_excel}\\n"
+            if not df_exclusoes.empty:
                 result_summary += f"   📁 Planilha de Exclusões: {exclusoes_file}\\n"
                 result_summary += f"      📊 Funcionários excluídos: {len(df_exclusoes)}\\n"
                 result_summary += f"      📋 Motivos de exclusão: {df_exclusoes['Motivo_Exclusao'].nunique()}\\n"
+                result_summary += f"      🔁 Com mais de um motivo: {contar_multiplos_motivos(df_exclusoes)} (motivo principal por precedência)\\n"
+            result_summary += f"   📦 Base consolidada (data_dict do model_excel_generator_tool): {artefato_base}\\n"
             result_summary += f"\\n"
 
-            # Calcular valores totais REAIS baseados na planilha gerada
-            valor_total_vr = funcionarios_elegiveis * valor_diario_medio * dias_uteis_medio
-            valor_empresa = valor_total_vr * 0.80
-            valor_funcionario = valor_total_vr * 0.20
-
-            # Adicionar resumo final com valores REAIS
+            # Resultado estruturado: totais somados da planilha gerada e validações da base
+            desligados_ate_15 = ()
+            if df_desligados is not None and 'MATRICULA' in df_desligados.columns:
+                desligados_ate_15 = matriculas_como_texto(df_desligados.loc[excluidos_desligamento, 'MATRICULA'])
+            resultado.funcionarios_elegiveis = funcionarios_elegiveis
+            resultado.funcionarios_excluidos = len(df_exclusoes)
+            resultado.exclusoes_por_motivo = (
+                df_exclusoes['Motivo_Exclusao'].value_counts().astype(int).to_dict() if not df_exclusoes.empty else {}
+            )
+            resultado.valor_total_vr = round(float(df_consolidado['TOTAL'].sum()), 2)
+            resultado.valor_empresa = round(float(df_consolidado['Custo empresa'].sum()), 2)
+            resultado.valor_funcionario = round(float(df_consolidado['Desconto profissional'].sum()), 2)
+            resultado.arquivos['vr_mensal'] = str(pasta_saida / output_file)
+            if not df_exclusoes.empty:
+                resultado.arquivos['exclusoes'] = str(pasta_saida / exclusoes_file)
+            resultado.arquivos['base_consolidada'] = artefato_base
+            resultado.validacoes = validar_base_consolidada(df_consolidado, excluidos, desligados_ate_15)
+            resultado.motor_calculo = motor
+            resultado.backend_excel = backend_excel
+
+            # Adicionar resumo final com valores REAIS (totais somados da planilha gerada)
             result_summary += f"🎯 RESULTADO FINAL (CONFORME PDF + REGRA DIA 15):\\n"
-            result_summary += f"   👥 Total funcionários ativos: {total_ativos}\\n"
-            result_summary += f"   ➖ Funcionários em férias: {funcionarios_ferias} (excluídos)\\n"
+            result_summary += f"   👥 Total funcionários ativos: {resumo_ativos.total}\\n"
+            if df_ferias_parciais is not None and not df_ferias_parciais.empty:
+                ferias_integrais = funcionarios_ferias - len(df_ferias_parciais)
+                result_summary += f"   ➖ Funcionários em férias: {ferias_integrais} (excluídos) + {len(df_ferias_parciais)} com férias parciais (prorrateados)\\n"
+            else:
+                result_summary += f"   ➖ Funcionários em férias: {funcionarios_ferias} (excluídos)\\n"
             result_summary += f"   ➖ Funcionários desligados até dia 15: {funcionarios_desligados_ate_15} (NÃO recebem VR)\\n"
-            result_summary += f"   ✅ Funcionários desligados após dia 15: {funcionarios_desligados_apos_15} (recebem VR INTEGRAL)\\n"
+            if regra_desligamento == REGRA_MES_COMPETENCIA:
+                result_summary += f"   ➖ Funcionários desligados antes de {competencia.rotulo}: {funcionarios_desligados_anteriores} (NÃO recebem VR)\\n"
+            regra_apos_15 = 'recebem VR PROPORCIONAL' if modo_prorrateio == MODO_DIAS_UTEIS else 'recebem VR INTEGRAL'
+            result_summary += f"   ✅ Funcionários desligados após dia 15: {funcionarios_desligados_apos_15} ({regra_apos_15})\\n"
             result_summary += f"   ➖ Funcionários afastados: {funcionarios_afastados}\\n"
             result_summary += f"   ➖ Funcionários no exterior: {funcionarios_exterior}\\n"
             result_summary += f"   ➖ Estagiários: {funcionarios_estagiarios} (EXCLUÍDOS conforme PDF)\\n"
             result_summary += f"   ➖ Aprendizes: {funcionarios_aprendizes} (EXCLUÍDOS conforme PDF)\\n"
-            result_summary += f"   ➖ Diretores: {funcionarios_diretores} (EXCLUÍDOS conforme PDF)\\n"
+            result_summary += f"   ➖ Diretores: {resumo_ativos.diretores_cargo} (EXCLUÍDOS conforme PDF)\\n"
             result_summary += f"   ✅ Funcionários elegíveis: {funcionarios_elegiveis}\\n"
             result_summary += f"   💰 Valor diário médio: R$ {valor_diario_medio:.2f}\\n"
             result_summary += f"   📅 Dias úteis médios por sindicato: {dias_uteis_medio:.1f}\\n"
-            result_summary += f"   💵 Valor total VR: R$ {valor_total_vr:,.2f}\\n"
-            result_summary += f"   🏢 Valor empresa (80%): R$ {valor_empresa:,.2f}\\n"
-            result_summary += f"   👤 Valor funcionário (20%): R$ {valor_funcionario:,.2f}\\n"
+            result_summary += f"   💵 Valor total VR: R$ {resultado.valor_total_vr:,.2f}\\n"
+            result_summary += f"   🏢 Valor empresa (80%): R$ {resultado.valor_empresa:,.2f}\\n"
+            result_summary += f"   👤 Valor funcionário (20%): R$ {resultado.valor_funcionario:,.2f}\\n"
             result_summary += f"\\n"
 
         except Exception as e:
             result_summary += f"⚠️ Erro ao gerar planilha consolidada: {str(e)}\\n"
-
-        result_summary += f"✅ PROCESSAMENTO CONCLUÍDO COM SUCESSO!\\n"
-        result_summary += f"📋 Todos os valores são baseados em dados REAIS das planilhas fornecidas.\\n"
-
+            resultado.erro = f"Erro ao gerar planilha consolidada: {str(e)}"
+            erro_etapa = e
+
+        if resultado.sucesso:
+            result_summary += f"✅ PROCESSAMENTO CONCLUÍDO COM SUCESSO!\\n"
+            result_summary += f"📋 Todos os valores são baseados em dados REAIS das planilhas fornecidas.\\n"
+
+        resultado.funcionarios_ativos = resumo_ativos.total
+        resultado.contagens = {
+            'ferias': funcionarios_ferias,
+            'desligados': funcionarios_desligados_total,
+            'desligados_ate_15': funcionarios_desligados_ate_15,
+            'desligados_apos_15': funcionarios_desligados_apos_15,
+            **({'desligados_anteriores': funcionarios_desligados_anteriores}
+               if regra_desligamento == REGRA_MES_COMPETENCIA else {}),
+            'afastados': funcionarios_afastados,
+            'exterior': funcionarios_exterior,
+            'estagiarios': funcionarios_estagiarios,
+            'aprendizes': funcionarios_aprendizes,
+            'diretores': resumo_ativos.diretores_cargo,
+            'admitidos_abril': funcionarios_admitidos_abril
+        }
+        resultado.tempo_total = round(cronometro.finalizar(erro=erro_etapa), 4)
+        resultado.tempos_etapas = cronometro.tempos
+        resultado.relatorio = result_summary
+        PROCESSAMENTOS.inc(status='sucesso' if resultado.sucesso else 'erro')
+
+        _notificar_progresso(progresso, 'Dados processados', 95)
         print(result_summary)
-        return result_summary
+        return resultado
 
     except Exception as e:
         error_msg = f"❌ Erro no processamento de dados reais: {str(e)}"
         print(error_msg)
-        return error_msg
\ No newline at end of file
+        resultado.tempo_total = round(cronometro.finalizar(erro=e), 4)
+        resultado.tempos_etapas = cronometro.tempos
+        PROCESSAMENTOS.inc(status='erro')
+        return resultado.falha(error_msg)
\ No newline at end of file
@@ -7,35 +7,27 @@ Extrai informações estruturadas do processamento conforme requisitos do PDF
 import os
 import json
 from crewai import Agent, Task, Crew
-from crewai.llm import LLM
 from crewai_tools import tool
-from dotenv import load_dotenv
+from typing import Optional
 
-# Carregar variáveis de ambiente com caminho absoluto
-current_dir = os.path.dirname(os.path.abspath(__file__))
-project_root = os.path.dirname(current_dir)
-dotenv_path = os.path.join(project_root, '.env')
-load_dotenv(dotenv_path)
+from llm_registry import obter_llm
+from metrics import medir_tool
+from session_context import ConfiguracaoLLM
 
 # Configurar LLM usando a mesma estrutura do projeto
-def get_llm():
-    # Recarregar variáveis de ambiente para pegar atualizações do header
-    load_dotenv(dotenv_path, override=True)
-
-    groq_api_key = os.getenv("GROQ_API_KEY")
-    modelo_llm = os.getenv("MODEL", "llama-3.3-70b-versatile")
-
-    print(f"🔑 Chave API carregada: {groq_api_key[:20] if groq_api_key else 'NONE'}...")
-    print(f"🤖 Modelo LLM: {modelo_llm}")
-
-    if not groq_api_key:
-        raise ValueError("GROQ_API_KEY não encontrada nas variáveis de ambiente")
-
-    if not modelo_llm.startswith('groq/'):
-        modelo_llm = f"groq/{modelo_llm}"
-    return LLM(model=modelo_llm, api_key=groq_api_key)
+def get_llm(config: Optional[ConfiguracaoLLM] = None, usar_cache: bool = True):
+    """
+    LLM do Groq com a configuração informada, a da sessão ativa ou a do .env/ambiente.
+    O cliente vem do registro (llm_registry): reutilizado enquanto provedor, modelo e chave
+    não mudam; o .env só é relido quando o arquivo é alterado.
+    Com usar_cache, prompts repetidos são respondidos pelo cache em disco (llm_response_cache)
+    """
+    llm = obter_llm(config, usar_cache=usar_cache)
+    print(f"🤖 Modelo LLM: {llm.model}")
+    return llm
 
 @tool
+@medir_tool
 def results_analyzer_agent_tool(raw_processing_result: str) -> str:
     """
     Ferramenta que usa agente para analisar resultados do processamento VR/VA
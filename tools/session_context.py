@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Sessões de processamento isoladas
+Cada requisição ganha um diretório próprio (uploads, saída e logs) e uma configuração
+de LLM; a sessão ativa é guardada em uma contextvar, então execuções simultâneas em
+threads diferentes não compartilham arquivos, logs nem variáveis de ambiente
+"""
+
+import os
+import re
+import uuid
+import shutil
+import contextvars
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Optional
+import logging
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Raiz dos diretórios de sessão
+SESSOES_DIR = os.getenv('FINACREW_SESSOES_DIR', 'sessions')
+MODELO_PADRAO = 'llama-3.3-70b-versatile'
+
+# Ids aceitos em caminhos (evita path traversal vindo de headers/URLs)
+_PADRAO_ID = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+
+@dataclass(frozen=True)
+class ConfiguracaoLLM:
+    """Chave e modelo do Groq de uma requisição (nunca escritos em os.environ)"""
+    api_key: Optional[str] = None
+    modelo: str = MODELO_PADRAO
+
+    @classmethod
+    def de_groq_config(cls, groq_config: Optional[Dict]) -> Optional['ConfiguracaoLLM']:
+        """Converte o dicionário {'apiKey', 'model'} do header X-Groq-Config"""
+        if not groq_config:
+            return None
+        return cls(api_key=groq_config.get('apiKey') or None, modelo=groq_config.get('model') or MODELO_PADRAO)
+
+
+@dataclass
+class Sessao:
+    """Diretórios e configuração de uma execução"""
+    id: str
+    diretorio: Path
+    uploads: Path
+    saida: Path
+    logs: Path
+    llm: Optional[ConfiguracaoLLM] = None
+    metadados: Dict = field(default_factory=dict)
+
+
+_sessao_atual: contextvars.ContextVar = contextvars.ContextVar('finacrew_sessao', default=None)
+
+
+def id_sessao_valido(session_id: Optional[str]) -> bool:
+    return bool(session_id) and bool(_PADRAO_ID.match(session_id))
+
+
+def criar_sessao(session_id: Optional[str] = None, raiz: Optional[str] = None,
+                 uploads: Optional[str] = None, llm: Optional[ConfiguracaoLLM] = None) -> Sessao:
+    """
+    Cria (ou reabre) a sessão e seus diretórios.
+
+    Args:
+        session_id: Id existente; um novo é gerado se omitido
+        raiz: Diretório raiz das sessões (padrão: FINACREW_SESSOES_DIR ou 'sessions')
+        uploads: Diretório de entrada alternativo (ex.: pasta de upload legada, compartilhada)
+        llm: Configuração do LLM desta sessão
+    """
+    session_id = session_id or uuid.uuid4().hex
+    if not id_sessao_valido(session_id):
+        raise ValueError(f"Id de sessão inválido: {session_id}")
+
+    diretorio = Path(raiz or SESSOES_DIR) / session_id
+    sessao = Sessao(
+        id=session_id,
+        diretorio=diretorio,
+        uploads=Path(uploads) if uploads else diretorio / 'uploads',
+        saida=diretorio / 'output',
+        logs=diretorio / 'logs',
+        llm=llm
+    )
+    for pasta in (sessao.uploads, sessao.saida, sessao.logs):
+        pasta.mkdir(parents=True, exist_ok=True)
+    return sessao
+
+
+def obter_sessao(session_id: str, raiz: Optional[str] = None) -> Optional[Sessao]:
+    """Sessão já existente em disco (None se o id for inválido ou desconhecido)"""
+    if not id_sessao_valido(session_id) or not (Path(raiz or SESSOES_DIR) / session_id).is_dir():
+        return None
+    return criar_sessao(session_id, raiz=raiz)
+
+
+def remover_sessao(sessao: Sessao):
+    """Apaga os diretórios da sessão"""
+    shutil.rmtree(sessao.diretorio, ignore_errors=True)
+
+
+@contextmanager
+def ativar_sessao(sessao: Sessao):
+    """Torna a sessão a ativa no contexto atual (thread ou tarefa) enquanto o bloco executa"""
+    token = _sessao_atual.set(sessao)
+    try:
+        yield sessao
+    finally:
+        _sessao_atual.reset(token)
+
+
+def sessao_atual() -> Optional[Sessao]:
+    return _sessao_atual.get()
+
+
+def diretorio_saida(padrao: str = '.') -> Path:
+    """Saída da sessão ativa; sem sessão, o diretório padrão (comportamento da CLI)"""
+    sessao = sessao_atual()
+    return sessao.saida if sessao else Path(padrao)
+
+
+def diretorio_logs(padrao: str = 'logs') -> Path:
+    """Logs da sessão ativa; sem sessão, o diretório padrão (comportamento da CLI)"""
+    sessao = sessao_atual()
+    return sessao.logs if sessao else Path(padrao)
+
+
+def configuracao_llm_atual() -> Optional[ConfiguracaoLLM]:
+    sessao = sessao_atual()
+    return sessao.llm if sessao else None
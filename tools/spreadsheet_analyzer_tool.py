@@ -13,11 +13,15 @@ import re
 from datetime import datetime
 import logging
 
+from parsed_upload_cache import ler_planilha_com_cache
+from metrics import medir_tool
+
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 @tool("spreadsheet_analyzer_tool")
+@medir_tool
 def spreadsheet_analyzer_tool(file_path: str, sheet_name: str = "default") -> str:
     """
     Analisa automaticamente planilhas de funcionários e identifica sua estrutura e tipo.
@@ -45,15 +49,15 @@ def spreadsheet_analyzer_tool(file_path: str, sheet_name: str = "default") -> st
         if not file_path_obj.exists():
             return f"❌ Arquivo não encontrado: {file_path}"
 
-        # Determinar método de carregamento
+        # Determinar método de carregamento (via cache compartilhado com o processador)
         if file_path.lower().endswith('.csv'):
-            df = pd.read_csv(file_path, encoding='utf-8', on_bad_lines='skip')
+            df, acerto_cache = ler_planilha_com_cache(file_path, 'csv', encoding='utf-8', on_bad_lines='skip')
         else:
-            # Se sheet_name for "default" ou None, usar a primeira aba
+            # Se sheet_name for "default" ou None, usar a primeira aba (mesma chave do processador)
             if sheet_name == "default" or sheet_name is None:
-                df = pd.read_excel(file_path, sheet_name=0)  # Primeira aba
+                df, acerto_cache = ler_planilha_com_cache(file_path)
             else:
-                df = pd.read_excel(file_path, sheet_name=sheet_name)
+                df, acerto_cache = ler_planilha_com_cache(file_path, sheet_name=sheet_name)
 
         if df.empty:
             return f"⚠️ Planilha vazia: {file_path}"
@@ -112,6 +116,7 @@ def spreadsheet_analyzer_tool(file_path: str, sheet_name: str = "default") -> st
 📂 Arquivo: {file_path_obj.name}
 🎯 Tipo Identificado: {spreadsheet_type} (Confiança: {confidence}%)
 📏 Registros: {total_rows} total, {non_null_rows} com dados válidos
+🗃️ Cache: {'hit (planilha já interpretada)' if acerto_cache else 'miss (planilha lida do arquivo)'}
 
 🔍 CAMPOS IDENTIFICADOS:
 """
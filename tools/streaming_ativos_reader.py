@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Leitura em lotes (streaming) de planilhas ATIVOS muito grandes
+Percorre a planilha com openpyxl em modo read-only, entregando DataFrames de tamanho
+limitado para que exclusões e cálculo sejam aplicados lote a lote com memória controlada
+"""
+
+import os
+import pandas as pd
+from pathlib import Path
+from typing import Iterator, List, Optional
+import logging
+
+from metrics import registrar_leitura
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Acima deste tamanho de arquivo (MB) o modo streaming é escolhido automaticamente
+LIMITE_STREAMING_MB = float(os.getenv('FINACREW_STREAMING_LIMITE_MB', '50'))
+
+# Memória alvo (MB) para cada lote em processamento
+MEMORIA_LOTE_MB = float(os.getenv('FINACREW_STREAMING_MEMORIA_MB', '256'))
+
+# Linhas lidas para estimar o custo de memória por linha
+LINHAS_CALIBRACAO = 1000
+LOTE_MINIMO = 1000
+LOTE_MAXIMO = 500000
+
+# Cópias intermediárias feitas por lote (conversões de texto, máscaras, saída)
+FATOR_COPIAS = 4
+
+
+def resolver_modo_streaming(caminho, modo: Optional[str] = None) -> bool:
+    """
+    Decide se a planilha deve ser lida em streaming.
+
+    Args:
+        caminho: Arquivo ATIVOS
+        modo: 'auto', 'sempre' ou 'nunca' (padrão: FINACREW_STREAMING ou 'auto')
+    """
+    escolha = (modo or os.getenv('FINACREW_STREAMING', 'auto')).strip().lower()
+    if escolha == 'sempre':
+        return True
+    if escolha == 'nunca':
+        return False
+    return Path(caminho).stat().st_size / (1024 * 1024) >= LIMITE_STREAMING_MB
+
+
+def calibrar_tamanho_lote(amostra: pd.DataFrame, memoria_mb: float = MEMORIA_LOTE_MB) -> int:
+    """Linhas por lote para que o lote e suas cópias caibam na memória alvo"""
+    if amostra.empty:
+        return LOTE_MINIMO
+    bytes_por_linha = max(amostra.memory_usage(deep=True).sum() / len(amostra), 1)
+    linhas = int(memoria_mb * 1024 * 1024 / (bytes_por_linha * FATOR_COPIAS))
+    return max(LOTE_MINIMO, min(LOTE_MAXIMO, linhas))
+
+
+class ResumoAtivos:
+    """Agregados de ATIVOS acumulados lote a lote (ou de uma vez, fora do streaming)"""
+
+    def __init__(self):
+        self.total = 0
+        self.colunas: List[str] = []
+        self.sindicatos: Optional[pd.Series] = None
+        self.diretores_cargo = 0
+        self.lotes = 0
+        self.tamanho_lote = 0
+
+    def acumular(self, df: pd.DataFrame):
+        self.lotes += 1
+        self.total += len(df)
+        if not self.colunas:
+            self.colunas = list(df.columns)
+
+        if 'Sindicato' in df.columns:
+            contagem = df['Sindicato'].value_counts()
+            self.sindicatos = contagem if self.sindicatos is None else self.sindicatos.add(contagem, fill_value=0)
+
+        if 'Cargo' in df.columns or 'CARGO' in df.columns:
+            cargo_col = 'Cargo' if 'Cargo' in df.columns else 'CARGO'
+            self.diretores_cargo += int(df[cargo_col].str.contains('DIRETOR|DIRETORA', case=False, na=False).sum())
+
+    @property
+    def possui_coluna_cargo(self) -> bool:
+        return 'Cargo' in self.colunas or 'CARGO' in self.colunas
+
+    def sindicatos_ordenados(self) -> pd.Series:
+        if self.sindicatos is None:
+            return pd.Series(dtype='int64')
+        return self.sindicatos.astype('int64').sort_values(ascending=False, kind='stable')
+
+
+def _normalizar_lote(lote: pd.DataFrame) -> pd.DataFrame:
+    """Converte colunas float inteiras para int, como o leitor openpyxl do pandas faz por célula"""
+    for coluna in lote.columns:
+        serie = lote[coluna]
+        if serie.dtype.kind == 'f' and serie.notna().all() and (serie % 1 == 0).all():
+            lote[coluna] = serie.astype('int64')
+    return lote
+
+
+def iterar_lotes_planilha(caminho, memoria_mb: float = MEMORIA_LOTE_MB,
+                          resumo: Optional[ResumoAtivos] = None) -> Iterator[pd.DataFrame]:
+    """
+    Lê a primeira aba em lotes, sem materializar a planilha inteira.
+
+    Args:
+        caminho: Arquivo Excel
+        memoria_mb: Memória alvo por lote
+        resumo: ResumoAtivos opcional que recebe o tamanho de lote calibrado
+
+    Yields:
+        DataFrames com o cabeçalho da planilha e índice contínuo entre os lotes
+    """
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(caminho, read_only=True, data_only=True)
+    inicio = 0
+    try:
+        linhas = workbook.worksheets[0].iter_rows(values_only=True)
+        cabecalho = next(linhas, None)
+        if cabecalho is None:
+            return
+        colunas = [str(c) if c is not None else f'Unnamed: {i}' for i, c in enumerate(cabecalho)]
+
+        tamanho_lote = LINHAS_CALIBRACAO
+        calibrado = False
+        buffer = []
+        linhas_vazias = 0
+        for linha in linhas:
+            # Linhas vazias só entram se houver dados depois delas (o pandas descarta as finais)
+            if all(valor is None for valor in linha):
+                linhas_vazias += 1
+                continue
+            if linhas_vazias:
+                buffer.extend([(None,) * len(colunas)] * linhas_vazias)
+                linhas_vazias = 0
+            buffer.append(linha[:len(colunas)])
+            if len(buffer) < tamanho_lote:
+                continue
+
+            lote = _normalizar_lote(pd.DataFrame(buffer, columns=colunas, index=pd.RangeIndex(inicio, inicio + len(buffer))))
+            if not calibrado:
+                tamanho_lote = calibrar_tamanho_lote(lote, memoria_mb)
+                calibrado = True
+                logger.info(f"Streaming de {Path(caminho).name}: lotes de {tamanho_lote} linhas (~{memoria_mb:.0f} MB)")
+                if resumo is not None:
+                    resumo.tamanho_lote = tamanho_lote
+            inicio += len(buffer)
+            buffer = []
+            yield lote
+
+        if buffer:
+            if resumo is not None and not resumo.tamanho_lote:
+                resumo.tamanho_lote = tamanho_lote
+            yield _normalizar_lote(pd.DataFrame(buffer, columns=colunas, index=pd.RangeIndex(inicio, inicio + len(buffer))))
+            inicio += len(buffer)
+    finally:
+        workbook.close()
+        registrar_leitura(Path(caminho).stem, caminho, inicio)
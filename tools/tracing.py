@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Rastreamento leve (spans) de uma execução: API → tools → LLM
+Cada span tem id, id do pai, atributos (arquivo, linhas, modelo, tokens) e duração.
+O span corrente fica em uma contextvar; threads e processos de trabalho recebem o
+contexto explicitamente (contexto_remoto/continuar_trace). Os spans são gravados em
+JSONL na pasta de logs da sessão e, ao fim do span raiz, convertidos para o formato
+Chrome trace (chrome://tracing, Perfetto, speedscope), sem coletor externo
+"""
+
+import os
+import json
+import time
+import uuid
+import threading
+import contextvars
+from contextlib import contextmanager
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+import logging
+
+from session_context import diretorio_logs
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+PREFIXO_ARQUIVO = 'trace_'
+
+_span_atual: contextvars.ContextVar = contextvars.ContextVar('finacrew_span_atual', default=None)
+_rastreador_atual: contextvars.ContextVar = contextvars.ContextVar('finacrew_rastreador', default=None)
+
+
+def tracing_habilitado() -> bool:
+    """Ligado por padrão; FINACREW_TRACING=0 desliga (spans viram no-op)"""
+    return os.getenv('FINACREW_TRACING', '1').strip().lower() not in ('0', 'false', 'nao', 'não')
+
+
+def _novo_id() -> str:
+    return uuid.uuid4().hex[:16]
+
+
+@dataclass
+class Span:
+    """Intervalo nomeado de uma execução; inicio em segundos desde a época"""
+    nome: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    inicio: float
+    duracao: float = 0.0
+    atributos: Dict = field(default_factory=dict)
+    status: str = 'ok'
+    erro: Optional[str] = None
+    pid: int = field(default_factory=os.getpid)
+    thread: str = field(default_factory=lambda: threading.current_thread().name)
+
+    def definir(self, **atributos):
+        self.atributos.update(atributos)
+
+
+class _SpanNulo:
+    """Devolvido quando não há rastreamento ativo: aceita atributos e não grava nada"""
+    span_id = None
+
+    def definir(self, **atributos):
+        pass
+
+
+SPAN_NULO = _SpanNulo()
+
+
+class Rastreador:
+    """Grava os spans de um trace em JSONL (uma linha por span, em append entre processos)"""
+
+    def __init__(self, caminho: Path, trace_id: str):
+        self.caminho = Path(caminho)
+        self.trace_id = trace_id
+        self._lock = threading.Lock()
+
+    def registrar(self, span: Span):
+        linha = json.dumps(asdict(span), ensure_ascii=False, default=str)
+        try:
+            with self._lock, open(self.caminho, 'a', encoding='utf-8') as f:
+                f.write(linha + '\n')
+        except OSError as e:
+            logger.warning(f"Não foi possível gravar o span {span.nome} em {self.caminho}: {e}")
+
+    def exportar_chrome(self) -> Path:
+        """Converte o JSONL em Chrome trace (eventos completos 'X', tempos em microssegundos)"""
+        eventos = []
+        with open(self.caminho, encoding='utf-8') as f:
+            for linha in f:
+                span = json.loads(linha)
+                eventos.append({
+                    'name': span['nome'],
+                    'cat': span['nome'].split('.')[0],
+                    'ph': 'X',
+                    'ts': round(span['inicio'] * 1e6),
+                    'dur': round(span['duracao'] * 1e6),
+                    'pid': span['pid'],
+                    'tid': span['thread'],
+                    'args': {**span['atributos'], 'span_id': span['span_id'], 'parent_id': span['parent_id'],
+                             'status': span['status'], **({'erro': span['erro']} if span['erro'] else {})}
+                })
+        eventos.sort(key=lambda e: e['ts'])
+        caminho = self.caminho.with_suffix('.json')
+        caminho.write_text(json.dumps({'traceEvents': eventos, 'displayTimeUnit': 'ms'}, ensure_ascii=False), encoding='utf-8')
+        return caminho
+
+
+def _abrir(nome: str, atributos: Dict, rastreador: Rastreador) -> Span:
+    pai = _span_atual.get()
+    return Span(
+        nome=nome,
+        trace_id=rastreador.trace_id,
+        span_id=_novo_id(),
+        parent_id=pai.span_id if pai is not None else None,
+        inicio=time.time(),
+        atributos=dict(atributos)
+    )
+
+
+@contextmanager
+def _executar_span(span: Span, rastreador: Rastreador) -> Iterator[Span]:
+    token = _span_atual.set(span)
+    inicio = time.perf_counter()
+    try:
+        yield span
+    except BaseException as e:
+        span.status = 'erro'
+        span.erro = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        span.duracao = time.perf_counter() - inicio
+        _span_atual.reset(token)
+        rastreador.registrar(span)
+
+
+@contextmanager
+def span(nome: str, **atributos) -> Iterator:
+    """Span filho do corrente; sem rastreamento ativo, não faz nada"""
+    rastreador = _rastreador_atual.get()
+    if rastreador is None:
+        yield SPAN_NULO
+        return
+    with _executar_span(_abrir(nome, atributos, rastreador), rastreador) as novo:
+        yield novo
+
+
+@contextmanager
+def rastrear(nome: str, diretorio: Optional[str] = None, **atributos) -> Iterator:
+    """
+    Span raiz de um trace novo gravado em diretorio (padrão: logs da sessão ativa).
+    Dentro de um trace já ativo, vira um span filho comum
+    """
+    if _rastreador_atual.get() is not None or not tracing_habilitado():
+        with span(nome, **atributos) as filho:
+            yield filho
+        return
+
+    pasta = Path(diretorio) if diretorio is not None else diretorio_logs()
+    pasta.mkdir(parents=True, exist_ok=True)
+    trace_id = _novo_id()
+    rastreador = Rastreador(pasta / f"{PREFIXO_ARQUIVO}{trace_id}.jsonl", trace_id)
+    token = _rastreador_atual.set(rastreador)
+    try:
+        with _executar_span(_abrir(nome, atributos, rastreador), rastreador) as raiz:
+            raiz.definir(arquivo_trace=rastreador.caminho.name)
+            yield raiz
+    finally:
+        _rastreador_atual.reset(token)
+        try:
+            rastreador.exportar_chrome()
+        except (OSError, ValueError) as e:
+            logger.warning(f"Não foi possível exportar o Chrome trace de {rastreador.caminho}: {e}")
+
+
+class SpanAberto:
+    """Span aberto e fechado em chamadas separadas (etapas sequenciais do CronometroEtapas)"""
+
+    def __init__(self, nome: str, **atributos):
+        self._rastreador = _rastreador_atual.get()
+        self._contexto = None
+        if self._rastreador is not None:
+            self._contexto = _executar_span(_abrir(nome, atributos, self._rastreador), self._rastreador)
+            self._contexto.__enter__()
+
+    def fechar(self, erro: Optional[BaseException] = None):
+        """Fecha o span; com erro, ele é gravado com status 'erro' (a exceção não é relançada)"""
+        if self._contexto is not None:
+            if erro is None:
+                self._contexto.__exit__(None, None, None)
+            else:
+                self._contexto.__exit__(type(erro), erro, erro.__traceback__)
+            self._contexto = None
+
+
+def trace_atual() -> Optional[Dict]:
+    """Arquivos do trace ativo (jsonl e o Chrome trace gerado ao fim da raiz)"""
+    rastreador = _rastreador_atual.get()
+    if rastreador is None:
+        return None
+    return {
+        'trace_id': rastreador.trace_id,
+        'jsonl': rastreador.caminho,
+        'chrome': rastreador.caminho.with_suffix('.json')
+    }
+
+
+def contexto_remoto() -> Optional[Dict]:
+    """Contexto serializável para continuar o trace em outra thread ou processo"""
+    rastreador = _rastreador_atual.get()
+    if rastreador is None:
+        return None
+    pai = _span_atual.get()
+    return {
+        'caminho': str(rastreador.caminho),
+        'trace_id': rastreador.trace_id,
+        'parent_id': pai.span_id if pai is not None else None
+    }
+
+
+@contextmanager
+def continuar_trace(contexto: Optional[Dict]) -> Iterator:
+    """No worker: spans do bloco viram filhos do span que gerou o contexto (mesmo arquivo)"""
+    if not contexto:
+        yield
+        return
+    rastreador = Rastreador(Path(contexto['caminho']), contexto['trace_id'])
+    # Pai remoto: só o id importa para os filhos
+    pai = Span(nome='remoto', trace_id=contexto['trace_id'], span_id=contexto['parent_id'], parent_id=None, inicio=0.0)
+    token_rastreador = _rastreador_atual.set(rastreador)
+    token_span = _span_atual.set(pai)
+    try:
+        yield
+    finally:
+        _span_atual.reset(token_span)
+        _rastreador_atual.reset(token_rastreador)
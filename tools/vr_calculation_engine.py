@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Motor vetorizado de elegibilidade e cálculo de VR
+Monta a base consolidada com joins, anti-joins (isin) e aritmética colunar,
+produzindo exatamente as mesmas linhas da aba VR MENSAL do laço por funcionário
+"""
+
+import os
+import pandas as pd
+import numpy as np
+from typing import Dict, Iterable, Optional
+import logging
+
+from competencia import COMPETENCIA_REFERENCIA, Competencia
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Motores disponíveis para montar a base consolidada
+MOTOR_VETORIZADO = 'vetorizado'
+MOTOR_LEGADO = 'legado'
+MOTOR_COMPARAR = 'comparar'
+MOTORES_VALIDOS = (MOTOR_VETORIZADO, MOTOR_LEGADO, MOTOR_COMPARAR)
+
+# Competência gravada na planilha (primeiro dia do mês de referência)
+COMPETENCIA_PADRAO = COMPETENCIA_REFERENCIA.data
+
+# Desligados com comunicação até este dia do mês não recebem VR
+DIA_LIMITE_DESLIGAMENTO = 15
+
+# Regras de desligamento disponíveis
+# 'dia' (padrão, modelo 05/2025): só o dia da demissão conta, qualquer que seja o mês da data, e a
+# admissão é comparada só pelo mês (sem o ano)
+# 'competencia' (lote de meses): compara mês e ano da demissão e da admissão com a competência;
+# desligados em meses anteriores ficam de fora e os de meses seguintes não afetam a competência
+REGRA_DIA_DO_MES = 'dia'
+REGRA_MES_COMPETENCIA = 'competencia'
+REGRAS_DESLIGAMENTO = (REGRA_DIA_DO_MES, REGRA_MES_COMPETENCIA)
+
+# Colunas da aba VR MENSAL, na ordem do modelo
+COLUNAS_VR_MENSAL = [
+    'Matricula',
+    'Admissão',
+    'Sindicato do Colaborador',
+    'Competência',
+    'Dias',
+    'VALOR DIÁRIO VR',
+    'TOTAL',
+    'Custo empresa',
+    'Desconto profissional',
+    'OBS GERAL'
+]
+
+
+def resolver_motor_calculo(motor_calculo: Optional[str] = None) -> str:
+    """Resolve o motor de cálculo a partir do argumento ou da variável FINACREW_MOTOR_VR"""
+    motor = (motor_calculo or os.getenv('FINACREW_MOTOR_VR', MOTOR_VETORIZADO)).strip().lower()
+    if motor not in MOTORES_VALIDOS:
+        logger.warning(f"Motor de cálculo desconhecido '{motor}', usando '{MOTOR_VETORIZADO}'")
+        return MOTOR_VETORIZADO
+    return motor
+
+
+def resolver_regra_desligamento(regra: Optional[str] = None) -> str:
+    """Resolve a regra de desligamento a partir do argumento ou da variável FINACREW_REGRA_DESLIGAMENTO"""
+    valor = (regra or os.getenv('FINACREW_REGRA_DESLIGAMENTO', REGRA_DIA_DO_MES)).strip().lower()
+    if valor not in REGRAS_DESLIGAMENTO:
+        logger.warning(f"Regra de desligamento desconhecida '{valor}', usando '{REGRA_DIA_DO_MES}'")
+        return REGRA_DIA_DO_MES
+    return valor
+
+
+def matriculas_como_texto(serie: pd.Series) -> pd.Series:
+    """Converte matrículas para texto como o laço original (str(valor) ou '' quando vazio)"""
+    return serie.astype(str).where(serie.notna(), '')
+
+
+def primeira_ocorrencia(df: pd.DataFrame, coluna: str) -> pd.DataFrame:
+    """Indexa o DataFrame pela matrícula em texto mantendo a primeira ocorrência (como .iloc[0])"""
+    chave = df['MATRICULA'].astype(str)
+    return df.assign(_chave=chave).drop_duplicates('_chave', keep='first').set_index('_chave')[coluna]
+
+
+def no_mes(datas: pd.Series, competencia: Competencia) -> pd.Series:
+    """Datas que caem no mês da competência (NaT = False)"""
+    return (datas.dt.year == competencia.ano) & (datas.dt.month == competencia.mes)
+
+
+def admitidos_no_mes(datas: pd.Series, competencia: Competencia, regra: str = REGRA_DIA_DO_MES) -> pd.Series:
+    """Admissões no mês da competência: só o mês na regra 'dia' (modelo 05/2025), mês e ano na 'competencia'"""
+    if regra == REGRA_MES_COMPETENCIA:
+        return no_mes(datas, competencia)
+    return datas.dt.month == competencia.mes
+
+
+def mascara_desligados_anteriores(df_desligados: pd.DataFrame, competencia: str = COMPETENCIA_PADRAO,
+                                  regra: str = REGRA_DIA_DO_MES) -> pd.Series:
+    """Desligados em mês anterior à competência (só na regra 'competencia'; na regra 'dia' nenhum)"""
+    if regra != REGRA_MES_COMPETENCIA:
+        return pd.Series(False, index=df_desligados.index)
+    competencia = Competencia.de_texto(competencia)
+    return df_desligados['DATA DEMISSÃO'] < pd.Timestamp(competencia.data)
+
+
+def mascara_desligados_excluidos(df_desligados: pd.DataFrame, competencia: str = COMPETENCIA_PADRAO,
+                                 regra: str = REGRA_DIA_DO_MES) -> pd.Series:
+    """
+    Desligados sem VR na competência.
+    Regra 'dia': comunicação até o dia 15. Regra 'competencia': até o dia 15 do mês da competência
+    ou em mês anterior a ela.
+    """
+    ate_dia_limite = df_desligados['DIA'] <= DIA_LIMITE_DESLIGAMENTO
+    if regra != REGRA_MES_COMPETENCIA:
+        return ate_dia_limite
+    competencia = Competencia.de_texto(competencia)
+    no_mes_competencia = no_mes(df_desligados['DATA DEMISSÃO'], competencia)
+    return mascara_desligados_anteriores(df_desligados, competencia, regra) | (no_mes_competencia & ate_dia_limite)
+
+
+def mascara_desligados_vr_integral(df_desligados: pd.DataFrame, competencia: str = COMPETENCIA_PADRAO,
+                                   regra: str = REGRA_DIA_DO_MES) -> pd.Series:
+    """Desligados após o dia 15 (na regra 'competencia', só no mês da competência): VR integral"""
+    apos_dia_limite = df_desligados['DIA'] > DIA_LIMITE_DESLIGAMENTO
+    if regra != REGRA_MES_COMPETENCIA:
+        return apos_dia_limite
+    return apos_dia_limite & no_mes(df_desligados['DATA DEMISSÃO'], Competencia.de_texto(competencia))
+
+
+def valor_por_substring(sindicatos: pd.Series, mapa: Dict[str, float], padrao: float) -> np.ndarray:
+    """Primeira chave do mapa contida no nome do sindicato, na ordem do dicionário"""
+    valores = np.full(len(sindicatos), padrao, dtype=float)
+    atribuido = np.zeros(len(sindicatos), dtype=bool)
+    for chave, valor in mapa.items():
+        encontrado = sindicatos.str.contains(chave, regex=False).to_numpy() & ~atribuido
+        valores[encontrado] = valor
+        atribuido |= encontrado
+    return valores
+
+
+def calcular_base_consolidada(
+    df_ativos: pd.DataFrame,
+    excluidos: Iterable[str],
+    df_admissoes: Optional[pd.DataFrame],
+    df_desligados: Optional[pd.DataFrame],
+    valor_por_sindicato: Dict[str, float],
+    dias_por_sindicato: Dict[str, int],
+    valor_diario_padrao: float,
+    dias_uteis_padrao: float,
+    competencia: str = COMPETENCIA_PADRAO,
+    regra_desligamento: str = REGRA_DIA_DO_MES
+) -> pd.DataFrame:
+    """
+    Calcula a base consolidada de VR para toda a população de uma vez.
+
+    Args:
+        df_ativos: Funcionários ativos (MATRICULA, Sindicato e opcionalmente TITULO DO CARGO)
+        excluidos: Matrículas (texto) excluídas por férias, desligamento, afastamento etc.
+        df_admissoes: Admissões com coluna 'Admissão' já convertida para data
+        df_desligados: Desligados com colunas 'DATA DEMISSÃO' e 'DIA'
+        valor_por_sindicato: Valor diário por trecho do nome do sindicato
+        dias_por_sindicato: Dias úteis por trecho do nome do sindicato
+        valor_diario_padrao: Valor diário quando nenhum sindicato corresponde
+        dias_uteis_padrao: Dias úteis quando nenhum sindicato corresponde
+        competencia: Competência ('AAAA-MM-01' ou 'MM.AAAA'); define o mês anterior (admissão sem
+                     proporcional), o mês proporcional e a data gravada na planilha
+        regra_desligamento: 'dia' (padrão) ou 'competencia' (ver REGRAS_DESLIGAMENTO)
+
+    Returns:
+        DataFrame com as colunas de COLUNAS_VR_MENSAL, na ordem de df_ativos
+    """
+    competencia = Competencia.de_texto(competencia)
+    matriculas = matriculas_como_texto(df_ativos['MATRICULA'])
+
+    # Anti-join com as exclusões e filtro de diretores
+    elegiveis = ~matriculas.isin(set(excluidos))
+    if 'TITULO DO CARGO' in df_ativos.columns:
+        cargos = df_ativos['TITULO DO CARGO']
+        diretores = cargos.notna() & cargos.astype(str).str.upper().str.contains('DIRETOR', regex=False)
+        elegiveis &= ~diretores
+
+    matriculas = matriculas[elegiveis].reset_index(drop=True)
+    sindicatos = df_ativos.loc[elegiveis, 'Sindicato'].reset_index(drop=True)
+    sindicatos = sindicatos.where(sindicatos.notna(), '')
+    sindicatos_texto = sindicatos.astype(str)
+
+    valor_diario = valor_por_substring(sindicatos_texto, valor_por_sindicato, valor_diario_padrao)
+    dias = valor_por_substring(sindicatos_texto, dias_por_sindicato, dias_uteis_padrao)
+
+    total_linhas = len(matriculas)
+    data_admissao = pd.Series('2024-08-01', index=matriculas.index, dtype=object)
+    obs_geral = pd.Series('', index=matriculas.index, dtype=object)
+
+    # Join com admissões (primeira ocorrência por matrícula)
+    if df_admissoes is not None and 'MATRICULA' in df_admissoes.columns and total_linhas:
+        admissao = pd.to_datetime(matriculas.map(primeira_ocorrencia(df_admissoes, 'Admissão')))
+        admitidos = admissao.notna().to_numpy()
+        if admitidos.any():
+            data_admissao[admitidos] = admissao[admitidos].dt.strftime('%Y-%m-%d')
+            data_texto = admissao.dt.strftime('%d/%m/%Y')
+
+            # Mês anterior: mês cheio; mês da competência: proporcional aos dias corridos restantes
+            mes_anterior = admitidos & admitidos_no_mes(admissao, competencia.anterior, regra_desligamento).to_numpy()
+            obs_geral[mes_anterior] = 'Admitido em ' + data_texto[mes_anterior]
+
+            mes_atual = admitidos & admitidos_no_mes(admissao, competencia, regra_desligamento).to_numpy()
+            dia_admissao = admissao.dt.day.to_numpy(dtype=float, na_value=0)
+            proporcao = (competencia.dias_no_mes - dia_admissao + 1) / competencia.dias_no_mes
+            dias = np.where(mes_atual, np.trunc(dias * proporcao), dias)
+            obs_geral[mes_atual] = 'Admitido em ' + data_texto[mes_atual] + ' - Proporcional'
+
+    # Join com desligados: após o dia 15 recebem VR integral
+    if df_desligados is not None and 'MATRICULA' in df_desligados.columns and total_linhas:
+        demissao = pd.to_datetime(matriculas.map(primeira_ocorrencia(df_desligados, 'DATA DEMISSÃO')))
+        dia_demissao = matriculas.map(primeira_ocorrencia(df_desligados, 'DIA'))
+        apos_15 = mascara_desligados_vr_integral(
+            pd.DataFrame({'DATA DEMISSÃO': demissao, 'DIA': dia_demissao}), competencia, regra_desligamento
+        ).to_numpy()
+        if apos_15.any():
+            obs_geral[apos_15] = (
+                'Desligado em ' + demissao[apos_15].dt.strftime('%d/%m/%Y')
+                + ' - VR Integral (desconto na rescisão)'
+            )
+
+    total_vr = valor_diario * dias
+
+    return pd.DataFrame({
+        'Matricula': matriculas.to_numpy(dtype=object),
+        'Admissão': data_admissao.to_numpy(dtype=object),
+        'Sindicato do Colaborador': sindicatos.to_numpy(dtype=object),
+        'Competência': competencia.data,
+        'Dias': dias.astype(np.int64),
+        'VALOR DIÁRIO VR': valor_diario,
+        'TOTAL': total_vr,
+        'Custo empresa': total_vr * 0.80,
+        'Desconto profissional': total_vr * 0.20,
+        'OBS GERAL': obs_geral.to_numpy(dtype=object)
+    }, columns=COLUNAS_VR_MENSAL)
+
+
+def comparar_bases_consolidadas(df_legado: pd.DataFrame, df_vetorizado: pd.DataFrame) -> Dict:
+    """
+    Compara linha a linha as bases produzidas pelos dois motores.
+
+    Returns:
+        Dicionário com 'identicas', quantidades de linhas e as primeiras divergências
+    """
+    resultado = {
+        'identicas': False,
+        'linhas_legado': len(df_legado),
+        'linhas_vetorizado': len(df_vetorizado),
+        'linhas_divergentes': 0,
+        'exemplos': []
+    }
+
+    if df_legado.empty and df_vetorizado.empty:
+        resultado['identicas'] = True
+        return resultado
+
+    if len(df_legado) != len(df_vetorizado) or list(df_legado.columns) != list(df_vetorizado.columns):
+        resultado['linhas_divergentes'] = abs(len(df_legado) - len(df_vetorizado))
+        return resultado
+
+    legado = df_legado.reset_index(drop=True)
+    vetorizado = df_vetorizado.reset_index(drop=True)
+    diferentes = (legado != vetorizado) & ~(legado.isna() & vetorizado.isna())
+    linhas = diferentes.any(axis=1)
+
+    resultado['linhas_divergentes'] = int(linhas.sum())
+    resultado['identicas'] = resultado['linhas_divergentes'] == 0
+    for posicao in np.flatnonzero(linhas.to_numpy())[:5]:
+        colunas = list(diferentes.columns[diferentes.iloc[posicao]])
+        resultado['exemplos'].append({
+            'linha': int(posicao),
+            'colunas': colunas,
+            'legado': {c: legado.at[posicao, c] for c in colunas},
+            'vetorizado': {c: vetorizado.at[posicao, c] for c in colunas}
+        })
+    return resultado
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Carregador único e paralelo das planilhas de entrada
+Lê cada arquivo Excel exatamente uma vez e entrega um dataset compartilhado
+para as etapas de contagem, exclusões e consolidação
+"""
+
+import os
+import time
+import threading
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import pandas as pd
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+import logging
+
+from metrics import registrar_cache, registrar_leitura
+from parsed_upload_cache import cache_habilitado, ler_planilha_com_cache
+from tracing import contexto_remoto, continuar_trace, span
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Planilhas de entrada conhecidas pelo processador (chave → nome do arquivo)
+ARQUIVOS_ENTRADA = {
+    'ATIVOS': 'ATIVOS.xlsx',
+    'FERIAS': 'FERIAS.xlsx',
+    'DESLIGADOS': 'DESLIGADOS.xlsx',
+    'AFASTAMENTOS': 'AFASTAMENTOS.xlsx',
+    'EXTERIOR': 'EXTERIOR.xlsx',
+    'ESTAGIO': 'ESTAGIO.xlsx',
+    'APRENDIZ': 'APRENDIZ.xlsx',
+    'ADMISSAO_ABRIL': 'ADMISSAO_ABRIL.xlsx',
+    'SINDICATO_VALOR': 'Base_sindicato_x_valor.xlsx',
+    'DIAS_UTEIS': 'Base_dias_uteis.xlsx'
+}
+
+# Acima deste volume total (MB) o parsing vai para processos; abaixo, threads bastam
+LIMITE_PROCESSOS_MB = float(os.getenv('FINACREW_LOADER_LIMITE_PROCESSOS_MB', '5'))
+
+_pool_processos = None
+_pool_lock = threading.Lock()
+
+
+def _ler_planilha(caminho: str, contexto_trace: Optional[Dict] = None) -> Tuple[pd.DataFrame, float, bool]:
+    """
+    Lê a primeira aba de uma planilha pelo cache (executado nos workers) e mede o tempo.
+    contexto_trace liga o span da leitura ao trace de quem chamou (threads e processos)
+    """
+    with continuar_trace(contexto_trace), span('planilha.ler', arquivo=Path(caminho).name) as leitura:
+        inicio = time.perf_counter()
+        df, acerto_cache = ler_planilha_com_cache(caminho)
+        leitura.definir(linhas=len(df), cache=acerto_cache)
+    return df, time.perf_counter() - inicio, acerto_cache
+
+
+def _obter_pool_processos() -> ProcessPoolExecutor:
+    """Pool de processos persistente, reaproveitado entre execuções para amortizar o spawn"""
+    global _pool_processos
+    with _pool_lock:
+        if _pool_processos is None:
+            _pool_processos = ProcessPoolExecutor(
+                max_workers=min(len(ARQUIVOS_ENTRADA), os.cpu_count() or 1),
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return _pool_processos
+
+
+def _resolver_executor(executor: Optional[str], tamanho_total_mb: float) -> str:
+    """Decide entre 'threads' e 'processos' (FINACREW_LOADER_EXECUTOR: auto, threads, processos)"""
+    escolha = (executor or os.getenv('FINACREW_LOADER_EXECUTOR', 'auto')).strip().lower()
+    if escolha in ('threads', 'processos'):
+        return escolha
+    return 'processos' if tamanho_total_mb >= LIMITE_PROCESSOS_MB else 'threads'
+
+
+class DatasetEntrada:
+    """Planilhas de entrada carregadas uma única vez para toda a execução"""
+
+    def __init__(self, base_path: Path, planilhas: Dict[str, pd.DataFrame],
+                 tempos: Dict[str, float], executor: str, tempo_total: float,
+                 acertos_cache: Optional[Dict[str, bool]] = None):
+        self.base_path = base_path
+        self.planilhas = planilhas
+        self.tempos = tempos
+        self.executor = executor
+        self.tempo_total = tempo_total
+        self.acertos_cache = acertos_cache or {}
+
+    @property
+    def cache_hits(self) -> int:
+        return sum(1 for acerto in self.acertos_cache.values() if acerto)
+
+    @property
+    def cache_misses(self) -> int:
+        return sum(1 for acerto in self.acertos_cache.values() if not acerto)
+
+    def existe(self, nome: str) -> bool:
+        """Indica se a planilha foi encontrada e carregada"""
+        return nome in self.planilhas
+
+    def get(self, nome: str) -> Optional[pd.DataFrame]:
+        """
+        Retorna o DataFrame carregado (compartilhado entre as etapas).
+
+        Quem precisar alterar colunas deve trabalhar sobre uma cópia.
+        """
+        return self.planilhas.get(nome)
+
+    def caminho(self, nome: str) -> Path:
+        """Caminho do arquivo correspondente à chave"""
+        return self.base_path / ARQUIVOS_ENTRADA[nome]
+
+    def arquivo(self, nome: str) -> str:
+        """Nome do arquivo correspondente à chave"""
+        return ARQUIVOS_ENTRADA[nome]
+
+
+def carregar_planilhas(
+    base_directory: str,
+    nomes: Optional[Iterable[str]] = None,
+    max_workers: Optional[int] = None,
+    executor: Optional[str] = None
+) -> DatasetEntrada:
+    """
+    Carrega em paralelo todas as planilhas de entrada presentes no diretório.
+
+    Args:
+        base_directory: Diretório com os arquivos Excel
+        nomes: Chaves de ARQUIVOS_ENTRADA a carregar (padrão: todas)
+        max_workers: Número máximo de threads (padrão: número de arquivos, limitado a CPUs)
+        executor: 'threads', 'processos' ou 'auto' (padrão: FINACREW_LOADER_EXECUTOR)
+
+    Returns:
+        DatasetEntrada com os DataFrames e o tempo de leitura de cada arquivo
+    """
+    inicio = time.perf_counter()
+    base_path = Path(base_directory)
+    nomes = list(nomes) if nomes is not None else list(ARQUIVOS_ENTRADA)
+
+    caminhos = {
+        nome: base_path / ARQUIVOS_ENTRADA[nome]
+        for nome in nomes
+        if (base_path / ARQUIVOS_ENTRADA[nome]).exists()
+    }
+
+    planilhas = {}
+    tempos = {}
+    acertos_cache = {}
+    if not caminhos:
+        return DatasetEntrada(base_path, planilhas, tempos, 'nenhum', time.perf_counter() - inicio)
+
+    tamanho_total_mb = sum(c.stat().st_size for c in caminhos.values()) / (1024 * 1024)
+    modo = _resolver_executor(executor, tamanho_total_mb)
+    workers = max_workers or min(len(caminhos), os.cpu_count() or 1)
+
+    contexto_trace = contexto_remoto()
+    if modo == 'processos':
+        pool = _obter_pool_processos()
+        futuros = {nome: pool.submit(_ler_planilha, str(c), contexto_trace) for nome, c in caminhos.items()}
+        for nome, futuro in futuros.items():
+            planilhas[nome], tempos[nome], acertos_cache[nome] = futuro.result()
+    else:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='finacrew-loader') as pool:
+            futuros = {nome: pool.submit(_ler_planilha, str(c), contexto_trace) for nome, c in caminhos.items()}
+            for nome, futuro in futuros.items():
+                planilhas[nome], tempos[nome], acertos_cache[nome] = futuro.result()
+
+    usa_cache = cache_habilitado()
+    for nome, caminho in caminhos.items():
+        registrar_leitura(nome, caminho, len(planilhas[nome]))
+        if usa_cache:
+            registrar_cache('planilhas', acertos_cache[nome])
+
+    tempo_total = time.perf_counter() - inicio
+    logger.info(
+        f"{len(planilhas)} planilha(s) carregada(s) via {modo} em {tempo_total:.2f}s "
+        f"(cache: {sum(acertos_cache.values())} hit(s))"
+    )
+    return DatasetEntrada(base_path, planilhas, tempos, modo, tempo_total, acertos_cache)
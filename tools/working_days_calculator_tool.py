@@ -6,17 +6,26 @@ Convertido para usar decorador @tool conforme filosofia Professor
 
 from crewai.tools import tool
 import pandas as pd
-from datetime import datetime, timedelta, date
-import holidays
 from typing import Dict, List
 from pathlib import Path
 import logging
 
+from metrics import medir_tool
+from holiday_calendar import (
+    dias_uteis_mes,
+    dias_uteis_por_regiao,
+    feriados_regionais_do_mes,
+    limites_mes,
+    nome_regiao,
+    uf_da_regiao
+)
+
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 @tool("working_days_calculator_tool")
+@medir_tool
 def working_days_calculator_tool(reference_month: str = "05.2025") -> str:
     """
     Calcula dias úteis EXATOS por região/sindicato considerando feriados específicos.
@@ -50,34 +59,22 @@ def working_days_calculator_tool(reference_month: str = "05.2025") -> str:
             'SINDPD MG - Minas Gerais': 35.0
         }
 
-        # Calcular dias úteis por sindicato
+        # Calcular dias úteis por sindicato (todas as regiões em uma contagem vetorizada)
         working_days_by_union = {}
         holiday_details = {}
 
-        for union, daily_value in union_values.items():
-            # Extrair estado do nome do sindicato
-            if 'SP' in union or 'São Paulo' in union:
-                state = 'São Paulo'
-            elif 'RJ' in union or 'Rio de Janeiro' in union:
-                state = 'Rio de Janeiro'
-            elif 'PR' in union or 'Paraná' in union:
-                state = 'Paraná'
-            elif 'RS' in union or 'Rio Grande do Sul' in union:
-                state = 'Rio Grande do Sul'
-            elif 'MG' in union or 'Minas Gerais' in union:
-                state = 'Minas Gerais'
-            else:
-                state = 'Brasil'
-
-            # Calcular dias úteis específicos para o estado
-            working_days, state_holidays = calculate_working_days_for_state(
-                state, target_year, target_month
-            )
+        ufs = [uf_da_regiao(union) for union in union_values]
+        inicio_mes, fim_mes = limites_mes(target_year, target_month)
+        dias_por_union = dias_uteis_por_regiao(ufs, inicio_mes, fim_mes)
+
+        for (union, daily_value), uf, working_days in zip(union_values.items(), ufs, dias_por_union):
+            working_days = int(working_days)
+            state_holidays = feriados_regionais_do_mes(target_year, target_month, uf)
 
             working_days_by_union[union] = {
                 'dias_uteis': working_days,
                 'valor_diario': daily_value,
-                'estado': state,
+                'estado': nome_regiao(uf),
                 'feriados_especificos': len(state_holidays),
                 'valor_mensal_base': working_days * daily_value
             }
@@ -163,72 +160,10 @@ def working_days_calculator_tool(reference_month: str = "05.2025") -> str:
 
 def calculate_working_days_for_state(estado: str, year: int, month: int) -> tuple:
     """Calcula dias úteis específicos para um estado considerando feriados regionais"""
-
-    # Obter feriados nacionais
-    br_holidays = holidays.Brazil(years=year)
-
-    # Obter feriados específicos por estado
-    state_specific_holidays = get_state_specific_holidays(estado, year, month)
-
-    # Combinar feriados
-    all_holidays = set(br_holidays.keys()) | set([h['data'] for h in state_specific_holidays])
-
-    # Calcular dias úteis para o mês específico
-    start_date = date(year, month, 1)
-
-    # Último dia do mês
-    if month == 12:
-        end_date = date(year + 1, 1, 1) - timedelta(days=1)
-    else:
-        end_date = date(year, month + 1, 1) - timedelta(days=1)
-
-    working_days = 0
-    current_date = start_date
-
-    while current_date <= end_date:
-        # Se não for sábado (5) nem domingo (6) nem feriado
-        if current_date.weekday() < 5 and current_date not in all_holidays:
-            working_days += 1
-        current_date += timedelta(days=1)
-
-    return working_days, state_specific_holidays
+    uf = uf_da_regiao(estado)
+    return dias_uteis_mes(year, month, uf), feriados_regionais_do_mes(year, month, uf)
 
 
 def get_state_specific_holidays(estado: str, year: int, month: int) -> List[Dict]:
     """Retorna feriados específicos por estado para o mês especificado"""
-
-    state_holidays = []
-
-    if "São Paulo" in estado or "SP" in estado:
-        state_holidays.extend([
-            {'data': date(year, 1, 25), 'nome': 'Aniversário de São Paulo'},
-            {'data': date(year, 4, 23), 'nome': 'São Jorge'},
-            {'data': date(year, 7, 9), 'nome': 'Revolução Constitucionalista'}
-        ])
-
-    elif "Rio de Janeiro" in estado or "RJ" in estado:
-        state_holidays.extend([
-            {'data': date(year, 4, 23), 'nome': 'São Jorge'},
-            {'data': date(year, 11, 20), 'nome': 'Zumbi dos Palmares'},
-            {'data': date(year, 12, 13), 'nome': 'Santa Luzia'}
-        ])
-
-    elif "Paraná" in estado or "PR" in estado:
-        state_holidays.extend([
-            {'data': date(year, 12, 19), 'nome': 'Emancipação do Paraná'}
-        ])
-
-    elif "Rio Grande do Sul" in estado or "RS" in estado:
-        state_holidays.extend([
-            {'data': date(year, 9, 20), 'nome': 'Revolução Farroupilha'}
-        ])
-
-    elif "Minas Gerais" in estado or "MG" in estado:
-        state_holidays.extend([
-            {'data': date(year, 4, 21), 'nome': 'Tiradentes'}
-        ])
-
-    # Filtrar apenas feriados do mês especificado
-    month_holidays = [h for h in state_holidays if h['data'].month == month]
-
-    return month_holidays
\ No newline at end of file
+    return feriados_regionais_do_mes(year, month, uf_da_regiao(estado))